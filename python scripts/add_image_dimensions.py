@@ -0,0 +1,415 @@
+#!/usr/bin/env python3
+"""
+Give every <img> intrinsic width/height attributes so the page does not shift while it loads.
+
+speakers.html alone has about 2,500 <img loading="lazy"> tags, almost all
+with a height but no width, so the browser cannot reserve their space
+until each file arrives. This pass reads the dimensions from the image
+files' headers - the PNG IHDR chunk, the JPEG SOF segment (with the EXIF
+orientation), the GIF screen descriptor, the WebP VP8/VP8L/VP8X header
+and the root <svg> element - without decoding them, and edits the markup:
+
+- an <img> with one of width/height gets the other, scaled by the
+  image's aspect ratio, so it renders exactly as before;
+- an <img> with neither gets the file's size, unless the stylesheets set
+  its height but not its width (the width attribute would then stretch
+  it); an SVG without width/height of its own only has a ratio and is
+  left alone;
+- an element with a background-image in its style attribute gets an
+  aspect-ratio declaration, unless its CSS already sets both its width
+  and height (the speaker cards do).
+
+Values that are not lengths (width="Auto") count as absent. The
+stylesheet gets one rule, :where(img[width][height]) { height: auto; },
+so an image narrowed by max-width: 100% keeps its ratio; :where() has no
+specificity, so any rule that sizes an image still wins.
+
+Dimensions are cached in .image_dimensions.json by content hash (a file
+is only hashed again when its size or mtime changes) and the files are
+probed in parallel threads. Running the pass again changes nothing.
+
+Usage:
+    python3 "python scripts/add_image_dimensions.py" --dry-run
+    python3 "python scripts/add_image_dimensions.py"
+    python3 "python scripts/add_image_dimensions.py" --workers 16 speakers.html zh/speakers.html
+"""
+
+import os
+import re
+import sys
+import json
+import struct
+import hashlib
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+
+from html_stream import build_tree, apply_edits, attr_span, set_attr_edit
+from site_partials import find_pages
+from asset_index import normalize_target, resolve_asset
+from audit_render_blocking import COMPOUND, css_blocks, css_urls, declarations
+
+CACHE_FILE = '.image_dimensions.json'
+CACHE_VERSION = 1
+
+STYLESHEET = 'css/china2024.css'
+RATIO_MARKER = '/* add_image_dimensions: images with width/height attributes keep their ratio */'
+RATIO_RULE = RATIO_MARKER + '\n:where(img[width][height]) {\n  height: auto;\n}\n'
+
+# Enough for the root element of any SVG the site ships, comments and all
+SVG_HEAD_BYTES = 16 * 1024
+LENGTH = re.compile(r'^\s*(\d+(?:\.\d+)?)\s*(px)?\s*$')
+JPEG_SOF = {0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7, 0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF}
+
+
+# Probing ---------------------------------------------------------------------
+
+def _jpeg_size(f):
+    f.seek(2)
+    orientation = 1
+    while True:
+        marker = f.read(2)
+        while marker[:1] == b'\xff' and marker[1:2] == b'\xff':
+            # Fill bytes before a marker
+            marker = marker[1:] + f.read(1)
+        if len(marker) < 2 or marker[0] != 0xFF:
+            return None
+        kind = marker[1]
+        if kind in (0xD8, 0x01) or 0xD0 <= kind <= 0xD7:
+            continue
+        length_bytes = f.read(2)
+        if len(length_bytes) < 2:
+            return None
+        length = struct.unpack('>H', length_bytes)[0]
+        if kind in JPEG_SOF:
+            height, width = struct.unpack('>xHH', f.read(5))
+            # EXIF orientations 5-8 rotate by 90 degrees, and browsers apply them
+            return (height, width) if orientation >= 5 else (width, height)
+        segment = f.read(length - 2)
+        if kind == 0xE1 and segment.startswith(b'Exif\x00\x00'):
+            orientation = _exif_orientation(segment[6:]) or orientation
+
+
+def _exif_orientation(tiff):
+    if len(tiff) < 8 or tiff[:2] not in (b'II', b'MM'):
+        return None
+    order = '<' if tiff[:2] == b'II' else '>'
+    offset = struct.unpack(order + 'I', tiff[4:8])[0]
+    if offset + 2 > len(tiff):
+        return None
+    count = struct.unpack(order + 'H', tiff[offset:offset + 2])[0]
+    for index in range(count):
+        entry = tiff[offset + 2 + index * 12:offset + 14 + index * 12]
+        if len(entry) == 12 and struct.unpack(order + 'H', entry[:2])[0] == 0x0112:
+            return struct.unpack(order + 'H', entry[8:10])[0]
+    return None
+
+
+def _webp_size(head):
+    chunk = head[12:16]
+    if chunk == b'VP8 ' and head[23:26] == b'\x9d\x01\x2a':
+        width, height = struct.unpack('<HH', head[26:30])
+        return width & 0x3FFF, height & 0x3FFF
+    if chunk == b'VP8L' and head[20:21] == b'\x2f':
+        bits = struct.unpack('<I', head[21:25])[0]
+        return (bits & 0x3FFF) + 1, ((bits >> 14) & 0x3FFF) + 1
+    if chunk == b'VP8X':
+        return int.from_bytes(head[24:27], 'little') + 1, int.from_bytes(head[27:30], 'little') + 1
+    return None
+
+
+def _svg_size(head):
+    """(width, height, exact): exact is False when only the viewBox gives a ratio."""
+    match = re.search(rb'<svg\b((?:[^>"\']|"[^"]*"|\'[^\']*\')*)>', head)
+    if not match:
+        return None
+    attrs = {name.lower(): value for name, value in re.findall(
+        r'([\w:-]+)\s*=\s*["\']([^"\']*)["\']', match.group(1).decode('utf-8', 'replace'))}
+    width, height = LENGTH.match(attrs.get('width', '')), LENGTH.match(attrs.get('height', ''))
+    if width and height:
+        return float(width.group(1)), float(height.group(1)), True
+    box = attrs.get('viewbox', '').replace(',', ' ').split()
+    if len(box) == 4:
+        box_width, box_height = float(box[2]), float(box[3])
+        if box_width > 0 and box_height > 0:
+            if width:
+                return float(width.group(1)), float(width.group(1)) * box_height / box_width, True
+            if height:
+                return float(height.group(1)) * box_width / box_height, float(height.group(1)), True
+            return box_width, box_height, False
+    return None
+
+
+def probe(path):
+    """(width, height, exact) from the file's header, or None if the format is unknown."""
+    with open(path, 'rb') as f:
+        head = f.read(32)
+        if head.startswith(b'\x89PNG\r\n\x1a\n') and head[12:16] == b'IHDR':
+            return struct.unpack('>II', head[16:24]) + (True,)
+        if head[:6] in (b'GIF87a', b'GIF89a'):
+            return struct.unpack('<HH', head[6:10]) + (True,)
+        if head.startswith(b'\xff\xd8'):
+            size = _jpeg_size(f)
+            return size + (True,) if size else None
+        if head.startswith(b'RIFF') and head[8:12] == b'WEBP':
+            size = _webp_size(head)
+            return size + (True,) if size else None
+        f.seek(0)
+        text = f.read(SVG_HEAD_BYTES)
+    if b'<svg' in text:
+        return _svg_size(text)
+    return None
+
+
+class DimensionCache:
+    """Image dimensions by content hash, with each file's hash remembered by size and mtime."""
+
+    def __init__(self, path=CACHE_FILE):
+        self.path = path
+        self.files = {}
+        self.dimensions = {}
+        self.probed = 0
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                cached = json.load(f)
+            if cached.get('version') == CACHE_VERSION:
+                self.files = cached['files']
+                self.dimensions = cached['dimensions']
+        except (OSError, ValueError, KeyError):
+            pass
+
+    def _lookup(self, path):
+        stat = os.stat(path)
+        known = self.files.get(path)
+        if known and known[:2] == [stat.st_size, stat.st_mtime_ns] and known[2] in self.dimensions:
+            return path, known[2], None
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                digest.update(chunk)
+        digest = digest.hexdigest()
+        self.files[path] = [stat.st_size, stat.st_mtime_ns, digest]
+        if digest in self.dimensions:
+            return path, digest, None
+        try:
+            return path, digest, probe(path)
+        except (OSError, struct.error, ValueError):
+            return path, digest, None
+
+    def load(self, paths, workers):
+        """{path: (width, height, exact) or None} for the given files, probing the unknown ones in parallel."""
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(self._lookup, sorted(set(paths))))
+        sizes = {}
+        for path, digest, probed in results:
+            if digest not in self.dimensions:
+                self.dimensions[digest] = list(probed) if probed else None
+                self.probed += 1
+            size = self.dimensions[digest]
+            sizes[path] = tuple(size) if size else None
+        return sizes
+
+    def save(self):
+        used = set(digest for _, _, digest in self.files.values())
+        with open(self.path, 'w', encoding='utf-8') as f:
+            json.dump({'version': CACHE_VERSION, 'files': self.files,
+                       'dimensions': {digest: size for digest, size in self.dimensions.items() if digest in used}},
+                      f, separators=(',', ':'))
+
+
+# CSS sizing ------------------------------------------------------------------
+
+def sizing_rules(text):
+    """[(tag, classes, {'width', 'height'})] for the rules of a stylesheet that size elements."""
+    rules = []
+    for _, prelude, body in css_blocks(text):
+        if prelude.startswith('@'):
+            continue
+        values = declarations(body)
+        sized = {name for name in ('width', 'height') if values.get(name, 'auto').strip() != 'auto'}
+        if not sized:
+            continue
+        for selector in prelude.split(','):
+            compound = re.split(r'[\s>+~]+', selector.strip())[-1]
+            # Pseudo-classes do not change which elements can match, for this purpose
+            match = COMPOUND.match(re.sub(r'::?[-\w]+(\([^)]*\))?', '', compound))
+            if match and compound:
+                rules.append(((match.group(1) or '').lower() or None,
+                              frozenset(match.group(2).split('.')[1:]), sized))
+    return rules
+
+
+class CssSizing:
+    """Which of width/height the stylesheets set (to something other than auto) for a tag and classes."""
+
+    def __init__(self, sheets):
+        self.sheets = sheets  # project path -> sizing_rules(), shared between pages
+        self.rules = []
+
+    def add_stylesheet(self, path):
+        if path not in self.sheets:
+            if not path or not os.path.isfile(path):
+                return
+            with open(path, 'r', encoding='utf-8', errors='replace') as f:
+                self.sheets[path] = sizing_rules(f.read())
+        self.rules += self.sheets[path]
+
+    def add_css(self, text):
+        self.rules += sizing_rules(text)
+
+    def sized(self, tag, classes):
+        found = set()
+        for rule_tag, rule_classes, sized in self.rules:
+            if (rule_tag is None or rule_tag == tag) and rule_classes <= classes and (rule_tag or rule_classes):
+                found |= sized
+        return found
+
+
+# Markup ----------------------------------------------------------------------
+
+def length(value):
+    match = LENGTH.match(value or '')
+    return float(match.group(1)) if match and float(match.group(1)) > 0 else None
+
+
+def _number(value):
+    return str(max(1, round(value)))
+
+
+def image_edits(page, data, tree, sizes, sizing, counts):
+    edits = []
+    for img in tree.find_all('img'):
+        path = resolve_asset(page, normalize_target(img.attrs.get('src', '')))
+        size = sizes.get(path)
+        width, height = length(img.attrs.get('width')), length(img.attrs.get('height'))
+        if width and height:
+            continue
+        if not size:
+            counts['no local file'] += 1
+            continue
+        natural_width, natural_height, exact = size
+        if height:
+            edits.append(set_attr_edit(data, img, 'width', _number(height * natural_width / natural_height)))
+        elif width:
+            edits.append(set_attr_edit(data, img, 'height', _number(width * natural_height / natural_width)))
+        elif not exact:
+            counts['ratio only'] += 1
+            continue
+        elif sizing.sized('img', img.classes) == {'height'}:
+            counts['height set by CSS'] += 1
+            continue
+        else:
+            edits.append(set_attr_edit(data, img, 'width', _number(natural_width)))
+            edits.append(set_attr_edit(data, img, 'height', _number(natural_height)))
+        counts['img'] += 1
+    return edits
+
+
+def background_edits(page, data, tree, sizes, sizing, counts):
+    edits = []
+    for element in tree.iter():
+        style = element.attrs.get('style', '')
+        if 'background' not in style or 'aspect-ratio' in style:
+            continue
+        url = next((url for url in css_urls(style) if not url.startswith('data:')), None)
+        size = sizes.get(resolve_asset(page, normalize_target(url))) if url else None
+        span = attr_span(data, element, 'style')
+        if not size or span is None:
+            continue
+        inline = {name for name in ('width', 'height') if declarations(style).get(name, 'auto') != 'auto'}
+        if {'width', 'height'} <= inline | sizing.sized(element.name, element.classes):
+            counts['card sized by CSS'] += 1
+            continue
+        value = data[span[0]:span[1]].rstrip()
+        separator = b' ' if value.endswith(b';') or not value else b'; '
+        ratio = f"aspect-ratio: {_number(size[0])} / {_number(size[1])}".encode('ascii')
+        edits.append((span[0] + len(value), span[1], separator + ratio))
+        counts['card'] += 1
+    return edits
+
+
+def referenced_images(page, data, tree):
+    paths = set()
+    for img in tree.find_all('img'):
+        paths.add(resolve_asset(page, normalize_target(img.attrs.get('src', ''))))
+    for element in tree.iter():
+        for url in css_urls(element.attrs.get('style', '')):
+            if not url.startswith('data:'):
+                paths.add(resolve_asset(page, normalize_target(url)))
+    return {path for path in paths if path and os.path.isfile(path)}
+
+
+def add_ratio_rule(path, dry_run):
+    """Append RATIO_RULE to the stylesheet once. Returns True if it was added."""
+    with open(path, 'r', encoding='utf-8') as f:
+        text = f.read()
+    if RATIO_MARKER in text:
+        return False
+    if not dry_run:
+        with open(path, 'a', encoding='utf-8') as f:
+            f.write(('' if text.endswith('\n') else '\n') + '\n' + RATIO_RULE)
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Add width/height to images and aspect-ratio to background cards')
+    parser.add_argument('pages', nargs='*', help='Pages to update (default: every page of the site)')
+    parser.add_argument('--project-root', default='.', help='Site root (default: current directory)')
+    parser.add_argument('--workers', type=int, default=8, help='Threads probing image files (default: 8)')
+    parser.add_argument('--dry-run', action='store_true', help='Report without writing anything')
+    args = parser.parse_args()
+
+    os.chdir(args.project_root)
+    pages = [os.path.normpath(page).replace(os.sep, '/') for page in args.pages] or find_pages('.')
+    print("📐 Adding image dimensions" + (" (dry run)" if args.dry_run else ""))
+    print("=" * 50)
+
+    documents = {}
+    for page in pages:
+        with open(page, 'rb') as f:
+            data = f.read()
+        documents[page] = (data, build_tree(data))
+
+    cache = DimensionCache()
+    images = set().union(*(referenced_images(page, data, tree) for page, (data, tree) in documents.items()))
+    sizes = cache.load(images, args.workers)
+    print(f"  Images referenced: {len(images)} ({cache.probed} probed, the rest from {CACHE_FILE})")
+    unreadable = sorted(path for path, size in sizes.items() if size is None)
+    if unreadable:
+        print(f"  ⚠️  No dimensions in the headers of {len(unreadable)} files, e.g. {unreadable[0]}")
+
+    counts = dict.fromkeys(['img', 'card', 'no local file', 'ratio only', 'height set by CSS', 'card sized by CSS'], 0)
+    changed = 0
+    sheets = {}
+    for page, (data, tree) in documents.items():
+        sizing = CssSizing(sheets)
+        for link in tree.find_all('link'):
+            if 'stylesheet' in link.attrs.get('rel', '').lower().split():
+                sizing.add_stylesheet(resolve_asset(page, link.attrs.get('href', '')))
+        for style in tree.find_all('style'):
+            sizing.add_css(data[style.inner_start:style.inner_end].decode('utf-8', 'replace'))
+        edits = (image_edits(page, data, tree, sizes, sizing, counts)
+                 + background_edits(page, data, tree, sizes, sizing, counts))
+        if not edits:
+            continue
+        changed += 1
+        if not args.dry_run:
+            with open(page, 'wb') as f:
+                f.write(apply_edits(data, edits))
+
+    print(f"  <img> tags given dimensions: {counts['img']}")
+    print(f"  Background cards given an aspect-ratio: {counts['card']}")
+    skipped = {reason: count for reason, count in counts.items() if reason not in ('img', 'card') and count}
+    if skipped:
+        print("  Left alone: " + ', '.join(f"{count} ({reason})" for reason, count in skipped.items()))
+    print(f"  Pages {'to update' if args.dry_run else 'updated'}: {changed} of {len(pages)}")
+    if counts['img'] and os.path.isfile(STYLESHEET) and add_ratio_rule(STYLESHEET, args.dry_run):
+        print(f"  {'Would add' if args.dry_run else 'Added'} the height: auto rule to {STYLESHEET}")
+
+    if not args.dry_run:
+        cache.save()
+        print("\n✅ Done. Check Cumulative Layout Shift in the browser's performance panel.")
+    sys.exit(0)
+
+
+if __name__ == "__main__":
+    main()
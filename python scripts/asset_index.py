@@ -0,0 +1,384 @@
+#!/usr/bin/env python3
+"""
+Persistent reverse dependency index of which pages reference which assets.
+
+This script will:
+1. Extract every href/src/srcset/url()/@import reference from the HTML and CSS files in one pass
+2. Store asset -> referencing files (with byte offsets) and page -> assets in SQLite
+3. Update incrementally, re-reading only files whose size or mtime changed
+4. Answer "which pages use this asset?" without grepping the whole tree
+
+Other scripts can import it to touch only the files that reference an asset:
+
+    from asset_index import AssetIndex
+
+    with AssetIndex() as index:
+        index.update()
+        for page in index.pages_with_url_containing('gosim-logo-32.svg'):
+            ...
+
+Usage:
+    python3 "python scripts/asset_index.py" update
+    python3 "python scripts/asset_index.py" who-uses images/66cbd46970d8568ff4d7ce6f_favicon-32.png
+    python3 "python scripts/asset_index.py" assets speakers.html
+    python3 "python scripts/asset_index.py" missing
+"""
+
+import os
+import re
+import sys
+import sqlite3
+import argparse
+from pathlib import Path
+from urllib.parse import unquote
+
+DEFAULT_DB = '.asset_index.sqlite'
+
+SCHEMA_VERSION = 1
+
+SKIP_DIRS = {'.git', 'python scripts', '__pycache__', '_partials', '_templates'}
+
+# Attribute references in HTML (byte patterns so offsets are file offsets)
+ATTR_PATTERN = re.compile(
+    rb'\s(href|src|srcset|poster|data-src|xlink:href)\s*=\s*(?:"([^"]*)"|\'([^\']*)\')',
+    re.IGNORECASE,
+)
+
+# url(...) in CSS files, <style> blocks and style attributes
+CSS_URL_PATTERN = re.compile(rb'url\(\s*(?:"([^"]*)"|\'([^\']*)\'|([^)\'"\s][^)]*?))\s*\)', re.IGNORECASE)
+
+# @import "..." without url()
+CSS_IMPORT_PATTERN = re.compile(rb'@import\s+(?:"([^"]*)"|\'([^\']*)\')', re.IGNORECASE)
+
+# Webflow exports escape some characters in URLs, e.g. gosim\-logo\-32\.svg
+ESCAPE_PATTERN = re.compile(r'\\(.)')
+
+
+def is_indexed_file(name):
+    """Only HTML and CSS pages are scanned for references."""
+    if not name.endswith(('.html', '.css')):
+        return False
+    return not any(skip in name for skip in ['backup', 'temp', '.bak', 'before_dedup'])
+
+
+def iter_srcset(value, base_offset):
+    """Yield (url, offset) for each candidate in a srcset value (bytes)."""
+    position = 0
+    length = len(value)
+    while position < length:
+        while position < length and value[position:position + 1] in (b' ', b'\t', b'\n', b'\r', b','):
+            position += 1
+        if position >= length:
+            break
+        start = position
+        while position < length and value[position:position + 1] not in (b' ', b'\t', b'\n', b'\r'):
+            position += 1
+        url = value[start:position]
+        # A trailing comma belongs to the separator when there is no descriptor
+        if url.endswith(b','):
+            url = url[:-1]
+        yield url, base_offset + start
+        while position < length and value[position:position + 1] != b',':
+            position += 1
+
+
+def extract_references(data, is_css=False):
+    """
+    Extract (kind, raw_url, byte_offset) references from a page's bytes.
+
+    kind is the attribute name for HTML attributes, 'url' for url() and
+    'import' for @import.
+    """
+    references = []
+    if not is_css:
+        for match in ATTR_PATTERN.finditer(data):
+            kind = match.group(1).decode('ascii').lower()
+            group = 2 if match.group(2) is not None else 3
+            value = match.group(group)
+            offset = match.start(group)
+            if kind == 'srcset':
+                for url, url_offset in iter_srcset(value, offset):
+                    references.append(('srcset', url, url_offset))
+            else:
+                references.append((kind, value, offset))
+    for match in CSS_URL_PATTERN.finditer(data):
+        group = next(g for g in (1, 2, 3) if match.group(g) is not None)
+        references.append(('url', match.group(group).strip(), match.start(group)))
+    for match in CSS_IMPORT_PATTERN.finditer(data):
+        group = 1 if match.group(1) is not None else 2
+        references.append(('import', match.group(group), match.start(group)))
+    return [
+        (kind, url.decode('utf-8', errors='replace'), offset)
+        for kind, url, offset in references
+        if url
+    ]
+
+
+def normalize_target(raw_url):
+    """Undo Webflow backslash escaping and drop query string and fragment."""
+    target = ESCAPE_PATTERN.sub(r'\1', raw_url.strip())
+    target = target.split('#')[0].split('?')[0]
+    return target
+
+
+def is_local_reference(target):
+    """Check if a reference points into the project (not external, data: etc.)."""
+    if not target:
+        return False
+    if target.startswith(('data:', 'mailto:', 'tel:', 'javascript:', '//')):
+        return False
+    if re.match(r'^[a-zA-Z][a-zA-Z0-9+.-]*:', target):
+        return False
+    return True
+
+
+def resolve_asset(page, target):
+    """Resolve a local reference from page to a project-relative asset path."""
+    if not is_local_reference(target):
+        return None
+    target = unquote(target)
+    if target.startswith('/'):
+        resolved = os.path.normpath(target.lstrip('/'))
+    else:
+        resolved = os.path.normpath(os.path.join(os.path.dirname(page), target))
+    if resolved.startswith('..'):
+        # Points outside the project (e.g. the ../cdn.prod.website-files.com mirrors)
+        return None
+    return resolved.replace(os.sep, '/')
+
+
+class AssetIndex:
+    """SQLite-backed map of asset -> referencing pages and page -> assets."""
+
+    def __init__(self, project_root='.', db_path=None):
+        self.project_root = Path(project_root).resolve()
+        self.db_path = Path(db_path) if db_path else self.project_root / DEFAULT_DB
+        self.connection = sqlite3.connect(str(self.db_path))
+        self.connection.execute('PRAGMA journal_mode=WAL')
+        self._create_schema()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self.connection.commit()
+        self.connection.close()
+
+    def _create_schema(self):
+        cursor = self.connection.cursor()
+        cursor.execute('CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)')
+        row = cursor.execute("SELECT value FROM meta WHERE key = 'schema'").fetchone()
+        if row and int(row[0]) != SCHEMA_VERSION:
+            cursor.execute('DROP TABLE IF EXISTS pages')
+            cursor.execute('DROP TABLE IF EXISTS refs')
+        cursor.executescript('''
+            CREATE TABLE IF NOT EXISTS pages (
+                path TEXT PRIMARY KEY,
+                size INTEGER NOT NULL,
+                mtime_ns INTEGER NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS refs (
+                page TEXT NOT NULL,
+                kind TEXT NOT NULL,
+                raw_url TEXT NOT NULL,
+                target TEXT NOT NULL,
+                asset TEXT,
+                offset INTEGER NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS refs_asset ON refs (asset);
+            CREATE INDEX IF NOT EXISTS refs_page ON refs (page);
+        ''')
+        cursor.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('schema', ?)", (str(SCHEMA_VERSION),))
+        self.connection.commit()
+
+    # Building ---------------------------------------------------------------
+
+    def find_pages(self):
+        """Find every HTML and CSS file in the project."""
+        pages = []
+        for root, dirs, files in os.walk(self.project_root):
+            dirs[:] = [d for d in dirs if d not in SKIP_DIRS and not d.startswith('.')]
+            for name in files:
+                if is_indexed_file(name):
+                    path = Path(root) / name
+                    pages.append(path.relative_to(self.project_root).as_posix())
+        return sorted(pages)
+
+    def _index_page(self, page, stat):
+        with open(self.project_root / page, 'rb') as f:
+            data = f.read()
+        references = extract_references(data, is_css=page.endswith('.css'))
+        cursor = self.connection.cursor()
+        cursor.execute('DELETE FROM refs WHERE page = ?', (page,))
+        cursor.executemany(
+            'INSERT INTO refs (page, kind, raw_url, target, asset, offset) VALUES (?, ?, ?, ?, ?, ?)',
+            [
+                (page, kind, raw_url, normalize_target(raw_url),
+                 resolve_asset(page, normalize_target(raw_url)), offset)
+                for kind, raw_url, offset in references
+            ],
+        )
+        cursor.execute('INSERT OR REPLACE INTO pages (path, size, mtime_ns) VALUES (?, ?, ?)',
+                       (page, stat.st_size, stat.st_mtime_ns))
+        return len(references)
+
+    def update(self, pages=None, verbose=False):
+        """
+        Bring the index up to date.
+
+        With no arguments the whole tree is checked and only files whose size
+        or mtime changed are re-read; pass a list of pages to refresh just
+        those (e.g. the files a rewrite tool has just modified).
+        """
+        full_scan = pages is None
+        if full_scan:
+            pages = self.find_pages()
+        else:
+            pages = [Path(page).as_posix() for page in pages]
+        known = dict(
+            (path, (size, mtime)) for path, size, mtime in
+            self.connection.execute('SELECT path, size, mtime_ns FROM pages')
+        )
+        reindexed = 0
+        removed = 0
+        for page in pages:
+            path = self.project_root / page
+            if not path.exists():
+                if page in known:
+                    self._remove_page(page)
+                    removed += 1
+                continue
+            stat = path.stat()
+            if known.get(page) == (stat.st_size, stat.st_mtime_ns):
+                continue
+            count = self._index_page(page, stat)
+            reindexed += 1
+            if verbose:
+                print(f"  Indexed: {page} ({count} references)")
+        if full_scan:
+            for page in set(known) - set(pages):
+                self._remove_page(page)
+                removed += 1
+        self.connection.commit()
+        return reindexed, removed
+
+    def _remove_page(self, page):
+        self.connection.execute('DELETE FROM refs WHERE page = ?', (page,))
+        self.connection.execute('DELETE FROM pages WHERE path = ?', (page,))
+
+    # Queries ------------------------------------------------------------------
+
+    def pages_referencing(self, asset):
+        """Return [(page, kind, raw_url, offset)] for every reference to a project asset."""
+        asset = os.path.normpath(asset).replace(os.sep, '/')
+        return self.connection.execute(
+            'SELECT page, kind, raw_url, offset FROM refs WHERE asset = ? ORDER BY page, offset',
+            (asset,),
+        ).fetchall()
+
+    def pages_with_url_containing(self, text, kinds=None):
+        """Return the pages with a reference whose (unescaped) URL contains text."""
+        query = "SELECT DISTINCT page FROM refs WHERE instr(target, ?) > 0"
+        params = [text]
+        if kinds:
+            query += f" AND kind IN ({', '.join('?' for _ in kinds)})"
+            params.extend(kinds)
+        return [row[0] for row in self.connection.execute(query + ' ORDER BY page', params)]
+
+    def references_matching(self, like_pattern, kinds=None):
+        """Return [(page, kind, raw_url, offset)] for references whose raw URL matches a SQL LIKE pattern."""
+        query = 'SELECT page, kind, raw_url, offset FROM refs WHERE raw_url LIKE ?'
+        params = [like_pattern]
+        if kinds:
+            query += f" AND kind IN ({', '.join('?' for _ in kinds)})"
+            params.extend(kinds)
+        return self.connection.execute(query + ' ORDER BY page, offset', params).fetchall()
+
+    def assets_of(self, page):
+        """Return the distinct project assets a page references."""
+        page = os.path.normpath(page).replace(os.sep, '/')
+        return [row[0] for row in self.connection.execute(
+            'SELECT DISTINCT asset FROM refs WHERE page = ? AND asset IS NOT NULL ORDER BY asset', (page,)
+        )]
+
+    def missing_assets(self):
+        """Return {asset: [pages]} for referenced assets that do not exist on disk."""
+        missing = {}
+        for asset, page in self.connection.execute(
+                'SELECT DISTINCT asset, page FROM refs WHERE asset IS NOT NULL ORDER BY asset, page'):
+            if not (self.project_root / asset).exists():
+                missing.setdefault(asset, []).append(page)
+        return missing
+
+    def stats(self):
+        pages = self.connection.execute('SELECT COUNT(*) FROM pages').fetchone()[0]
+        references = self.connection.execute('SELECT COUNT(*) FROM refs').fetchone()[0]
+        assets = self.connection.execute('SELECT COUNT(DISTINCT asset) FROM refs WHERE asset IS NOT NULL').fetchone()[0]
+        return pages, references, assets
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Reverse dependency index of which pages reference which assets')
+    parser.add_argument('--project-root', default='.', help='Project root directory')
+    parser.add_argument('--db', help=f'Index database path (default: <project-root>/{DEFAULT_DB})')
+    subparsers = parser.add_subparsers(dest='command')
+
+    subparsers.add_parser('update', help='Build or incrementally update the index')
+    subparsers.add_parser('rebuild', help='Drop the index and rebuild it from scratch')
+    who_uses = subparsers.add_parser('who-uses', help='List the pages that reference an asset')
+    who_uses.add_argument('asset', help='Project-relative asset path, e.g. images/foo.png')
+    assets = subparsers.add_parser('assets', help='List the assets a page references')
+    assets.add_argument('page', help='Project-relative page path, e.g. speakers.html')
+    grep = subparsers.add_parser('grep', help='List the pages with a reference URL containing text')
+    grep.add_argument('text')
+    subparsers.add_parser('missing', help='List referenced assets that do not exist')
+    subparsers.add_parser('stats', help='Show index statistics')
+
+    args = parser.parse_args()
+    if not args.command:
+        parser.print_help()
+        return
+
+    if args.command == 'rebuild':
+        db_path = Path(args.db) if args.db else Path(args.project_root) / DEFAULT_DB
+        if db_path.exists():
+            db_path.unlink()
+
+    with AssetIndex(args.project_root, args.db) as index:
+        reindexed, removed = index.update(verbose=args.command in ('update', 'rebuild'))
+        if args.command in ('update', 'rebuild'):
+            pages, references, asset_count = index.stats()
+            print(f"Re-indexed {reindexed} files, removed {removed}")
+            print(f"Index: {pages} pages, {references} references, {asset_count} distinct assets")
+        elif args.command == 'who-uses':
+            rows = index.pages_referencing(args.asset)
+            for page, kind, raw_url, offset in rows:
+                print(f"{page}:{offset}\t{kind}\t{raw_url}")
+            print(f"\n{len({row[0] for row in rows})} pages, {len(rows)} references")
+        elif args.command == 'assets':
+            for asset in index.assets_of(args.page):
+                print(asset)
+        elif args.command == 'grep':
+            for page in index.pages_with_url_containing(args.text):
+                print(page)
+        elif args.command == 'missing':
+            missing = index.missing_assets()
+            for asset, pages in missing.items():
+                print(f"❌ {asset} ({len(pages)} pages)")
+                for page in pages[:5]:
+                    print(f"    - {page}")
+            print(f"\nMissing assets: {len(missing)}")
+            if missing:
+                sys.exit(1)
+        elif args.command == 'stats':
+            pages, references, asset_count = index.stats()
+            print(f"Pages: {pages}")
+            print(f"References: {references}")
+            print(f"Distinct assets: {asset_count}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,525 @@
+#!/usr/bin/env python3
+"""
+Audit and fix the resources that block first paint on each page.
+
+For every page this builds the graph of resources the browser has to deal
+with before it can render:
+
+- stylesheets linked from <head> (render-blocking unless media="print"),
+  plus the @import chains inside them;
+- external classic scripts without async/defer, in <head> (render-blocking)
+  or <body> (parser-blocking: everything after them waits);
+- the web fonts the page uses: @font-face rules of its stylesheets whose
+  family appears in a font-family declaration of a rule matching elements
+  on the page, weighted by how many elements use them;
+- the LCP candidate: the first sizeable image in the body outside the
+  navbar and footer, either an <img> or a CSS background-image.
+
+and flags what blocks. With --fix it rewrites the pages:
+
+- scripts get defer (async for independent third-party scripts), unless
+  an inline script later in the page depends on them running in order;
+- the most used font faces (--max-font-preloads) and the LCP image get a
+  <link rel="preload">, inserted before the first stylesheet;
+- the LCP <img> gets fetchpriority="high" and loses loading="lazy"; every
+  other <img> gets decoding="async".
+
+Preload links the pass adds carry data-preload-audit and are rebuilt on
+every run, so it is safe to re-run after the pages change. Paths are made
+relative to each page with update_html_files.get_relative_path.
+
+Usage:
+    python3 "python scripts/audit_render_blocking.py"
+    python3 "python scripts/audit_render_blocking.py" --report render_blocking_report.md
+    python3 "python scripts/audit_render_blocking.py" --fix --dry-run
+    python3 "python scripts/audit_render_blocking.py" --fix index.html zh.html
+"""
+
+import os
+import re
+import sys
+import argparse
+from collections import Counter
+
+from html_stream import build_tree, apply_edits, set_attr_edit, remove_attr_edit
+from site_partials import find_pages
+from asset_index import resolve_asset
+from update_html_files import get_relative_path
+
+AUDIT_ATTRIBUTE = 'data-preload-audit'
+AUDIT_PRELOAD = re.compile(rb'[ \t]*<link\b[^>]*\s' + AUDIT_ATTRIBUTE.encode() + rb'[^>]*>\n?')
+
+CSS_COMMENT = re.compile(r'/\*.*?\*/', re.DOTALL)
+CSS_DECLARATION = re.compile(r'''(?:[^;("']|\([^)]*\)|"[^"]*"|'[^']*')+''')
+CSS_URL = re.compile(r'''url\(\s*(?:"([^"]*)"|'([^']*)'|([^)'"\s][^)]*?))\s*\)''')
+CSS_IMPORT = re.compile(r'''@import\s+(?:url\()?\s*["']?([^"')\s;]+)''')
+COMPOUND = re.compile(r'^([a-z][a-z0-9]*)?((?:\.[-\w]+)*)$', re.IGNORECASE)
+
+FONT_TYPES = {'.woff2': 'font/woff2', '.woff': 'font/woff', '.ttf': 'font/ttf', '.otf': 'font/otf'}
+FONT_WEIGHTS = {'normal': 400, 'bold': 700, 'lighter': 300, 'bolder': 700}
+
+# Containers whose images are never the LCP element as first rendered
+NOT_LCP_TAGS = {'nav', 'footer', 'script', 'style', 'noscript', 'template', 'svg'}
+NOT_LCP_CLASSES = {'w-nav', 'w-nav-menu', 'w-dropdown-list', 'w-lightbox', 'w-embed'}
+NOT_LCP_WORDS = ('logo', 'icon')
+MIN_LCP_SIZE = 120
+
+# Third-party scripts nothing on the page calls into, which can run whenever they arrive
+ASYNC_SOURCES = re.compile(r'cmsfilter|googletagmanager|gtag/js|analytics|hotjar|clarity', re.IGNORECASE)
+
+# Inline scripts written by the build that only touch the scripts they name, lazily
+BUILD_SCRIPTS = {'tab-fragments', 'wf-ix'}
+
+# Globals an inline script must mention to depend on one of the site's scripts
+SCRIPT_GLOBALS = {
+    'jquery': re.compile(r'(?<![\w$.])(?:\$\s*[(.]|jQuery\b)'),
+    'china2024': re.compile(r'(?<![\w$.])(?:\$\s*[(.]|jQuery\b|Webflow\b)'),
+    'webflow-lite': re.compile(r'\bwfRuntime\b'),
+}
+JS_COMMENT = re.compile(r'/\*.*?\*/|(?<![:\'"\\])//[^\n]*', re.DOTALL)
+
+
+def css_blocks(text):
+    """(enclosing at-rule preludes, prelude, body) for every block without nested blocks."""
+    text = CSS_COMMENT.sub('', text)
+    open_blocks = []
+    position = 0
+    innermost = False
+    for match in re.finditer(r'[{}]', text):
+        if match.group() == '{':
+            open_blocks.append(text[position:match.start()].strip())
+            innermost = True
+        elif open_blocks:
+            prelude = open_blocks.pop()
+            if innermost:
+                yield list(open_blocks), prelude, text[position:match.start()]
+            innermost = False
+        position = match.end()
+
+
+def declarations(body):
+    result = {}
+    for declaration in CSS_DECLARATION.findall(body):
+        name, _, value = declaration.partition(':')
+        if value.strip():
+            result[name.strip().lower()] = value.strip()
+    return result
+
+
+def css_urls(value):
+    return [next(group for group in match.groups() if group is not None) for match in CSS_URL.finditer(value)]
+
+
+def font_weight(value):
+    value = (value or 'normal').strip().lower()
+    if value in FONT_WEIGHTS:
+        return FONT_WEIGHTS[value]
+    try:
+        return int(float(value))
+    except ValueError:
+        return 400
+
+
+def family_names(value):
+    return [name.strip().strip('\'"').lower() for name in value.split(',') if name.strip()]
+
+
+class FontFace:
+    """An @font-face rule: family, weight range, style and the project path of its first local file."""
+
+    def __init__(self, family, weights, style, path, display):
+        self.family = family
+        self.weights = weights
+        self.style = style
+        self.path = path
+        self.display = display
+
+    def __repr__(self):
+        return f"{self.family} {'-'.join(map(str, sorted(set(self.weights))))} {self.style}"
+
+    def covers(self, weight, style):
+        return self.style == style and self.weights[0] <= weight <= self.weights[1]
+
+
+class Stylesheet:
+    """
+    The parts of a stylesheet the audit needs: its @font-face rules, its
+    @imports, and the rules outside media queries that set a font family or
+    a background image, keyed by the last compound of their selectors.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'r', encoding='utf-8', errors='replace') as f:
+            text = f.read()
+        self.size = len(text.encode('utf-8'))
+        self.imports = [resolve_asset(path, url) or url for url in CSS_IMPORT.findall(CSS_COMMENT.sub('', text))]
+        self.faces = []
+        self.font_rules = []        # (tag, classes, [families], weight, style)
+        self.background_rules = []  # (tag, classes, project path)
+        for at_rules, prelude, body in css_blocks(text):
+            values = declarations(body)
+            if prelude.lower() == '@font-face':
+                self._add_face(values)
+                continue
+            if at_rules:
+                continue
+            background = values.get('background-image') or values.get('background')
+            image = next((url for url in css_urls(background or '') if not url.startswith('data:')), None)
+            if 'font-family' not in values and image is None:
+                continue
+            for selector in prelude.split(','):
+                compound = re.split(r'[\s>+~]+', selector.strip())[-1]
+                match = COMPOUND.match(compound)
+                if not match or not compound:
+                    continue
+                tag = (match.group(1) or '').lower() or None
+                classes = frozenset(match.group(2).split('.')[1:])
+                if 'font-family' in values:
+                    self.font_rules.append((tag, classes, family_names(values['font-family']),
+                                            font_weight(values.get('font-weight')),
+                                            (values.get('font-style') or 'normal').lower()))
+                if image:
+                    self.background_rules.append((tag, classes, resolve_asset(path, image)))
+
+    def _add_face(self, values):
+        family = family_names(values.get('font-family', ''))
+        url = next((url for url in css_urls(values.get('src', '')) if not url.startswith('data:')), None)
+        if not family or url is None:
+            return
+        weights = [font_weight(part) for part in values.get('font-weight', 'normal').split()]
+        self.faces.append(FontFace(family[0], (min(weights), max(weights)),
+                                   (values.get('font-style') or 'normal').lower(),
+                                   resolve_asset(self.path, url.split('?')[0].split('#')[0]),
+                                   values.get('font-display')))
+
+
+def _matches(tag, classes, element_tag, element_classes):
+    return (tag is None or tag == element_tag) and classes <= element_classes
+
+
+def _size(path):
+    try:
+        return os.path.getsize(path)
+    except (OSError, TypeError):
+        return 0
+
+
+class PageAudit:
+    """What blocks first paint on one page, and the edits that fix it."""
+
+    def __init__(self, page, data, sheets):
+        self.page = page
+        self.data = data
+        self.tree = build_tree(data)
+        self.head = self.tree.find('head')
+        self.body = self.tree.find('body')
+        self.stylesheets = []      # (element, project path, blocking)
+        self.scripts = []          # (element, src, project path, where, status)
+        self.fonts = Counter()     # FontFace -> elements using it
+        self.lcp = None            # (kind, element or None, project path)
+        self.notes = []
+        self.done = []             # fixes applied by audit_page(fix=True)
+        self._scan_stylesheets(sheets)
+        self._scan_scripts()
+        self._scan_fonts()
+        self._scan_lcp()
+
+    def _inside(self, element, root):
+        return root is not None and root.start <= element.start < root.end
+
+    def _scan_stylesheets(self, sheets):
+        for link in self.tree.find_all('link'):
+            if 'stylesheet' not in link.attrs.get('rel', '').lower().split():
+                continue
+            path = resolve_asset(self.page, link.attrs.get('href', ''))
+            blocking = link.attrs.get('media', 'all').strip().lower() not in ('print', 'not all')
+            self.stylesheets.append((link, path, blocking))
+            if path and path not in sheets and os.path.exists(path):
+                sheets[path] = Stylesheet(path)
+            if path in sheets and sheets[path].imports:
+                self.notes.append(f"{path} @imports {', '.join(sheets[path].imports)} (extra blocking round trip)")
+        self.sheets = [sheets[path] for _, path, _ in self.stylesheets if path in sheets]
+
+    def _scan_scripts(self):
+        scripts = self.tree.find_all('script')
+        for index, script in enumerate(scripts):
+            src = script.attrs.get('src')
+            kind = script.attrs.get('type', 'text/javascript').lower()
+            if not src or kind not in ('text/javascript', 'application/javascript', 'module', ''):
+                continue
+            where = 'head' if self._inside(script, self.head) else 'body'
+            if kind == 'module' or 'async' in script.attrs or 'defer' in script.attrs:
+                status = 'non-blocking'
+            else:
+                dependent = self._dependent_inline_script(src, scripts[index + 1:])
+                status = f"kept: {dependent}" if dependent else 'blocking'
+            self.scripts.append((script, src, resolve_asset(self.page, src), where, status))
+
+    def _dependent_inline_script(self, src, later):
+        """Excerpt of the first later inline script that relies on src having run, or None."""
+        globals_pattern = next((pattern for name, pattern in SCRIPT_GLOBALS.items() if name in src), None)
+        for script in later:
+            if 'src' in script.attrs or script.attrs.get('id') in BUILD_SCRIPTS:
+                continue
+            if 'json' in script.attrs.get('type', '') or script.attrs.get('type') == 'module':
+                continue
+            code = JS_COMMENT.sub('', self.data[script.inner_start:script.inner_end].decode('utf-8', 'replace'))
+            if not code.strip():
+                continue
+            # Scripts the audit does not know could define anything the inline code uses
+            match = globals_pattern.search(code) if globals_pattern else re.search(r'\S', code)
+            if match:
+                return 'inline script uses it: ' + ' '.join(code[match.start():match.start() + 30].split())
+        return None
+
+    def _element_counts(self):
+        counts = Counter()
+        for element in (self.body or self.tree).iter():
+            counts[(element.name, frozenset(element.classes))] += 1
+        return counts
+
+    def _scan_fonts(self):
+        faces = [face for sheet in self.sheets for face in sheet.faces]
+        if not faces:
+            return
+        counts = self._element_counts()
+        for sheet in self.sheets:
+            for tag, classes, families, weight, style in sheet.font_rules:
+                used = sum(count for (name, element_classes), count in counts.items()
+                           if _matches(tag, classes, name, element_classes))
+                if not used:
+                    continue
+                # The first family with a face is the one the browser downloads
+                for family in families:
+                    candidates = [face for face in faces if face.family == family]
+                    if candidates:
+                        face = next((face for face in candidates if face.covers(weight, style)), None)
+                        if face is not None:
+                            self.fonts[face] += used
+                        break
+        for face in self.fonts:
+            if not face.path or not os.path.exists(face.path):
+                self.notes.append(f"@font-face {face} points at a missing file ({face.path})")
+            elif not face.display:
+                self.notes.append(f"@font-face {face} has no font-display (text stays invisible while it loads)")
+
+    def _candidate(self, element):
+        if element.name in NOT_LCP_TAGS or element.classes & NOT_LCP_CLASSES:
+            return False
+        if 'w-tab-pane' in element.classes and 'w--tab-active' not in element.classes:
+            return False
+        return True
+
+    def _scan_lcp(self):
+        if self.body is None:
+            return
+        backgrounds = [rule for sheet in self.sheets for rule in sheet.background_rules]
+
+        def visit(element):
+            if not self._candidate(element):
+                return None
+            found = self._lcp_image(element, backgrounds)
+            if found:
+                return found
+            for child in element.children:
+                found = visit(child)
+                if found:
+                    return found
+            return None
+
+        self.lcp = visit(self.body)
+
+    def _lcp_image(self, element, backgrounds):
+        attrs = element.attrs
+        if any(word in attrs.get('class', '').lower() for word in NOT_LCP_WORDS):
+            return None
+        if element.name == 'img':
+            src = attrs.get('src', '')
+            if not src or src.startswith('data:') or src.lower().endswith('.svg'):
+                return None
+            for dimension in ('width', 'height'):
+                if attrs.get(dimension, '').isdigit() and int(attrs[dimension]) < MIN_LCP_SIZE:
+                    return None
+            return 'img', element, resolve_asset(self.page, src)
+        inline = next((url for url in css_urls(attrs.get('style', '')) if not url.startswith('data:')), None)
+        if inline:
+            path = resolve_asset(self.page, inline)
+        else:
+            path = next((path for tag, classes, path in backgrounds if classes
+                         and _matches(tag, classes, element.name, element.classes)), None)
+        if path and not path.lower().endswith('.svg'):
+            return 'background', element, path
+        return None
+
+    def blocking(self):
+        """(render-blocking bytes, [descriptions]) of what the browser waits for before first paint."""
+        items, total = [], 0
+        for _, path, blocking in self.stylesheets:
+            if blocking:
+                size = _size(path)
+                total += size
+                items.append(f"stylesheet {path} ({size / 1024:.0f} KB)")
+        for _, src, path, where, status in self.scripts:
+            if status != 'non-blocking':
+                size = _size(path)
+                if where == 'head':
+                    total += size
+                items.append(f"{'render' if where == 'head' else 'parser'}-blocking script {path or src} "
+                             f"({size / 1024:.0f} KB)" + (f" [{status}]" if status.startswith('kept') else ''))
+        return total, items
+
+    def fixes(self, max_font_preloads):
+        """(edits, [descriptions]) that defer scripts, add preloads and prioritise the LCP image."""
+        edits, done = [], []
+        for script, src, _, _, status in self.scripts:
+            if status == 'blocking':
+                attribute = 'async' if ASYNC_SOURCES.search(src) else 'defer'
+                edits.append(set_attr_edit(self.data, script, attribute))
+                done.append(f"{attribute} {src}")
+
+        preloads = []
+        available = [face for face, _ in self.fonts.most_common() if face.path and os.path.exists(face.path)]
+        for face in available[:max_font_preloads]:
+            font_type = FONT_TYPES.get(os.path.splitext(face.path)[1].lower(), 'font/ttf')
+            preloads.append(f'<link rel="preload" href="{get_relative_path(self.page, face.path)}" as="font" '
+                            f'type="{font_type}" crossorigin {AUDIT_ATTRIBUTE} />')
+            done.append(f"preload font {face.path}")
+
+        lcp_element = None
+        if self.lcp and self.lcp[2] and os.path.exists(self.lcp[2]):
+            kind, lcp_element, path = self.lcp
+            extra = ''
+            if kind == 'img' and lcp_element.attrs.get('srcset'):
+                extra = f' imagesrcset="{lcp_element.attrs["srcset"]}"'
+                if lcp_element.attrs.get('sizes'):
+                    extra += f' imagesizes="{lcp_element.attrs["sizes"]}"'
+            preloads.append(f'<link rel="preload" href="{get_relative_path(self.page, path)}" as="image"'
+                            f'{extra} fetchpriority="high" {AUDIT_ATTRIBUTE} />')
+            done.append(f"preload {kind} {path}")
+            if kind == 'img':
+                edits.append(set_attr_edit(self.data, lcp_element, 'fetchpriority', 'high'))
+                if lcp_element.attrs.get('loading') == 'lazy':
+                    edits.append(remove_attr_edit(self.data, lcp_element, 'loading'))
+                    done.append("LCP image no longer lazy")
+
+        decoding = 0
+        for image in self.tree.find_all('img'):
+            if image is not lcp_element and 'decoding' not in image.attrs:
+                edits.append(set_attr_edit(self.data, image, 'decoding', 'async'))
+                decoding += 1
+        if decoding:
+            done.append(f"decoding=async on {decoding} images")
+
+        if preloads and self.head is not None:
+            anchor = self.stylesheets[0][0].start if self.stylesheets else self.head.inner_end
+            line_start = self.data.rfind(b'\n', 0, anchor) + 1
+            indent = re.match(rb'[ \t]*', self.data[line_start:anchor]).group(0)
+            at = line_start if not self.data[line_start:anchor].strip() else anchor
+            edits.append((at, at, b''.join(indent + preload.encode('utf-8') + b'\n' for preload in preloads)))
+        return edits, done
+
+
+def audit_page(page, sheets, fix=False, max_font_preloads=2):
+    """(audit, fixed bytes or None). Preloads from a previous run are dropped before auditing."""
+    with open(page, 'rb') as f:
+        original = f.read()
+    data = AUDIT_PRELOAD.sub(b'', original)
+    audit = PageAudit(page, data, sheets)
+    if not fix:
+        return audit, None
+    edits, audit.done = audit.fixes(max_font_preloads)
+    return audit, apply_edits(data, edits)
+
+
+def write_report(path, audits):
+    lines = [
+        '# Render-blocking resources',
+        '',
+        '| Page | Blocking KB | Blocking scripts | Fonts used | LCP candidate |',
+        '|------|------------:|------------------|------------|---------------|',
+    ]
+    for audit in audits:
+        total, _ = audit.blocking()
+        scripts = ', '.join(f"{os.path.basename(src)} ({where}{', kept' if status.startswith('kept') else ''})"
+                            for _, src, _, where, status in audit.scripts if status != 'non-blocking') or '-'
+        fonts = ', '.join(f"{face} ×{count}" for face, count in audit.fonts.most_common(3)) or '-'
+        lcp = f"{audit.lcp[0]} {audit.lcp[2]}" if audit.lcp else '-'
+        lines.append(f"| {audit.page} | {total / 1024:.0f} | {scripts} | {fonts} | {lcp} |")
+    notes = sorted({note for audit in audits for note in audit.notes})
+    if notes:
+        lines += ['', '## Notes', ''] + [f"- {note}" for note in notes]
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('\n'.join(lines) + '\n')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Audit (and fix) render-blocking resources on every page')
+    parser.add_argument('pages', nargs='*', help='Pages to audit (default: every page of the site)')
+    parser.add_argument('--project-root', default='.', help='Site root (default: current directory)')
+    parser.add_argument('--fix', action='store_true', help='Defer scripts, add preloads and image priorities')
+    parser.add_argument('--dry-run', action='store_true', help='With --fix, report the fixes without writing')
+    parser.add_argument('--max-font-preloads', type=int, default=2,
+                        help='Font files to preload per page, most used first (default: 2)')
+    parser.add_argument('--report', help='Write a markdown report to this file')
+    parser.add_argument('--verbose', action='store_true', help='List the blocking resources of every page')
+    args = parser.parse_args()
+
+    os.chdir(args.project_root)
+    pages = args.pages or find_pages('.')
+    print("🔍 Auditing render-blocking resources" + (" and fixing" if args.fix else "")
+          + (" (dry run)" if args.dry_run else ""))
+    print("=" * 50)
+
+    sheets = {}
+    audits = []
+    changed = 0
+    blocking_scripts = Counter()
+    for page in pages:
+        page = os.path.normpath(page)
+        audit, fixed = audit_page(page, sheets, args.fix, args.max_font_preloads)
+        audits.append(audit)
+        total, items = audit.blocking()
+        for _, src, _, where, status in audit.scripts:
+            if status != 'non-blocking':
+                blocking_scripts[(os.path.basename(src), where, status.startswith('kept'))] += 1
+        if args.verbose:
+            print(f"  {page}: {total / 1024:.0f} KB render-blocking")
+            for item in items:
+                print(f"    - {item}")
+            if audit.lcp:
+                print(f"    LCP candidate: {audit.lcp[0]} {audit.lcp[2]}")
+            for done in audit.done:
+                print(f"    ✓ {done}")
+        if fixed is not None:
+            with open(page, 'rb') as f:
+                if f.read() != fixed:
+                    changed += 1
+                    if not args.dry_run:
+                        with open(page, 'wb') as out:
+                            out.write(fixed)
+
+    print(f"\n  Pages audited: {len(audits)}")
+    for (name, where, kept), count in blocking_scripts.most_common():
+        kind = 'render-blocking (head)' if where == 'head' else 'parser-blocking (body)'
+        print(f"  {'⚠️ ' if kept else '•'} {name}: {kind} on {count} pages" + (", kept: inline code depends on it" if kept else ''))
+    fonts = Counter()
+    for audit in audits:
+        fonts.update({str(face): 1 for face in audit.fonts})
+    if fonts:
+        print("  Fonts used: " + ', '.join(f"{face} ({count} pages)" for face, count in fonts.most_common(5)))
+    lcp_kinds = Counter(audit.lcp[0] if audit.lcp else 'none found' for audit in audits)
+    print("  LCP candidates: " + ', '.join(f"{kind} on {count} pages" for kind, count in lcp_kinds.most_common()))
+    for note in sorted({note for audit in audits for note in audit.notes})[:10]:
+        print(f"  ⚠️  {note}")
+
+    if args.report:
+        write_report(args.report, audits)
+        print(f"\n📄 Report written to {args.report}")
+    if args.fix:
+        print(f"\n{'Would update' if args.dry_run else 'Updated'} {changed} pages")
+    sys.exit(0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,382 @@
+#!/usr/bin/env python3
+"""
+Draw the site's small SVG icons from one sprite instead of separate <img> files.
+
+Every speaker card carries the same five social icons (Hyperlink, LinkedIn,
+GitHub, X, Mastodon) as <img> tags - about 2,400 of them on speakers.html
+alone - and the schedule and speaker pages add the Mastodon logo, the
+Down-Line arrow and the Close icon. This build step:
+
+1. Finds every icon-sized <img> of an SVG: one whose width or height
+   attribute is at most MAX_ICON_SIZE pixels. Icons still pointing at the
+   Webflow CDN are matched to their local copy in images/
+2. Collects those SVGs into SPRITE, one <symbol> per file named after it
+   (66bf8563..._Github-Logo-1--Streamline-Ultimate.svg -> Github-Logo-1),
+   dropping the editor metadata (<desc>, <title>, <metadata>, comments,
+   Inkscape/Sodipodi markup). Gradients, clip paths and masks move to the
+   sprite's <defs> with their ids prefixed by the symbol's, so icons cannot
+   clash
+3. Replaces each <img> with
+   <svg class="sprite-icon" width=".." height=".."><use href="images/icons.svg#Github-Logo-1"></use></svg>,
+   sized like the <img> was (a missing width or height follows the
+   icon's viewBox), aria-hidden when the alt text is empty and role="img"
+   with an aria-label otherwise
+4. Appends a rule giving .sprite-icon the layout the stylesheet gives
+   <img> (inline-block, vertical-align: middle, max-width: 100%)
+
+An <img> shows its SVG in isolation, so a symbol gets color="#000" and
+fill="#000" unless its file sets them: currentColor and unfilled shapes
+stay black instead of taking the link colour. An SVG with <style>,
+<script>, <text>, <image> or <foreignObject>, or referring to anything
+outside itself, renders differently inline and keeps its <img>.
+
+The icons load in one request and stay crisp at any zoom. The sprite is
+rebuilt from the files on every run, so re-running after editing an icon
+updates it; --restore turns the icons back into <img> tags of the local
+files for the steps that look for them (remove_down_arrow_images.py, for
+one).
+
+Usage:
+    python3 "python scripts/build_icon_sprite.py" --dry-run
+    python3 "python scripts/build_icon_sprite.py"
+    python3 "python scripts/build_icon_sprite.py" --restore
+"""
+
+import os
+import re
+import sys
+import html
+import argparse
+import xml.etree.ElementTree as ET
+from collections import Counter
+
+from html_stream import build_tree, apply_edits
+from site_partials import find_pages
+from asset_index import normalize_target, resolve_asset
+from webflow_assets import ASSET_ID_PATTERN, WebflowAssetResolver
+from add_image_dimensions import length, _number
+
+SPRITE = 'images/icons.svg'
+ICON_DIRS = ['images']
+MAX_ICON_SIZE = 48
+
+STYLESHEET = 'css/china2024.css'
+ICON_MARKER = '/* build_icon_sprite: sprite icons lay out like the <img> tags they replace */'
+ICON_RULE = ICON_MARKER + '\n:where(.sprite-icon) {\n  display: inline-block;\n  vertical-align: middle;\n  max-width: 100%;\n}\n'
+
+SVG_NS = 'http://www.w3.org/2000/svg'
+XLINK_NS = 'http://www.w3.org/1999/xlink'
+ET.register_namespace('', SVG_NS)
+ET.register_namespace('xlink', XLINK_NS)
+
+DROPPED = {'title', 'desc', 'metadata'}
+UNSAFE = {'style', 'script', 'text', 'image', 'foreignObject'}
+DEFINITIONS = {'clipPath', 'mask', 'linearGradient', 'radialGradient', 'pattern', 'filter', 'marker'}
+# Attributes of the root <svg> that do not carry over to a <symbol>
+ROOT_ONLY = {'width', 'height', 'viewBox', 'preserveAspectRatio', 'id', 'version', 'x', 'y', 'baseProfile',
+             'enable-background', '{http://www.w3.org/XML/1998/namespace}space'}
+# What an SVG shown through <img> inherits: nothing from the page
+ISOLATED_DEFAULTS = {'color': '#000', 'fill': '#000'}
+
+# img attributes with no meaning on the <svg>
+IMG_ONLY = {'src', 'srcset', 'sizes', 'loading', 'decoding', 'alt', 'width', 'height'}
+
+REFERENCE = re.compile(r'url\(\s*[\'"]?#([^\'")\s]+)[\'"]?\s*\)')
+EXTERNAL_URL = re.compile(r'url\(\s*[\'"]?(?!#)')
+SPRITE_ICON = re.compile(
+    rb'<svg class="sprite-icon"((?:\s+[\w:-]+="[^"]*")*)><use href="([^"#]*)#([^"]+)"></use></svg>')
+VIEWBOX_NUMBER = re.compile(r'[-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?')
+
+
+def local(tag):
+    return tag.rsplit('}', 1)[-1]
+
+
+def symbol_id(path):
+    """Symbol name for an icon file: 66bf..._Github-Logo-1--Streamline-Ultimate.svg -> Github-Logo-1."""
+    name = os.path.splitext(os.path.basename(path))[0]
+    match = ASSET_ID_PATTERN.match(name)
+    if match:
+        name = match.group(2)
+    name = name.split('--Streamline', 1)[0]
+    return re.sub(r'[^A-Za-z0-9_-]+', '-', name).strip('-') or 'icon'
+
+
+def icon_files():
+    """{symbol id: file} for every SVG the sprite could hold, so existing <use> references can be resolved."""
+    files = {}
+    for directory in ICON_DIRS:
+        for root, dirs, names in os.walk(directory):
+            dirs.sort()
+            for name in sorted(names):
+                path = os.path.join(root, name).replace(os.sep, '/')
+                if not name.endswith('.svg') or path == SPRITE:
+                    continue
+                identifier = symbol_id(path)
+                while identifier in files:
+                    identifier += '-2'
+                files[identifier] = path
+    return files
+
+
+class Unsafe(ValueError):
+    """The SVG would not render the same inline as it does through <img>."""
+
+
+def _check(element):
+    name = local(element.tag)
+    if not element.tag.startswith('{' + SVG_NS + '}'):
+        return
+    if name in UNSAFE:
+        raise Unsafe(f'<{name}>')
+    for attribute, value in element.attrib.items():
+        if EXTERNAL_URL.search(value):
+            raise Unsafe(f'{local(attribute)}="{value}"')
+        if local(attribute) == 'href' and not value.startswith('#'):
+            raise Unsafe(f'href="{value}"')
+    for child in element:
+        _check(child)
+
+
+def _copy(element, rename, definitions):
+    """A cleaned copy of element, with its definitions moved to definitions; None to drop it."""
+    if not element.tag.startswith('{' + SVG_NS + '}'):
+        # Inkscape, Sodipodi and RDF markup
+        return None
+    name = local(element.tag)
+    if name in DROPPED:
+        return None
+    copy = ET.Element(element.tag)
+    for attribute, value in element.attrib.items():
+        if attribute.startswith('{') and not attribute.startswith(('{' + XLINK_NS + '}', '{http://www.w3.org/XML')):
+            continue
+        if attribute == 'id':
+            if value not in rename:
+                continue
+            value = rename[value]
+        value = REFERENCE.sub(lambda match: f'url(#{rename.get(match.group(1), match.group(1))})', value)
+        if local(attribute) == 'href' and value[1:] in rename:
+            value = '#' + rename[value[1:]]
+        copy.set(attribute, value)
+    copy.text = element.text if element.text and element.text.strip() else None
+    for child in element:
+        child_copy = _copy(child, rename, definitions)
+        if child_copy is None:
+            continue
+        if local(child.tag) == 'defs' or local(child.tag) in DEFINITIONS:
+            # <defs> only matters for what is in it
+            definitions.extend(child_copy if local(child.tag) == 'defs' else [child_copy])
+        else:
+            copy.append(child_copy)
+    return copy
+
+
+def view_box(root):
+    box = root.get('viewBox')
+    if box and len(VIEWBOX_NUMBER.findall(box)) == 4:
+        return ' '.join(VIEWBOX_NUMBER.findall(box))
+    width, height = length(root.get('width')), length(root.get('height'))
+    if width and height:
+        return f'0 0 {root.get("width").strip().removesuffix("px")} {root.get("height").strip().removesuffix("px")}'
+    return None
+
+
+def load_symbol(path, identifier):
+    """(<symbol>, [definitions], viewBox width / height) for an icon file; raises Unsafe or ValueError."""
+    root = ET.parse(path).getroot()
+    if root.tag != '{%s}svg' % SVG_NS:
+        raise Unsafe('not an SVG document')
+    _check(root)
+    box = view_box(root)
+    if box is None:
+        raise Unsafe('no viewBox or size')
+    ids = {element.get('id') for element in root.iter() if element.get('id')}
+    referenced = set()
+    for element in root.iter():
+        for attribute, value in element.attrib.items():
+            referenced.update(REFERENCE.findall(value))
+            if local(attribute) == 'href' and value.startswith('#'):
+                referenced.add(value[1:])
+    rename = {name: f'{identifier}-{name}' for name in ids & referenced}
+
+    definitions = []
+    symbol = ET.Element('{%s}symbol' % SVG_NS, {'id': identifier, 'viewBox': box})
+    if root.get('preserveAspectRatio'):
+        symbol.set('preserveAspectRatio', root.get('preserveAspectRatio'))
+    for attribute, value in ISOLATED_DEFAULTS.items():
+        symbol.set(attribute, value)
+    cleaned = _copy(root, rename, definitions)
+    for attribute, value in cleaned.attrib.items():
+        if attribute not in ROOT_ONLY:
+            symbol.set(attribute, value)
+    symbol.extend(list(cleaned))
+    # A definition nothing refers to lost its id, and would only take up room
+    definitions = [element for element in definitions if element.get('id')]
+    _, _, box_width, box_height = (float(number) for number in box.split())
+    return symbol, definitions, box_width / box_height
+
+
+def build_sprite(icons):
+    """
+    (sprite bytes, {file: (symbol id, aspect ratio)}, {file: reason}) for
+    the icon files, keyed by symbol id.
+    """
+    sprite = ET.Element('{%s}svg' % SVG_NS)
+    defs = ET.SubElement(sprite, '{%s}defs' % SVG_NS)
+    symbols = {}
+    rejected = {}
+    for identifier, path in sorted(icons.items()):
+        try:
+            symbol, definitions, ratio = load_symbol(path, identifier)
+        except (Unsafe, ET.ParseError, OSError, ValueError) as error:
+            rejected[path] = str(error) or type(error).__name__
+            continue
+        defs.extend(definitions)
+        sprite.append(symbol)
+        symbols[path] = (identifier, ratio)
+    if not len(defs):
+        sprite.remove(defs)
+    return ET.tostring(sprite, encoding='utf-8', xml_declaration=False) + b'\n', symbols, rejected
+
+
+def icon_size(img):
+    """The width or height attribute, if the <img> is icon-sized."""
+    sizes = [size for size in (length(img.attrs.get('width')), length(img.attrs.get('height'))) if size]
+    return sizes and max(sizes) <= MAX_ICON_SIZE
+
+
+def icon_markup(img, href, ratio):
+    width, height = length(img.attrs.get('width')), length(img.attrs.get('height'))
+    width = width or height * ratio
+    height = height or width / ratio
+    attributes = [('class', ' '.join(filter(None, [img.attrs.get('class'), 'sprite-icon']))),
+                  ('width', _number(width)), ('height', _number(height))]
+    attributes += [(name, value) for name, value in img.attrs.items() if name not in IMG_ONLY and name != 'class']
+    alt = img.attrs.get('alt', '').strip()
+    attributes += [('role', 'img'), ('aria-label', alt)] if alt else [('aria-hidden', 'true')]
+    attributes.append(('focusable', 'false'))
+    rendered = ''.join(f' {name}="{html.escape(value)}"' for name, value in attributes)
+    # class first and the use element closed explicitly, so --restore can find it
+    return f'<svg{rendered}><use href="{href}"></use></svg>'.encode('utf-8')
+
+
+def icon_source(page, img, resolver):
+    """The local SVG file an icon-sized <img> shows, or None."""
+    if not icon_size(img):
+        return None
+    src = img.attrs.get('src', '')
+    source = resolve_asset(page, normalize_target(src))
+    if not (source and os.path.isfile(source)) and 'cdn.prod.website-files.com/' in src:
+        source = resolver.resolve_url(src)
+    return source if source and source.endswith('.svg') else None
+
+
+def convert(page, tree, symbols, resolver, counts):
+    """Edits replacing the page's icon <img> tags with sprite references."""
+    edits = []
+    sprite_href = os.path.relpath(SPRITE, os.path.dirname(page) or '.').replace(os.sep, '/')
+    for img in tree.find_all('img'):
+        source = icon_source(page, img, resolver)
+        if source is None:
+            continue
+        if source not in symbols:
+            counts['kept: unsafe inline'] += 1
+            continue
+        identifier, ratio = symbols[source]
+        edits.append((img.start, img.end, icon_markup(img, f'{sprite_href}#{identifier}', ratio)))
+        counts[identifier] += 1
+    return edits
+
+
+def restore(page, data, files):
+    """The page with its sprite icons back as <img> tags."""
+    def replace(match):
+        path = files.get(match.group(3).decode('utf-8'))
+        if path is None:
+            return match.group(0)
+        attributes = dict(re.findall(r'\s+([\w:-]+)="([^"]*)"', match.group(1).decode('utf-8')))
+        classes = ' '.join(name for name in attributes.pop('class', '').split() if name != 'sprite-icon')
+        alt = attributes.pop('aria-label', '')
+        for name in ('role', 'aria-hidden', 'focusable'):
+            attributes.pop(name, None)
+        src = os.path.relpath(path, os.path.dirname(page) or '.').replace(os.sep, '/')
+        rendered = ''.join(f' {name}="{value}"' for name, value in ([('class', classes)] if classes else [])
+                           + [('src', html.escape(src))] + list(attributes.items()))
+        return f'<img{rendered} loading="lazy" alt="{alt}"/>'.encode('utf-8')
+    return SPRITE_ICON.sub(replace, data)
+
+
+def add_icon_rule(path, dry_run):
+    """Append ICON_RULE to the stylesheet once. Returns True if it was added."""
+    with open(path, 'r', encoding='utf-8') as f:
+        text = f.read()
+    if ICON_MARKER in text:
+        return False
+    if not dry_run:
+        with open(path, 'a', encoding='utf-8') as f:
+            f.write(('' if text.endswith('\n') else '\n') + '\n' + ICON_RULE)
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Collect the SVG icons into one sprite and reference it with <use>')
+    parser.add_argument('pages', nargs='*', help='Pages to update (default: every page of the site)')
+    parser.add_argument('--project-root', default='.', help='Site root (default: current directory)')
+    parser.add_argument('--restore', action='store_true', help='Turn the sprite icons back into <img> tags')
+    parser.add_argument('--dry-run', action='store_true', help='Report without writing anything')
+    args = parser.parse_args()
+
+    os.chdir(args.project_root)
+    pages = [os.path.normpath(page).replace(os.sep, '/') for page in args.pages] or find_pages('.')
+    print(("↺ Restoring icon <img> tags" if args.restore else "🧩 Building the icon sprite")
+          + (" (dry run)" if args.dry_run else ""))
+    print("=" * 50)
+
+    files = icon_files()
+    documents = {}
+    for page in pages:
+        with open(page, 'rb') as f:
+            original = f.read()
+        # Start from <img> tags, so the sprite is always rebuilt from the current files
+        data = restore(page, original, files)
+        documents[page] = (original, data)
+
+    if args.restore:
+        outputs = {page: data for page, (_, data) in documents.items()}
+    else:
+        trees = {page: build_tree(data) for page, (_, data) in documents.items()}
+        resolver = WebflowAssetResolver(asset_dirs=ICON_DIRS)
+        used = {icon_source(page, img, resolver) for page, tree in trees.items() for img in tree.find_all('img')}
+        sprite, symbols, rejected = build_sprite({identifier: path for identifier, path in files.items()
+                                                  if path in used})
+        for path, reason in sorted(rejected.items()):
+            print(f"  ⚠️  {path} stays an <img>: {reason}")
+
+        counts = Counter()
+        outputs = {}
+        for page, (_, data) in documents.items():
+            edits = convert(page, trees[page], symbols, resolver, counts)
+            outputs[page] = apply_edits(data, edits) if edits else data
+        print(f"  Icons in {SPRITE}: {len(symbols)} ({len(sprite) / 1024:.1f} KB, was "
+              f"{sum(os.path.getsize(path) for path in symbols) / 1024:.1f} KB in {len(symbols)} files)")
+        for identifier, count in sorted(counts.items(), key=lambda item: -item[1]):
+            print(f"    {identifier}: {count}")
+        if symbols and not args.dry_run:
+            with open(SPRITE, 'wb') as f:
+                f.write(sprite)
+        if symbols and os.path.isfile(STYLESHEET) and add_icon_rule(STYLESHEET, args.dry_run):
+            print(f"  {'Would add' if args.dry_run else 'Added'} the .sprite-icon layout rule to {STYLESHEET}")
+
+    changed = [page for page, data in outputs.items() if data != documents[page][0]]
+    if not args.dry_run:
+        for page in changed:
+            with open(page, 'wb') as f:
+                f.write(outputs[page])
+    print(f"  Pages {'to update' if args.dry_run else 'updated'}: {len(changed)} of {len(pages)}")
+    if not args.dry_run:
+        print("\n✅ Done." + ("" if args.restore else f" Run fingerprint_assets.py afterwards to version {SPRITE}."))
+    sys.exit(0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,436 @@
+#!/usr/bin/env python3
+"""
+Generate a service worker that keeps the schedule usable on venue Wi-Fi.
+
+At the conference attendees open schedule.html, the two day pages and the
+schedules/*.html session pages again and again over a congested network.
+This build step writes:
+
+- sw.js at the site root, with a precache manifest inlined: every entry is
+  a URL plus a content hash (revision) of the file. The entries are, in
+  priority order,
+    core        css/china2024.css, the scripts the schedule pages load
+                and the font files the stylesheet declares (under their
+                fingerprinted names after fingerprint_assets.py);
+    pages       schedule.html, schedule-october-17/18.html (en and zh);
+    sessions    schedules/*.html and zh/schedules/*.html;
+    thumbnails  the images/speakers files the speaker pages use, the ones
+                on the most pages first;
+  up to --max-precache-mb in total. Whatever does not fit is left to the
+  runtime cache and listed in the output;
+- precache-manifest.json next to it, the same manifest for inspection;
+- a registration snippet in the <head> of every page, added (or updated)
+  with the same relative-path head rewriting as update_html_files.py.
+
+The worker serves assets cache-first (their URL does not change without
+the revision changing, so a cached copy is never stale) and pages
+stale-while-revalidate: the cached page is shown at once and refreshed in
+the background for the next visit. When a page is neither cached nor
+reachable, the cached schedule of the same language is shown instead.
+Assets and pages outside the manifest go to a runtime cache capped at
+RUNTIME_MAX_ENTRIES, oldest first out.
+
+The cache names carry a version derived from the manifest, so a rebuild
+after any file changes installs a new cache and the old one is deleted on
+activation; files whose revision did not change are copied over from the
+old cache instead of being downloaded again.
+
+--remove takes the snippet out of every page and replaces sw.js with a
+worker that clears its caches and unregisters itself, which is how a
+service worker already installed in visitors' browsers is retired.
+
+Usage:
+    python3 "python scripts/build_service_worker.py" --dry-run
+    python3 "python scripts/build_service_worker.py" --max-precache-mb 20
+    python3 "python scripts/build_service_worker.py" --remove
+"""
+
+import os
+import re
+import sys
+import json
+import glob
+import hashlib
+import argparse
+from collections import Counter
+from urllib.parse import quote
+
+from site_partials import find_pages
+from asset_index import ATTR_PATTERN, CSS_URL_PATTERN, iter_srcset, resolve_asset
+from audit_render_blocking import Stylesheet
+from update_html_files import get_relative_path
+from fingerprint_assets import load_manifest
+
+SW_FILE = 'sw.js'
+MANIFEST_FILE = 'precache-manifest.json'
+CACHE_PREFIX = 'gosim-'
+
+CORE_ASSETS = ['css/china2024.css']
+SCHEDULE_PAGES = [
+    'schedule.html', 'schedule-october-17.html', 'schedule-october-18.html',
+    'zh/schedule.html', 'zh/schedule-october-17.html', 'zh/schedule-october-18.html',
+]
+SESSION_PAGES = ['schedules/*.html', 'zh/schedules/*.html']
+SPEAKER_PAGES = ['speakers.html', 'zh/speakers.html', 'speakers/*.html', 'zh/speakers/*.html']
+THUMBNAIL_DIR = 'images/speakers/'
+
+DEFAULT_MAX_PRECACHE_MB = 30
+RUNTIME_MAX_ENTRIES = 150
+# Runtime responses larger than this are served but not kept
+RUNTIME_MAX_ENTRY_BYTES = 2 * 1024 * 1024
+
+SNIPPET_ID = 'sw-register'
+SNIPPET = re.compile(r'[ \t]*<script id="' + SNIPPET_ID + r'">.*?</script>\n?', re.DOTALL)
+SNIPPET_TEMPLATE = '''<script id="sw-register">
+if ('serviceWorker' in navigator) {
+  window.addEventListener('load', function () {
+    navigator.serviceWorker.register('%s').catch(function () {});
+  });
+}
+</script>
+'''
+
+SW_TEMPLATE = r'''/* Generated by build_service_worker.py - do not edit */
+var VERSION = '%(version)s';
+var PREFIX = '%(prefix)s';
+var PRECACHE = PREFIX + 'precache-' + VERSION;
+var RUNTIME = PREFIX + 'runtime-' + VERSION;
+var RUNTIME_MAX_ENTRIES = %(runtime_entries)d;
+var RUNTIME_MAX_ENTRY_BYTES = %(runtime_bytes)d;
+var REVISION_HEADER = 'x-precache-revision';
+var MANIFEST = %(manifest)s;
+var OFFLINE_PAGES = %(offline)s;
+
+function absolute(url) {
+  return new URL(url, self.registration.scope).href;
+}
+
+var PRECACHED = {};
+MANIFEST.forEach(function (entry) { PRECACHED[absolute(entry.url)] = entry.revision; });
+
+function withRevision(response, revision) {
+  var headers = new Headers(response.headers);
+  headers.set(REVISION_HEADER, revision);
+  return response.blob().then(function (body) {
+    return new Response(body, { status: response.status, statusText: response.statusText, headers: headers });
+  });
+}
+
+function previousCopy(url, revision) {
+  // An unchanged file from the cache of an earlier version
+  return caches.keys().then(function (names) {
+    var older = names.filter(function (name) { return name.indexOf(PREFIX + 'precache-') === 0 && name !== PRECACHE; });
+    return older.reduce(function (found, name) {
+      return found.then(function (response) {
+        if (response) return response;
+        return caches.open(name).then(function (cache) { return cache.match(url); }).then(function (match) {
+          return match && match.headers.get(REVISION_HEADER) === revision ? match : undefined;
+        });
+      });
+    }, Promise.resolve(undefined));
+  });
+}
+
+function precacheEntry(cache, entry) {
+  var url = absolute(entry.url);
+  return previousCopy(url, entry.revision).then(function (response) {
+    if (response) return cache.put(url, response);
+    return fetch(new Request(url, { cache: 'reload' })).then(function (response) {
+      if (!response.ok) throw new Error(entry.url + ': ' + response.status);
+      return withRevision(response, entry.revision).then(function (tagged) { return cache.put(url, tagged); });
+    });
+  });
+}
+
+self.addEventListener('install', function (event) {
+  event.waitUntil(caches.open(PRECACHE).then(function (cache) {
+    return Promise.all(MANIFEST.map(function (entry) { return precacheEntry(cache, entry); }));
+  }).then(function () { return self.skipWaiting(); }));
+});
+
+self.addEventListener('activate', function (event) {
+  event.waitUntil(caches.keys().then(function (names) {
+    return Promise.all(names.filter(function (name) {
+      return name.indexOf(PREFIX) === 0 && name !== PRECACHE && name !== RUNTIME;
+    }).map(function (name) { return caches.delete(name); }));
+  }).then(function () { return self.clients.claim(); }));
+});
+
+function trimRuntime(cache) {
+  return cache.keys().then(function (keys) {
+    // Keys come back in insertion order: drop the oldest
+    var excess = keys.length - RUNTIME_MAX_ENTRIES;
+    return Promise.all(keys.slice(0, Math.max(excess, 0)).map(function (key) { return cache.delete(key); }));
+  });
+}
+
+function keep(url, response) {
+  if (!response || !response.ok || response.type === 'opaque') return Promise.resolve();
+  var length = parseInt(response.headers.get('content-length') || '0', 10);
+  if (length > RUNTIME_MAX_ENTRY_BYTES) return Promise.resolve();
+  var cacheName = PRECACHED[url] ? PRECACHE : RUNTIME;
+  return caches.open(cacheName).then(function (cache) {
+    return cache.delete(url).then(function () { return cache.put(url, response); }).then(function () {
+      if (cacheName === RUNTIME) return trimRuntime(cache);
+    });
+  });
+}
+
+function cacheKey(request) {
+  var url = new URL(request.url);
+  url.hash = '';
+  if (url.pathname.slice(-1) === '/') url.pathname += 'index.html';
+  if (!PRECACHED[url.href] && !/\.[a-z0-9]+$/i.test(url.pathname) && PRECACHED[url.href.split('?')[0] + '.html']) {
+    // Clean URLs served without the .html extension
+    url.pathname += '.html';
+  }
+  return url.href;
+}
+
+function offlinePage(url) {
+  var path = new URL(url).pathname;
+  var scope = new URL(self.registration.scope).pathname;
+  var zh = path.indexOf(scope + 'zh/') === 0;
+  return caches.match(absolute(zh ? OFFLINE_PAGES.zh : OFFLINE_PAGES.en));
+}
+
+function staleWhileRevalidate(event, key) {
+  var network = fetch(event.request).then(function (response) {
+    var copy = response.clone();
+    event.waitUntil(keep(key, copy));
+    return response;
+  });
+  event.waitUntil(network.catch(function () {}));
+  return caches.match(key).then(function (cached) {
+    return cached || network.catch(function () {
+      return offlinePage(key).then(function (fallback) { return fallback || Response.error(); });
+    });
+  });
+}
+
+function cacheFirst(event, key) {
+  return caches.match(key).then(function (cached) {
+    return cached || fetch(event.request).then(function (response) {
+      event.waitUntil(keep(key, response.clone()));
+      return response;
+    });
+  });
+}
+
+self.addEventListener('fetch', function (event) {
+  var request = event.request;
+  if (request.method !== 'GET' || request.headers.has('range')) return;
+  if (new URL(request.url).origin !== self.location.origin) return;
+  var key = cacheKey(request);
+  var isPage = request.mode === 'navigate' || /\.html$/.test(new URL(key).pathname);
+  event.respondWith(isPage ? staleWhileRevalidate(event, key) : cacheFirst(event, key));
+});
+'''
+
+REMOVAL_SW = '''/* Generated by build_service_worker.py --remove - do not edit */
+var PREFIX = '%s';
+
+self.addEventListener('install', function () { self.skipWaiting(); });
+
+self.addEventListener('activate', function (event) {
+  event.waitUntil(caches.keys().then(function (names) {
+    return Promise.all(names.filter(function (name) { return name.indexOf(PREFIX) === 0; })
+      .map(function (name) { return caches.delete(name); }));
+  }).then(function () {
+    return self.registration.unregister();
+  }).then(function () {
+    return self.clients.matchAll({ type: 'window' });
+  }).then(function (clients) {
+    clients.forEach(function (client) { client.navigate(client.url); });
+  }));
+});
+'''
+
+
+def expand(patterns):
+    """Existing project paths for a list of paths and glob patterns, in order, without repeats."""
+    paths = []
+    for pattern in patterns:
+        matches = sorted(glob.glob(pattern)) if any(c in pattern for c in '*?[') else [pattern]
+        for path in matches:
+            path = path.replace(os.sep, '/')
+            if os.path.isfile(path) and path not in paths:
+                paths.append(path)
+    return paths
+
+
+def page_assets(page):
+    """Local non-page files a page references through href/src/srcset or url(), in document order."""
+    with open(page, 'rb') as f:
+        data = f.read()
+    references = []
+    for match in ATTR_PATTERN.finditer(data):
+        value = next((group for group in match.groups()[1:] if group is not None), b'')
+        urls = [url for url, _ in iter_srcset(value, 0)] if match.group(1).lower() == b'srcset' else [value]
+        references.extend((match.start(), url) for url in urls)
+    for match in CSS_URL_PATTERN.finditer(data):
+        references.append((match.start(), next(group for group in match.groups() if group is not None)))
+
+    assets = []
+    for _, url in sorted(references):
+        url = url.decode('utf-8', errors='replace').split('#')[0].split('?')[0]
+        path = resolve_asset(page, url) if url else None
+        if path and not path.endswith('.html') and os.path.isfile(path) and path not in assets:
+            assets.append(path)
+    return assets
+
+
+def revision(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()[:10]
+
+
+def collect_groups():
+    """[(group name, [project paths])] in precache priority order."""
+    schedule_pages = expand(SCHEDULE_PAGES)
+    session_pages = expand(SESSION_PAGES)
+
+    # Under their fingerprinted names once fingerprint_assets.py has run
+    fingerprinted = load_manifest()
+    core = expand(fingerprinted.get(path, path) for path in CORE_ASSETS)
+    for page in schedule_pages + session_pages:
+        for path in page_assets(page):
+            if path not in core and not path.startswith(THUMBNAIL_DIR):
+                core.append(path)
+    for sheet in [path for path in core if path.endswith('.css')]:
+        for face in Stylesheet(sheet).faces:
+            if face.path and os.path.isfile(face.path) and face.path not in core:
+                core.append(face.path)
+
+    usage = Counter()
+    for page in expand(SPEAKER_PAGES):
+        usage.update(path for path in page_assets(page) if path.startswith(THUMBNAIL_DIR))
+    thumbnails = sorted(usage, key=lambda path: (-usage[path], os.path.getsize(path), path))
+
+    return [('core', core), ('pages', schedule_pages), ('sessions', session_pages), ('thumbnails', thumbnails)]
+
+
+def build_manifest(groups, max_bytes):
+    """(manifest entries, {group: (precached, bytes)}, [(path, size) left to the runtime cache])."""
+    manifest = []
+    summary = {}
+    deferred = []
+    total = 0
+    for name, paths in groups:
+        count = size = 0
+        for path in paths:
+            file_size = os.path.getsize(path)
+            if total + file_size > max_bytes:
+                deferred.append((path, file_size))
+                continue
+            total += file_size
+            count += 1
+            size += file_size
+            manifest.append({'url': quote(path, safe='/'), 'revision': revision(path)})
+        summary[name] = (count, size)
+    return manifest, summary, deferred
+
+
+def render_worker(manifest):
+    version = hashlib.sha256(json.dumps(manifest, sort_keys=True).encode('utf-8')).hexdigest()[:12]
+    offline = {'en': quote('schedule.html'), 'zh': quote('zh/schedule.html')}
+    return version, SW_TEMPLATE % {
+        'version': version,
+        'prefix': CACHE_PREFIX,
+        'runtime_entries': RUNTIME_MAX_ENTRIES,
+        'runtime_bytes': RUNTIME_MAX_ENTRY_BYTES,
+        'manifest': json.dumps(manifest, indent=1),
+        'offline': json.dumps(offline),
+    }
+
+
+def update_registration(page, remove=False, dry_run=False):
+    """Add, refresh or (with remove) take out the registration snippet. Returns True if the page changed."""
+    with open(page, 'r', encoding='utf-8') as f:
+        content = f.read()
+    updated = SNIPPET.sub('', content)
+    if not remove:
+        snippet = SNIPPET_TEMPLATE % get_relative_path(page, SW_FILE).replace(os.sep, '/')
+        head_end = updated.find('</head>')
+        if head_end == -1:
+            return False
+        line_start = updated.rfind('\n', 0, head_end) + 1
+        if updated[line_start:head_end].strip():
+            line_start = head_end
+        updated = updated[:line_start] + snippet + updated[line_start:]
+    if updated == content:
+        return False
+    if not dry_run:
+        with open(page, 'w', encoding='utf-8') as f:
+            f.write(updated)
+    return True
+
+
+def write_file(path, content, dry_run):
+    if dry_run:
+        return
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(content)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Generate the service worker and precache manifest')
+    parser.add_argument('--project-root', default='.', help='Site root (default: current directory)')
+    parser.add_argument('--max-precache-mb', type=float, default=DEFAULT_MAX_PRECACHE_MB,
+                        help=f'Upper bound on the precached bytes (default: {DEFAULT_MAX_PRECACHE_MB})')
+    parser.add_argument('--remove', action='store_true',
+                        help='Take the registration out of every page and retire the installed worker')
+    parser.add_argument('--dry-run', action='store_true', help='Report without writing anything')
+    args = parser.parse_args()
+
+    os.chdir(args.project_root)
+    pages = find_pages('.')
+
+    if args.remove:
+        print("🧹 Removing the service worker" + (" (dry run)" if args.dry_run else ""))
+        print("=" * 50)
+        write_file(SW_FILE, REMOVAL_SW % CACHE_PREFIX, args.dry_run)
+        if os.path.exists(MANIFEST_FILE) and not args.dry_run:
+            os.remove(MANIFEST_FILE)
+        changed = sum(update_registration(page, remove=True, dry_run=args.dry_run) for page in pages)
+        print(f"  {SW_FILE} replaced by a worker that clears its caches and unregisters")
+        print(f"  Registration {'would be ' if args.dry_run else ''}removed from {changed} pages")
+        sys.exit(0)
+
+    print("🔧 Building the service worker" + (" (dry run)" if args.dry_run else ""))
+    print("=" * 50)
+    # Pages first, so the manifest hashes them with the snippet in place
+    changed = sum(update_registration(page, dry_run=args.dry_run) for page in pages)
+    groups = collect_groups()
+    manifest, summary, deferred = build_manifest(groups, args.max_precache_mb * 1024 * 1024)
+    version, worker = render_worker(manifest)
+
+    total = sum(size for _, size in summary.values())
+    for name, paths in groups:
+        count, size = summary[name]
+        print(f"  {name:<11} {count:4d}/{len(paths):<4d} files  {size / 1024 / 1024:6.2f} MB")
+    print(f"  {'total':<11} {len(manifest):4d}       files  {total / 1024 / 1024:6.2f} MB "
+          f"(cap {args.max_precache_mb:g} MB), version {version}")
+    if deferred:
+        deferred_size = sum(size for _, size in deferred)
+        print(f"\n  ⚠️  {len(deferred)} files ({deferred_size / 1024 / 1024:.1f} MB) over the cap, "
+              f"left to the runtime cache:")
+        for path, size in deferred[:10]:
+            print(f"    - {path} ({size / 1024:.0f} KB)")
+        if len(deferred) > 10:
+            print(f"    ... and {len(deferred) - 10} more")
+
+    write_file(SW_FILE, worker, args.dry_run)
+    write_file(MANIFEST_FILE, json.dumps({'version': version, 'entries': manifest}, indent=2) + '\n', args.dry_run)
+
+    print(f"\n  {'Would write' if args.dry_run else 'Wrote'} {SW_FILE} and {MANIFEST_FILE}")
+    print(f"  Registration {'would be ' if args.dry_run else ''}added or updated on {changed} of {len(pages)} pages")
+    if not args.dry_run:
+        print("\n✅ Done. Serve the site over HTTPS (or localhost) and check Application > Service Workers.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""
+Full-site link and asset integrity checker.
+
+This script will:
+1. Extract every internal href/src/srcset/url()/@import reference from both language trees
+2. Resolve each reference against the inventory of files in the project
+3. Check #anchor targets against the id/name attributes of the target page
+4. Write machine-readable results and exit non-zero when anything is broken
+
+Extraction runs across a process pool, so the whole site is checked in a
+few seconds and the check can run on every commit.
+
+Usage:
+    python3 "python scripts/check_site_links.py"
+    python3 "python scripts/check_site_links.py" --json link_check_report.json
+    python3 "python scripts/check_site_links.py" --workers 8 speakers zh/speakers
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import bisect
+import argparse
+from pathlib import Path
+from urllib.parse import unquote
+from concurrent.futures import ProcessPoolExecutor
+
+from asset_index import extract_references, is_local_reference, is_indexed_file, SKIP_DIRS
+
+# id="..." and <a name="..."> anchor targets
+ANCHOR_PATTERN = re.compile(rb'\s(?:id|name)\s*=\s*(?:"([^"]*)"|\'([^\']*)\')', re.IGNORECASE)
+
+# CSS escapes (\-, \.) are real escapes inside url(); in HTML attributes they are not
+CSS_ESCAPE_PATTERN = re.compile(r'\\(.)')
+
+
+def scan_file(project_root, page):
+    """Extract references and anchor ids from one file (runs in a worker process)."""
+    with open(os.path.join(project_root, page), 'rb') as f:
+        data = f.read()
+    is_css = page.endswith('.css')
+    line_starts = [0]
+    position = data.find(b'\n')
+    while position != -1:
+        line_starts.append(position + 1)
+        position = data.find(b'\n', position + 1)
+    references = [
+        (kind, url, bisect.bisect_right(line_starts, offset))
+        for kind, url, offset in extract_references(data, is_css=is_css)
+    ]
+    anchors = set()
+    if not is_css:
+        for match in ANCHOR_PATTERN.finditer(data):
+            value = match.group(1) if match.group(1) is not None else match.group(2)
+            anchors.add(value.decode('utf-8', errors='replace'))
+    return page, references, anchors
+
+
+def build_inventory(project_root):
+    """Return (all project files, pages to check) as project-relative POSIX paths."""
+    inventory = set()
+    pages = []
+    for root, dirs, files in os.walk(project_root):
+        dirs[:] = [d for d in dirs if d not in SKIP_DIRS and not d.startswith('.')]
+        for name in files:
+            relative = Path(root, name).relative_to(project_root).as_posix()
+            inventory.add(relative)
+            if is_indexed_file(name):
+                pages.append(relative)
+    return inventory, sorted(pages)
+
+
+def check_reference(page, kind, url, inventory, anchors_by_page):
+    """Return (reason, resolved) for a broken reference, or None if it resolves."""
+    if kind in ('url', 'import'):
+        url = CSS_ESCAPE_PATTERN.sub(r'\1', url)
+    elif '\\' in url:
+        # Browsers treat a backslash in an http(s) URL as a path separator
+        return 'backslash-escaped URL', None
+    url = url.strip()
+    if not is_local_reference(url):
+        return None
+
+    path_part, _, fragment = url.partition('#')
+    path_part = path_part.split('?')[0]
+
+    if not path_part:
+        target = page
+    else:
+        path_part = unquote(path_part)
+        if path_part.startswith('/'):
+            target = os.path.normpath(path_part.lstrip('/'))
+        else:
+            target = os.path.normpath(os.path.join(os.path.dirname(page), path_part))
+        target = target.replace(os.sep, '/')
+        if target.startswith('..'):
+            return 'points outside the project', target
+        if target not in inventory:
+            if target + '/index.html' in inventory or (target == '.' and 'index.html' in inventory):
+                target = 'index.html' if target == '.' else target + '/index.html'
+            else:
+                return 'missing file', target
+
+    if fragment and target.endswith('.html'):
+        anchors = anchors_by_page.get(target)
+        if anchors is not None and unquote(fragment) not in anchors:
+            return 'missing anchor', f"{target}#{fragment}"
+    return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Check that every internal link and asset reference resolves')
+    parser.add_argument('paths', nargs='*', help='Only report on pages under these paths (default: whole site)')
+    parser.add_argument('--project-root', default='.', help='Project root directory')
+    parser.add_argument('--workers', type=int, default=os.cpu_count(), help='Worker processes (default: CPU count)')
+    parser.add_argument('--json', help='Write machine-readable results to this file ("-" for stdout)')
+    parser.add_argument('--ignore-backslash', action='store_true',
+                        help='Do not report backslash-escaped URLs left by the Webflow export')
+    args = parser.parse_args()
+
+    project_root = str(Path(args.project_root).resolve())
+    start = time.perf_counter()
+    inventory, pages = build_inventory(project_root)
+
+    results = {}
+    with ProcessPoolExecutor(max_workers=args.workers) as executor:
+        chunksize = max(1, len(pages) // ((args.workers or 1) * 4))
+        for page, references, anchors in executor.map(scan_file, [project_root] * len(pages), pages,
+                                                      chunksize=chunksize):
+            results[page] = (references, anchors)
+
+    anchors_by_page = {page: anchors for page, (references, anchors) in results.items()}
+    prefixes = [Path(path).as_posix().rstrip('/') for path in args.paths]
+
+    checked_pages = [
+        page for page in pages
+        if not prefixes or any(page == prefix or page.startswith(prefix + '/') for prefix in prefixes)
+    ]
+
+    broken = []
+    reference_count = 0
+    for page in checked_pages:
+        references, _ = results[page]
+        for kind, url, line in references:
+            reference_count += 1
+            problem = check_reference(page, kind, url, inventory, anchors_by_page)
+            if not problem:
+                continue
+            reason, resolved = problem
+            if reason == 'backslash-escaped URL' and args.ignore_backslash:
+                continue
+            broken.append({
+                'page': page,
+                'line': line,
+                'kind': kind,
+                'url': url,
+                'reason': reason,
+                'resolved': resolved,
+            })
+    elapsed = time.perf_counter() - start
+
+    report = {
+        'files_checked': len(checked_pages),
+        'references_checked': reference_count,
+        'broken_count': len(broken),
+        'seconds': round(elapsed, 3),
+        'broken': broken,
+    }
+
+    if args.json == '-':
+        json.dump(report, sys.stdout, indent=2, ensure_ascii=False)
+        print()
+    else:
+        by_reason = {}
+        for item in broken:
+            by_reason.setdefault(item['reason'], []).append(item)
+        for reason, items in sorted(by_reason.items()):
+            print(f"\n❌ {reason}: {len(items)}")
+            for item in items[:20]:
+                print(f"    {item['page']}:{item['line']} {item['kind']}={item['url']}")
+            if len(items) > 20:
+                print(f"    ... and {len(items) - 20} more")
+        print(f"\n{'='*50}")
+        print(f"📊 LINK CHECK SUMMARY")
+        print(f"{'='*50}")
+        print(f"Files checked: {report['files_checked']}")
+        print(f"References checked: {reference_count}")
+        print(f"Broken references: {len(broken)}")
+        print(f"Time: {elapsed:.2f}s")
+        if not broken:
+            print("✅ All internal references resolve")
+        if args.json:
+            with open(args.json, 'w', encoding='utf-8') as f:
+                json.dump(report, f, indent=2, ensure_ascii=False)
+            print(f"\nResults saved to: {args.json}")
+
+    sys.exit(1 if broken else 0)
+
+
+if __name__ == "__main__":
+    main()
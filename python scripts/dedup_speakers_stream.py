@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+Streaming removal of duplicate speakers from the combined speakers.html file.
+
+Does the same job as fix_speaker_duplicates_v2.py - keep the first card for
+each speaker name in tabs 1-7 - without building a BeautifulSoup tree. The
+file is tokenized in chunks; only the speaker card currently being read is
+buffered, every other byte is copied straight to the output, and kept cards
+are written back exactly as they were read. Memory stays flat regardless of
+page size and the markup that is not removed comes through byte-identical.
+
+Usage:
+    python3 "python scripts/dedup_speakers_stream.py"
+    python3 "python scripts/dedup_speakers_stream.py" zh/speakers.html --in-place
+    python3 "python scripts/dedup_speakers_stream.py" --by-content
+"""
+
+import os
+import re
+import sys
+import html
+import hashlib
+import argparse
+
+from html_stream import iter_tokens, parse_attrs, class_list, CHUNK_SIZE
+
+TAB_NUMBERS = range(1, 8)  # Tabs 1-7
+
+# Attributes that differ between otherwise identical copies of a card
+VOLATILE_ATTRIBUTES = re.compile(rb'\s(?:data-w-id|id)="[^"]*"')
+WHITESPACE = re.compile(rb'\s+')
+
+
+def name_key(name):
+    """Digest of a speaker name, so the seen-set stays small however long names get."""
+    return hashlib.blake2b(name.encode('utf-8'), digest_size=16).digest()
+
+
+def content_key(card_bytes):
+    """Digest of a card's markup with whitespace and per-copy ids normalized away."""
+    normalized = WHITESPACE.sub(b' ', VOLATILE_ATTRIBUTES.sub(b'', card_bytes)).strip()
+    return hashlib.blake2b(normalized, digest_size=16).digest()
+
+
+class SpeakerDeduplicator:
+    """
+    Token-stream state machine over the speakers page.
+
+    Tab panes, the collection list and the cards are all <div>s, so their
+    boundaries are tracked by div depth: an element ends when the depth
+    returns to where it was when the element opened.
+    """
+
+    def __init__(self, by_content=False):
+        self.by_content = by_content
+        self.stats = {}  # tab number -> [kept, removed]
+
+    def run(self, source, output, chunk_size=CHUNK_SIZE):
+        depth = 0
+        tab = None
+        tab_depth = list_depth = card_depth = None
+        processed_tabs = set()
+        seen = set()
+        card = None          # list of raw token bytes for the card being read
+        heading = None       # list of text pieces while inside h3.heading
+        card_name = None
+
+        for token in iter_tokens(source, chunk_size):
+            kind, name = token.kind, token.name
+
+            if kind == 'start' and name == 'div' and not token.self_closing:
+                attrs = None
+                if card is None:
+                    attrs = parse_attrs(token.attrs)
+                    if tab is None:
+                        tab = self._tab_number(attrs, processed_tabs)
+                        if tab is not None:
+                            tab_depth = depth
+                            processed_tabs.add(tab)
+                            seen = set()
+                            self.stats[tab] = [0, 0]
+                    elif list_depth is None:
+                        if {'collection-list', 'w-dyn-items'} <= class_list(attrs):
+                            list_depth = depth
+                    elif 'collection-item' in class_list(attrs):
+                        card = []
+                        card_depth = depth
+                        card_name = None
+                depth += 1
+            elif kind == 'end' and name == 'div':
+                depth -= 1
+
+            if card is None:
+                output.write(token.raw)
+                if kind == 'end' and name == 'div':
+                    if list_depth is not None and depth == list_depth:
+                        list_depth = None
+                    if tab is not None and depth == tab_depth:
+                        tab = tab_depth = None
+                continue
+
+            card.append(token.raw)
+            if kind == 'start' and name == 'h3' and heading is None and card_name is None:
+                if 'heading' in class_list(parse_attrs(token.attrs)):
+                    heading = []
+            elif kind == 'end' and name == 'h3' and heading is not None:
+                card_name = ''.join(heading) or None
+                heading = None
+            elif kind == 'text' and heading is not None:
+                piece = html.unescape(token.raw.decode('utf-8', errors='replace')).strip()
+                if piece:
+                    heading.append(piece)
+
+            if kind == 'end' and name == 'div' and depth == card_depth:
+                card_bytes = b''.join(card)
+                if self.by_content:
+                    key = content_key(card_bytes)
+                elif card_name:
+                    key = name_key(card_name)
+                else:
+                    key = None  # cards without a name are always kept
+                if key is not None and key in seen:
+                    self.stats[tab][1] += 1
+                else:
+                    if key is not None:
+                        seen.add(key)
+                    self.stats[tab][0] += 1
+                    output.write(card_bytes)
+                card = card_name = card_depth = heading = None
+
+        if card is not None:
+            # Unterminated card at end of input: never drop content we could not classify
+            output.write(b''.join(card))
+        return self.stats
+
+    @staticmethod
+    def _tab_number(attrs, processed_tabs):
+        match = re.fullmatch(r'Tab (\d+)', attrs.get('data-w-tab', ''))
+        if not match:
+            return None
+        number = int(match.group(1))
+        if number not in TAB_NUMBERS or number in processed_tabs:
+            return None
+        return number
+
+
+def dedup_file(input_path, output_path, by_content=False, chunk_size=CHUNK_SIZE):
+    """Stream input_path to output_path without duplicate speaker cards. Returns per-tab stats."""
+    temp_path = output_path + '.tmp'
+    with open(input_path, 'rb') as source, open(temp_path, 'wb') as output:
+        stats = SpeakerDeduplicator(by_content).run(source, output, chunk_size)
+    os.replace(temp_path, output_path)
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Remove duplicate speaker cards from speakers.html in one streaming pass')
+    parser.add_argument('input', nargs='?', default='speakers.html', help='Speakers page (default: speakers.html)')
+    parser.add_argument('-o', '--output', default='speakers_deduplicated_v2.html',
+                        help='Output file (default: speakers_deduplicated_v2.html)')
+    parser.add_argument('--in-place', action='store_true', help='Overwrite the input file')
+    parser.add_argument('--by-content', action='store_true',
+                        help='Treat cards as duplicates only when their normalized markup matches')
+    parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE, help='Bytes read per chunk')
+    args = parser.parse_args()
+
+    output_path = args.input if args.in_place else args.output
+    stats = dedup_file(args.input, output_path, args.by_content, args.chunk_size)
+
+    for tab_number in TAB_NUMBERS:
+        if tab_number not in stats:
+            print(f"Tab {tab_number} not found")
+            continue
+        kept, removed = stats[tab_number]
+        print(f"Tab {tab_number}: kept {kept}, removed {removed} duplicates")
+
+    total_removed = sum(removed for _, removed in stats.values())
+    print(f"\nRemoved {total_removed} duplicate speaker cards")
+    print(f"Deduplicated speakers file created: {output_path}")
+    if not stats:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -69,27 +69,37 @@ class HTMLFormatter:
         tokens = []
         current_pos = 0
         
-        # Find all script and style tags
-        script_pattern = r'(<script[^>]*>.*?</script>)'
-        style_pattern = r'(<style[^>]*>.*?</style>)'
-        pre_pattern = r'(<pre[^>]*>.*?</pre>)'
-        textarea_pattern = r'(<textarea[^>]*>.*?</textarea>)'
-        
-        # Combine patterns
-        combined_pattern = f'({script_pattern}|{style_pattern}|{pre_pattern}|{textarea_pattern})'
-        
-        # Find all matches
-        matches = list(re.finditer(combined_pattern, html_content, re.DOTALL | re.IGNORECASE))
-        
-        for i, match in enumerate(matches):
+        # Find the opening tags of the sections kept as they are; each one
+        # runs to the first closing tag of its name, searched for from there
+        # rather than by a DOTALL pattern tried across the whole document
+        open_pattern = re.compile(r'<(script|style|pre|textarea)\b[^<>]*>', re.IGNORECASE)
+        unclosed = set()
+        search_pos = 0
+        
+        while True:
+            match = open_pattern.search(html_content, search_pos)
+            if not match:
+                break
+            name = match.group(1).lower()
+            close = None
+            if name not in unclosed:
+                close = re.compile(rf'</{name}>', re.IGNORECASE).search(html_content, match.end())
+            if not close:
+                # No closing tag after this one means none after any later one either
+                unclosed.add(name)
+                search_pos = match.end()
+                continue
+            start, end = match.start(), close.end()
+            search_pos = end
+            
             # Add content before the match
-            if match.start() > current_pos:
-                before_content = html_content[current_pos:match.start()]
+            if start > current_pos:
+                before_content = html_content[current_pos:start]
                 tokens.extend(self._split_html_content(before_content))
             
             # Add the matched content as a single token
-            tokens.append(match.group(0))
-            current_pos = match.end()
+            tokens.append(html_content[start:end])
+            current_pos = end
         
         # Add remaining content
         if current_pos < len(html_content):
@@ -103,8 +113,8 @@ class HTMLFormatter:
         tokens = []
         current_pos = 0
         
-        # Find all HTML tags
-        tag_pattern = r'<[^>]+>'
+        # Find all HTML tags (a stray < ends at the next one)
+        tag_pattern = r'<[^<>]+>'
         matches = list(re.finditer(tag_pattern, content))
         
         for match in matches:
@@ -230,7 +240,8 @@ class HTMLFormatter:
         css = re.sub(r'\s+', ' ', css_content.strip())
         
         # Add line breaks for CSS rules and media queries
-        css = re.sub(r'(@media[^{]+){', r'\1 {\n', css)
+        css = re.sub(r'(@media[^{@]+){', r'\1 {\n', css)
+        # regex-lint: accept overlap with line 243: applied after it, to the braces it has already spaced
         css = re.sub(r'([{}])', r'\n\1\n', css)
         css = re.sub(r'([;])', r'\1\n', css)
         
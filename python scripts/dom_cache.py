@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+"""
+Parse-once document cache shared by the tree-based pipeline stages.
+
+When several stages run over the same page in one run - URL extraction in
+update_urls.py, tab dedup in fix_speaker_duplicates_v2.py, later head and
+asset passes - each used to read and parse the file itself. A
+DocumentCache parses each page once, hands the same tree to every stage
+that asks for it, records which stages modified it, and serializes each
+modified page exactly once when the run is flushed.
+
+Read-only stages can go further with result(): the stage's output is
+memoized per page and, with a cache directory, stored on disk keyed by the
+page's content hash, so an unchanged page is not parsed at all on the next
+run. (Whole trees are not cached on disk: unpickling one takes about as long
+as parsing the page with lxml.)
+
+    from dom_cache import DocumentCache
+
+    with DocumentCache(cache_dir='.dom_cache') as documents:
+        soup = documents.get('speakers.html', stage='dedup')
+        ...
+        documents.mark_modified('speakers.html', 'dedup')
+    # modified pages are written back here
+
+Run directly, it runs the URL extraction and speaker dedup stages over the
+given pages through one cache and reports how many parses were needed.
+"""
+
+import os
+import time
+import pickle
+import hashlib
+import argparse
+from collections import OrderedDict
+
+import bs4
+
+from html_parsers import make_soup, default_parser, REFERENCE_PARSER
+
+DEFAULT_CACHE_DIR = '.dom_cache'
+
+# Unmodified trees kept in memory; modified ones are kept until flush()
+MAX_DOCUMENTS = 16
+
+
+class DocumentCache:
+    """Per-run cache of parsed pages, keyed by absolute path."""
+
+    def __init__(self, parser=None, cache_dir=None, max_documents=MAX_DOCUMENTS):
+        self.parser = parser or default_parser()
+        self.cache_dir = cache_dir
+        self.max_documents = max_documents
+        self.trees = OrderedDict()   # path -> soup, least recently used first
+        self.texts = {}              # path -> original text, for pages with a tree or pending result
+        self.hashes = {}             # path -> content hash of the text on disk
+        self.modified = {}           # path -> [stages that changed the tree]
+        self.outputs = {}            # path -> file to write on flush, if not the page itself
+        self.results = {}            # (path, stage) -> memoized stage result
+        self.parse_count = 0
+        self.result_hits = 0
+        self.parse_seconds = 0.0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.flush()
+
+    @staticmethod
+    def _key(path):
+        return os.path.abspath(str(path))
+
+    def text(self, path):
+        """The page's text as read from disk (utf-8, falling back to latin-1)."""
+        key = self._key(path)
+        if key not in self.texts:
+            with open(key, 'rb') as f:
+                data = f.read()
+            try:
+                text = data.decode('utf-8')
+            except UnicodeDecodeError:
+                text = data.decode('latin-1')
+            self.texts[key] = text
+            self.hashes[key] = hashlib.sha256(data).hexdigest()
+        return self.texts[key]
+
+    def content_hash(self, path):
+        """SHA-256 of the page bytes on disk."""
+        self.text(path)
+        return self.hashes[self._key(path)]
+
+    def get(self, path, stage=None):
+        """Return the page's tree, parsing it on first use. Stages share the same object."""
+        key = self._key(path)
+        if key in self.trees:
+            self.trees.move_to_end(key)
+            return self.trees[key]
+        text = self.text(path)
+        start = time.perf_counter()
+        soup = make_soup(text, self.parser)
+        self.parse_seconds += time.perf_counter() - start
+        self.parse_count += 1
+        self.trees[key] = soup
+        self._evict()
+        return soup
+
+    def _evict(self):
+        unmodified = [key for key in self.trees if key not in self.modified and key not in self.outputs]
+        for key in unmodified[:max(0, len(unmodified) - self.max_documents)]:
+            del self.trees[key]
+            self.texts.pop(key, None)
+
+    def mark_modified(self, path, stage):
+        """Record that stage changed the page's tree, so flush() writes it."""
+        key = self._key(path)
+        if key not in self.trees:
+            raise KeyError(f"{path} has no tree in this cache; call get() first")
+        stages = self.modified.setdefault(key, [])
+        if stage not in stages:
+            stages.append(stage)
+        # Results computed from the old tree no longer apply
+        for result_key in [result_key for result_key in self.results if result_key[0] == key]:
+            del self.results[result_key]
+
+    def modified_by(self, path):
+        """Stages that modified the page in this run, in order."""
+        return list(self.modified.get(self._key(path), []))
+
+    def set_output(self, path, output_path):
+        """Write the page to output_path on flush instead of overwriting it."""
+        self.outputs[self._key(path)] = output_path
+
+    def invalidate(self, path):
+        """Forget everything about a page, e.g. after it was rewritten outside the cache."""
+        key = self._key(path)
+        if key in self.modified:
+            raise RuntimeError(f"{path} has unsaved changes from {', '.join(self.modified[key])}")
+        self.trees.pop(key, None)
+        self.texts.pop(key, None)
+        self.hashes.pop(key, None)
+        for result_key in [result_key for result_key in self.results if result_key[0] == key]:
+            del self.results[result_key]
+
+    def result(self, path, stage, compute):
+        """
+        Return compute(tree) for a read-only stage, memoized per page and,
+        with a cache directory, on disk by content hash. compute's result
+        must be picklable.
+        """
+        key = self._key(path)
+        if (key, stage) in self.results:
+            return self.results[(key, stage)]
+
+        cache_file = None
+        if self.cache_dir and key not in self.modified:
+            digest = hashlib.sha256(
+                f"{stage}\0{self.parser}\0{bs4.__version__}\0{self.content_hash(path)}".encode()
+            ).hexdigest()
+            cache_file = os.path.join(self.cache_dir, digest[:2], digest + '.pickle')
+            try:
+                with open(cache_file, 'rb') as f:
+                    value = pickle.load(f)
+                self.result_hits += 1
+                self.results[(key, stage)] = value
+                if key not in self.trees:
+                    self.texts.pop(key, None)
+                return value
+            except (OSError, EOFError, pickle.UnpicklingError):
+                pass
+
+        value = compute(self.get(path, stage))
+        self.results[(key, stage)] = value
+        if cache_file:
+            os.makedirs(os.path.dirname(cache_file), exist_ok=True)
+            temp_file = cache_file + '.tmp'
+            with open(temp_file, 'wb') as f:
+                pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temp_file, cache_file)
+        return value
+
+    def flush(self):
+        """Serialize each modified (or redirected) page once. Returns [(written path, stages)]."""
+        written = []
+        for key in list(self.trees):
+            if key not in self.modified and key not in self.outputs:
+                continue
+            output_path = self.outputs.get(key, key)
+            with open(output_path, 'w', encoding='utf-8') as f:
+                f.write(str(self.trees[key]))
+            written.append((output_path, self.modified.pop(key, [])))
+            self.outputs.pop(key, None)
+            if output_path == key:
+                # The tree now matches the file on disk again
+                self.texts.pop(key, None)
+                self.hashes.pop(key, None)
+        return written
+
+
+def main():
+    from update_urls import URLUpdater
+    from fix_speaker_duplicates_v2 import remove_duplicate_speakers_by_name
+
+    parser = argparse.ArgumentParser(description='Run the tree-based stages over pages through one document cache')
+    parser.add_argument('pages', nargs='*', default=['speakers.html'], help='Pages to process (default: speakers.html)')
+    parser.add_argument('--cache-dir', default=None,
+                        help=f'Keep read-only stage results on disk (e.g. {DEFAULT_CACHE_DIR})')
+    parser.add_argument('--dedup', action='store_true',
+                        help='Also run the speaker dedup stage (writes speakers_deduplicated_v2.html)')
+    args = parser.parse_args()
+
+    # The dedup stage writes its tree back, which needs html.parser to serialize the page unchanged
+    with DocumentCache(parser=REFERENCE_PARSER if args.dedup else None, cache_dir=args.cache_dir) as documents:
+        updater = URLUpdater('.', documents=documents)
+        for page in args.pages:
+            urls = updater.extract_urls_from_file(page)
+            print(f"{page}: {len(urls)} URLs")
+            if args.dedup and os.path.basename(page) == 'speakers.html':
+                remove_duplicate_speakers_by_name(documents=documents, input_path=page)
+
+    print(f"\nParser: {documents.parser}")
+    print(f"Pages parsed: {documents.parse_count} ({documents.parse_seconds:.2f}s)")
+    print(f"Stage results loaded from disk: {documents.result_hits}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,278 @@
+#!/usr/bin/env python3
+"""
+Give the site's assets content-hashed file names so they can be cached forever.
+
+css/china2024.css, js/china2024.js and the images are referenced by fixed
+names, so a browser or CDN that caches them for long risks serving stale
+files after a redeploy. This build step:
+
+1. Finds every asset the pages reference (href, src, srcset, data-src,
+   url() in <style> blocks and style attributes), and the assets those
+   stylesheets reference in turn
+2. Copies each one to name.<hash>.ext next to the original, the hash being
+   the first HASH_LENGTH hex digits of the SHA-256 of its content. A
+   stylesheet is hashed after its own references are rewritten, so a new
+   font or image also gives the stylesheets using it a new name
+3. Rewrites the references in the pages and in the hashed stylesheets
+4. Writes asset-manifest.json, {original path: fingerprinted path}
+
+The originals are left untouched and stay the files to edit. An asset
+whose content did not change keeps its name from one build to the next,
+so repeat visitors only download what actually changed. Re-running maps
+the pages back to the original names (a name.<hash>.ext next to an
+existing name.ext is taken for a copy of it) before fingerprinting again, and --restore does only that, for steps that
+look for the original names (webflow_runtime.py, for one): run them on
+restored pages, then fingerprint again. Run build_service_worker.py after
+this step so the precache lists the fingerprinted files.
+
+Fingerprinted copies left over from earlier builds are kept, since pages
+cached with the old HTML may still ask for them; --prune deletes those
+that the current manifest no longer uses.
+
+Usage:
+    python3 "python scripts/fingerprint_assets.py" --dry-run
+    python3 "python scripts/fingerprint_assets.py"
+    python3 "python scripts/fingerprint_assets.py" --prune
+    python3 "python scripts/fingerprint_assets.py" --restore
+"""
+
+import os
+import re
+import sys
+import json
+import shutil
+import hashlib
+import argparse
+from functools import lru_cache
+
+from site_partials import find_pages
+from asset_index import extract_references, normalize_target, resolve_asset
+
+MANIFEST_FILE = 'asset-manifest.json'
+HASH_LENGTH = 10
+
+ASSET_EXTENSIONS = {
+    '.css', '.js',
+    '.png', '.jpg', '.jpeg', '.gif', '.svg', '.webp', '.avif', '.ico',
+    '.woff', '.woff2', '.ttf', '.otf', '.eot',
+}
+
+# Files other build steps look up by name
+EXCLUDED = {'sw.js'}
+
+# name.<hash>.ext
+FINGERPRINTED = re.compile(r'\.[0-9a-f]{%d}(?=\.[^./]+$)' % HASH_LENGTH)
+
+
+def fingerprinted_name(path, digest):
+    stem, ext = os.path.splitext(path)
+    return f"{stem}.{digest}{ext}"
+
+
+@lru_cache(maxsize=None)
+def original_name(path):
+    """The asset a fingerprinted copy was made from, or None if path is not one."""
+    original = FINGERPRINTED.sub('', path, count=1)
+    return original if original != path and os.path.isfile(original) else None
+
+
+def _split_extension(segment):
+    """(stem, extension) of a raw URL segment, keeping a Webflow-escaped dot (\\.svg) with the extension."""
+    dot = segment.rfind('.')
+    if dot <= 0:
+        return segment, ''
+    if segment[dot - 1] == '\\':
+        dot -= 1
+    return segment[:dot], segment[dot:]
+
+
+def with_digest(raw_url, digest):
+    """
+    raw_url with digest inserted before the file extension, or with the one
+    that is there removed when digest is None. The query string, fragment
+    and any escaping or percent-encoding of the rest of the URL are kept.
+    """
+    cut = min([index for index in (raw_url.find('?'), raw_url.find('#')) if index != -1] or [len(raw_url)])
+    path, suffix = raw_url[:cut], raw_url[cut:]
+    directory, _, segment = path.rpartition('/')
+    stem, ext = _split_extension(segment)
+    if digest is None:
+        stem = re.sub(r'\.[0-9a-f]{%d}$' % HASH_LENGTH, '', stem)
+    else:
+        stem = f"{stem}.{digest}"
+    return (directory + '/' if '/' in path else '') + stem + ext + suffix
+
+
+def references(path, data):
+    """[(offset, raw url, project path)] for the local references in an HTML or CSS file."""
+    found = {}
+    for _, raw_url, offset in extract_references(data, is_css=path.endswith('.css')):
+        asset = resolve_asset(path, normalize_target(raw_url))
+        if asset:
+            found.setdefault(offset, (raw_url, asset))
+    return [(offset, raw_url, asset) for offset, (raw_url, asset) in sorted(found.items())]
+
+
+def rewrite(path, data, rename):
+    """Apply rename(raw url, project path) -> new raw url or None to every local reference."""
+    pieces = []
+    position = 0
+    for offset, raw_url, asset in references(path, data):
+        replacement = rename(raw_url, asset)
+        if replacement is None or replacement == raw_url:
+            continue
+        raw = raw_url.encode('utf-8')
+        if data[offset:offset + len(raw)] != raw:
+            continue
+        pieces += [data[position:offset], replacement.encode('utf-8')]
+        position = offset + len(raw)
+    pieces.append(data[position:])
+    return b''.join(pieces)
+
+
+def restore(raw_url, asset):
+    return with_digest(raw_url, None) if original_name(asset) else None
+
+
+def fingerprinter(mapping):
+    def rename(raw_url, asset):
+        if asset not in mapping:
+            return None
+        digest = os.path.splitext(mapping[asset])[0].rsplit('.', 1)[1]
+        return with_digest(raw_url, digest)
+    return rename
+
+
+def is_asset(path):
+    return (os.path.splitext(path)[1].lower() in ASSET_EXTENSIONS and path not in EXCLUDED
+            and not original_name(path) and os.path.isfile(path))
+
+
+class Fingerprinter:
+    """Content hashes of the assets, stylesheets after their own references are rewritten."""
+
+    def __init__(self, dry_run=False):
+        self.dry_run = dry_run
+        self.mapping = {}
+        self.written = []
+        self._visiting = set()
+
+    def add(self, path):
+        if path in self.mapping or path in self._visiting or not is_asset(path):
+            return
+        with open(path, 'rb') as f:
+            data = f.read()
+        if path.endswith('.css'):
+            # A stylesheet's name depends on the names it references
+            self._visiting.add(path)
+            for _, _, asset in references(path, data):
+                self.add(asset)
+            self._visiting.discard(path)
+            data = rewrite(path, data, fingerprinter(self.mapping))
+        target = fingerprinted_name(path, hashlib.sha256(data).hexdigest()[:HASH_LENGTH])
+        self.mapping[path] = target
+        if os.path.exists(target):
+            return
+        self.written.append(target)
+        if self.dry_run:
+            return
+        if path.endswith('.css'):
+            with open(target, 'wb') as f:
+                f.write(data)
+            shutil.copystat(path, target)
+        else:
+            shutil.copy2(path, target)
+
+
+def stale_copies(mapping):
+    """Fingerprinted copies of the mapped assets other than the current ones."""
+    current = set(mapping.values())
+    stale = []
+    for directory in sorted({os.path.dirname(original) for original in mapping}):
+        for name in os.listdir(directory or '.'):
+            path = f"{directory}/{name}" if directory else name
+            if FINGERPRINTED.search(name) and path not in current and FINGERPRINTED.sub('', path, count=1) in mapping:
+                stale.append(path)
+    return sorted(stale)
+
+
+def load_manifest():
+    try:
+        with open(MANIFEST_FILE, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Copy assets to content-hashed names and rewrite the references')
+    parser.add_argument('--project-root', default='.', help='Site root (default: current directory)')
+    parser.add_argument('--restore', action='store_true', help='Point the pages back at the original names')
+    parser.add_argument('--prune', action='store_true',
+                        help='Delete fingerprinted copies the new manifest no longer uses')
+    parser.add_argument('--dry-run', action='store_true', help='Report without writing anything')
+    args = parser.parse_args()
+
+    os.chdir(args.project_root)
+    previous = load_manifest()
+    pages = find_pages('.')
+
+    print(("↺ Restoring original asset names" if args.restore else "🔑 Fingerprinting assets")
+          + (" (dry run)" if args.dry_run else ""))
+    print("=" * 50)
+
+    restored = {}
+    for page in pages:
+        with open(page, 'rb') as f:
+            original = f.read()
+        restored[page] = (original, rewrite(page, original, restore))
+
+    if args.restore:
+        outputs = {page: data for page, (_, data) in restored.items()}
+        mapping = {}
+    else:
+        assets = Fingerprinter(args.dry_run)
+        for page, (_, data) in restored.items():
+            for _, _, asset in references(page, data):
+                assets.add(asset)
+        mapping = assets.mapping
+        outputs = {page: rewrite(page, data, fingerprinter(mapping)) for page, (_, data) in restored.items()}
+        unchanged = sum(1 for original, hashed in mapping.items() if previous.get(original) == hashed)
+        print(f"  Assets fingerprinted: {len(mapping)} ({unchanged} unchanged since the last build, "
+              f"{len(assets.written)} new {'copies to write' if args.dry_run else 'copies written'})")
+        for target in assets.written[:10]:
+            print(f"    + {target}")
+        if len(assets.written) > 10:
+            print(f"    ... and {len(assets.written) - 10} more")
+
+    changed = [page for page, data in outputs.items() if data != restored[page][0]]
+    if not args.dry_run:
+        for page in changed:
+            with open(page, 'wb') as f:
+                f.write(outputs[page])
+    print(f"  Pages {'to update' if args.dry_run else 'updated'}: {len(changed)} of {len(pages)}")
+
+    if args.restore:
+        if not args.dry_run:
+            print("\n✅ Done. The fingerprinted copies are kept for the next build.")
+        sys.exit(0)
+
+    stale = stale_copies(mapping)
+    if stale and args.prune:
+        if not args.dry_run:
+            for path in stale:
+                os.remove(path)
+        print(f"  {'Would delete' if args.dry_run else 'Deleted'} {len(stale)} fingerprinted copies no longer used")
+    elif stale:
+        print(f"  {len(stale)} fingerprinted copies from earlier builds kept (--prune deletes them)")
+
+    if not args.dry_run:
+        with open(MANIFEST_FILE, 'w', encoding='utf-8') as f:
+            json.dump(dict(sorted(mapping.items())), f, indent=2, ensure_ascii=False)
+            f.write('\n')
+        print(f"\n✅ Done. {MANIFEST_FILE} maps each original name to its fingerprinted one.")
+    sys.exit(0)
+
+
+if __name__ == "__main__":
+    main()
@@ -16,23 +16,11 @@ def fix_escaped_urls(file_path):
         
         original_content = content
         
-        # Fix speaker URLs: "\.\./speakers/name\.html" -> "../speakers/name.html"
-        content = re.sub(r'\\\.\\\./speakers/([^\\]+)\\\.html', r'../speakers/\1.html', content)
-        
-        # Fix other relative URLs: "\.\./path\.html" -> "../path.html"
-        content = re.sub(r'\\\.\\\./([^\\]+)\\\.html', r'../\1.html', content)
-        
-        # Fix double escaped URLs: "\.\./\.\./path\.html" -> "../../path.html"
-        content = re.sub(r'\\\.\\\./\\\.\\\./([^\\]+)\\\.html', r'../../\1.html', content)
-        
-        # Fix URLs with escaped hyphens: "name\-surname\.html" -> "name-surname.html"
-        content = re.sub(r'([^\\])\\-([^\\])', r'\1-\2', content)
-        
-        # Fix any remaining escaped dots in URLs
-        content = re.sub(r'\\\.', '.', content)
-        
-        # Fix any remaining escaped slashes in URLs
-        content = re.sub(r'\\/', '/', content)
+        # Unescape URLs: "\.\./speakers/name\-surname\.html" -> "../speakers/name-surname.html".
+        # One rule takes every escaped dot, slash and hyphen, so no two rules
+        # compete for the same backslash or skip the second of two escapes
+        # that share a character ("a\-b\-c")
+        content = re.sub(r'\\([./-])', r'\1', content)
         
         # Only write if content changed
         if content != original_content:
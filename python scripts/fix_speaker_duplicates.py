@@ -4,7 +4,7 @@ Script to remove duplicate speakers from the combined speakers.html file.
 Deduplicates based on data-w-id attributes to ensure each speaker appears only once per tab.
 """
 
-from bs4 import BeautifulSoup
+from html_parsers import make_soup, REFERENCE_PARSER
 import os
 
 def remove_duplicate_speakers():
@@ -14,7 +14,9 @@ def remove_duplicate_speakers():
     with open('speakers.html', 'r', encoding='utf-8') as f:
         content = f.read()
     
-    soup = BeautifulSoup(content, 'html.parser')
+    # The tree is written back with str(soup), so parse it with html.parser:
+    # lxml drops the newline after the doctype and every run would change the file
+    soup = make_soup(content, REFERENCE_PARSER)
     
     # For each tab, remove duplicates
     for tab_number in range(1, 8):  # Tabs 1-7
@@ -4,9 +4,12 @@ Script to remove duplicate speakers from the combined speakers.html file.
 Deduplicates based on speaker names to ensure each speaker appears only once per tab.
 """
 
-from bs4 import BeautifulSoup
+from dom_cache import DocumentCache
+from html_parsers import REFERENCE_PARSER
 import os
 
+STAGE = 'fix_speaker_duplicates_v2'
+
 def get_speaker_name(speaker_item):
     """Extract the speaker name from a speaker item."""
     heading = speaker_item.find('h3', class_='heading')
@@ -14,14 +17,23 @@ def get_speaker_name(speaker_item):
         return heading.get_text(strip=True)
     return None
 
-def remove_duplicate_speakers_by_name():
-    """Remove duplicate speakers from the combined speakers.html file based on names."""
+def remove_duplicate_speakers_by_name(documents=None, input_path='speakers.html',
+                                      output_path='speakers_deduplicated_v2.html'):
+    """
+    Remove duplicate speakers from the combined speakers.html file based on names.
     
-    # Read the combined speakers.html file
-    with open('speakers.html', 'r', encoding='utf-8') as f:
-        content = f.read()
+    When called with a shared DocumentCache the already parsed tree is reused
+    and the output is written when the cache is flushed.
+    """
+    own_cache = documents is None
+    if own_cache:
+        # The page is written back with str(soup); html.parser keeps the
+        # serialization byte-stable across runs (lxml drops the newline after the doctype)
+        documents = DocumentCache(parser=REFERENCE_PARSER)
     
-    soup = BeautifulSoup(content, 'html.parser')
+    # Parse the combined speakers.html file (or reuse the tree another stage parsed)
+    soup = documents.get(input_path, stage=STAGE)
+    total_removed = 0
     
     # For each tab, remove duplicates
     for tab_number in range(1, 8):  # Tabs 1-7
@@ -60,6 +72,7 @@ def remove_duplicate_speakers_by_name():
                     # First time seeing this name, keep it
                     seen_names.add(speaker_name)
         
+        total_removed += duplicates_removed
         print(f"Removed {duplicates_removed} duplicates from Tab {tab_number}")
         print(f"Kept {len(seen_names)} unique speakers in Tab {tab_number}")
         
@@ -67,11 +80,14 @@ def remove_duplicate_speakers_by_name():
         if seen_names:
             print(f"Sample speakers in Tab {tab_number}: {list(seen_names)[:3]}")
     
-    # Write the deduplicated file
-    with open('speakers_deduplicated_v2.html', 'w', encoding='utf-8') as f:
-        f.write(str(soup))
+    # Write the deduplicated file (serialized once, when the cache is flushed)
+    if total_removed:
+        documents.mark_modified(input_path, STAGE)
+    documents.set_output(input_path, output_path)
+    if own_cache:
+        documents.flush()
     
-    print("Deduplicated speakers file created: speakers_deduplicated_v2.html")
+    print(f"Deduplicated speakers file created: {output_path}")
 
 if __name__ == "__main__":
     remove_duplicate_speakers_by_name()
@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Pluggable BeautifulSoup parser backend for the tree-based scripts.
+
+Parsing is the main cost in update_urls.py and the fix_speaker_duplicates
+scripts, and html.parser is the slowest backend bs4 supports. make_soup()
+picks the fastest backend that is installed - lxml, then Python's
+html.parser - so scripts get the speed-up without each one choosing a
+parser. html5lib is spec-exact but slower than html.parser, so it is only
+used when asked for by name.
+
+The faster default is for scripts that only read the tree. Scripts that
+write str(soup) back to disk (the fix_speaker_duplicates scripts) pass
+REFERENCE_PARSER: lxml serializes some pages differently - it drops the
+newline after the doctype - so every re-run would change the file.
+
+The backend can be forced without touching a script:
+
+    HTML_PARSER=html.parser python3 "python scripts/update_urls.py"
+
+Run directly, this module benchmarks every installed backend on real pages
+and checks that each one yields the same document as html.parser:
+
+    python3 "python scripts/html_parsers.py"
+    python3 "python scripts/html_parsers.py" --repeat 5 speakers.html zh/speakers.html
+"""
+
+import os
+import sys
+import time
+import hashlib
+import argparse
+import importlib.util
+
+from bs4 import BeautifulSoup
+from bs4.element import PreformattedString
+
+# Backends in order of preference: (bs4 feature name, module that provides it)
+PARSER_PREFERENCE = [
+    ('lxml', 'lxml'),
+    ('html.parser', None),
+]
+
+# Backends that can be requested explicitly but are never picked automatically
+OPTIONAL_PARSERS = [
+    ('html5lib', 'html5lib'),
+]
+
+REFERENCE_PARSER = 'html.parser'
+
+NON_TEXT_ELEMENTS = {'script', 'style', 'template'}
+
+_default_parser = None
+
+
+def available_parsers():
+    """Return the names of every installed backend, fastest first."""
+    return [
+        name for name, module in PARSER_PREFERENCE + OPTIONAL_PARSERS
+        if module is None or importlib.util.find_spec(module) is not None
+    ]
+
+
+def default_parser():
+    """The HTML_PARSER environment variable if set, else the fastest installed backend."""
+    global _default_parser
+    if _default_parser is None:
+        requested = os.environ.get('HTML_PARSER')
+        if requested:
+            if requested not in available_parsers():
+                raise ValueError(f"HTML_PARSER={requested} is not installed "
+                                 f"(available: {', '.join(available_parsers())})")
+            _default_parser = requested
+        else:
+            _default_parser = available_parsers()[0]
+    return _default_parser
+
+
+def make_soup(content, parser=None):
+    """Parse HTML with the given backend, or the default one."""
+    return BeautifulSoup(content, parser or default_parser())
+
+
+def document_fingerprint(soup):
+    """
+    Digest of what the scripts read from a tree: every element's name and
+    attributes in document order, plus the text. Details that legitimately
+    differ between backends - serialization and the case of SVG attribute
+    names, which html5lib keeps as viewBox - are left out.
+    """
+    digest = hashlib.sha256()
+    for tag in soup.find_all(True):
+        digest.update(tag.name.encode())
+        attrs = sorted((name.lower(), ' '.join(value) if isinstance(value, list) else value)
+                       for name, value in tag.attrs.items())
+        for name, value in attrs:
+            digest.update(f"\0{name}={value}".encode('utf-8', errors='replace'))
+        digest.update(b'\n')
+    # Visible text only: backends disagree on whether script/style bodies count as text
+    text = ' '.join(
+        string for string in soup.find_all(string=True)
+        if not isinstance(string, PreformattedString) and string.parent.name not in NON_TEXT_ELEMENTS
+    )
+    digest.update(' '.join(text.split()).encode('utf-8', errors='replace'))
+    return digest.hexdigest()
+
+
+def benchmark(files, parsers, repeat=3):
+    """Return {parser: {'seconds': best total, 'mismatches': [files]}} over the given files."""
+    contents = []
+    for file_path in files:
+        with open(file_path, 'r', encoding='utf-8') as f:
+            contents.append((file_path, f.read()))
+
+    reference = {file_path: document_fingerprint(make_soup(content, REFERENCE_PARSER))
+                 for file_path, content in contents}
+
+    results = {}
+    for parser in parsers:
+        best = None
+        soups = {}
+        for _ in range(repeat):
+            start = time.perf_counter()
+            for file_path, content in contents:
+                soups[file_path] = make_soup(content, parser)
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        mismatches = [file_path for file_path, soup in soups.items()
+                      if document_fingerprint(soup) != reference[file_path]]
+        results[parser] = {'seconds': best, 'mismatches': mismatches}
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the installed BeautifulSoup parser backends')
+    parser.add_argument('files', nargs='*', default=['speakers.html', 'index.html', 'schedule.html', 'zh/speakers.html'],
+                        help='Pages to parse (default: the largest site pages)')
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per backend; the best is reported')
+    args = parser.parse_args()
+
+    files = [file_path for file_path in args.files if os.path.exists(file_path)]
+    if not files:
+        print("No pages found to benchmark")
+        sys.exit(1)
+
+    parsers = available_parsers()
+    total_bytes = sum(os.path.getsize(file_path) for file_path in files)
+    print(f"Installed backends: {', '.join(parsers)}")
+    print(f"Default backend: {default_parser()}")
+    print(f"Parsing {len(files)} pages ({total_bytes / 1024:.0f} KB), best of {args.repeat}")
+    print("=" * 50)
+
+    results = benchmark(files, parsers, args.repeat)
+    baseline = results[REFERENCE_PARSER]['seconds']
+    for name, result in sorted(results.items(), key=lambda item: item[1]['seconds']):
+        status = '✅ matches' if not result['mismatches'] else f"❌ differs on {len(result['mismatches'])} pages"
+        print(f"{name:12s} {result['seconds']:7.3f}s  {baseline / result['seconds']:5.2f}x  {status}")
+        for file_path in result['mismatches']:
+            print(f"    - {file_path}")
+
+    if any(result['mismatches'] for result in results.values()):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
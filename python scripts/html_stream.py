@@ -0,0 +1,345 @@
+#!/usr/bin/env python3
+"""
+Incremental HTML tokenizer over a byte stream.
+
+Reads the input in fixed-size chunks and yields one token per tag, comment,
+declaration or run of text, each carrying the exact bytes it was built from
+and its offset in the input. Concatenating the raw bytes of every token
+reproduces the input byte for byte, so a streaming rewriter can copy the
+tokens it does not care about straight to the output and only ever holds
+one chunk (plus whatever it chooses to buffer) in memory.
+
+The contents of <script>, <style>, <textarea> and <title> are returned as a
+single text token, as browsers do, so markup-looking strings inside them are
+never mistaken for tags.
+
+    from html_stream import iter_tokens, parse_attrs
+
+    with open('speakers.html', 'rb') as f:
+        for token in iter_tokens(f):
+            if token.kind == 'start' and token.name == 'div':
+                attrs = parse_attrs(token.attrs)
+"""
+
+import io
+import re
+import html
+import argparse
+from collections import namedtuple
+
+CHUNK_SIZE = 64 * 1024
+
+# A tag that is not closed within this many bytes is treated as text
+MAX_TAG_BYTES = 1024 * 1024
+
+# kind is one of 'text', 'start', 'end', 'comment', 'other' (doctype, <?...>, <![CDATA[...]]>)
+Token = namedtuple('Token', ['kind', 'raw', 'offset', 'name', 'attrs', 'self_closing'])
+
+START_TAG = re.compile(rb'<([a-zA-Z][^\s/>]*)((?:[^>"\']|"[^"]*"|\'[^\']*\')*)>')
+END_TAG = re.compile(rb'</([a-zA-Z][^\s/>]*)[^>]*>')
+ATTRIBUTE = re.compile(
+    rb'([^\s"\'>/=]+)(?:\s*=\s*(?:"([^"]*)"|\'([^\']*)\'|([^\s>]+)))?'
+)
+
+RAW_TEXT_ELEMENTS = {b'script', b'style', b'textarea', b'title'}
+
+VOID_ELEMENTS = {
+    'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input',
+    'link', 'meta', 'source', 'track', 'wbr',
+}
+
+
+def parse_attrs(raw_attrs):
+    """Parse the attribute bytes of a start tag into a {name: value} dict of str."""
+    attrs = {}
+    for match in ATTRIBUTE.finditer(raw_attrs):
+        name = match.group(1).decode('utf-8', errors='replace').lower()
+        value = next((group for group in match.groups()[1:] if group is not None), b'')
+        attrs.setdefault(name, html.unescape(value.decode('utf-8', errors='replace')))
+    return attrs
+
+
+def class_list(attrs):
+    """Return the set of class names in a parsed attribute dict."""
+    return set(attrs.get('class', '').split())
+
+
+def iter_tokens(stream, chunk_size=CHUNK_SIZE):
+    """Yield Tokens for a binary file object, reading chunk_size bytes at a time."""
+    buffer = b''
+    base = 0          # input offset of buffer[0]
+    position = 0      # next unconsumed byte in buffer
+    eof = False
+    raw_text_end = None  # closing-tag pattern while inside <script>/<style>
+
+    def fill():
+        nonlocal buffer, base, position, eof
+        chunk = stream.read(chunk_size)
+        if not chunk:
+            eof = True
+            return False
+        buffer = buffer[position:] + chunk
+        base += position
+        position = 0
+        return True
+
+    while True:
+        if position >= len(buffer) and not fill():
+            return
+
+        if raw_text_end is not None:
+            match = raw_text_end.search(buffer, position)
+            if match is None and not eof:
+                # Keep reading until the closing tag shows up
+                fill()
+                continue
+            end = match.start() if match else len(buffer)
+            if end > position:
+                yield Token('text', buffer[position:end], base + position, None, None, False)
+                position = end
+            raw_text_end = None
+            continue
+
+        lt = buffer.find(b'<', position)
+        if lt == -1:
+            text = buffer[position:]
+            offset = base + position
+            position = len(buffer)
+            yield Token('text', text, offset, None, None, False)
+            continue
+        if lt > position:
+            yield Token('text', buffer[position:lt], base + position, None, None, False)
+            position = lt
+
+        token, end = _markup_at(buffer, position, eof)
+        if token is None and end is None:
+            # Incomplete markup: read more, unless it has grown implausibly long
+            if len(buffer) - position < MAX_TAG_BYTES and fill():
+                continue
+            token = ('text', None, None, False)
+            end = position + 1
+        kind, name, attrs, self_closing = token
+        yield Token(kind, buffer[position:end], base + position, name, attrs, self_closing)
+        position = end
+        if kind == 'start' and not self_closing and name.encode() in RAW_TEXT_ELEMENTS:
+            raw_text_end = re.compile(rb'</' + name.encode() + rb'[\s/>]', re.IGNORECASE)
+
+
+class Element:
+    """
+    An element located by byte offsets: data[start:end] is the whole element
+    and data[inner_start:inner_end] its content. Built by build_tree().
+    """
+
+    __slots__ = ('name', 'attrs', 'start', 'end', 'inner_start', 'inner_end', 'parent', 'children')
+
+    def __init__(self, name, attrs, start, inner_start, parent):
+        self.name = name
+        self.attrs = attrs
+        self.start = start
+        self.inner_start = inner_start
+        self.end = self.inner_end = inner_start
+        self.parent = parent
+        self.children = []
+
+    def __repr__(self):
+        return f"<{self.name} {self.attrs.get('class', '')!r} @{self.start}>"
+
+    @property
+    def classes(self):
+        return set(self.attrs.get('class', '').split())
+
+    def iter(self):
+        """This element and all its descendants in document order."""
+        yield self
+        for child in self.children:
+            yield from child.iter()
+
+    def find_all(self, name=None, classes=()):
+        """Descendants with the given tag name and all the given classes."""
+        classes = set(classes.split() if isinstance(classes, str) else classes)
+        return [
+            element for element in self.iter()
+            if element is not self and (name is None or element.name == name) and classes <= element.classes
+        ]
+
+    def find(self, name=None, classes=()):
+        found = self.find_all(name, classes)
+        return found[0] if found else None
+
+
+def build_tree(data):
+    """
+    Parse bytes into a tree of Elements with byte offsets, tolerating the
+    unclosed elements real pages contain. Returns a synthetic root element.
+    """
+    root = Element('#root', {}, 0, 0, None)
+    root.end = root.inner_end = len(data)
+    current = root
+    for token in iter_tokens(io.BytesIO(data)):
+        if token.kind == 'start':
+            element = Element(token.name, parse_attrs(token.attrs), token.offset,
+                              token.offset + len(token.raw), current)
+            current.children.append(element)
+            if token.name in VOID_ELEMENTS or token.self_closing:
+                element.end = element.inner_end = element.inner_start
+            else:
+                current = element
+        elif token.kind == 'end':
+            open_element = current
+            while open_element is not root and open_element.name != token.name:
+                open_element = open_element.parent
+            if open_element is root:
+                continue
+            # Close anything left open inside the matched element at this point
+            while current is not open_element:
+                current.end = current.inner_end = token.offset
+                current = current.parent
+            current.inner_end = token.offset
+            current.end = token.offset + len(token.raw)
+            current = current.parent
+    while current is not root:
+        current.end = current.inner_end = len(data)
+        current = current.parent
+    return root
+
+
+def text_span(data, element):
+    """(start, end) of an element's content with surrounding whitespace trimmed."""
+    start, end = element.inner_start, element.inner_end
+    while start < end and data[start:start + 1].isspace():
+        start += 1
+    while end > start and data[end - 1:end].isspace():
+        end -= 1
+    return start, end
+
+
+def attr_span(data, element, name):
+    """(start, end) of an attribute's quoted value within an element's start tag, or None."""
+    tag_end = element.inner_start
+    match = re.compile(rb'\s' + re.escape(name.encode()) + rb'\s*=\s*(?:"([^"]*)"|\'([^\']*)\')',
+                       re.IGNORECASE).search(data, element.start, tag_end)
+    if not match:
+        return None
+    group = 1 if match.group(1) is not None else 2
+    return match.start(group), match.end(group)
+
+
+def _attr_pattern(name):
+    return re.compile(rb'\s' + re.escape(name.encode()) + rb'(?:\s*=\s*(?:"[^"]*"|\'[^\']*\'|[^\s"\'>]+))?(?=[\s/>])',
+                      re.IGNORECASE)
+
+
+def set_attr_edit(data, element, name, value=None):
+    """
+    Edit for apply_edits() that sets an attribute in an element's start tag,
+    replacing any existing value. A value of None writes a boolean attribute.
+    """
+    encoded = None if value is None else html.escape(value).encode('utf-8')
+    match = _attr_pattern(name).search(data, element.start, element.inner_start)
+    if match:
+        # Keep the attribute where it is and only swap its value
+        name_end = match.start() + 1 + len(name)
+        if encoded is None:
+            return name_end, match.end(), b''
+        span = attr_span(data, element, name)
+        if span:
+            return span[0], span[1], encoded
+        return name_end, match.end(), b'="' + encoded + b'"'
+    attribute = b' ' + name.encode() + (b'' if encoded is None else b'="' + encoded + b'"')
+    # Before the closing > (or />), after the last attribute
+    tag_end = element.inner_start - 1
+    if data[tag_end - 1:tag_end] == b'/':
+        tag_end -= 1
+    while data[tag_end - 1:tag_end].isspace():
+        tag_end -= 1
+    return tag_end, tag_end, attribute
+
+
+def remove_attr_edit(data, element, name):
+    """Edit for apply_edits() that removes an attribute from an element's start tag, or None if it has none."""
+    match = _attr_pattern(name).search(data, element.start, element.inner_start)
+    return (match.start(), match.end(), b'') if match else None
+
+
+def apply_edits(data, edits):
+    """Apply non-overlapping (start, end, replacement) edits to bytes; None entries are ignored."""
+    pieces = []
+    position = 0
+    for start, end, replacement in sorted(edit for edit in edits if edit):
+        pieces.append(data[position:start])
+        pieces.append(replacement)
+        position = end
+    pieces.append(data[position:])
+    return b''.join(pieces)
+
+
+def _markup_at(buffer, position, eof):
+    """
+    Classify the markup starting at buffer[position] == '<'.
+
+    Returns ((kind, name, attrs, self_closing), end), or (None, None) when more
+    input is needed to decide.
+    """
+    head = buffer[position:position + 9]
+    if head.startswith(b'<!--'):
+        close = buffer.find(b'-->', position + 4)
+        if close == -1:
+            return _need_more(buffer, position, eof)
+        return ('comment', None, None, False), close + 3
+    if head.startswith(b'<!') or head.startswith(b'<?'):
+        terminator = b']]>' if head.startswith(b'<![CDATA[') else b'>'
+        close = buffer.find(terminator, position + 2)
+        if close == -1:
+            return _need_more(buffer, position, eof)
+        return ('other', None, None, False), close + len(terminator)
+    if head.startswith(b'</'):
+        match = END_TAG.match(buffer, position)
+        if match is None:
+            return _need_more(buffer, position, eof)
+        return ('end', match.group(1).decode('ascii', errors='replace').lower(), None, False), match.end()
+    match = START_TAG.match(buffer, position)
+    if match is None:
+        if len(head) > 1 and not head[1:2].isalpha():
+            # A bare '<' in text
+            return ('text', None, None, False), position + 1
+        return _need_more(buffer, position, eof)
+    attrs = match.group(2)
+    self_closing = attrs.rstrip().endswith(b'/')
+    return ('start', match.group(1).decode('ascii', errors='replace').lower(), attrs, self_closing), match.end()
+
+
+def _need_more(buffer, position, eof):
+    if eof:
+        # Unterminated markup at end of input is text
+        return ('text', None, None, False), len(buffer)
+    return None, None
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Tokenize an HTML file and print a tag summary')
+    parser.add_argument('file', help='HTML file to tokenize')
+    parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE, help='Bytes read per chunk')
+    parser.add_argument('--verify', action='store_true',
+                        help='Check that the tokens reassemble into the original bytes')
+    args = parser.parse_args()
+
+    counts = {}
+    pieces = [] if args.verify else None
+    with open(args.file, 'rb') as f:
+        for token in iter_tokens(f, args.chunk_size):
+            key = f"{token.kind}:{token.name}" if token.name else token.kind
+            counts[key] = counts.get(key, 0) + 1
+            if pieces is not None:
+                pieces.append(token.raw)
+
+    for key, count in sorted(counts.items(), key=lambda item: -item[1])[:25]:
+        print(f"{count:8d}  {key}")
+    if pieces is not None:
+        with open(args.file, 'rb') as f:
+            identical = b''.join(pieces) == f.read()
+        print(f"\nRound trip: {'✅ byte-identical' if identical else '❌ differs'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+"""
+Inline small assets into the pages and stylesheets as data: URIs.
+
+Many referenced files are tiny - sponsor marks, 24 px arrows, the
+Streamline feature icons - and each still costs a request. This stage
+replaces references to files of at most --max-bytes with the file's
+content, using the asset index for where they are:
+
+- src, poster and data-src attributes, <link rel="icon"> hrefs, and url()
+  in the stylesheets, <style> blocks and style attributes;
+- SVG is URL-encoded, which stays readable and compresses better than
+  base64; other formats are base64-encoded.
+
+Inlining trades a request for bytes that are downloaded again with every
+page that carries them, while a separate file is fetched once and then
+served from the cache. So an asset stays a file when more than
+--max-pages pages (stylesheets count as pages) reference it, and a page
+keeps the file when it references it more than --max-per-page times. The
+site-wide logo, favicon and social icons are shared by hundreds of pages
+and stay files. srcset candidates, @import, <use> fragments and links
+to other pages are never inlined.
+
+The request count of every changed page (its distinct local resources,
+as the asset index sees them) is reported before and after. Run this
+after build_icon_sprite.py, so sprite icons are not inlined, and before
+fingerprint_assets.py.
+
+Usage:
+    python3 "python scripts/inline_small_assets.py" --dry-run
+    python3 "python scripts/inline_small_assets.py" --max-bytes 2048 --report inline_assets_report.md
+"""
+
+import os
+import re
+import sys
+import base64
+import argparse
+from urllib.parse import quote
+
+from asset_index import AssetIndex
+from html_stream import apply_edits
+
+MAX_BYTES = 4096
+MAX_PAGES = 3
+MAX_PER_PAGE = 2
+
+MEDIA_TYPES = {
+    '.svg': 'image/svg+xml', '.png': 'image/png', '.jpg': 'image/jpeg', '.jpeg': 'image/jpeg',
+    '.gif': 'image/gif', '.webp': 'image/webp', '.avif': 'image/avif', '.ico': 'image/x-icon',
+    '.woff2': 'font/woff2', '.woff': 'font/woff',
+}
+# Reference kinds (see asset_index.extract_references) that can take a data: URI
+INLINE_KINDS = {'src', 'poster', 'data-src', 'href', 'url'}
+ICON_LINK = re.compile(rb'^<link\b[^>]*\brel\s*=\s*["\']?[^"\'>]*\bicon\b', re.IGNORECASE)
+# Characters that never need encoding in a data: URI
+SAFE = "/:=;,@!$*+-._~?"
+
+
+def tag_at(data, offset):
+    """The start tag of the HTML attribute at offset."""
+    start = data.rfind(b'<', 0, offset)
+    end = data.find(b'>', offset)
+    return data[start:end + 1]
+
+
+def svg_data_uri(data, delimiter, in_html, in_style):
+    """
+    data:image/svg+xml, URI for an SVG, encoded only as far as its context
+    requires. delimiter is the quote around the URL ('' for an unquoted
+    url()); in_html is set for HTML attributes and CSS inside a page, and
+    in_style for CSS.
+    """
+    text = data.decode('utf-8').strip()
+    text = re.sub(r'\s+', ' ', re.sub(r'>\s+<', '><', text))
+    safe = SAFE
+    if delimiter:
+        safe += ' '
+        # Raw < inside a <style> block could end it early
+        safe += '<>' if not (in_html and in_style) else ''
+        safe += '()' if in_style else ''
+        if not (in_html and in_style):
+            # The other quote is free to use; a style attribute's own quote is unknown
+            inner = "'" if delimiter == '"' else '"'
+            if inner == "'" and "'" not in text:
+                text = text.replace('"', "'")
+            elif inner == '"' and '"' not in text:
+                text = text.replace("'", '"')
+            safe += inner
+    if not in_html:
+        safe += '&'
+    return 'data:image/svg+xml,' + quote(text, safe=safe)
+
+
+def data_uri(path, delimiter, in_html, in_style):
+    with open(path, 'rb') as f:
+        data = f.read()
+    extension = os.path.splitext(path)[1].lower()
+    if extension == '.svg':
+        try:
+            return svg_data_uri(data, delimiter, in_html, in_style)
+        except UnicodeDecodeError:
+            pass
+    return f"data:{MEDIA_TYPES[extension]};base64,{base64.b64encode(data).decode('ascii')}"
+
+
+def candidates(index, max_bytes, max_pages):
+    """{asset: [(page, kind, raw_url, offset)]} for the small assets few enough pages use."""
+    small = {}
+    for (asset,) in index.connection.execute('SELECT DISTINCT asset FROM refs WHERE asset IS NOT NULL'):
+        if os.path.splitext(asset)[1].lower() not in MEDIA_TYPES or not os.path.isfile(asset):
+            continue
+        if os.path.getsize(asset) > max_bytes:
+            continue
+        references = index.pages_referencing(asset)
+        if len({page for page, _, _, _ in references}) <= max_pages:
+            small[asset] = references
+    return small
+
+
+def plan(index, max_bytes, max_pages, max_per_page):
+    """{page: [(start, end, data uri bytes, asset)]} for every reference to inline."""
+    edits = {}
+    for asset, references in sorted(candidates(index, max_bytes, max_pages).items()):
+        per_page = {}
+        for page, kind, raw_url, offset in references:
+            per_page.setdefault(page, []).append((kind, raw_url, offset))
+        for page, page_references in per_page.items():
+            if len(page_references) > max_per_page:
+                continue
+            with open(page, 'rb') as f:
+                data = f.read()
+            in_html = not page.endswith('.css')
+            page_edits = []
+            for kind, raw_url, offset in page_references:
+                # A #fragment points into the file (an SVG <use>, a view), which a data: URI cannot keep
+                if kind not in INLINE_KINDS or '#' in raw_url:
+                    break
+                if kind == 'href' and not ICON_LINK.match(tag_at(data, offset)):
+                    break
+                raw = raw_url.encode('utf-8')
+                if data[offset:offset + len(raw)] != raw:
+                    # The index is behind the file; leave it to the next run
+                    break
+                delimiter = data[offset - 1:offset].decode('latin-1')
+                if delimiter not in ('"', "'"):
+                    delimiter = ''
+                uri = data_uri(asset, delimiter, in_html, kind == 'url')
+                page_edits.append((offset, offset + len(raw), uri.encode('utf-8'), asset))
+            else:
+                # All of the page's references to the asset, or none: a half-inlined asset still costs its request
+                edits.setdefault(page, []).extend(page_edits)
+    return edits
+
+
+def request_count(index, page):
+    """Distinct local files the page loads, links to other pages aside."""
+    return len([asset for asset in index.assets_of(page) if not asset.endswith('.html')])
+
+
+def write_report(path, rows, max_bytes, max_pages, max_per_page):
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write("# Inlined Asset Report\n\n")
+        f.write(f"Assets of at most {max_bytes} bytes, referenced by at most {max_pages} pages "
+                f"and at most {max_per_page} times per page, inlined as data: URIs.\n\n")
+        f.write("| Page | Inlined | Requests before | Requests after | Bytes added |\n")
+        f.write("|------|---------|-----------------|----------------|-------------|\n")
+        for page, inlined, before, after, added in rows:
+            f.write(f"| {page} | {', '.join(os.path.basename(asset) for asset in inlined)} | "
+                    f"{before} | {after} | {added:+,} |\n")
+        f.write(f"\n**Requests saved:** {sum(row[2] - row[3] for row in rows)} across {len(rows)} files\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Inline small, rarely shared assets as data: URIs')
+    parser.add_argument('--project-root', default='.', help='Site root (default: current directory)')
+    parser.add_argument('--max-bytes', type=int, default=MAX_BYTES,
+                        help=f'Largest file to inline (default: {MAX_BYTES})')
+    parser.add_argument('--max-pages', type=int, default=MAX_PAGES,
+                        help=f'Keep assets referenced by more pages than this as files (default: {MAX_PAGES})')
+    parser.add_argument('--max-per-page', type=int, default=MAX_PER_PAGE,
+                        help=f'Keep an asset a page references more often than this as a file (default: {MAX_PER_PAGE})')
+    parser.add_argument('--report', help='Also write the per-page request counts to this Markdown file')
+    parser.add_argument('--dry-run', action='store_true', help='Report without writing anything')
+    args = parser.parse_args()
+
+    os.chdir(args.project_root)
+    print("🧩 Inlining small assets" + (" (dry run)" if args.dry_run else ""))
+    print("=" * 50)
+
+    rows = []
+    with AssetIndex() as index:
+        index.update()
+        edits = plan(index, args.max_bytes, args.max_pages, args.max_per_page)
+        for page in sorted(edits):
+            with open(page, 'rb') as f:
+                data = f.read()
+            updated = apply_edits(data, [(start, end, uri) for start, end, uri, _ in edits[page]])
+            inlined = sorted({asset for _, _, _, asset in edits[page]})
+            before = request_count(index, page)
+            rows.append((page, inlined, before, before - len(inlined), len(updated) - len(data)))
+            print(f"  {page}: {before} -> {before - len(inlined)} requests, "
+                  f"{len(updated) - len(data):+,} bytes ({', '.join(os.path.basename(a) for a in inlined)})")
+            if not args.dry_run:
+                with open(page, 'wb') as f:
+                    f.write(updated)
+        if not args.dry_run:
+            index.update(sorted(edits))
+
+    saved = sum(before - after for _, _, before, after, _ in rows)
+    print(f"  Files {'to update' if args.dry_run else 'updated'}: {len(rows)}, requests saved: {saved}, "
+          f"bytes added: {sum(row[4] for row in rows):+,}")
+    if args.report:
+        write_report(args.report, rows, args.max_bytes, args.max_pages, args.max_per_page)
+        print(f"  Report written to {args.report}")
+    if not args.dry_run:
+        print("\n✅ Done. Run fingerprint_assets.py afterwards so the remaining files get hashed names.")
+    sys.exit(0)
+
+
+if __name__ == "__main__":
+    main()
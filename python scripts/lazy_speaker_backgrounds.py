@@ -0,0 +1,685 @@
+#!/usr/bin/env python3
+"""
+Show a tiny placeholder in each speaker card and load the photo when it scrolls into view.
+
+The speaker cards (div.image-15, and div.div-block-17 in the overlays) show
+their photo through style="background-image:url(...)", which loading="lazy"
+cannot defer: every photo of the page is requested up front, and each card
+stays blank until its photo arrives. This build step computes a placeholder
+for every photo - its dominant colour and a PLACEHOLDER_SIDE-pixel
+thumbnail, inlined as a PNG data URI that the browser scales up into a
+blur - and rewrites each card's style to
+
+    --lazy-bg:url(<photo>);background-color:<colour>;background-image:url(data:...)
+
+(the cards of the detail panels, hidden until opened, only get the colour).
+
+A custom property holding a url() is never fetched by itself, so the page
+only loads the placeholders. A small inline loader watches the cards with
+an IntersectionObserver (ROOT_MARGIN ahead of the viewport), preloads a
+card's photo when it gets close and then swaps it in with
+background-image: var(--lazy-bg); it also picks up the cards that
+split_speaker_tabs.py's loader inserts later, and without JavaScript a
+<noscript> rule shows every photo straight away.
+
+The photos are decoded with the standard library only - baseline JPEGs
+from their DC coefficients (the average of every 8x8 block), progressive
+JPEGs from their first DC scan, 8- and 16-bit PNGs - or with Pillow when it
+is installed. A photo that cannot be decoded leaves its card unchanged.
+Zh pages that still point at the Webflow CDN are matched to the local copy
+in images/speakers. Placeholders are cached in .speaker_placeholders.json
+by photo content hash (a file is only hashed again when its size or mtime
+changes) and new photos are decoded in parallel processes.
+
+The photo URL stays the first url() in the style, so speaker_dataset.py
+and the asset tools (fingerprint_assets.py, page_weight_budget.py,
+build_service_worker.py) still find it; the scripts matching
+background-image:url(../cdn...) literally (replace_speaker_images*.py,
+verify_speaker_images.py) need --restore first. Running the step again
+recomputes the placeholders, so run it after site_generator.py and after
+split_speaker_tabs.py, which copies the cards into speakers-tab-N.html.
+
+Usage:
+    python3 "python scripts/lazy_speaker_backgrounds.py" --dry-run
+    python3 "python scripts/lazy_speaker_backgrounds.py"
+    python3 "python scripts/lazy_speaker_backgrounds.py" --restore
+"""
+
+import os
+import re
+import sys
+import glob
+import json
+import zlib
+import base64
+import struct
+import hashlib
+import argparse
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+from html_stream import build_tree, apply_edits, attr_span
+from asset_index import normalize_target, resolve_asset
+from webflow_assets import WebflowAssetResolver
+from add_image_dimensions import JPEG_SOF, _exif_orientation
+
+DEFAULT_PAGES = ['speakers.html', 'zh/speakers.html']
+# Card class -> whether it gets the thumbnail; the detail panel is hidden until
+# opened, and its colour is enough until the photo (cached by then) is swapped in
+CARDS = {'image-15': True, 'div-block-17': False}
+SPEAKER_IMAGES = 'images/speakers'
+
+CACHE_FILE = '.speaker_placeholders.json'
+# Bump when the placeholder format below changes
+CACHE_VERSION = 1
+PLACEHOLDER_SIDE = 6
+ROOT_MARGIN = '200px'
+
+BACKGROUND = re.compile(rb'background-image\s*:\s*url\(([^)]+)\)')
+LAZY_BACKGROUND = re.compile(rb'--lazy-bg:url\(([^)]+)\);background-color:#[0-9a-f]{6}'
+                             rb'(?:;background-image:url\(data:image/png;base64,[A-Za-z0-9+/=]*\))?')
+
+LOADER_ID = 'lazy-backgrounds'
+LOADER = re.compile(rb'\s*<noscript id="' + LOADER_ID.encode() + rb'-fallback">.*?</noscript>'
+                    rb'\s*<script id="' + LOADER_ID.encode() + rb'">.*?</script>', re.DOTALL)
+
+LOADER_SCRIPT = b'''<noscript id="lazy-backgrounds-fallback"><style>[style*="--lazy-bg"] { background-image: var(--lazy-bg) !important; }</style></noscript>
+<script id="lazy-backgrounds">
+(function () {
+  var SELECTOR = '[style*="--lazy-bg"]';
+  function show(card) {
+    if (card.hasAttribute('data-bg-state')) return;
+    card.setAttribute('data-bg-state', 'loading');
+    var url = card.style.getPropertyValue('--lazy-bg').trim().replace(/^url\\((['"]?)(.*)\\1\\)$/, '$2');
+    var image = new Image();
+    // Swap only once the photo is in the cache, so the placeholder never flashes blank
+    image.onload = image.onerror = function () {
+      card.style.backgroundImage = 'var(--lazy-bg)';
+      card.setAttribute('data-bg-state', 'loaded');
+    };
+    image.src = url;
+  }
+  var observer = 'IntersectionObserver' in window && new IntersectionObserver(function (entries) {
+    entries.forEach(function (entry) {
+      if (!entry.isIntersecting) return;
+      observer.unobserve(entry.target);
+      show(entry.target);
+    });
+  }, { rootMargin: '%(margin)s' });
+  function watch(root) {
+    var cards = [].slice.call(root.querySelectorAll(SELECTOR));
+    if (root.matches && root.matches(SELECTOR)) cards.push(root);
+    cards.forEach(function (card) {
+      if (observer) observer.observe(card); else show(card);
+    });
+  }
+  watch(document);
+  // Tab panels loaded by split_speaker_tabs.py arrive after this runs
+  if ('MutationObserver' in window) {
+    new MutationObserver(function (mutations) {
+      mutations.forEach(function (mutation) {
+        [].forEach.call(mutation.addedNodes, function (node) {
+          if (node.nodeType === 1) watch(node);
+        });
+      });
+    }).observe(document.body, { childList: true, subtree: true });
+  }
+})();
+</script>''' % {b'margin': ROOT_MARGIN.encode()}
+
+
+# Decoding --------------------------------------------------------------------
+#
+# Every decoder returns (width, height, rgb): the photo at 1/8 scale, one
+# pixel per 8x8 block, which is all a PLACEHOLDER_SIDE-pixel thumbnail and
+# a dominant colour need.
+
+JPEG_ENTROPY_END = re.compile(rb'\xff(?![\x00\xd0-\xd7])')
+JPEG_RESTART = re.compile(rb'\xff[\xd0-\xd7]')
+
+
+def _huffman_table(spec):
+    """16-bit prefix -> code length << 8 | symbol, for a DHT table (counts + symbols)."""
+    table = [0] * 65536
+    code = 0
+    index = 16
+    for length in range(1, 17):
+        for _ in range(spec[length - 1]):
+            span = 1 << (16 - length)
+            start = code * span
+            if start + span > 65536:
+                raise ValueError('invalid Huffman table')
+            table[start:start + span] = [length << 8 | spec[index]] * span
+            code += 1
+            index += 1
+        code <<= 1
+    return table
+
+
+def _decode_scan(segments, units, tables, with_ac, shift, restart):
+    """
+    Decode the DC coefficients of one scan into the component grids.
+    units lists, for every MCU, the (component, grid, index) of its blocks.
+    """
+    predictions = {}
+    segment_index = -1
+    data = b''
+    position = 0
+    for number, unit in enumerate(units):
+        if number == 0 or (restart and number % restart == 0):
+            segment_index += 1
+            if segment_index >= len(segments):
+                raise ValueError('truncated scan')
+            # Padding, so peeking past the last code stays in range
+            data = segments[segment_index] + b'\x00\x00\x00'
+            position = 0
+            predictions = dict.fromkeys(predictions, 0)
+        for component, grid, index in unit:
+            dc_table, ac_table = tables[component]
+            entry = dc_table[(int.from_bytes(data[position >> 3:(position >> 3) + 3], 'big')
+                              >> (8 - (position & 7))) & 0xFFFF]
+            if not entry:
+                raise ValueError('invalid Huffman code')
+            position += entry >> 8
+            size = entry & 0xFF
+            value = predictions.get(component, 0)
+            if size:
+                bits = ((int.from_bytes(data[position >> 3:(position >> 3) + 3], 'big')
+                         >> (8 - (position & 7))) & 0xFFFF) >> (16 - size)
+                position += size
+                value += bits if bits >> (size - 1) else bits - (1 << size) + 1
+            predictions[component] = value
+            grid[index] = value << shift
+            if not with_ac:
+                continue
+            # The AC coefficients only have to be skipped
+            k = 1
+            while k < 64:
+                entry = ac_table[(int.from_bytes(data[position >> 3:(position >> 3) + 3], 'big')
+                                  >> (8 - (position & 7))) & 0xFFFF]
+                if not entry:
+                    raise ValueError('invalid Huffman code')
+                position += entry >> 8
+                run_size = entry & 0xFF
+                if run_size & 15:
+                    position += run_size & 15
+                    k += (run_size >> 4) + 1
+                elif run_size == 0xF0:
+                    k += 16
+                else:
+                    break
+        if position > len(data) * 8:
+            raise ValueError('truncated scan')
+
+
+def _decode_jpeg(data):
+    quantization = {}
+    huffman = {}
+    built = {}
+    frame = None
+    progressive = False
+    restart = 0
+    orientation = 1
+    adobe_transform = None
+    position = 2
+    while position + 4 <= len(data):
+        if data[position] != 0xFF:
+            raise ValueError('marker expected')
+        kind = data[position + 1]
+        if kind == 0xFF:
+            # Fill byte before a marker
+            position += 1
+            continue
+        position += 2
+        if kind == 0xD9:
+            break
+        if kind == 0x01 or 0xD0 <= kind <= 0xD7:
+            continue
+        length = struct.unpack('>H', data[position:position + 2])[0]
+        segment = data[position + 2:position + length]
+        position += length
+        if kind == 0xDB:
+            while segment:
+                precision, table = segment[0] >> 4, segment[0] & 15
+                quantization[table] = struct.unpack('>H', segment[1:3])[0] if precision else segment[1]
+                segment = segment[129:] if precision else segment[65:]
+        elif kind == 0xC4:
+            while len(segment) > 17:
+                size = 17 + sum(segment[1:17])
+                huffman[(segment[0] >> 4, segment[0] & 15)] = bytes(segment[1:size])
+                segment = segment[size:]
+        elif kind in (0xC0, 0xC1, 0xC2):
+            precision, height, width, count = struct.unpack('>BHHB', segment[:6])
+            if precision != 8 or not height or not width:
+                return None
+            progressive = kind == 0xC2
+            components = {}
+            for offset in range(6, 6 + 3 * count, 3):
+                identifier, sampling, table = segment[offset:offset + 3]
+                components[identifier] = (sampling >> 4, sampling & 15, table)
+            h_max = max(h for h, _, _ in components.values())
+            v_max = max(v for _, v, _ in components.values())
+            mcus_x, mcus_y = -(-width // (8 * h_max)), -(-height // (8 * v_max))
+            grids = {identifier: [0] * (mcus_x * h * mcus_y * v) for identifier, (h, v, _) in components.items()}
+            frame = (width, height, components, h_max, v_max, mcus_x, mcus_y, grids)
+        elif kind in JPEG_SOF:
+            # Arithmetic coding, lossless and hierarchical JPEGs
+            return None
+        elif kind == 0xDD:
+            restart = struct.unpack('>H', segment[:2])[0]
+        elif kind == 0xE1 and segment.startswith(b'Exif\x00\x00'):
+            orientation = _exif_orientation(segment[6:]) or orientation
+        elif kind == 0xEE and segment.startswith(b'Adobe') and len(segment) >= 12:
+            adobe_transform = segment[11]
+        elif kind == 0xDA:
+            if frame is None:
+                return None
+            match = JPEG_ENTROPY_END.search(data, position)
+            end = match.start() if match else len(data)
+            entropy = data[position:end]
+            position = end
+            count = segment[0]
+            scan = [(segment[1 + 2 * i], segment[2 + 2 * i]) for i in range(count)]
+            start, _, approximation = segment[1 + 2 * count:4 + 2 * count]
+            if progressive and (start != 0 or approximation >> 4):
+                # AC and refinement scans add detail the placeholder does not need
+                continue
+            width, height, components, h_max, v_max, mcus_x, mcus_y, grids = frame
+            tables = {}
+            for identifier, selectors in scan:
+                specs = [huffman.get((0, selectors >> 4)), None if progressive else huffman.get((1, selectors & 15))]
+                if specs[0] is None or (not progressive and specs[1] is None):
+                    return None
+                for spec in specs:
+                    if spec is not None and spec not in built:
+                        built[spec] = _huffman_table(spec)
+                tables[identifier] = tuple(built.get(spec) for spec in specs)
+            units = []
+            if count == 1:
+                identifier = scan[0][0]
+                h, v, _ = components[identifier]
+                grid, stride = grids[identifier], mcus_x * h
+                # The component's own size, in whole blocks
+                samples_x, samples_y = -(-width * h // h_max), -(-height * v // v_max)
+                blocks_x, blocks_y = -(-samples_x // 8), -(-samples_y // 8)
+                units = [((identifier, grid, y * stride + x),) for y in range(blocks_y) for x in range(blocks_x)]
+            else:
+                for mcu_y in range(mcus_y):
+                    for mcu_x in range(mcus_x):
+                        unit = []
+                        for identifier, _ in scan:
+                            h, v, _ = components[identifier]
+                            stride = mcus_x * h
+                            unit += [(identifier, grids[identifier], (mcu_y * v + y) * stride + mcu_x * h + x)
+                                     for y in range(v) for x in range(h)]
+                        units.append(unit)
+            segments = [part.replace(b'\xff\x00', b'\xff') for part in JPEG_RESTART.split(entropy)]
+            _decode_scan(segments, units, tables, not progressive, approximation & 15, restart)
+    if frame is None:
+        return None
+
+    width, height, components, h_max, v_max, mcus_x, _, grids = frame
+    if len(components) not in (1, 3):
+        # CMYK
+        return None
+    out_width, out_height = -(-width // 8), -(-height // 8)
+    planes = []
+    for identifier, (h, v, table) in components.items():
+        quant, grid, stride = quantization.get(table, 1), grids[identifier], mcus_x * h
+        # A block's average is its DC coefficient / 8, around a level shift of 128
+        planes.append([min(255, max(0, round(grid[(y * v // v_max) * stride + x * h // h_max] * quant / 8) + 128))
+                       for y in range(out_height) for x in range(out_width)])
+    if len(planes) == 1:
+        rgb = bytes(value for value in planes[0] for _ in range(3))
+    elif adobe_transform == 0:
+        rgb = bytes(value for pixel in zip(*planes) for value in pixel)
+    else:
+        rgb = bytearray()
+        for y, cb, cr in zip(*planes):
+            rgb += bytes(min(255, max(0, round(value))) for value in (
+                y + 1.402 * (cr - 128), y - 0.344136 * (cb - 128) - 0.714136 * (cr - 128), y + 1.772 * (cb - 128)))
+    return _orient(out_width, out_height, bytes(rgb), orientation)
+
+
+def _orient(width, height, rgb, orientation):
+    """Apply an EXIF orientation, as browsers do when they show the photo."""
+    if orientation not in range(2, 9):
+        return width, height, rgb
+    pixels = [rgb[i:i + 3] for i in range(0, len(rgb), 3)]
+    rows = [pixels[y * width:(y + 1) * width] for y in range(height)]
+    if orientation in (5, 6, 7, 8):
+        # Transpose first; 6 and 8 are then a quarter turn clockwise and anticlockwise
+        rows = [list(column) for column in zip(*rows)]
+    if orientation in (2, 3, 6, 7):
+        rows = [row[::-1] for row in rows]
+    if orientation in (3, 4, 7, 8):
+        rows = rows[::-1]
+    return len(rows[0]), len(rows), b''.join(b''.join(row) for row in rows)
+
+
+def _decode_png(data):
+    if data[12:16] != b'IHDR':
+        return None
+    width, height, depth, color, _, _, interlace = struct.unpack('>IIBBBBB', data[16:29])
+    channels = {0: 1, 2: 3, 3: 1, 4: 2, 6: 4}.get(color)
+    if channels is None or depth not in (8, 16) or (color == 3 and depth != 8):
+        return None
+    palette = b''
+    idat = []
+    position = 8
+    while position + 8 <= len(data):
+        length, kind = struct.unpack('>I4s', data[position:position + 8])
+        body = data[position + 8:position + 8 + length]
+        if kind == b'PLTE':
+            palette = body
+        elif kind == b'IDAT':
+            idat.append(body)
+        elif kind == b'IEND':
+            break
+        position += 12 + length
+    raw = zlib.decompress(b''.join(idat))
+
+    block_size = 8
+    if interlace:
+        # The first Adam7 pass is already one pixel of every 8x8 block
+        width, height, block_size = -(-width // 8), -(-height // 8), 1
+    sample = depth // 8
+    bpp = channels * sample
+    stride = width * bpp
+    out_width, out_height = -(-width // block_size), -(-height // block_size)
+    # Per block: red, green and blue sums over white, and the pixel count
+    sums = [[0, 0, 0, 0] for _ in range(out_width * out_height)]
+    previous = bytearray(stride)
+    for y in range(height):
+        offset = y * (stride + 1)
+        kind = raw[offset]
+        line = bytearray(raw[offset + 1:offset + 1 + stride])
+        if kind == 1:
+            for x in range(bpp, stride):
+                line[x] = (line[x] + line[x - bpp]) & 0xFF
+        elif kind == 2:
+            line = bytearray((a + b) & 0xFF for a, b in zip(line, previous))
+        elif kind == 3:
+            for x in range(stride):
+                line[x] = (line[x] + (((line[x - bpp] if x >= bpp else 0) + previous[x]) >> 1)) & 0xFF
+        elif kind == 4:
+            for x in range(stride):
+                a = line[x - bpp] if x >= bpp else 0
+                b = previous[x]
+                c = previous[x - bpp] if x >= bpp else 0
+                p = a + b - c
+                pa, pb, pc = abs(p - a), abs(p - b), abs(p - c)
+                line[x] = (line[x] + (a if pa <= pb and pa <= pc else b if pb <= pc else c)) & 0xFF
+        elif kind:
+            raise ValueError('invalid PNG filter')
+        previous = line
+        # High bytes of 16-bit samples
+        planes = [bytes(line[i * sample::bpp]) for i in range(channels)]
+        if color == 3:
+            planes = [plane.translate(bytes(palette[i::3].ljust(256, b'\x00'))) for plane in planes for i in range(3)]
+        elif color in (0, 4):
+            planes = [planes[0]] * 3 + planes[1:]
+        row = sums[(y // block_size) * out_width:(y // block_size + 1) * out_width]
+        for block, x in zip(row, range(0, width, block_size)):
+            count = min(block_size, width - x)
+            if len(planes) == 4:
+                alpha = planes[3][x:x + count]
+                transparent = 255 * count - sum(alpha)
+                for i in range(3):
+                    block[i] += (sum(map(int.__mul__, planes[i][x:x + count], alpha)) + 255 * transparent) / 255
+            else:
+                for i in range(3):
+                    block[i] += sum(planes[i][x:x + count])
+            block[3] += count
+    rgb = bytes(min(255, round(value / block[3])) for block in sums for value in block[:3])
+    return out_width, out_height, rgb
+
+
+def _decode_pillow(path):
+    with Image.open(path) as image:
+        image.draft('RGB', (image.width // 8, image.height // 8))
+        image = image.convert('RGBA')
+        background = Image.new('RGBA', image.size, (255, 255, 255, 255))
+        image = Image.alpha_composite(background, image).convert('RGB')
+        image = image.resize((-(-image.width // 8), -(-image.height // 8)), Image.BOX)
+        return image.width, image.height, image.tobytes()
+
+
+def _encode_png(width, height, rgb):
+    def chunk(kind, body):
+        return struct.pack('>I', len(body)) + kind + body + struct.pack('>I', zlib.crc32(kind + body))
+    rows = b''.join(b'\x00' + rgb[y * width * 3:(y + 1) * width * 3] for y in range(height))
+    return (b'\x89PNG\r\n\x1a\n' + chunk(b'IHDR', struct.pack('>IIBBBBB', width, height, 8, 2, 0, 0, 0))
+            + chunk(b'IDAT', zlib.compress(rows, 9)) + chunk(b'IEND', b''))
+
+
+def dominant_color(rgb):
+    """Mean of the most common colour bucket (3 bits per channel) as #rrggbb."""
+    pixels = [rgb[i:i + 3] for i in range(0, len(rgb), 3)]
+    buckets = Counter(bytes(value >> 5 for value in pixel) for pixel in pixels)
+    bucket = buckets.most_common(1)[0][0]
+    members = [pixel for pixel in pixels if bytes(value >> 5 for value in pixel) == bucket]
+    return '#' + ''.join(f'{round(sum(pixel[i] for pixel in members) / len(members)):02x}' for i in range(3))
+
+
+def thumbnail(width, height, rgb, side=PLACEHOLDER_SIDE):
+    """Box-filtered thumbnail fitting in side x side, as (width, height, rgb)."""
+    scale = side / max(width, height)
+    out_width, out_height = max(1, round(width * scale)), max(1, round(height * scale))
+    out = bytearray()
+    for ty in range(out_height):
+        y0 = ty * height // out_height
+        y1 = max(y0 + 1, (ty + 1) * height // out_height)
+        for tx in range(out_width):
+            x0 = tx * width // out_width
+            x1 = max(x0 + 1, (tx + 1) * width // out_width)
+            box = [rgb[(y * width + x) * 3:(y * width + x) * 3 + 3] for y in range(y0, y1) for x in range(x0, x1)]
+            out += bytes(round(sum(pixel[i] for pixel in box) / len(box)) for i in range(3))
+    return out_width, out_height, bytes(out)
+
+
+def placeholder(path):
+    """{'color': '#rrggbb', 'image': data URI} for a photo, or None if it cannot be decoded."""
+    try:
+        if Image is not None:
+            decoded = _decode_pillow(path)
+        else:
+            with open(path, 'rb') as f:
+                data = f.read()
+            if data.startswith(b'\xff\xd8'):
+                decoded = _decode_jpeg(data)
+            elif data.startswith(b'\x89PNG\r\n\x1a\n'):
+                decoded = _decode_png(data)
+            else:
+                decoded = None
+    except (OSError, ValueError, IndexError, KeyError, struct.error, zlib.error):
+        return None
+    if not decoded or not decoded[2]:
+        return None
+    small = _encode_png(*thumbnail(*decoded))
+    return {'color': dominant_color(decoded[2]),
+            'image': 'data:image/png;base64,' + base64.b64encode(small).decode('ascii')}
+
+
+class PlaceholderCache:
+    """Placeholders by photo content hash, with each file's hash remembered by size and mtime."""
+
+    def __init__(self, path=CACHE_FILE):
+        self.path = path
+        self.files = {}
+        self.placeholders = {}
+        self.decoded = 0
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                cached = json.load(f)
+            if cached.get('version') == CACHE_VERSION:
+                self.files = cached['files']
+                self.placeholders = cached['placeholders']
+        except (OSError, ValueError, KeyError):
+            pass
+
+    def _digest(self, path):
+        stat = os.stat(path)
+        known = self.files.get(path)
+        if known and known[:2] == [stat.st_size, stat.st_mtime_ns]:
+            return known[2]
+        with open(path, 'rb') as f:
+            digest = hashlib.sha256(f.read()).hexdigest()
+        self.files[path] = [stat.st_size, stat.st_mtime_ns, digest]
+        return digest
+
+    def load(self, paths, workers):
+        """{path: placeholder or None}, decoding the photos not seen before in parallel processes."""
+        digests = {path: self._digest(path) for path in sorted(set(paths))}
+        missing = {}
+        for path, digest in digests.items():
+            if digest not in self.placeholders:
+                missing.setdefault(digest, path)
+        if missing:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                for digest, result in zip(missing, executor.map(placeholder, missing.values())):
+                    self.placeholders[digest] = result
+            self.decoded = len(missing)
+        return {path: self.placeholders[digest] for path, digest in digests.items()}
+
+    def save(self):
+        # Files that are gone, and placeholders no file has any more
+        self.files = {path: known for path, known in self.files.items() if os.path.isfile(path)}
+        used = {known[2] for known in self.files.values()}
+        with open(self.path, 'w', encoding='utf-8') as f:
+            json.dump({'version': CACHE_VERSION, 'files': dict(sorted(self.files.items())),
+                       'placeholders': {digest: value for digest, value in sorted(self.placeholders.items())
+                                        if digest in used}}, f, indent=1)
+            f.write('\n')
+
+
+# Pages -----------------------------------------------------------------------
+
+def restore(data):
+    """The page with its cards and loader back in their original form."""
+    data = LAZY_BACKGROUND.sub(rb'background-image:url(\1)', data)
+    return LOADER.sub(b'', data)
+
+
+def cards(data, tree):
+    """[((start, end) of the background-image declaration, photo url, with thumbnail)] for the speaker cards."""
+    found = []
+    for name, with_thumbnail in CARDS.items():
+        for card in tree.find_all('div', name):
+            span = attr_span(data, card, 'style')
+            match = span and BACKGROUND.search(data, *span)
+            if match:
+                found.append((match.span(), match.group(1).decode('utf-8'), with_thumbnail))
+    return found
+
+
+def photo_path(page, url, resolver):
+    """Project path of the local copy of a card's photo, or None."""
+    local = resolve_asset(page, normalize_target(url))
+    if local and os.path.isfile(local):
+        return local
+    if 'cdn.prod.website-files.com/' in url:
+        return resolver.resolve_url(url)
+    return None
+
+
+def expand_pages(pages):
+    """The pages plus the speakers-tab-N.html variants split_speaker_tabs.py wrote next to them."""
+    expanded = []
+    for page in pages:
+        stem, ext = os.path.splitext(page)
+        for path in [page] + sorted(glob.glob(glob.escape(stem) + '-tab-*' + ext)):
+            if os.path.isfile(path) and path not in expanded:
+                expanded.append(path.replace(os.sep, '/'))
+    return expanded
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Give the speaker cards inline placeholders and load photos on scroll')
+    parser.add_argument('pages', nargs='*', default=DEFAULT_PAGES,
+                        help='Speaker pages (default: speakers.html and zh/speakers.html, with their tab variants)')
+    parser.add_argument('--project-root', default='.', help='Site root (default: current directory)')
+    parser.add_argument('--workers', type=int, default=os.cpu_count(), help='Processes decoding photos (default: CPU count)')
+    parser.add_argument('--restore', action='store_true', help='Put the cards and pages back in their original form')
+    parser.add_argument('--dry-run', action='store_true', help='Report without writing anything')
+    args = parser.parse_args()
+
+    os.chdir(args.project_root)
+    pages = expand_pages([os.path.normpath(page).replace(os.sep, '/') for page in args.pages])
+    print(("↺ Restoring speaker card backgrounds" if args.restore else "🖼️  Adding speaker card placeholders")
+          + (" (dry run)" if args.dry_run else ""))
+    print("=" * 50)
+    if not args.restore and Image is None:
+        print("  Pillow is not installed: decoding baseline/progressive JPEGs and PNGs with the standard library")
+
+    documents = {}
+    for page in pages:
+        with open(page, 'rb') as f:
+            original = f.read()
+        # Start from the original markup, so re-running recomputes every placeholder
+        data = restore(original)
+        documents[page] = (original, data, build_tree(data))
+
+    outputs = {}
+    if args.restore:
+        outputs = {page: data for page, (_, data, _) in documents.items()}
+    else:
+        resolver = WebflowAssetResolver(asset_dirs=[SPEAKER_IMAGES])
+        found = {page: [(span, url, with_thumbnail, photo_path(page, url, resolver))
+                        for span, url, with_thumbnail in cards(data, tree)]
+                 for page, (_, data, tree) in documents.items()}
+        photos = {photo for entries in found.values() for *_, photo in entries if photo}
+        cache = PlaceholderCache()
+        results = cache.load(photos, args.workers)
+        print(f"  Photos: {len(photos)} ({cache.decoded} decoded, the rest from {CACHE_FILE})")
+        failed = sorted(photo for photo, result in results.items() if result is None)
+        if failed:
+            print(f"  ⚠️  Could not decode {len(failed)} photos, e.g. {failed[0]}")
+
+        counts = Counter()
+        for page, (_, data, _) in documents.items():
+            edits = []
+            for span, url, with_thumbnail, photo in found[page]:
+                result = results.get(photo) if photo else None
+                if result is None:
+                    counts['no local photo' if not photo else 'not decoded'] += 1
+                    continue
+                style = f"--lazy-bg:url({url});background-color:{result['color']}"
+                if with_thumbnail:
+                    style += f";background-image:url({result['image']})"
+                edits.append((span[0], span[1], style.encode('utf-8')))
+                counts['card'] += 1
+            if edits:
+                data = apply_edits(data, edits)
+                body_end = data.rfind(b'</body>')
+                if body_end != -1:
+                    data = data[:body_end] + LOADER_SCRIPT + b'\n' + data[body_end:]
+            outputs[page] = data
+        print(f"  Cards given a placeholder: {counts['card']}")
+        skipped = {reason: count for reason, count in counts.items() if reason != 'card'}
+        if skipped:
+            print("  Left alone: " + ', '.join(f"{count} ({reason})" for reason, count in skipped.items()))
+        if not args.dry_run:
+            cache.save()
+
+    changed = [page for page, data in outputs.items() if data != documents[page][0]]
+    if not args.dry_run:
+        for page in changed:
+            with open(page, 'wb') as f:
+                f.write(outputs[page])
+    for page in pages:
+        delta = len(outputs[page]) - len(documents[page][0])
+        print(f"  {page}: {len(outputs[page]) / 1024:.0f} KB ({delta / 1024:+.1f} KB)")
+    print(f"  Pages {'to update' if args.dry_run else 'updated'}: {len(changed)} of {len(pages)}")
+    if not args.dry_run:
+        print("\n✅ Done. Throttle the network in the browser to see the placeholders.")
+    sys.exit(0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,1028 @@
+#!/usr/bin/env python3
+"""
+Script to lint the regex rules used by the maintenance scripts.
+This script will:
+1. Load every regex rule set from the scripts in this directory (without running them)
+2. Time each pattern against the real HTML/CSS corpus
+3. Time each pattern against generated adversarial inputs and flag super-linear growth
+4. Flag duplicate, subsumed and overlapping rules among the patterns that compete
+   for the same text: those a function applies with sub/findall/finditer/split
+5. Report the per-pattern cost and exit non-zero when a rule or an overlap needs attention
+
+Each pattern is measured in a separate worker process with a timeout, so a
+catastrophically backtracking rule is reported instead of hanging the lint.
+Patterns are found through str and bytes constants, module-level names,
+Rule(...) definitions and the compiled objects they are stored in, and are
+timed the way they are applied: a pattern only ever called with .match or
+.fullmatch is tried once per input, not scanned across it.
+
+A finding that is understood and intended is accepted with a comment on
+the rule's lines or the line above it, which keeps it in the report but
+out of the exit status:
+
+    # regex-lint: accept only ever searched inside one attribute value
+
+That accepts the rule's own cost. An overlapping, subsumed or duplicate
+pair needs a comment of its own on either rule, naming the line of the
+other one, so accepting one finding never silences another:
+
+    # regex-lint: accept overlap with line 42: the table runs specific to general
+
+Usage:
+    python3 "python scripts/lint_regex_rules.py"
+    python3 "python scripts/lint_regex_rules.py" --all-files --json regex_lint_report.json
+"""
+
+import os
+import re
+import ast
+import sys
+import json
+import math
+import time
+import argparse
+import multiprocessing
+from pathlib import Path
+
+try:
+    import re._parser as sre_parse
+except ImportError:  # Python < 3.11
+    import sre_parse
+
+SCRIPTS_DIR = Path(__file__).resolve().parent
+
+RE_FUNCTIONS = {'sub', 'subn', 'findall', 'finditer', 'search', 'match', 'fullmatch', 'compile', 'split'}
+
+# Methods that try a pattern at a single position the caller picks, rather than scanning
+ANCHORED_METHODS = {'match', 'fullmatch'}
+
+# Methods that find every match in the text: patterns used with them in one function compete for it
+COMPETING_METHODS = {'sub', 'subn', 'findall', 'finditer', 'split'}
+
+# '# regex-lint: accept <reason>' on a rule's lines (or the line above) accepts its cost, and
+# '# regex-lint: accept overlap with line <n>: <reason>' its pairing with the rule on line n
+ACCEPT_COMMENT = re.compile(r'#\s*regex-lint:\s*accept\b(?!\s+overlap\b):?\s*(.*)')
+ACCEPT_OVERLAP_COMMENT = re.compile(r'#\s*regex-lint:\s*accept\s+overlap\s+with\s+line\s+(\d+)\b:?\s*(.*)')
+
+# Adversarial inputs are grown from MIN_SIZE by doubling up to MAX_SIZE characters
+MIN_SIZE = 1024
+MAX_SIZE = 64 * 1024
+
+# Growth exponent above which a rule is reported as super-linear
+SUPERLINEAR_EXPONENT = 1.5
+
+# Adversarial timings below this are treated as noise when estimating growth
+NOISE_FLOOR = 0.002
+
+# Each adversarial size is timed this many times and the fastest run kept
+REPEATS = 3
+
+# Candidate characters used when a negated character class needs a member
+FALLBACK_CHARS = 'ax0 -"\'/.<>=_\\'
+
+
+class RegexRule:
+    """A single regex pattern found in one of the scripts."""
+
+    def __init__(self, script, function, line, pattern, flags, end_line=None):
+        self.script = script
+        self.function = function
+        self.line = line
+        self.end_line = end_line or line
+        self.pattern = pattern
+        self.flags = flags
+        # (method, function, subject) for every place the pattern is applied to a text
+        self.uses = []
+        self.accepted = None
+        # line of another rule in the script -> reason their pairing is accepted
+        self.accepted_overlaps = {}
+
+    @property
+    def location(self):
+        return f"{self.script}:{self.line}"
+
+    @property
+    def is_bytes(self):
+        return isinstance(self.pattern, bytes)
+
+    @property
+    def mode(self):
+        """
+        How the scripts apply the pattern, and so how it is timed: 'match' or
+        'fullmatch' when it is only tried at positions its caller picks,
+        'search' when only the first match is wanted, else 'scan'.
+        """
+        methods = {method for method, _, _ in self.uses}
+        if methods and methods <= ANCHORED_METHODS:
+            return 'fullmatch' if methods == {'fullmatch'} else 'match'
+        if methods and methods <= ANCHORED_METHODS | {'search'}:
+            return 'search'
+        return 'scan'
+
+    @property
+    def groups(self):
+        """
+        Where the pattern finds every match in a text, and so competes with
+        the other patterns applied to the same text in that function.
+        """
+        return {f"{self.script}:{function}:{subject}" for method, function, subject in self.uses
+                if method in COMPETING_METHODS}
+
+    def source(self):
+        """The pattern as text (bytes patterns decoded byte for byte)."""
+        return self.pattern.decode('latin-1') if self.is_bytes else self.pattern
+
+    def short_pattern(self, width=60):
+        text = ('b:' if self.is_bytes else '') + self.source().replace('\n', '\\n')
+        return text if len(text) <= width else text[:width - 3] + '...'
+
+
+class RuleCollector(ast.NodeVisitor):
+    """
+    Collect regex rules from a script's AST.
+
+    Patterns are resolved when they are str or bytes constants (or sums of
+    them), simple f-strings of known constants, or names bound to such
+    values - including loop variables iterating over a list, tuple or dict
+    literal, which is how most of the replacers keep their rule tables.
+    Rules come from re.<function>(...) calls and from rewrite_engine
+    Rule(...) calls that are not literal=True.
+
+    Every application of a rule is recorded with the function it happens
+    in and the text it is applied to: direct re.<function>() calls, and
+    method calls on compiled patterns reached through names, containers,
+    .get(), subscripts and loop variables (TABLE.get(key, DEFAULT).match(...)).
+    A Rule(...) is applied by scanning, to whatever text the function hands
+    its engine.
+    """
+
+    def __init__(self, script):
+        self.script = script
+        self.rules = []
+        self.dynamic = []
+        self.module_scope = {}
+        self.scopes = []
+        self.qualname = []
+        self.definitions = {}   # id(re.compile or Rule call) -> [RegexRule]
+        self.uses = []          # (re.compile or Rule call, method, function, subject)
+
+    def collect(self, tree):
+        """Visit a module and attach every recorded use to its rules."""
+        # Module-level names first, so functions can use constants defined below them
+        for node in tree.body:
+            if isinstance(node, ast.Assign):
+                for target in node.targets:
+                    if isinstance(target, ast.Name):
+                        self.module_scope[target.id] = node.value
+        self.visit(tree)
+        for call, method, function, subject in self.uses:
+            for rule in self.definitions.get(id(call), []):
+                rule.uses.append((method, function, subject))
+        return self.rules
+
+    # Scope handling -------------------------------------------------------
+
+    @property
+    def function(self):
+        return '.'.join(self.qualname) if self.scopes else '<module>'
+
+    def _lookup(self, name):
+        for scope in reversed(self.scopes):
+            if name in scope:
+                return scope[name]
+        return self.module_scope.get(name)
+
+    def _bind(self, name, node):
+        scope = self.scopes[-1] if self.scopes else self.module_scope
+        scope[name] = node
+
+    def visit_FunctionDef(self, node):
+        self.scopes.append({})
+        self.qualname.append(node.name)
+        self.generic_visit(node)
+        self.qualname.pop()
+        self.scopes.pop()
+
+    visit_AsyncFunctionDef = visit_FunctionDef
+
+    def visit_Lambda(self, node):
+        # Each lambda of a table is its own function: its patterns do not compete with its neighbours'
+        self.scopes.append({})
+        self.qualname.append(f"<lambda:{node.lineno}>")
+        self.generic_visit(node)
+        self.qualname.pop()
+        self.scopes.pop()
+
+    def visit_ClassDef(self, node):
+        self.qualname.append(node.name)
+        self.generic_visit(node)
+        self.qualname.pop()
+
+    def visit_Assign(self, node):
+        for target in node.targets:
+            if isinstance(target, ast.Name):
+                self._bind(target.id, node.value)
+        self.generic_visit(node)
+
+    def visit_For(self, node):
+        # for pattern in patterns / for pattern, repl in MAPPING.items() / for name, regex in TABLE.items()
+        iterable = node.iter
+        part = None
+        if isinstance(iterable, ast.Call) and isinstance(iterable.func, ast.Attribute) \
+                and iterable.func.attr in ('items', 'keys', 'values'):
+            part = iterable.func.attr
+            iterable = iterable.func.value
+        if isinstance(node.target, ast.Tuple):
+            for position, target in enumerate(node.target.elts):
+                if not isinstance(target, ast.Name):
+                    continue
+                if part == 'items':
+                    if position < 2:
+                        self._bind(target.id, ('iter', iterable, ('keys', 'values')[position], None))
+                else:
+                    self._bind(target.id, ('iter', iterable, part, position))
+        elif isinstance(node.target, ast.Name):
+            self._bind(node.target.id, ('iter', iterable, 'keys' if part == 'items' else part, None))
+        self.generic_visit(node)
+
+    # Value resolution -----------------------------------------------------
+
+    def _elements(self, iterable, part, index):
+        """The element nodes a loop over iterable binds, or None if the iterable is not a literal."""
+        if isinstance(iterable, ast.Name):
+            iterable = self._lookup(iterable.id)
+        if isinstance(iterable, ast.Dict):
+            elements = iterable.values if part == 'values' else iterable.keys
+        elif isinstance(iterable, (ast.List, ast.Tuple, ast.Set)):
+            elements = iterable.elts
+        else:
+            return None
+        if index is not None:
+            elements = [element.elts[index] if isinstance(element, (ast.Tuple, ast.List)) and len(element.elts) > index
+                        else None for element in elements]
+        return elements
+
+    def _resolve_strings(self, node, depth=0):
+        """Resolve a node to the list of str or bytes values it can take, or None."""
+        if depth > 8 or node is None:
+            return None
+        if isinstance(node, tuple) and node[0] == 'iter':
+            elements = self._elements(*node[1:])
+            if elements is None:
+                return None
+            values = []
+            for element in elements:
+                resolved = self._resolve_strings(element, depth + 1)
+                if resolved is None:
+                    return None
+                values.extend(resolved)
+            return values
+        if isinstance(node, ast.Constant) and isinstance(node.value, (str, bytes)):
+            return [node.value]
+        if isinstance(node, ast.Name):
+            return self._resolve_strings(self._lookup(node.id), depth + 1)
+        if isinstance(node, ast.BinOp) and isinstance(node.op, ast.Add):
+            left = self._resolve_strings(node.left, depth + 1)
+            right = self._resolve_strings(node.right, depth + 1)
+            if not left or not right or len(left) * len(right) > 64:
+                return None
+            try:
+                return [a + b for a in left for b in right]
+            except TypeError:
+                return None
+        if isinstance(node, ast.BinOp) and isinstance(node.op, ast.Mod):
+            # r'\.[0-9a-f]{%d}$' % HASH_LENGTH
+            left = self._resolve_strings(node.left, depth + 1)
+            right = node.right
+            while isinstance(right, ast.Name) and isinstance(self._lookup(right.id), ast.AST):
+                right = self._lookup(right.id)
+            if not left or not isinstance(right, ast.Constant) or isinstance(right.value, bytes):
+                return None
+            try:
+                return [value % right.value for value in left]
+            except (TypeError, ValueError):
+                return None
+        if isinstance(node, ast.Call) and isinstance(node.func, ast.Attribute) and node.func.attr == 'encode' \
+                and not node.keywords and len(node.args) <= 1:
+            # STYLE_ID.encode(), the constant part of a bytes pattern
+            encoding = self._resolve_strings(node.args[0], depth + 1) if node.args else ['utf-8']
+            values = self._resolve_strings(node.func.value, depth + 1)
+            if not values or not encoding or not all(isinstance(value, str) for value in values):
+                return None
+            return [value.encode(encoding[0]) for value in values]
+        if isinstance(node, ast.JoinedStr):
+            parts = ['']
+            for value in node.values:
+                if isinstance(value, ast.Constant):
+                    options = [value.value]
+                elif isinstance(value, ast.FormattedValue):
+                    options = self._resolve_strings(value.value, depth + 1)
+                else:
+                    options = None
+                if not options or len(options) != 1 or not isinstance(options[0], str):
+                    return None
+                parts = [part + options[0] for part in parts]
+            return parts
+        return None
+
+    def _compiled(self, node, depth=0):
+        """The re.compile(...) calls whose result node can evaluate to."""
+        if depth > 8 or node is None:
+            return []
+        if isinstance(node, tuple) and node[0] == 'iter':
+            return [call for element in self._elements(*node[1:]) or [] for call in self._compiled(element, depth + 1)]
+        if isinstance(node, ast.Call):
+            if self._re_function(node) == 'compile':
+                return [node]
+            # TABLE.get(key, DEFAULT)
+            if isinstance(node.func, ast.Attribute) and node.func.attr == 'get':
+                found = self._compiled(node.func.value, depth + 1)
+                for argument in node.args[1:]:
+                    found += self._compiled(argument, depth + 1)
+                return found
+            return []
+        if isinstance(node, ast.Name):
+            return self._compiled(self._lookup(node.id), depth + 1)
+        if isinstance(node, ast.Subscript):
+            return self._compiled(node.value, depth + 1)
+        if isinstance(node, (ast.List, ast.Tuple, ast.Set)):
+            return [call for element in node.elts for call in self._compiled(element, depth + 1)]
+        if isinstance(node, ast.Dict):
+            return [call for element in node.values for call in self._compiled(element, depth + 1)]
+        if isinstance(node, ast.BoolOp):
+            return [call for value in node.values for call in self._compiled(value, depth + 1)]
+        if isinstance(node, ast.IfExp):
+            return self._compiled(node.body, depth + 1) + self._compiled(node.orelse, depth + 1)
+        return []
+
+    def _resolve_flags(self, node):
+        if node is None:
+            return 0
+        if isinstance(node, ast.Attribute) and isinstance(node.value, ast.Name) and node.value.id == 're':
+            return int(getattr(re, node.attr, 0))
+        if isinstance(node, ast.BinOp) and isinstance(node.op, ast.BitOr):
+            return self._resolve_flags(node.left) | self._resolve_flags(node.right)
+        if isinstance(node, ast.Constant) and isinstance(node.value, int):
+            return node.value
+        if isinstance(node, ast.Name):
+            value = self._lookup(node.id)
+            return self._resolve_flags(value) if isinstance(value, ast.AST) else 0
+        return 0
+
+    # Rule discovery -------------------------------------------------------
+
+    @staticmethod
+    def _re_function(node):
+        func = node.func
+        if isinstance(func, ast.Attribute) and func.attr in RE_FUNCTIONS \
+                and isinstance(func.value, ast.Name) and func.value.id == 're' and node.args:
+            return func.attr
+        return None
+
+    @staticmethod
+    def _argument(node, position, keyword):
+        for item in node.keywords:
+            if item.arg == keyword:
+                return item.value
+        return node.args[position] if len(node.args) > position else None
+
+    def _subject(self, node, method, offset):
+        """
+        The text a call applies its pattern to, as source: the string
+        argument after the pattern (and replacement), followed through
+        nested substitutions so re.sub(a, x, re.sub(b, y, text)) applies
+        both to text. '*' when it is not known.
+        """
+        position = offset + (1 if method in ('sub', 'subn') else 0)
+        subject = self._argument(node, position, 'string')
+        while isinstance(subject, ast.Call):
+            inner = self._re_function(subject)
+            if inner:
+                subject = self._argument(subject, 2 if inner in ('sub', 'subn') else 1, 'string')
+            elif isinstance(subject.func, ast.Attribute) and subject.func.attr in ('sub', 'subn') \
+                    and self._compiled(subject.func.value):
+                subject = self._argument(subject, 1, 'string')
+            else:
+                break
+        return ast.unparse(subject) if subject is not None else '*'
+
+    def _define(self, node, pattern_node, flags_node, method):
+        """Record the rules of a call; method is how the call itself applies them (None for re.compile)."""
+        # A Rule(...) is scanned with whatever text the engine is given
+        subject = self._subject(node, method, 1) if method and self._re_function(node) else '*'
+        compiled = self._compiled(pattern_node)
+        if compiled:
+            # re.sub(COMPILED, ...) or Rule(COMPILED, ...) applies an existing rule
+            if method:
+                self.uses.extend((call, method, self.function, subject) for call in compiled)
+            return
+        patterns = self._resolve_strings(pattern_node)
+        if patterns is None:
+            self.dynamic.append(f"{self.script}:{node.lineno}")
+            return
+        flags = self._resolve_flags(flags_node)
+        rules = [RegexRule(self.script, self.function, node.lineno, pattern, flags,
+                           getattr(node, 'end_lineno', node.lineno)) for pattern in patterns]
+        self.rules.extend(rules)
+        self.definitions[id(node)] = rules
+        if method:
+            self.uses.append((node, method, self.function, subject))
+
+    def visit_Call(self, node):
+        func = node.func
+        re_function = self._re_function(node)
+        if re_function:
+            flag_position = {'sub': 4, 'subn': 4, 'split': 3, 'compile': 1}.get(re_function, 2)
+            self._define(node, node.args[0], self._argument(node, flag_position, 'flags'),
+                         None if re_function == 'compile' else re_function)
+        elif (isinstance(func, ast.Name) and func.id == 'Rule') or \
+                (isinstance(func, ast.Attribute) and func.attr == 'Rule'):
+            literal = self._argument(node, 2, 'literal')
+            is_literal = isinstance(literal, ast.Constant) and literal.value
+            if node.args and not is_literal:
+                # The rewrite engine scans with every rule in turn
+                self._define(node, node.args[0], self._argument(node, 3, 'flags'), 'finditer')
+        elif isinstance(func, ast.Attribute) and func.attr in RE_FUNCTIONS - {'compile'}:
+            # PATTERN.match(...), TABLE[key].sub(...), TABLE.get(key, DEFAULT).match(...)
+            subject = self._subject(node, func.attr, 0)
+            for call in self._compiled(func.value):
+                self.uses.append((call, func.attr, self.function, subject))
+        self.generic_visit(node)
+
+
+def _comment_lines(lines, rule):
+    """The rule's lines, and the line above when it is a comment of its own."""
+    for number in range(max(rule.line - 1, 1), min(rule.end_line, len(lines)) + 1):
+        line = lines[number - 1]
+        # The line above only counts when it is a comment of its own, not the end of the previous rule
+        if number < rule.line and not line.lstrip().startswith('#'):
+            continue
+        yield line
+
+
+def accepted_reason(lines, rule):
+    """The reason given by a '# regex-lint: accept <reason>' comment on the rule's lines or the line above."""
+    for line in _comment_lines(lines, rule):
+        match = ACCEPT_COMMENT.search(line)
+        if match:
+            return match.group(1).strip() or 'accepted'
+    return None
+
+
+def accepted_overlaps(lines, rule):
+    """{other rule's line: reason} from '# regex-lint: accept overlap with line <n>: <reason>' comments."""
+    accepted = {}
+    for line in _comment_lines(lines, rule):
+        for match in ACCEPT_OVERLAP_COMMENT.finditer(line):
+            accepted[int(match.group(1))] = match.group(2).strip() or 'accepted'
+    return accepted
+
+
+def overlap_reason(first, second):
+    """Why the pair is accepted, or None: one of the rules has to name the other's line."""
+    if first.script != second.script:
+        return None
+    return first.accepted_overlaps.get(second.line) or second.accepted_overlaps.get(first.line)
+
+
+def load_rules(scripts_dir):
+    """Load every regex rule from the scripts in scripts_dir."""
+    rules = []
+    dynamic = []
+    for script in sorted(Path(scripts_dir).glob('*.py')):
+        if script.resolve() == Path(__file__).resolve():
+            continue
+        source = script.read_text(encoding='utf-8')
+        try:
+            tree = ast.parse(source, filename=str(script))
+        except SyntaxError as e:
+            print(f"  ✗ Could not parse {script.name}: {e}")
+            continue
+        collector = RuleCollector(script.name)
+        lines = source.splitlines()
+        # A pattern used at several call sites of one function (findall then
+        # sub, say) is the same rule; keep the first call site.
+        seen = {}
+        for rule in collector.collect(tree):
+            key = (rule.function, rule.pattern, rule.flags)
+            if key in seen:
+                seen[key].uses.extend(rule.uses)
+                continue
+            seen[key] = rule
+            rule.accepted = accepted_reason(lines, rule)
+            rule.accepted_overlaps = accepted_overlaps(lines, rule)
+            rules.append(rule)
+        dynamic.extend(collector.dynamic)
+    return rules, dynamic
+
+
+# Adversarial input generation ---------------------------------------------
+
+def _op_name(op):
+    return getattr(op, 'name', str(op))
+
+
+def _class_member(items):
+    """Pick a character accepted by a parsed character class."""
+    negate = any(_op_name(op) == 'NEGATE' for op, _ in items)
+    if not negate:
+        for op, av in items:
+            name = _op_name(op)
+            if name == 'LITERAL':
+                return chr(av)
+            if name == 'RANGE':
+                return chr(av[0])
+            if name == 'CATEGORY':
+                category = _op_name(av)
+                if 'DIGIT' in category and 'NOT' not in category:
+                    return '0'
+                if 'SPACE' in category and 'NOT' not in category:
+                    return ' '
+                return 'a'
+        return 'a'
+    pattern = re.compile('[' + ''.join(_class_source(items)) + ']')
+    for candidate in FALLBACK_CHARS:
+        if pattern.match(candidate):
+            return candidate
+    return 'a'
+
+
+def _class_source(items):
+    source = []
+    for op, av in items:
+        name = _op_name(op)
+        if name == 'NEGATE':
+            source.insert(0, '^')
+        elif name == 'LITERAL':
+            source.append(re.escape(chr(av)))
+        elif name == 'RANGE':
+            source.append(f"{re.escape(chr(av[0]))}-{re.escape(chr(av[1]))}")
+        elif name == 'CATEGORY':
+            source.append({'CATEGORY_DIGIT': r'\d', 'CATEGORY_NOT_DIGIT': r'\D',
+                           'CATEGORY_SPACE': r'\s', 'CATEGORY_NOT_SPACE': r'\S',
+                           'CATEGORY_WORD': r'\w', 'CATEGORY_NOT_WORD': r'\W'}.get(_op_name(av), ''))
+    return source
+
+
+def _example(data):
+    """Build a short string that walks the parsed pattern once."""
+    out = []
+    for op, av in data:
+        name = _op_name(op)
+        if name == 'LITERAL':
+            out.append(chr(av))
+        elif name == 'NOT_LITERAL':
+            out.append('a' if chr(av) != 'a' else 'x')
+        elif name == 'ANY':
+            out.append('a')
+        elif name == 'IN':
+            out.append(_class_member(av))
+        elif name in ('MAX_REPEAT', 'MIN_REPEAT', 'POSSESSIVE_REPEAT'):
+            low, high, sub = av
+            count = max(low, 1) if high != 0 else 0
+            out.append(_example(sub) * count)
+        elif name == 'SUBPATTERN':
+            out.append(_example(av[-1]))
+        elif name == 'ATOMIC_GROUP':
+            out.append(_example(av))
+        elif name == 'BRANCH':
+            out.append(_example(av[1][0]))
+        elif name == 'GROUPREF_EXISTS':
+            out.append(_example(av[1]))
+    return ''.join(out)
+
+
+def _literal_chars(data, chars):
+    for op, av in data:
+        name = _op_name(op)
+        if name == 'LITERAL':
+            chars.append(chr(av))
+        elif name in ('MAX_REPEAT', 'MIN_REPEAT', 'POSSESSIVE_REPEAT'):
+            _literal_chars(av[2], chars)
+        elif name == 'SUBPATTERN':
+            _literal_chars(av[-1], chars)
+        elif name == 'BRANCH':
+            for branch in av[1]:
+                _literal_chars(branch, chars)
+    return chars
+
+
+def adversarial_inputs(rule):
+    """
+    Return named generators of adversarial text for a rule.
+
+    The families target the usual ways a rule goes super-linear: many starts
+    that each scan to the end of the input before failing (unterminated
+    DOTALL/lazy spans), long runs of a character a repeat can consume, and
+    dense sequences of the pattern's own literal characters. Inputs for a
+    bytes pattern are bytes.
+    """
+    parsed = sre_parse.parse(rule.source(), rule.flags)
+    example = _example(parsed.data) or 'a'
+    near_miss = example[:-1] or example
+    literals = ''.join(_literal_chars(parsed.data, [])) or 'a'
+    run_char = example[len(example) // 2] if example else 'a'
+    generators = {
+        'near-miss repeated': lambda n: (near_miss * (n // len(near_miss) + 1))[:n],
+        'example pumped': lambda n: example[:1] + run_char * n,
+        'literal alphabet': lambda n: (literals * (n // len(literals) + 1))[:n],
+    }
+    if rule.is_bytes:
+        generators = {family: (lambda n, generate=generate: generate(n).encode('latin-1'))
+                      for family, generate in generators.items()}
+    return generators, example
+
+
+def _time_pattern(compiled, text, mode='scan'):
+    """Time one application of the pattern the way the scripts apply it."""
+    start = time.perf_counter()
+    count = 0
+    if mode == 'scan':
+        for _ in compiled.finditer(text):
+            count += 1
+    else:
+        # match/fullmatch: one attempt at a position the caller picked; search: up to the first match
+        count = int(getattr(compiled, mode)(text) is not None)
+    return time.perf_counter() - start, count
+
+
+def _growth_exponent(points):
+    """
+    Least-squares log-log slope of the three largest measurements above the
+    noise floor (two when that is all there is), so one noisy timing does not
+    decide it.
+    """
+    usable = [(math.log(n), math.log(t)) for n, t in points if t >= NOISE_FLOOR][-3:]
+    if len(usable) < 2:
+        return None
+    mean_x = sum(x for x, _ in usable) / len(usable)
+    mean_y = sum(y for _, y in usable) / len(usable)
+    spread = sum((x - mean_x) ** 2 for x, _ in usable)
+    if spread == 0:
+        return None
+    return sum((x - mean_x) * (y - mean_y) for x, y in usable) / spread
+
+
+def measure_rule(rule, corpus, probe_text, size_budget, max_spans, queue):
+    """Measure a single rule (runs inside a worker process)."""
+    result = {'error': None}
+    try:
+        compiled = re.compile(rule.pattern, rule.flags)
+    except re.error as e:
+        result['error'] = f"does not compile: {e}"
+        queue.put(result)
+        return
+
+    corpus_time = 0.0
+    corpus_matches = 0
+    corpus_bytes = 0
+    spans = []
+    # A match-only rule has no throughput of its own: it runs where another scan stops
+    for index, text in enumerate(corpus if rule.mode in ('scan', 'search') else []):
+        start = time.perf_counter()
+        for match in (compiled.finditer(text) if rule.mode == 'scan' else filter(None, [compiled.search(text)])):
+            corpus_matches += 1
+            if len(spans) < max_spans:
+                spans.append((index, match.start(), match.end()))
+        corpus_time += time.perf_counter() - start
+        corpus_bytes += len(text)
+    result['corpus_seconds'] = corpus_time
+    result['corpus_matches'] = corpus_matches
+    result['corpus_chars'] = corpus_bytes
+    result['corpus_spans'] = spans
+    result['probe_spans'] = ([(m.start(), m.end()) for m in compiled.finditer(probe_text)]
+                             if rule.mode == 'scan' else [])
+
+    generators, example = adversarial_inputs(rule)
+    result['example'] = example
+    families = {}
+    for family, generate in generators.items():
+        points = []
+        size = MIN_SIZE
+        while size <= MAX_SIZE:
+            text = generate(size)
+            elapsed, _ = _time_pattern(compiled, text, rule.mode)
+            if elapsed <= size_budget:
+                elapsed = min([elapsed] + [_time_pattern(compiled, text, rule.mode)[0] for _ in range(REPEATS - 1)])
+            points.append((size, elapsed))
+            if elapsed > size_budget:
+                break
+            size *= 2
+        families[family] = {
+            'points': points,
+            'exponent': _growth_exponent(points),
+            'worst_seconds': max(t for _, t in points),
+        }
+    result['adversarial'] = families
+    queue.put(result)
+
+
+def run_measurement(rule, corpus, probe_text, args):
+    """Run measure_rule in a child process so a runaway pattern can be killed."""
+    context = multiprocessing.get_context('fork' if hasattr(os, 'fork') else 'spawn')
+    queue = context.Queue()
+    process = context.Process(target=measure_rule,
+                              args=(rule, corpus, probe_text, args.size_budget, args.max_spans, queue))
+    process.start()
+    try:
+        result = queue.get(timeout=args.timeout)
+    except Exception:
+        result = {'error': f"timed out after {args.timeout:.0f}s (catastrophic backtracking?)"}
+    process.join(1)
+    if process.is_alive():
+        process.terminate()
+        process.join()
+    return result
+
+
+# Overlap detection ----------------------------------------------------------
+
+def _spans_contained(inner, outer):
+    outer_sorted = sorted(outer)
+    return bool(inner) and all(
+        any(o_start <= start and end <= o_end for o_start, o_end in outer_sorted)
+        for start, end in inner
+    )
+
+
+def _spans_intersect(first, second):
+    a = sorted(first)
+    b = sorted(second)
+    i = j = 0
+    while i < len(a) and j < len(b):
+        if a[i][1] > b[j][0] and b[j][1] > a[i][0]:
+            return True
+        if a[i][1] <= b[j][1]:
+            i += 1
+        else:
+            j += 1
+    return False
+
+
+def _by_document(spans):
+    documents = {}
+    for index, start, end in spans:
+        documents.setdefault(index, []).append((start, end))
+    return documents
+
+
+def rule_groups(rules):
+    """
+    {group: [rule index]}: the rules a function scans the same text with
+    compete for it. A constant is grouped with every text it scans;
+    match-only rules (tails and tokens tried at a position another rule
+    found) and rules nothing applies are in no group.
+    """
+    groups = {}
+    for index, rule in enumerate(rules):
+        for group in sorted(rule.groups):
+            groups.setdefault(group, []).append(index)
+    return groups
+
+
+def find_overlaps(rules, results):
+    """Compare the rules of each group pairwise on the corpus and probe text."""
+    findings = []
+    compared = set()
+    for group, members in rule_groups(rules).items():
+        for position, a in enumerate(members):
+            for b in members[position + 1:]:
+                rule_a, rule_b = rules[a], rules[b]
+                result_a, result_b = results[a], results[b]
+                # Spans of str and bytes patterns are offsets into different texts
+                if (a, b) in compared or rule_a.is_bytes != rule_b.is_bytes:
+                    continue
+                compared.add((a, b))
+                if result_a.get('error') or result_b.get('error'):
+                    continue
+                if rule_a.pattern == rule_b.pattern and rule_a.flags == rule_b.flags:
+                    findings.append(('duplicate', rule_a, rule_b))
+                    continue
+
+                docs_a = _by_document(result_a['corpus_spans'])
+                docs_a[-1] = result_a['probe_spans']
+                docs_b = _by_document(result_b['corpus_spans'])
+                docs_b[-1] = result_b['probe_spans']
+
+                shared = set(docs_a) & set(docs_b)
+                if not any(docs_a[d] and docs_b[d] for d in shared):
+                    continue
+                a_in_b = all(_spans_contained(docs_a[d], docs_b.get(d, [])) for d in docs_a if docs_a[d])
+                b_in_a = all(_spans_contained(docs_b[d], docs_a.get(d, [])) for d in docs_b if docs_b[d])
+                if a_in_b:
+                    findings.append(('subsumed', rule_a, rule_b))
+                elif b_in_a:
+                    findings.append(('subsumed', rule_b, rule_a))
+                elif any(_spans_intersect(docs_a[d], docs_b[d]) for d in shared):
+                    findings.append(('overlapping', rule_a, rule_b))
+    return findings
+
+
+# Corpus ----------------------------------------------------------------------
+
+def load_corpus(project_root, all_files, sample_size):
+    """Load the HTML and CSS corpus, largest files first when sampling."""
+    files = []
+    for root, dirs, names in os.walk(project_root):
+        dirs[:] = [d for d in dirs if not d.startswith('.') and d != 'python scripts']
+        for name in names:
+            if name.endswith(('.html', '.css')) and not any(skip in name for skip in ['backup', 'temp', '.bak']):
+                files.append(Path(root) / name)
+    files.sort(key=lambda path: path.stat().st_size, reverse=True)
+    if not all_files:
+        css_files = [path for path in files if path.suffix == '.css']
+        files = files[:sample_size] + [path for path in css_files if path not in files[:sample_size]]
+    corpus = []
+    for path in files:
+        with open(path, 'r', encoding='utf-8', errors='replace') as f:
+            corpus.append(f.read())
+    return files, corpus
+
+
+# Reporting -------------------------------------------------------------------
+
+def classify(rule, result, args):
+    """Return the list of problems found for a measured rule."""
+    problems = []
+    if result.get('error'):
+        problems.append(result['error'])
+        return problems
+    for family, data in result['adversarial'].items():
+        exponent = data['exponent']
+        if exponent is not None and exponent > SUPERLINEAR_EXPONENT:
+            problems.append(f"super-linear on '{family}' input (growth ~n^{exponent:.1f})")
+        elif data['worst_seconds'] > args.size_budget:
+            problems.append(f"slow on '{family}' input ({data['worst_seconds'] * 1000:.0f} ms)")
+    if result['corpus_seconds'] > 0 and result['corpus_chars'] > 0:
+        throughput = result['corpus_chars'] / result['corpus_seconds'] / 1e6
+        if throughput < args.min_throughput:
+            problems.append(f"slow on corpus ({throughput:.1f} MB/s < {args.min_throughput} MB/s)")
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Time and lint the regex rules used by the maintenance scripts')
+    parser.add_argument('--project-root', default='.', help='Project root directory (corpus location)')
+    parser.add_argument('--scripts-dir', default=str(SCRIPTS_DIR), help='Directory containing the scripts to lint')
+    parser.add_argument('--all-files', action='store_true', help='Time against every HTML/CSS file instead of a sample')
+    parser.add_argument('--sample', type=int, default=25, help='Number of largest HTML files to sample (default: 25)')
+    parser.add_argument('--timeout', type=float, default=20.0, help='Seconds allowed per rule before it is killed (default: 20)')
+    parser.add_argument('--size-budget', type=float, default=0.25,
+                        help='Seconds allowed for a single adversarial input (default: 0.25)')
+    parser.add_argument('--min-throughput', type=float, default=5.0,
+                        help='Minimum corpus throughput in MB/s before a rule is flagged (default: 5)')
+    parser.add_argument('--max-spans', type=int, default=20000, help='Match spans kept per rule for overlap checks')
+    parser.add_argument('--json', help='Write machine-readable results to this file')
+    parser.add_argument('--no-fail', action='store_true', help='Always exit 0 (report only)')
+
+    args = parser.parse_args()
+
+    print("🔍 Loading regex rules...")
+    rules, dynamic = load_rules(args.scripts_dir)
+    print(f"Found {len(rules)} rules in {len({rule.script for rule in rules})} scripts, "
+          f"{len(rule_groups(rules))} functions that scan with them")
+    if dynamic:
+        print(f"Skipped {len(dynamic)} dynamically built patterns: {', '.join(dynamic)}")
+
+    files, corpus = load_corpus(args.project_root, args.all_files, args.sample)
+    corpus_size = sum(len(text) for text in corpus)
+    print(f"Loaded corpus: {len(files)} files, {corpus_size / 1e6:.1f} MB")
+    # Bytes patterns (the mmap and streaming scanners) run over the encoded pages
+    corpus_bytes = [text.encode('utf-8', errors='replace') for text in corpus]
+
+    # Probe text: one example match per rule, so rules can be compared even
+    # when the real corpus no longer contains anything they match.
+    examples = []
+    for rule in rules:
+        try:
+            examples.append(adversarial_inputs(rule)[1])
+        except (re.error, RecursionError):
+            pass
+    probe_text = '\n'.join(examples)
+    probe_bytes = probe_text.encode('utf-8')
+
+    print("-" * 50)
+    results = []
+    for index, rule in enumerate(rules, 1):
+        print(f"[{index}/{len(rules)}] {rule.location} {rule.short_pattern()}")
+        if rule.is_bytes:
+            results.append(run_measurement(rule, corpus_bytes, probe_bytes, args))
+        else:
+            results.append(run_measurement(rule, corpus, probe_text, args))
+
+    overlaps = find_overlaps(rules, results)
+
+    print("\n" + "=" * 50)
+    print("📊 REGEX RULE COST REPORT")
+    print("=" * 50)
+    header = (f"{'location':<40} {'mode':>9} {'corpus ms':>9} {'MB/s':>7} {'matches':>8} "
+              f"{'worst adv ms':>12} {'growth':>7}")
+    print(header)
+    print("-" * len(header))
+
+    flagged = []
+    report = []
+    ordered = sorted(zip(rules, results), key=lambda item: -(item[1].get('corpus_seconds') or 0))
+    for rule, result in ordered:
+        problems = classify(rule, result, args)
+        entry = {
+            'script': rule.script,
+            'function': rule.function,
+            'line': rule.line,
+            'pattern': rule.source(),
+            'bytes': rule.is_bytes,
+            'flags': rule.flags,
+            'mode': rule.mode,
+            'groups': sorted(rule.groups),
+            'problems': problems,
+            'accepted': rule.accepted,
+        }
+        marker = ('  ✔️ accepted' if rule.accepted else '  ❌') if problems else ''
+        if result.get('error'):
+            print(f"{rule.location:<40} {rule.mode:>9} {'-':>9} {'-':>7} {'-':>8} {'-':>12} {'-':>7}{marker} {result['error']}")
+        else:
+            corpus_ms = result['corpus_seconds'] * 1000
+            throughput = result['corpus_chars'] / result['corpus_seconds'] / 1e6 if result['corpus_seconds'] else float('inf')
+            worst = max(data['worst_seconds'] for data in result['adversarial'].values()) * 1000
+            exponents = [data['exponent'] for data in result['adversarial'].values() if data['exponent'] is not None]
+            growth = f"n^{max(exponents):.1f}" if exponents else '~n'
+            if rule.mode in ('scan', 'search'):
+                corpus_columns = f"{corpus_ms:>9.1f} {throughput:>7.0f} {result['corpus_matches']:>8}"
+            else:
+                corpus_columns = f"{'-':>9} {'-':>7} {'-':>8}"
+            print(f"{rule.location:<40} {rule.mode:>9} {corpus_columns} {worst:>12.1f} {growth:>7}{marker}")
+            entry.update({
+                'corpus_ms': round(corpus_ms, 3),
+                'corpus_matches': result['corpus_matches'],
+                'throughput_mb_s': round(throughput, 2) if math.isfinite(throughput) else None,
+                'adversarial': {
+                    family: {
+                        'exponent': round(data['exponent'], 2) if data['exponent'] is not None else None,
+                        'worst_ms': round(data['worst_seconds'] * 1000, 3),
+                        'points': [(n, round(t * 1000, 3)) for n, t in data['points']],
+                    }
+                    for family, data in result['adversarial'].items()
+                },
+            })
+        if problems:
+            flagged.append((rule, problems))
+        report.append(entry)
+
+    failing = [(rule, problems) for rule, problems in flagged if not rule.accepted]
+    if failing:
+        print(f"\n❌ {len(failing)} rules need attention:")
+        for rule, problems in failing:
+            print(f"  - {rule.location} {rule.short_pattern()}")
+            for problem in problems:
+                print(f"      {problem}")
+
+    accepted = [(rule, problems) for rule, problems in flagged if rule.accepted]
+    if accepted:
+        print(f"\n✔️  {len(accepted)} flagged rules are accepted in the source:")
+        for rule, problems in accepted:
+            print(f"  - {rule.location} {rule.short_pattern()}")
+            print(f"      {'; '.join(problems)} - accepted: {rule.accepted}")
+
+    open_overlaps = [overlap for overlap in overlaps if not overlap_reason(overlap[1], overlap[2])]
+    if overlaps:
+        print(f"\n⚠️  {len(overlaps)} redundant or overlapping rule pairs"
+              f" ({len(overlaps) - len(open_overlaps)} accepted):")
+        for kind, first, second in overlaps:
+            reason = overlap_reason(first, second)
+            if reason:
+                print(f"  - accepted {kind}: {first.location} and {second.location} - {reason}")
+            elif kind == 'duplicate':
+                print(f"  - duplicate: {first.location} and {second.location} {first.short_pattern()}")
+            elif kind == 'subsumed':
+                print(f"  - subsumed: every match of {first.location} {first.short_pattern(40)}")
+                print(f"              is also matched by {second.location} {second.short_pattern(40)}")
+            else:
+                print(f"  - overlapping: {first.location} {first.short_pattern(40)}")
+                print(f"                 and {second.location} {second.short_pattern(40)}")
+
+    if not failing and not open_overlaps:
+        print("\n✅ All rules are linear and independent" + (" (apart from the accepted ones)" if flagged or overlaps else ""))
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({
+                'corpus_files': len(files),
+                'corpus_chars': corpus_size,
+                'rules': report,
+                'dynamic_patterns': dynamic,
+                'overlaps': [
+                    {'kind': kind, 'first': first.location, 'first_pattern': first.source(),
+                     'second': second.location, 'second_pattern': second.source(),
+                     'accepted': overlap_reason(first, second)}
+                    for kind, first, second in overlaps
+                ],
+            }, f, indent=2)
+        print(f"\nResults saved to: {args.json}")
+
+    # Both slow rules and overlapping pairs need attention, unless accepted in the source
+    if (failing or open_overlaps) and not args.no_fail:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Memory-mapped read-only scanning for the verifier and report scripts.
+
+Files are mapped read-only and compiled bytes patterns run directly on the
+mapping: nothing is decoded, copied into a Python string or written back, so
+a verification pass over the tree is bound by page-cache reads rather than
+string building. Only the matched bytes are ever materialized.
+
+    from mmap_scan import iter_matches, file_contains
+
+    pattern = re.compile(rb'background-image:url\\(\\.\\./cdn\\.prod\\.website-files\\.com/[^)]+\\)')
+    if file_contains('speakers.html', pattern):
+        ...
+"""
+
+import os
+import re
+import mmap
+import argparse
+from contextlib import contextmanager
+
+
+@contextmanager
+def mapped(file_path):
+    """Map a file read-only; yields b'' for empty files (which cannot be mapped)."""
+    with open(file_path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            yield b''
+            return
+        mapping = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            yield mapping
+        finally:
+            mapping.close()
+
+
+def file_contains(file_path, pattern):
+    """True if the compiled bytes pattern matches anywhere in the file."""
+    with mapped(file_path) as data:
+        return pattern.search(data) is not None
+
+
+def iter_matches(file_path, pattern, group=0):
+    """Yield (offset, matched bytes) for each match of a compiled bytes pattern."""
+    with mapped(file_path) as data:
+        for match in pattern.finditer(data):
+            yield match.start(group), match.group(group)
+
+
+def count_matches(file_path, pattern):
+    """Count the matches of a compiled bytes pattern in a file."""
+    with mapped(file_path) as data:
+        return sum(1 for _ in pattern.finditer(data))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Scan files for a bytes regex using read-only memory maps')
+    parser.add_argument('pattern', help='Regular expression (matched against raw bytes)')
+    parser.add_argument('files', nargs='+', help='Files to scan')
+    parser.add_argument('--count', action='store_true', help='Only print match counts')
+    args = parser.parse_args()
+
+    pattern = re.compile(args.pattern.encode('utf-8'))
+    total = 0
+    for file_path in args.files:
+        if args.count:
+            count = count_matches(file_path, pattern)
+            total += count
+            if count:
+                print(f"{file_path}: {count}")
+        else:
+            for offset, matched in iter_matches(file_path, pattern):
+                total += 1
+                print(f"{file_path}:{offset}: {matched.decode('utf-8', errors='replace')}")
+    print(f"\nTotal matches: {total}")
+
+
+if __name__ == "__main__":
+    main()
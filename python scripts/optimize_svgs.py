@@ -0,0 +1,744 @@
+#!/usr/bin/env python3
+"""
+Optimize the site's SVG files in place, and prove each result draws the same.
+
+The SVGs in images/ come from Streamline, Illustrator, Inkscape and Figma
+exports with editor metadata, wrapper groups and path data at full
+precision (0.9500000000000001, 8.33647265625). For every SVG in the asset
+directories - where replace_logo_urls.py, the sponsor replacers and
+replace_social_media_svgs.py point the pages - this stage:
+
+- drops comments, the XML declaration and DOCTYPE, <metadata>, <title>,
+  <desc>, Inkscape/Sodipodi/RDF markup, version/baseProfile and other
+  attributes with no effect, and ids nothing refers to;
+- drops presentation attributes equal to the value they would inherit
+  (fill="#000000" at the top level, stroke-width="1" without a stroke
+  width above it);
+- unwraps groups with no attributes, and folds a group with only
+  presentation attributes and a transform into its single child;
+- rewrites path data from absolute coordinates rounded to PRECISION
+  significant digits of the drawing's size, picking the shorter of the
+  absolute and relative form of every segment (relative offsets are taken
+  between rounded points, so rounding errors do not add up along a path),
+  and rounds the other coordinates the same way;
+- shortens colours (#FFFFFF -> #fff) and strips whitespace between tags.
+
+Precision follows the coordinate system: the viewBox of the drawing or
+the nearest nested viewBox, the 0-1 range of objectBoundingBox units, and
+the scale of the transforms above an element. Files with a <style>
+element keep their structure, ids and presentation attributes, since
+selectors may depend on them.
+
+Safety check: the original and the optimized file are both reduced to
+what a renderer sees - every drawn element in document order, with its
+transform chain, its inherited presentation properties and its geometry
+in absolute coordinates - and compared, geometry within the rounding
+step. A file that fails the comparison, does not parse or does not get
+smaller is left as it is. Results are cached in .svg_optimize_cache.json
+by content hash, so files that are already optimized are skipped. Run
+this before build_icon_sprite.py and fingerprint_assets.py.
+
+The replacers that point pages at local SVGs (webflow_assets.py,
+replace_logo_urls.py, the sponsor replacers and replace_social_media_svgs.py)
+call optimize_localized() on the files they link, so a newly localized
+SVG is optimized in the same run; running this script covers the rest.
+
+Usage:
+    python3 "python scripts/optimize_svgs.py" --dry-run
+    python3 "python scripts/optimize_svgs.py"
+    python3 "python scripts/optimize_svgs.py" --precision 5 images/66d3_logo.svg
+"""
+
+import os
+import re
+import sys
+import copy
+import json
+import math
+import hashlib
+import argparse
+import xml.etree.ElementTree as ET
+
+from webflow_assets import ASSET_DIRS
+from fingerprint_assets import original_name
+from build_icon_sprite import SPRITE, SVG_NS, XLINK_NS, local
+
+CACHE_FILE = '.svg_optimize_cache.json'
+CACHE_VERSION = 1
+PRECISION = 4
+
+SVG = '{%s}' % SVG_NS
+XML_NS = '{http://www.w3.org/XML/1998/namespace}'
+DROPPED = {'title', 'desc', 'metadata'}
+DROPPED_ATTRIBUTES = {'version', 'baseProfile', 'enable-background', 'data-name'}
+# Elements whose content is referenced rather than drawn where it stands
+REFERENCED_CONTENT = {'defs', 'symbol', 'clipPath', 'mask', 'pattern', 'marker', 'linearGradient',
+                      'radialGradient', 'filter'}
+TEXT_CONTENT = {'text', 'tspan', 'textPath', 'style', 'script'}
+
+# Inherited presentation properties and their initial values
+INHERITED = {
+    'fill': '#000000', 'fill-opacity': '1', 'fill-rule': 'nonzero', 'stroke': 'none', 'stroke-width': '1',
+    'stroke-linecap': 'butt', 'stroke-linejoin': 'miter', 'stroke-miterlimit': '4', 'stroke-dasharray': 'none',
+    'stroke-dashoffset': '0', 'stroke-opacity': '1', 'clip-rule': 'nonzero', 'visibility': 'visible',
+    'color': '#000000', 'font-family': None, 'font-size': None, 'font-weight': None, 'font-style': None,
+    'text-anchor': None, 'paint-order': None,
+}
+COLOR_ATTRIBUTES = {'fill', 'stroke', 'stop-color', 'flood-color', 'lighting-color', 'color'}
+NUMBER_ATTRIBUTES = {'x', 'y', 'width', 'height', 'cx', 'cy', 'r', 'rx', 'ry', 'x1', 'y1', 'x2', 'y2',
+                     'fx', 'fy', 'stroke-width'}
+BOUNDING_BOX_UNITS = {'clipPath': 'clipPathUnits', 'mask': 'maskContentUnits', 'pattern': 'patternContentUnits'}
+GRADIENTS = {'linearGradient', 'radialGradient'}
+
+NUMBER = re.compile(r'[-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?')
+PLAIN_NUMBER = re.compile(r'^\s*[-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?\s*$')
+SEPARATORS = re.compile(r'[\s,]*')
+HEX_COLOR = re.compile(r'^#([0-9a-fA-F]{3}|[0-9a-fA-F]{6})$')
+REFERENCE = re.compile(r'url\(\s*[\'"]?#([^\'")\s]+)')
+TRANSFORM = re.compile(r'(matrix|translate|scale|rotate|skewX|skewY)\s*\(([^()]*)\)')
+ARGUMENTS = {'M': 2, 'L': 2, 'H': 1, 'V': 1, 'C': 6, 'S': 4, 'Q': 4, 'T': 2, 'A': 7, 'Z': 0}
+
+
+class NotEquivalent(ValueError):
+    """The optimized SVG would not draw the same as the original."""
+
+
+# Numbers -----------------------------------------------------------------------
+
+def format_number(value, decimals):
+    """Shortest form of value rounded to decimals places: 0.50 -> .5, -0.5 -> -.5, 2.0 -> 2."""
+    text = f'{value:.{decimals}f}'
+    if '.' in text:
+        text = text.rstrip('0').rstrip('.')
+    if text in ('-0', ''):
+        return '0'
+    if text.startswith('0.'):
+        return text[1:]
+    if text.startswith('-0.'):
+        return '-' + text[2:]
+    return text
+
+
+def join_numbers(numbers):
+    """Numbers joined with separators only where the next one would run into the last."""
+    out = ''
+    for number in numbers:
+        if out and not (number[0] == '-' or (number[0] == '.' and '.' in previous and 'e' not in previous)):
+            out += ' '
+        out += number
+        previous = number
+    return out
+
+
+def integer_digits(size):
+    """Digits before the decimal point in the coordinates of a system size units across."""
+    return max(1, math.floor(math.log10(size)) + 1) if size > 0 else 1
+
+
+def short_color(value):
+    match = HEX_COLOR.match(value.strip())
+    if not match:
+        return value
+    hex_digits = match.group(1).lower()
+    if len(hex_digits) == 6 and hex_digits[0::2] == hex_digits[1::2]:
+        hex_digits = hex_digits[0::2]
+    return '#' + hex_digits
+
+
+def normal_color(value):
+    """Comparable form of a colour: #abc, #AABBCC and black all become #aabbcc/#000000."""
+    value = value.strip().lower()
+    if value == 'black':
+        return '#000000'
+    if value == 'white':
+        return '#ffffff'
+    match = HEX_COLOR.match(value)
+    if match and len(match.group(1)) == 3:
+        return '#' + ''.join(digit * 2 for digit in match.group(1))
+    return value
+
+
+# Transforms --------------------------------------------------------------------
+
+def transform_scale(transforms):
+    """Geometric mean scale of a list of transform attribute values."""
+    scale = 1.0
+    for value in transforms:
+        for name, raw in TRANSFORM.findall(value):
+            numbers = [float(number) for number in NUMBER.findall(raw)]
+            if name == 'matrix' and len(numbers) == 6:
+                scale *= math.sqrt(abs(numbers[0] * numbers[3] - numbers[1] * numbers[2])) or 1.0
+            elif name == 'scale' and numbers:
+                scale *= math.sqrt(abs(numbers[0] * (numbers[1] if len(numbers) > 1 else numbers[0]))) or 1.0
+    return scale
+
+
+def normal_transform(values):
+    return ' '.join(re.sub(r'[\s,]+', ' ', value).strip() for value in values if value and value.strip())
+
+
+# Path data ---------------------------------------------------------------------
+
+def parse_path(data):
+    """[(command, [numbers])] exactly as written, arc flags included; raises ValueError."""
+    segments = []
+    position = 0
+    command = None
+    length = len(data)
+    while True:
+        position = SEPARATORS.match(data, position).end()
+        if position >= length:
+            return segments
+        char = data[position]
+        if char.isalpha():
+            if char.upper() not in ARGUMENTS:
+                raise ValueError(f'unknown path command {char}')
+            command = char
+            position += 1
+            if command in 'Zz':
+                segments.append((command, []))
+                continue
+        elif command is None or command in 'Zz':
+            raise ValueError('path data must start with a command')
+        numbers = []
+        for index in range(ARGUMENTS[command.upper()]):
+            position = SEPARATORS.match(data, position).end()
+            if command in 'Aa' and index in (3, 4):
+                if data[position:position + 1] not in ('0', '1'):
+                    raise ValueError('invalid arc flag')
+                numbers.append(float(data[position]))
+                position += 1
+                continue
+            match = NUMBER.match(data, position)
+            if not match:
+                raise ValueError('number expected in path data')
+            numbers.append(float(match.group()))
+            position = match.end()
+        segments.append((command, numbers))
+        # Coordinate pairs after a moveto are linetos
+        command = {'M': 'L', 'm': 'l'}.get(command, command)
+
+
+def absolute_path(segments):
+    """The segments with absolute coordinates, as [(COMMAND, [numbers])]."""
+    x = y = start_x = start_y = 0.0
+    result = []
+    for command, numbers in segments:
+        upper = command.upper()
+        relative = command != upper
+        numbers = list(numbers)
+        if upper == 'Z':
+            x, y = start_x, start_y
+        elif upper == 'H':
+            numbers[0] += x if relative else 0
+            x = numbers[0]
+        elif upper == 'V':
+            numbers[0] += y if relative else 0
+            y = numbers[0]
+        elif upper == 'A':
+            if relative:
+                numbers[5] += x
+                numbers[6] += y
+            x, y = numbers[5], numbers[6]
+        else:
+            if relative:
+                numbers = [value + (x if index % 2 == 0 else y) for index, value in enumerate(numbers)]
+            x, y = numbers[-2], numbers[-1]
+        if upper == 'M':
+            start_x, start_y = x, y
+        result.append((upper, numbers))
+    return result
+
+
+def write_path(segments, decimals):
+    """Shortest path data for absolute segments, with every coordinate rounded to decimals places."""
+    out = []
+    x = y = start_x = start_y = 0.0
+    last = None
+    for command, numbers in segments:
+        if command == 'Z':
+            out.append('z')
+            x, y = start_x, start_y
+            last = 'z'
+            continue
+        rounded = [round(value, decimals) for value in numbers]
+        if command == 'A':
+            rounded[3], rounded[4] = numbers[3], numbers[4]
+            offsets = rounded[:5] + [rounded[5] - x, rounded[6] - y]
+        elif command == 'H':
+            offsets = [rounded[0] - x]
+        elif command == 'V':
+            offsets = [rounded[0] - y]
+        else:
+            offsets = [value - (x if index % 2 == 0 else y) for index, value in enumerate(rounded)]
+        forms = []
+        for letter, values in ((command, rounded), (command.lower(), offsets)):
+            if command == 'A':
+                texts = [format_number(value, decimals) for value in values[:3]] + \
+                        [str(int(values[3])), str(int(values[4]))] + \
+                        [format_number(value, decimals) for value in values[5:]]
+            else:
+                texts = [format_number(value, decimals) for value in values]
+            # A repeated command letter can be left out, except after a moveto
+            implicit = letter == last and letter not in 'Mm' or {'M': 'L', 'm': 'l'}.get(last) == letter
+            forms.append((letter, texts, implicit))
+        letter, texts, implicit = min(forms, key=lambda form: len(join_numbers(form[1])) + (0 if form[2] else 1))
+        numbers_text = join_numbers(texts)
+        if implicit and out:
+            previous = out[-1]
+            # Separate from the previous number unless the sign or a second dot does
+            sep = '' if numbers_text[0] == '-' or (numbers_text[0] == '.' and re.search(r'\.\d*$', previous)) else ' '
+            out.append(sep + numbers_text)
+        else:
+            out.append(letter + numbers_text)
+        last = letter
+        if command == 'H':
+            x = rounded[0]
+        elif command == 'V':
+            y = rounded[0]
+        else:
+            x, y = rounded[-2], rounded[-1]
+        # Keep the exact rounded values, so the next relative offsets are exact too
+        x, y = round(x, decimals), round(y, decimals)
+        if command == 'M':
+            start_x, start_y = x, y
+    return ''.join(out)
+
+
+def same_path(first, second, tolerance):
+    if len(first) != len(second):
+        return False
+    for (command_a, numbers_a), (command_b, numbers_b) in zip(first, second):
+        if command_a != command_b or len(numbers_a) != len(numbers_b):
+            return False
+        if any(abs(a - b) > tolerance for a, b in zip(numbers_a, numbers_b)):
+            return False
+    return True
+
+
+# Analysis ----------------------------------------------------------------------
+
+def style_declarations(value):
+    declarations = {}
+    for item in (value or '').split(';'):
+        name, _, content = item.partition(':')
+        if content.strip():
+            declarations[name.strip()] = content.strip()
+    return declarations
+
+
+def referenced_ids(root):
+    ids = set()
+    for element in root.iter():
+        for attribute, value in element.attrib.items():
+            ids.update(REFERENCE.findall(value))
+            if local(attribute) == 'href' and value.startswith('#'):
+                ids.add(value[1:])
+    return ids
+
+
+def has_stylesheet(root):
+    return any(element.tag == SVG + 'style' for element in root.iter())
+
+
+def view_box_size(element, fallback):
+    box = NUMBER.findall(element.get('viewBox', ''))
+    if len(box) == 4 and max(float(box[2]), float(box[3])) > 0:
+        return max(float(box[2]), float(box[3]))
+    return fallback
+
+
+def walk(element, context, visit):
+    """
+    Call visit(element, context) for element and its descendants in document
+    order. context carries: inherited properties, the transform chain, the
+    size of the coordinate system, and whether the element is referenced
+    content (inside <defs>, a gradient, a clip path...).
+    """
+    name = local(element.tag)
+    inherited = dict(context['inherited'])
+    for attribute in INHERITED:
+        if element.get(attribute) is not None:
+            inherited[attribute] = element.get(attribute)
+    for attribute, value in style_declarations(element.get('style')).items():
+        if attribute in INHERITED:
+            inherited[attribute] = value
+    size = view_box_size(element, context['size'])
+    units = BOUNDING_BOX_UNITS.get(name)
+    if units and element.get(units) == 'objectBoundingBox':
+        size = 1.0
+    inner = {
+        'inherited': inherited,
+        'transforms': context['transforms'] + [element.get('transform') or ''],
+        'size': size,
+        'referenced': context['referenced'] or name in REFERENCED_CONTENT,
+    }
+    visit(element, context, inner)
+    for child in list(element):
+        walk(child, inner, visit)
+
+
+def root_context(root):
+    size = view_box_size(root, 0) or max(
+        [float(NUMBER.match(root.get(name, '')).group()) for name in ('width', 'height')
+         if NUMBER.match(root.get(name, ''))] or [100.0])
+    return {'inherited': dict(INHERITED), 'transforms': [], 'size': size, 'referenced': False}
+
+
+def coordinate_decimals(context, element, precision):
+    """Decimal places for the coordinates of element."""
+    size = context['size']
+    if local(element.tag) in GRADIENTS and element.get('gradientUnits') != 'userSpaceOnUse':
+        size = 1.0
+    scale = transform_scale(context['transforms'] + [element.get('transform') or ''])
+    # A scaled-up element draws its coordinates larger, so it needs more of their decimals
+    extra = math.ceil(math.log10(scale)) if scale > 0 else 0
+    return max(0, precision - integer_digits(size) + extra)
+
+
+def signature(root, precision):
+    """
+    What a renderer draws: [(tag, transform chain, inherited properties,
+    attributes, geometry, text, tolerance)] for every element except
+    plain groups and the ones that draw nothing.
+    """
+    referenced = referenced_ids(root)
+    nodes = []
+
+    def visit(element, context, inner):
+        name = local(element.tag)
+        if not element.tag.startswith(SVG) or name in DROPPED:
+            return
+        attributes = {}
+        for attribute, value in element.attrib.items():
+            attribute_name = local(attribute) if attribute.startswith('{' + XLINK_NS) else attribute
+            if attribute.startswith('{') and not attribute.startswith(('{' + XLINK_NS, XML_NS)):
+                continue
+            if attribute in INHERITED or attribute == 'transform' or attribute in DROPPED_ATTRIBUTES:
+                continue
+            if attribute == 'id' and value not in referenced and not has_style:
+                continue
+            if element is root and attribute in ('x', 'y'):
+                continue
+            attributes[attribute_name] = value
+        if name == 'g' and not attributes:
+            return
+        decimals = coordinate_decimals(context, element, precision)
+        tolerance = 10 ** -decimals * 1.01
+        geometry = None
+        if name == 'path' and 'd' in attributes:
+            try:
+                geometry = absolute_path(parse_path(attributes.pop('d')))
+            except ValueError:
+                geometry = attributes.pop('d', None)
+        numbers = {}
+        for attribute in list(attributes):
+            if attribute in NUMBER_ATTRIBUTES and element is not root and PLAIN_NUMBER.match(attributes[attribute]):
+                numbers[attribute] = float(attributes.pop(attribute))
+            elif attribute == 'points':
+                numbers[attribute] = [float(value) for value in NUMBER.findall(attributes.pop(attribute))]
+            elif attribute in COLOR_ATTRIBUTES:
+                attributes[attribute] = normal_color(attributes[attribute])
+        properties = {key: normal_color(value) if key in COLOR_ATTRIBUTES and value else value
+                      for key, value in inner['inherited'].items()}
+        if 'stroke-width' in properties and PLAIN_NUMBER.match(properties['stroke-width'] or ''):
+            properties['stroke-width'] = round(float(properties['stroke-width']), decimals)
+        text = (element.text or '').strip() if name in TEXT_CONTENT else ''
+        tail = (element.tail or '').strip() if name in TEXT_CONTENT else ''
+        nodes.append((name, normal_transform(inner['transforms']), properties, attributes, geometry, numbers,
+                      text + '|' + tail, tolerance))
+
+    has_style = has_stylesheet(root)
+    walk(root, root_context(root), visit)
+    return nodes
+
+
+def compare(original, optimized):
+    """Raise NotEquivalent with the first difference between two signatures."""
+    if len(original) != len(optimized):
+        raise NotEquivalent(f'{len(original)} drawn elements, {len(optimized)} after optimizing')
+    for first, second in zip(original, optimized):
+        name, transforms, properties, attributes, geometry, numbers, text, tolerance = first
+        if (name, transforms, text) != second[:2] + (second[6],):
+            raise NotEquivalent(f'<{name}> changed')
+        if properties != second[2] or attributes != second[3]:
+            differences = {key for key in set(properties) | set(second[2]) if properties.get(key) != second[2].get(key)}
+            differences |= {key for key in set(attributes) | set(second[3]) if attributes.get(key) != second[3].get(key)}
+            raise NotEquivalent(f'<{name}> {", ".join(sorted(differences))} changed')
+        if isinstance(geometry, list) != isinstance(second[4], list) or (
+                isinstance(geometry, list) and not same_path(geometry, second[4], tolerance)) or (
+                not isinstance(geometry, list) and geometry != second[4]):
+            raise NotEquivalent(f'<{name}> path moved by more than {tolerance:.2g}')
+        if set(numbers) != set(second[5]):
+            raise NotEquivalent(f'<{name}> attributes changed')
+        for key, value in numbers.items():
+            values, others = (value, second[5][key]) if isinstance(value, list) else ([value], [second[5][key]])
+            if len(values) != len(others) or any(abs(a - b) > tolerance for a, b in zip(values, others)):
+                raise NotEquivalent(f'<{name}> {key} moved by more than {tolerance:.2g}')
+
+
+# Optimizing --------------------------------------------------------------------
+
+def _clean(root, keep_structure):
+    """Drop editor metadata, unused ids and attributes without effect."""
+    referenced = referenced_ids(root)
+    for parent in list(root.iter()):
+        for child in list(parent):
+            if not child.tag.startswith(SVG) or local(child.tag) in DROPPED:
+                parent.remove(child)
+    for element in root.iter():
+        for attribute in list(element.attrib):
+            if attribute.startswith('{') and not attribute.startswith(('{' + XLINK_NS, XML_NS)):
+                del element.attrib[attribute]
+            elif attribute in DROPPED_ATTRIBUTES:
+                del element.attrib[attribute]
+            elif (attribute == 'id' and not keep_structure and element.get('id') not in referenced
+                  and local(element.tag) != 'symbol'):
+                del element.attrib[attribute]
+    # x and y do nothing on the outermost <svg>
+    for attribute in ('x', 'y'):
+        root.attrib.pop(attribute, None)
+
+
+def _remove_inherited(root):
+    """Drop presentation attributes equal to the value the element inherits anyway."""
+    def visit(element, context, inner):
+        if context['referenced'] or element.get('id'):
+            # Referenced content inherits from where it is used, not from its parent
+            return
+        declared = style_declarations(element.get('style'))
+        for attribute in INHERITED:
+            value = element.get(attribute)
+            if value is None or attribute in declared:
+                continue
+            parent_value = context['inherited'].get(attribute)
+            if parent_value is None:
+                continue
+            if (normal_color(value) == normal_color(parent_value) if attribute in COLOR_ATTRIBUTES
+                    else value.strip() == parent_value.strip()):
+                del element.attrib[attribute]
+    walk(root, root_context(root), visit)
+
+
+def _collapse_groups(root, referenced):
+    """Unwrap attribute-less groups and fold presentation-only groups into their single child."""
+    changed = True
+    while changed:
+        changed = False
+        for parent in list(root.iter()):
+            for index, group in enumerate(list(parent)):
+                if group.tag != SVG + 'g':
+                    continue
+                attributes = dict(group.attrib)
+                if not attributes:
+                    parent.remove(group)
+                    for offset, child in enumerate(list(group)):
+                        parent.insert(index + offset, child)
+                    changed = True
+                    break
+                children = list(group)
+                if (len(children) != 1 or not set(attributes) <= set(INHERITED) | {'transform'}
+                        or children[0].get('id') in referenced):
+                    continue
+                child = children[0]
+                for attribute, value in attributes.items():
+                    if attribute == 'transform':
+                        child.set('transform', f"{value} {child.get('transform', '')}".strip())
+                    elif child.get(attribute) is None:
+                        child.set(attribute, value)
+                child.tail = group.tail
+                parent.remove(group)
+                parent.insert(index, child)
+                changed = True
+                break
+            if changed:
+                break
+
+
+def _round(root, precision):
+    """Rewrite path data and coordinates at the precision of their coordinate system."""
+    def visit(element, context, inner):
+        name = local(element.tag)
+        decimals = coordinate_decimals(context, element, precision)
+        if name == 'path' and element.get('d'):
+            try:
+                element.set('d', write_path(absolute_path(parse_path(element.get('d'))), decimals))
+            except ValueError:
+                pass
+        for attribute in NUMBER_ATTRIBUTES:
+            value = element.get(attribute)
+            if value is not None and element is not root and PLAIN_NUMBER.match(value):
+                element.set(attribute, format_number(float(value), decimals))
+        if element.get('points'):
+            numbers = NUMBER.findall(element.get('points'))
+            element.set('points', ' '.join(format_number(float(value), decimals) for value in numbers))
+        for attribute in COLOR_ATTRIBUTES:
+            if element.get(attribute):
+                element.set(attribute, short_color(element.get(attribute)))
+    walk(root, root_context(root), visit)
+
+
+def _strip_whitespace(root):
+    for parent in root.iter():
+        if local(parent.tag) in TEXT_CONTENT:
+            continue
+        if parent.text and not parent.text.strip():
+            parent.text = None
+        for child in parent:
+            if child.tail and not child.tail.strip():
+                child.tail = None
+
+
+def serialize(root):
+    ET.register_namespace('', SVG_NS)
+    ET.register_namespace('xlink', XLINK_NS)
+    text = ET.tostring(root, encoding='unicode')
+    # <path ... /> -> <path .../>; attribute values never contain a raw >
+    return (text.replace(' />', '/>') + '\n').encode('utf-8')
+
+
+def optimize(data, precision=PRECISION):
+    """Optimized bytes for an SVG document; raises NotEquivalent, ET.ParseError or ValueError."""
+    root = ET.fromstring(data)
+    if root.tag != SVG + 'svg':
+        raise ValueError('not an SVG document')
+    before = signature(root, precision)
+    optimized = copy.deepcopy(root)
+    keep_structure = has_stylesheet(optimized)
+    _clean(optimized, keep_structure)
+    if not keep_structure:
+        _remove_inherited(optimized)
+        _collapse_groups(optimized, referenced_ids(optimized))
+    _round(optimized, precision)
+    _strip_whitespace(optimized)
+    output = serialize(optimized)
+    compare(before, signature(ET.fromstring(output), precision))
+    return output
+
+
+class OptimizeCache:
+    """Optimized SVGs by the content hash of the original, for one precision."""
+
+    def __init__(self, precision, path=CACHE_FILE):
+        self.path = path
+        self.precision = precision
+        self.results = {}
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                cached = json.load(f)
+            if cached.get('version') == CACHE_VERSION and cached.get('precision') == precision:
+                self.results = cached['results']
+        except (OSError, ValueError, KeyError):
+            pass
+
+    def get(self, data):
+        """(optimized bytes or None, reason or None); None bytes with no reason means already optimal."""
+        digest = hashlib.sha256(data).hexdigest()
+        if digest not in self.results:
+            try:
+                output = optimize(data, self.precision)
+                if len(output) >= len(data):
+                    self.results[digest] = {'svg': None, 'reason': 'not smaller'}
+                else:
+                    self.results[digest] = {'svg': output.decode('utf-8'), 'reason': None}
+                    # The output is done too
+                    self.results[hashlib.sha256(output).hexdigest()] = {'svg': None, 'reason': None}
+            except (NotEquivalent, ET.ParseError, ValueError) as error:
+                self.results[digest] = {'svg': None, 'reason': str(error) or type(error).__name__}
+        result = self.results[digest]
+        return (result['svg'].encode('utf-8') if result['svg'] else None), result['reason']
+
+    def save(self):
+        with open(self.path, 'w', encoding='utf-8') as f:
+            json.dump({'version': CACHE_VERSION, 'precision': self.precision,
+                       'results': dict(sorted(self.results.items()))}, f, indent=1, ensure_ascii=False)
+            f.write('\n')
+
+
+def is_source_svg(path):
+    """Whether path is an SVG this stage may rewrite: not the sprite, not a fingerprinted copy."""
+    # Fingerprinted copies must keep the content their name was made from
+    return path.endswith('.svg') and path != SPRITE and not original_name(path) and os.path.isfile(path)
+
+
+def find_svgs():
+    """The SVGs in the asset directories, minus generated files."""
+    paths = []
+    for directory in ASSET_DIRS:
+        if not os.path.isdir(directory):
+            continue
+        for name in sorted(os.listdir(directory)):
+            path = f"{directory}/{name}"
+            if is_source_svg(path):
+                paths.append(path)
+    return paths
+
+
+def optimize_files(paths, precision=PRECISION, dry_run=False):
+    """
+    Optimize the given SVGs in place through the cache. Returns (optimized,
+    kept): [(path, bytes before, bytes after)] for the files that got
+    smaller, and [(path, reason)] for the files left as they are.
+    """
+    cache = OptimizeCache(precision)
+    optimized = []
+    kept = []
+    for path in paths:
+        with open(path, 'rb') as f:
+            data = f.read()
+        output, reason = cache.get(data)
+        if output is None:
+            if reason:
+                kept.append((path, reason))
+            continue
+        optimized.append((path, len(data), len(output)))
+        if not dry_run:
+            with open(path, 'wb') as f:
+                f.write(output)
+    if not dry_run:
+        cache.save()
+    return optimized, kept
+
+
+def optimize_localized(local_paths, dry_run=False):
+    """Optimize the SVGs among the local assets a replacer just pointed pages at, and report it."""
+    paths = sorted({os.path.normpath(path).replace(os.sep, '/') for path in local_paths})
+    optimized, kept = optimize_files([path for path in paths if is_source_svg(path)], dry_run=dry_run)
+    for path, before, after in optimized:
+        print(f"  🪶 {path}: {before / 1024:.1f} KB -> {after / 1024:.1f} KB")
+    for path, reason in kept:
+        print(f"  ⚠️  {path} kept as it is: {reason}")
+    return optimized
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Optimize the SVG files in place, checking each draws the same')
+    parser.add_argument('files', nargs='*', help='SVG files (default: every SVG in the asset directories)')
+    parser.add_argument('--project-root', default='.', help='Site root (default: current directory)')
+    parser.add_argument('--precision', type=int, default=PRECISION,
+                        help=f'Significant digits kept across the drawing (default: {PRECISION})')
+    parser.add_argument('--dry-run', action='store_true', help='Report without writing anything')
+    args = parser.parse_args()
+
+    os.chdir(args.project_root)
+    files = [os.path.normpath(path).replace(os.sep, '/') for path in args.files] or find_svgs()
+    print("🪶 Optimizing SVG files" + (" (dry run)" if args.dry_run else ""))
+    print("=" * 50)
+
+    before = after = sum(os.path.getsize(path) for path in files)
+    optimized, kept = optimize_files(files, args.precision, args.dry_run)
+    for path, size, new_size in optimized:
+        after -= size - new_size
+        print(f"  {path}: {size / 1024:.1f} KB -> {new_size / 1024:.1f} KB")
+    for path, reason in kept:
+        print(f"  ⚠️  {path} kept as it is: {reason}")
+    saving = (1 - after / before) * 100 if before else 0
+    print(f"  Files {'to optimize' if args.dry_run else 'optimized'}: {len(optimized)} of {len(files)}, "
+          f"{before / 1024:.1f} KB -> {after / 1024:.1f} KB ({saving:.0f}% smaller)")
+    if not args.dry_run:
+        print("\n✅ Done. Re-run build_icon_sprite.py so the sprite picks up the smaller icons.")
+    sys.exit(0)
+
+
+if __name__ == "__main__":
+    main()
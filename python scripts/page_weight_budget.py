@@ -0,0 +1,315 @@
+#!/usr/bin/env python3
+"""
+Report what each page costs to load and fail the build when it goes over budget.
+
+For every page this walks the resources a browser fetches for it, from the
+local files:
+
+- the HTML itself;
+- what update_urls.py extracts from it (href, src, srcset), so the report
+  sees the same URLs the localization scripts do, plus url() in <style>
+  blocks and style attributes;
+- the stylesheets' @imports, the @font-face files the page's elements use
+  and the CSS background images of rules matching them (the same analysis
+  as audit_render_blocking.py);
+- of a srcset, only the largest candidate: the one a high-density screen
+  downloads, and the worst case for the others.
+
+Links to other pages are navigation, not resources, and external URLs
+cannot be sized from disk, so neither is counted. Every file counts once
+per page, as one request. Compressed bytes are the gzip size for text
+formats (what the server sends with compression on) and the file size for
+formats that are already compressed.
+
+Totals are reported per page and per language tree (en, zh/), where the
+tree total counts each file once: what a visitor browsing the whole tree
+with a warm cache downloads. Each page is checked against the budgets
+(DEFAULT_BUDGETS, overridden per page pattern or tree by --budgets), and
+with --baseline against the numbers of an earlier run saved with
+--save-baseline, failing on growth above --tolerance percent. The exit
+status is 1 when anything is over, so the build can stop on a regression.
+
+A budgets file looks like:
+
+    {
+      "page": {"bytes_kb": 3000, "compressed_kb": 1500, "requests": 80},
+      "pages": {"speakers*.html": {"bytes_kb": 12000}},
+      "trees": {"zh": {"compressed_kb": 40000}}
+    }
+
+Usage:
+    python3 "python scripts/page_weight_budget.py"
+    python3 "python scripts/page_weight_budget.py" --budgets page_budgets.json --report page_weight_report.md
+    python3 "python scripts/page_weight_budget.py" --save-baseline .page_weight_baseline.json
+    python3 "python scripts/page_weight_budget.py" --baseline .page_weight_baseline.json --tolerance 5
+"""
+
+import os
+import sys
+import gzip
+import json
+import argparse
+from fnmatch import fnmatch
+from functools import lru_cache
+
+from site_partials import find_pages
+from asset_index import CSS_URL_PATTERN, normalize_target, resolve_asset
+from audit_render_blocking import PageAudit
+from update_urls import URLUpdater, ATTRIBUTE_BYTES
+
+# Per page; trees only have the limits given for them in the budgets file
+DEFAULT_BUDGETS = {
+    'page': {'bytes_kb': 4000, 'compressed_kb': 3000, 'requests': 60},
+}
+BUDGET_KEYS = ('bytes_kb', 'compressed_kb', 'requests')
+
+COMPRESSIBLE = {'.html', '.css', '.js', '.svg', '.json', '.txt', '.xml', '.ttf', '.otf', '.eot', '.ico'}
+KINDS = {
+    '.html': 'html', '.css': 'css', '.js': 'js',
+    '.woff': 'font', '.woff2': 'font', '.ttf': 'font', '.otf': 'font', '.eot': 'font',
+    '.png': 'image', '.jpg': 'image', '.jpeg': 'image', '.gif': 'image', '.svg': 'image',
+    '.webp': 'image', '.avif': 'image', '.ico': 'image',
+}
+
+
+@lru_cache(maxsize=None)
+def file_sizes(path):
+    """(bytes, compressed bytes) of a file."""
+    with open(path, 'rb') as f:
+        data = f.read()
+    if os.path.splitext(path)[1].lower() in COMPRESSIBLE:
+        return len(data), min(len(gzip.compress(data, 6)), len(data))
+    return len(data), len(data)
+
+
+def kind_of(path):
+    return KINDS.get(os.path.splitext(path)[1].lower(), 'other')
+
+
+def largest_srcset_candidates(data):
+    """({candidate urls that are not downloaded}) for every srcset: all but the widest candidate."""
+    skipped = set()
+    for match in ATTRIBUTE_BYTES.finditer(data):
+        if match.group(1).lower() != b'srcset':
+            continue
+        value = match.group(2) if match.group(2) is not None else match.group(3)
+        candidates = []
+        for item in value.split(b','):
+            parts = item.split()
+            if parts:
+                descriptor = parts[1].decode('ascii', 'replace') if len(parts) > 1 else '1x'
+                try:
+                    width = float(descriptor[:-1])
+                except ValueError:
+                    width = 0
+                candidates.append((width, parts[0].decode('utf-8', 'replace')))
+        candidates.sort()
+        skipped.update(url for _, url in candidates[:-1])
+    return skipped
+
+
+class PageWeight:
+    """The resources of one page: {project path: kind}, with their sizes."""
+
+    def __init__(self, page, resources):
+        self.page = page
+        self.resources = resources
+        self.bytes = sum(file_sizes(path)[0] for path in resources)
+        self.compressed = sum(file_sizes(path)[1] for path in resources)
+        self.requests = len(resources)
+
+    @property
+    def tree(self):
+        return 'zh' if self.page.startswith('zh/') else 'en'
+
+    def by_kind(self):
+        totals = {}
+        for path, kind in self.resources.items():
+            totals[kind] = totals.get(kind, 0) + file_sizes(path)[0]
+        return totals
+
+
+def page_resources(page, updater, sheets):
+    """{project path: kind} for everything the page loads, the page first."""
+    with open(page, 'rb') as f:
+        data = f.read()
+    resources = {page: 'html'}
+
+    def add(path, kind=None):
+        if path and path not in resources and os.path.isfile(path):
+            resources[path] = kind or kind_of(path)
+
+    skipped = largest_srcset_candidates(data)
+    urls = updater.extract_urls_mmap(page) - skipped
+    urls |= {next(group for group in match.groups() if group is not None).decode('utf-8', 'replace')
+             for match in CSS_URL_PATTERN.finditer(data)}
+    for url in sorted(urls):
+        path = resolve_asset(page, normalize_target(url))
+        if path and not path.endswith('.html'):
+            add(path)
+
+    audit = PageAudit(page, data, sheets)
+    for sheet in audit.sheets:
+        for imported in sheet.imports:
+            add(imported, 'css')
+    for face in audit.fonts:
+        add(face.path, 'font')
+    elements = {(element.name, frozenset(element.classes)) for element in (audit.body or audit.tree).iter()}
+    for sheet in audit.sheets:
+        for tag, classes, path in sheet.background_rules:
+            if any((tag is None or tag == name) and classes <= element_classes
+                   for name, element_classes in elements):
+                add(path, 'image')
+    return resources
+
+
+def load_budgets(path):
+    budgets = {'page': dict(DEFAULT_BUDGETS['page']), 'pages': {}, 'trees': {}}
+    if path:
+        with open(path, 'r', encoding='utf-8') as f:
+            custom = json.load(f)
+        budgets['page'].update(custom.get('page', {}))
+        budgets['pages'].update(custom.get('pages', {}))
+        budgets['trees'].update(custom.get('trees', {}))
+    return budgets
+
+
+def page_budget(budgets, page):
+    budget = dict(budgets['page'])
+    for pattern, override in budgets['pages'].items():
+        if fnmatch(page, pattern):
+            budget.update(override)
+    return budget
+
+
+def measures(bytes_total, compressed, requests):
+    return {'bytes_kb': bytes_total / 1024, 'compressed_kb': compressed / 1024, 'requests': requests}
+
+
+def over_budget(values, budget):
+    """[description] of every limit the values exceed."""
+    return [f"{key} {values[key]:.0f} > {budget[key]}" for key in BUDGET_KEYS
+            if key in budget and values[key] > budget[key]]
+
+
+def tree_totals(weights):
+    """{tree: (pages, unique bytes, unique compressed bytes, unique requests, largest page)}."""
+    trees = {}
+    for weight in weights:
+        trees.setdefault(weight.tree, []).append(weight)
+    totals = {}
+    for tree, members in sorted(trees.items()):
+        files = set().union(*(weight.resources for weight in members))
+        totals[tree] = (len(members), sum(file_sizes(path)[0] for path in files),
+                        sum(file_sizes(path)[1] for path in files), len(files),
+                        max(members, key=lambda weight: weight.bytes))
+    return totals
+
+
+def compare_baseline(weights, baseline, tolerance):
+    """[(page, description)] for pages that grew more than tolerance percent since the baseline."""
+    regressions = []
+    for weight in weights:
+        before = baseline.get(weight.page)
+        if not before:
+            continue
+        now = measures(weight.bytes, weight.compressed, weight.requests)
+        for key in BUDGET_KEYS:
+            if before[key] and now[key] > before[key] * (1 + tolerance / 100):
+                regressions.append((weight.page, f"{key} {before[key]:.0f} -> {now[key]:.0f} "
+                                                 f"(+{(now[key] / before[key] - 1) * 100:.0f}%)"))
+    return regressions
+
+
+def write_report(path, weights, totals, failures):
+    lines = [
+        '# Page weight',
+        '',
+        '| Tree | Pages | Unique KB | Unique KB gzip | Unique requests | Heaviest page |',
+        '|------|------:|----------:|---------------:|----------------:|---------------|',
+    ]
+    for tree, (pages, size, compressed, requests, heaviest) in totals.items():
+        lines.append(f"| {tree} | {pages} | {size / 1024:.0f} | {compressed / 1024:.0f} | {requests} | "
+                     f"{heaviest.page} ({heaviest.bytes / 1024:.0f} KB) |")
+    lines += [
+        '',
+        '| Page | KB | KB gzip | Requests | HTML KB | CSS KB | JS KB | Font KB | Image KB |',
+        '|------|---:|--------:|---------:|--------:|-------:|------:|--------:|---------:|',
+    ]
+    for weight in sorted(weights, key=lambda weight: -weight.bytes):
+        kinds = weight.by_kind()
+        lines.append(f"| {weight.page} | {weight.bytes / 1024:.0f} | {weight.compressed / 1024:.0f} | "
+                     f"{weight.requests} | " + ' | '.join(f"{kinds.get(kind, 0) / 1024:.0f}"
+                                                           for kind in ('html', 'css', 'js', 'font', 'image')) + ' |')
+    if failures:
+        lines += ['', '## Over budget', ''] + [f"- {name}: {description}" for name, description in failures]
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('\n'.join(lines) + '\n')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Per-page weight and request budgets')
+    parser.add_argument('pages', nargs='*', help='Pages to measure (default: every page of the site)')
+    parser.add_argument('--project-root', default='.', help='Site root (default: current directory)')
+    parser.add_argument('--budgets', help='JSON file with budgets (see the module docstring)')
+    parser.add_argument('--baseline', help='Fail on pages that grew since the numbers saved in this file')
+    parser.add_argument('--tolerance', type=float, default=5,
+                        help='Growth allowed over the baseline, in percent (default: 5)')
+    parser.add_argument('--save-baseline', help='Save the per-page numbers to this file')
+    parser.add_argument('--report', help='Write a markdown report to this file')
+    parser.add_argument('--top', type=int, default=10, help='Heaviest pages to list (default: 10)')
+    args = parser.parse_args()
+
+    os.chdir(args.project_root)
+    budgets = load_budgets(args.budgets)
+    pages = [os.path.normpath(page).replace(os.sep, '/') for page in args.pages] or find_pages('.')
+    print("⚖️  Measuring page weight")
+    print("=" * 50)
+
+    updater = URLUpdater('.')
+    sheets = {}
+    weights = [PageWeight(page, page_resources(page, updater, sheets)) for page in pages]
+
+    failures = []
+    for weight in weights:
+        values = measures(weight.bytes, weight.compressed, weight.requests)
+        failures += [(weight.page, problem) for problem in over_budget(values, page_budget(budgets, weight.page))]
+    totals = tree_totals(weights)
+    for tree, (count, size, compressed, requests, heaviest) in totals.items():
+        failures += [(f"{tree}/ tree", problem) for problem in
+                     over_budget(measures(size, compressed, requests), budgets['trees'].get(tree, {}))]
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            failures += compare_baseline(weights, json.load(f), args.tolerance)
+
+    print(f"  {'Tree':<6}{'Pages':>7}{'Unique MB':>12}{'gzip MB':>10}{'Requests':>10}")
+    for tree, (count, size, compressed, requests, heaviest) in totals.items():
+        print(f"  {tree:<6}{count:>7}{size / 1024 / 1024:>12.1f}{compressed / 1024 / 1024:>10.1f}{requests:>10}")
+    print(f"\n  Heaviest pages:")
+    for weight in sorted(weights, key=lambda weight: -weight.bytes)[:args.top]:
+        print(f"    {weight.bytes / 1024:8.0f} KB  {weight.compressed / 1024:7.0f} KB gzip  "
+              f"{weight.requests:4d} requests  {weight.page}")
+
+    if args.save_baseline:
+        with open(args.save_baseline, 'w', encoding='utf-8') as f:
+            json.dump({weight.page: measures(weight.bytes, weight.compressed, weight.requests)
+                       for weight in weights}, f, indent=1, sort_keys=True)
+            f.write('\n')
+        print(f"\n💾 Baseline saved to {args.save_baseline}")
+    if args.report:
+        write_report(args.report, weights, totals, failures)
+        print(f"\n📄 Report written to {args.report}")
+
+    if failures:
+        print(f"\n❌ {len(failures)} over budget:")
+        for name, description in failures[:25]:
+            print(f"  - {name}: {description}")
+        if len(failures) > 25:
+            print(f"  ... and {len(failures) - 25} more")
+        sys.exit(1)
+    print("\n✅ Every page is within budget.")
+    sys.exit(0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Write .gz and .br siblings next to the site's text files.
+
+A static server (or preview_server.py) can then send a compressed copy
+made once at the highest level instead of compressing on every request.
+For every HTML, CSS, JS, SVG, JSON, XML, text and font file of at least
+MIN_SIZE bytes this writes:
+
+- name.ext.gz with gzip at level 9;
+- name.ext.br with Brotli at quality 11, when the brotli package is
+  installed (pip install brotli); without it only .gz files are written.
+
+A sibling is only kept if it is at least MIN_SAVING smaller than the
+file, and is only rewritten when the file is newer than it, so re-running
+after a change compresses just what changed. Siblings whose file is gone
+are deleted, and --remove deletes them all.
+
+Usage:
+    python3 "python scripts/precompress_assets.py"
+    python3 "python scripts/precompress_assets.py" --dry-run
+    python3 "python scripts/precompress_assets.py" --remove
+"""
+
+import os
+import sys
+import gzip
+import argparse
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+from site_partials import SKIP_DIRS
+
+COMPRESSIBLE = {'.html', '.css', '.js', '.mjs', '.svg', '.json', '.xml', '.txt', '.ttf', '.otf', '.eot', '.ico'}
+MIN_SIZE = 1024
+# A sibling has to save at least this fraction of the file to be worth a lookup
+MIN_SAVING = 0.1
+
+ENCODINGS = {'.gz': 'gzip', '.br': 'br'}
+
+
+def compress(data, suffix):
+    if suffix == '.gz':
+        # mtime=0 keeps the output identical from one build to the next
+        return gzip.compress(data, 9, mtime=0)
+    return brotli.compress(data, quality=11)
+
+
+def iter_files(project_root):
+    for root, dirs, files in os.walk(project_root):
+        dirs[:] = [d for d in dirs if d not in SKIP_DIRS and not d.startswith('.')]
+        for name in files:
+            yield os.path.relpath(os.path.join(root, name), project_root).replace(os.sep, '/')
+
+
+def precompress(path, suffixes, dry_run=False):
+    """{suffix: (original bytes, compressed bytes, written)} for the siblings of one file."""
+    results = {}
+    stat = os.stat(path)
+    data = None
+    for suffix in suffixes:
+        sibling = path + suffix
+        if os.path.exists(sibling) and os.stat(sibling).st_mtime_ns >= stat.st_mtime_ns:
+            results[suffix] = (stat.st_size, os.path.getsize(sibling), False)
+            continue
+        if data is None:
+            with open(path, 'rb') as f:
+                data = f.read()
+        compressed = compress(data, suffix)
+        if len(compressed) > len(data) * (1 - MIN_SAVING):
+            # Not worth it; drop a sibling left from an earlier version of the file
+            if os.path.exists(sibling) and not dry_run:
+                os.remove(sibling)
+            continue
+        if not dry_run:
+            with open(sibling, 'wb') as f:
+                f.write(compressed)
+        results[suffix] = (len(data), len(compressed), True)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Write precompressed .gz/.br siblings of the text files')
+    parser.add_argument('--project-root', default='.', help='Site root (default: current directory)')
+    parser.add_argument('--remove', action='store_true', help='Delete every .gz/.br sibling instead')
+    parser.add_argument('--dry-run', action='store_true', help='Report without writing anything')
+    args = parser.parse_args()
+
+    os.chdir(args.project_root)
+    files = sorted(iter_files('.'))
+    siblings = [path for path in files if os.path.splitext(path)[1] in ENCODINGS
+                and os.path.splitext(os.path.splitext(path)[0])[1].lower() in COMPRESSIBLE]
+
+    if args.remove:
+        if not args.dry_run:
+            for path in siblings:
+                os.remove(path)
+        print(f"🧹 {'Would delete' if args.dry_run else 'Deleted'} {len(siblings)} precompressed files")
+        sys.exit(0)
+
+    suffixes = ['.gz'] + (['.br'] if brotli else [])
+    print("📦 Precompressing text files" + (" (dry run)" if args.dry_run else ""))
+    print("=" * 50)
+    if brotli is None:
+        print("  ⚠️  brotli is not installed (pip install brotli): writing .gz files only")
+
+    existing = set(files)
+    orphans = [path for path in siblings if os.path.splitext(path)[0] not in existing]
+    if not args.dry_run:
+        for path in orphans:
+            os.remove(path)
+
+    totals = {suffix: [0, 0, 0, 0] for suffix in suffixes}  # files, written, original bytes, compressed bytes
+    for path in files:
+        if os.path.splitext(path)[1].lower() not in COMPRESSIBLE or os.path.getsize(path) < MIN_SIZE:
+            continue
+        for suffix, (original, compressed, written) in precompress(path, suffixes, args.dry_run).items():
+            total = totals[suffix]
+            total[0] += 1
+            total[1] += written
+            total[2] += original
+            total[3] += compressed
+
+    for suffix, (count, written, original, compressed) in totals.items():
+        ratio = compressed / original * 100 if original else 0
+        print(f"  {ENCODINGS[suffix]:<5} {count:5d} files, {written:5d} {'to write' if args.dry_run else 'written'}: "
+              f"{original / 1024 / 1024:.1f} MB -> {compressed / 1024 / 1024:.1f} MB ({ratio:.0f}%)")
+    if orphans:
+        print(f"  {'Would delete' if args.dry_run else 'Deleted'} {len(orphans)} files whose original is gone")
+    if not args.dry_run:
+        print("\n✅ Done. Preview with preview_server.py to see the encodings served.")
+
+
+if __name__ == "__main__":
+    main()
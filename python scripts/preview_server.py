@@ -0,0 +1,292 @@
+#!/usr/bin/env python3
+"""
+Local preview server with realistic caching and compression.
+
+python -m http.server sends every file uncompressed, with no validators
+and no cache headers, so a local preview says nothing about transfer
+sizes or repeat visits. This asyncio server (standard library only)
+behaves like the production host should:
+
+- serves the .br/.gz siblings written by precompress_assets.py with the
+  matching Content-Encoding when the client accepts it (Vary:
+  Accept-Encoding), and the file itself otherwise;
+- sends a strong ETag per representation and answers If-None-Match with
+  304 Not Modified;
+- supports single byte ranges (Range, If-Range), answering 206 or 416;
+- marks fingerprinted files (name.<hash>.ext, see fingerprint_assets.py)
+  Cache-Control: public, max-age=31536000, immutable, and everything else
+  no-cache, so the browser revalidates it with the ETag;
+- maps / to index.html and clean URLs (/schedule) to the .html page;
+- logs method, path, status, encoding, bytes sent and latency for every
+  request, and a summary when stopped (Ctrl+C or SIGTERM).
+
+Usage:
+    python3 "python scripts/preview_server.py"
+    python3 "python scripts/preview_server.py" --port 8080 --project-root .
+    python3 "python scripts/preview_server.py" --log preview_requests.csv
+"""
+
+import os
+import re
+import sys
+import time
+import signal
+import asyncio
+import argparse
+import mimetypes
+from collections import Counter
+from email.utils import formatdate
+from urllib.parse import unquote, urlsplit
+
+from fingerprint_assets import FINGERPRINTED
+
+CHUNK_SIZE = 64 * 1024
+MAX_HEADER_BYTES = 64 * 1024
+IDLE_TIMEOUT = 30
+
+IMMUTABLE = 'public, max-age=31536000, immutable'
+REVALIDATE = 'no-cache'
+
+# Preferred first
+ENCODINGS = [('br', '.br'), ('gzip', '.gz')]
+TEXT_TYPES = re.compile(r'^(text/|application/(javascript|json|xml)|image/svg\+xml)')
+RANGE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+REASONS = {200: 'OK', 206: 'Partial Content', 304: 'Not Modified', 400: 'Bad Request', 403: 'Forbidden',
+           404: 'Not Found', 405: 'Method Not Allowed', 416: 'Range Not Satisfiable'}
+
+mimetypes.add_type('font/woff2', '.woff2')
+mimetypes.add_type('font/woff', '.woff')
+mimetypes.add_type('font/ttf', '.ttf')
+mimetypes.add_type('font/otf', '.otf')
+mimetypes.add_type('application/javascript', '.js')
+mimetypes.add_type('image/svg+xml', '.svg')
+mimetypes.add_type('image/webp', '.webp')
+mimetypes.add_type('image/avif', '.avif')
+
+
+def accepted_encodings(header):
+    """Content codings the client accepts (q > 0)."""
+    accepted = set()
+    for item in header.split(','):
+        name, _, params = item.strip().partition(';')
+        quality = re.search(r'q=([0-9.]+)', params)
+        if name and not (quality and float(quality.group(1)) == 0):
+            accepted.add(name.strip().lower())
+    return accepted
+
+
+def parse_range(header, size):
+    """(start, end inclusive) for a single-range header, None to ignore it, or 'unsatisfiable'."""
+    match = RANGE.match(header.strip())
+    if not match or not (match.group(1) or match.group(2)):
+        # Multiple ranges or other units: serve the whole file, which the spec allows
+        return None
+    first, last = match.group(1), match.group(2)
+    if not first:
+        length = int(last)
+        if length == 0:
+            return 'unsatisfiable'
+        return max(size - length, 0), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or end < start:
+        return 'unsatisfiable'
+    return start, end
+
+
+class PreviewServer:
+    def __init__(self, project_root, log_path=None, quiet=False):
+        self.root = os.path.realpath(project_root)
+        self.log_file = open(log_path, 'w', encoding='utf-8') if log_path else None
+        if self.log_file:
+            self.log_file.write('time,method,path,status,encoding,bytes,ms\n')
+        self.quiet = quiet
+        self.statuses = Counter()
+        self.encodings = Counter()
+        self.bytes_sent = 0
+        self.requests = 0
+        self.latency = 0.0
+
+    def resolve(self, target):
+        """Absolute path of the file a request target maps to, or None."""
+        path = unquote(urlsplit(target).path)
+        candidate = os.path.realpath(os.path.join(self.root, path.lstrip('/')))
+        if candidate != self.root and not candidate.startswith(self.root + os.sep):
+            return None
+        if os.path.isdir(candidate):
+            candidate = os.path.join(candidate, 'index.html')
+        elif not os.path.exists(candidate) and not os.path.splitext(candidate)[1]:
+            candidate += '.html'
+        return candidate if os.path.isfile(candidate) else None
+
+    def representation(self, path, headers):
+        """(file to send, content coding or None) for the client's Accept-Encoding."""
+        accepted = accepted_encodings(headers.get('accept-encoding', ''))
+        for coding, suffix in ENCODINGS:
+            if coding in accepted and os.path.isfile(path + suffix):
+                return path + suffix, coding
+        return path, None
+
+    async def handle(self, reader, writer):
+        try:
+            while True:
+                try:
+                    head = await asyncio.wait_for(reader.readuntil(b'\r\n\r\n'), IDLE_TIMEOUT)
+                except (asyncio.IncompleteReadError, asyncio.TimeoutError, ConnectionError):
+                    break
+                except asyncio.LimitOverrunError:
+                    await self.respond(writer, 'GET', '-', 400, {}, time.perf_counter())
+                    break
+                started = time.perf_counter()
+                lines = head.decode('latin-1').split('\r\n')
+                parts = lines[0].split()
+                if len(parts) != 3:
+                    await self.respond(writer, 'GET', '-', 400, {}, started)
+                    break
+                method, target, version = parts
+                headers = {}
+                for line in lines[1:]:
+                    name, _, value = line.partition(':')
+                    if name:
+                        headers[name.strip().lower()] = value.strip()
+                # A request body is never read, so only GET/HEAD connections can be reused
+                keep_alive = (method in ('GET', 'HEAD') and headers.get('connection', '').lower() != 'close'
+                              and (version == 'HTTP/1.1' or headers.get('connection', '').lower() == 'keep-alive'))
+                await self.serve(writer, method, target, headers, started, keep_alive)
+                if not keep_alive:
+                    break
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, writer, method, target, headers, started, keep_alive):
+        if method not in ('GET', 'HEAD'):
+            return await self.respond(writer, method, target, 405, {'Allow': 'GET, HEAD'}, started)
+        path = self.resolve(target)
+        if path is None:
+            return await self.respond(writer, method, target, 404, {}, started, body=b'Not Found\n')
+
+        content_type = mimetypes.guess_type(path)[0] or 'application/octet-stream'
+        if TEXT_TYPES.match(content_type):
+            content_type += '; charset=utf-8'
+        file_path, coding = self.representation(path, headers)
+        stat = os.stat(file_path)
+        etag = f'"{stat.st_size:x}-{stat.st_mtime_ns:x}{"-" + coding if coding else ""}"'
+        response = {
+            'Content-Type': content_type,
+            'ETag': etag,
+            'Last-Modified': formatdate(stat.st_mtime, usegmt=True),
+            'Cache-Control': IMMUTABLE if FINGERPRINTED.search(os.path.basename(path)) else REVALIDATE,
+            'Vary': 'Accept-Encoding',
+            'Accept-Ranges': 'bytes',
+            'Connection': 'keep-alive' if keep_alive else 'close',
+        }
+        if coding:
+            response['Content-Encoding'] = coding
+
+        if_none_match = headers.get('if-none-match')
+        if if_none_match and (if_none_match.strip() == '*'
+                              or etag in [tag.strip().removeprefix('W/') for tag in if_none_match.split(',')]):
+            return await self.respond(writer, method, target, 304, response, started, coding=coding)
+
+        start, end, status = 0, stat.st_size - 1, 200
+        requested = headers.get('range')
+        if requested and headers.get('if-range', etag) == etag:
+            byte_range = parse_range(requested, stat.st_size)
+            if byte_range == 'unsatisfiable':
+                response['Content-Range'] = f'bytes */{stat.st_size}'
+                return await self.respond(writer, method, target, 416, response, started, coding=coding)
+            if byte_range:
+                start, end = byte_range
+                status = 206
+                response['Content-Range'] = f'bytes {start}-{end}/{stat.st_size}'
+        return await self.respond(writer, method, target, status, response, started,
+                                  file_path=file_path, span=(start, end), coding=coding)
+
+    async def respond(self, writer, method, target, status, headers, started,
+                      body=b'', file_path=None, span=None, coding=None):
+        length = span[1] - span[0] + 1 if span else len(body)
+        if status == 304:
+            length = 0
+        lines = [f'HTTP/1.1 {status} {REASONS.get(status, "")}', f'Date: {formatdate(usegmt=True)}',
+                 'Server: preview_server.py']
+        lines += [f'{name}: {value}' for name, value in headers.items()]
+        if status != 304:
+            lines.append(f'Content-Length: {length}')
+        writer.write(('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1'))
+        sent = 0
+        if method != 'HEAD' and status != 304:
+            if file_path:
+                with open(file_path, 'rb') as f:
+                    f.seek(span[0])
+                    remaining = length
+                    while remaining > 0:
+                        chunk = f.read(min(CHUNK_SIZE, remaining))
+                        if not chunk:
+                            break
+                        writer.write(chunk)
+                        remaining -= len(chunk)
+                        sent += len(chunk)
+                        await writer.drain()
+            else:
+                writer.write(body)
+                sent = len(body)
+        await writer.drain()
+        self.log(method, target, status, coding, sent, time.perf_counter() - started)
+
+    def log(self, method, target, status, coding, sent, elapsed):
+        self.requests += 1
+        self.statuses[status] += 1
+        self.encodings[coding or 'identity'] += 1
+        self.bytes_sent += sent
+        self.latency += elapsed
+        if not self.quiet:
+            print(f"  {status} {method:<4} {target}  {coding or '-'}  {sent / 1024:.1f} KB  {elapsed * 1000:.1f} ms")
+        if self.log_file:
+            self.log_file.write(f'{time.time():.3f},{method},"{target}",{status},{coding or ""},{sent},'
+                                f'{elapsed * 1000:.2f}\n')
+            self.log_file.flush()
+
+    def summary(self):
+        print("\n" + "=" * 50)
+        print(f"  Requests: {self.requests}, sent {self.bytes_sent / 1024 / 1024:.2f} MB, "
+              f"mean latency {self.latency / max(self.requests, 1) * 1000:.1f} ms")
+        print("  Status: " + ', '.join(f"{status} ×{count}" for status, count in sorted(self.statuses.items())))
+        print("  Encoding: " + ', '.join(f"{coding} ×{count}" for coding, count in self.encodings.most_common()))
+        if self.log_file:
+            self.log_file.close()
+
+
+async def serve_forever(server, host, port):
+    listener = await asyncio.start_server(server.handle, host, port, limit=MAX_HEADER_BYTES)
+    print(f"🌐 Serving {server.root} on http://{host}:{port}/ (Ctrl+C to stop)")
+    print("=" * 50)
+    stopped = asyncio.Event()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        # SIGTERM too, so a preview started in the background still prints its summary
+        asyncio.get_running_loop().add_signal_handler(signum, stopped.set)
+    async with listener:
+        await stopped.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Preview the site with compression, ETags, ranges and cache headers')
+    parser.add_argument('--project-root', default='.', help='Site root (default: current directory)')
+    parser.add_argument('--host', default='127.0.0.1', help='Address to listen on (default: 127.0.0.1)')
+    parser.add_argument('--port', type=int, default=8000, help='Port (default: 8000)')
+    parser.add_argument('--log', help='Also write every request to this CSV file')
+    parser.add_argument('--quiet', action='store_true', help='Only print the summary')
+    args = parser.parse_args()
+
+    server = PreviewServer(args.project_root, args.log, args.quiet)
+    try:
+        asyncio.run(serve_forever(server, args.host, args.port))
+    finally:
+        server.summary()
+    sys.exit(0)
+
+
+if __name__ == "__main__":
+    main()
@@ -8,6 +8,13 @@ import os
 import re
 import glob
 
+from rewrite_engine import Rule, RewriteEngine, match_bound
+
+# An <img> tag longer than this is not the arrow icon; the bound lets large files be streamed
+MAX_IMG_TAG_LENGTH = 2048
+
+ARROW_SRC = r'src="../cdn\.prod\.website-files\.com/667a2b77418bcfe1656798ef/66c38565670de1ddefd5f1f8_Down\\-Line\\-\\-Streamline\\-Mingcute\\.svg"'
+
 def remove_down_arrow_images():
     """Remove all instances of the specific down arrow image element from HTML files."""
     
@@ -16,7 +23,17 @@ def remove_down_arrow_images():
     pattern = r'<img width="24" data-w-id="bb2779c9-c325-465d-6ca5-fef762764514" alt="" src="../cdn\.prod\.website-files\.com/667a2b77418bcfe1656798ef/66c38565670de1ddefd5f1f8_Down\\-Line\\-\\-Streamline\\-Mingcute\\.svg" loading="lazy"/>'
     
     # Alternative pattern for variations (without data-w-id or with different attributes)
-    alt_pattern = r'<img width="24"[^>]*src="../cdn\.prod\.website-files\.com/667a2b77418bcfe1656798ef/66c38565670de1ddefd5f1f8_Down\\-Line\\-\\-Streamline\\-Mingcute\\.svg"[^>]*/>'
+    # Each attribute gap gets the room a MAX_IMG_TAG_LENGTH tag leaves beside the
+    # fixed parts, so every tag up to that length matches and the rule's match
+    # bound (which streaming uses as its overlap) is computed from the pattern
+    fixed_length = match_bound(re.compile(rf'<img width="24"{ARROW_SRC}/>'))
+    gap = rf'[^>]{{0,{MAX_IMG_TAG_LENGTH - fixed_length}}}'
+    alt_pattern = rf'<img width="24"{gap}{ARROW_SRC}{gap}/>'
+    
+    engine = RewriteEngine([
+        Rule(pattern, '', name='exact'),
+        Rule(alt_pattern, '', name='variant'),
+    ])
     
     # Find all HTML files
     html_files = []
@@ -32,24 +49,11 @@ def remove_down_arrow_images():
     
     for file_path in html_files:
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-            
-            original_content = content
-            
-            # Remove instances matching the main pattern
-            content, count1 = re.subn(pattern, '', content)
-            
-            # Remove instances matching the alternative pattern
-            content, count2 = re.subn(alt_pattern, '', content)
-            
-            total_count = count1 + count2
+            # Remove instances matching the main pattern, then the alternative pattern
+            counts = engine.rewrite_file(file_path)
+            total_count = counts['exact'] + counts['variant']
             
             if total_count > 0:
-                # Write the modified content back to the file
-                with open(file_path, 'w', encoding='utf-8') as f:
-                    f.write(content)
-                
                 total_removed += total_count
                 files_modified += 1
                 print(f"Removed {total_count} instances from {file_path}")
@@ -2,33 +2,43 @@
 """
 Script to replace CDN logo URLs with localized versions.
 Replaces: ../cdn.prod.website-files.com/667a2b77418bcfe1656798ef/66c7dd4f6865e5012249f0d5_gosim-logo-32.svg
-With: images/66c7dd4f6865e5012249f0d5_gosim-logo-32.svg
+With: images/66c7dd4f6865e5012249f0d5_gosim-logo-32.svg (relative to each page)
 """
 
-import os
-import re
+import sys
 import glob
 from pathlib import Path
 
-def replace_logo_urls():
+from webflow_assets import WebflowAssetResolver
+from optimize_svgs import optimize_localized
+
+# Webflow asset ID of the GOSIM logo
+LOGO_ASSET_ID = '66c7dd4f6865e5012249f0d5'
+
+def replace_logo_urls(use_index=False):
     """
     Replace all instances of the CDN logo URL with the localized version.
+    With use_index, only the files the asset reference index lists as
+    referencing the logo are read and rewritten.
     """
-    # Define the patterns to search for and replace
-    old_patterns = [
-        r'\.\./cdn\.prod\.website-files\.com/667a2b77418bcfe1656798ef/66c7dd4f6865e5012249f0d5_gosim-logo-32\.svg',
-        r'\.\./cdn\.prod\.website-files\.com/667a2b77418bcfe1656798ef/66c7dd4f6865e5012249f0d5_gosim\\-logo\\-32\\.svg',
-        r'cdn\.prod\.website-files\.com/667a2b77418bcfe1656798ef/66c7dd4f6865e5012249f0d5_gosim-logo-32\.svg',
-        r'cdn\.prod\.website-files\.com/667a2b77418bcfe1656798ef/66c7dd4f6865e5012249f0d5_gosim\\-logo\\-32\\.svg'
-    ]
+    # Escaped (gosim\-logo\-32\.svg) and plain forms both resolve by asset ID
+    resolver = WebflowAssetResolver()
     
-    new_url = 'images/66c7dd4f6865e5012249f0d5_gosim-logo-32.svg'
-    
-    # Find all HTML files in the current directory and subdirectories
-    html_files = glob.glob('**/*.html', recursive=True)
+    index = None
+    if use_index:
+        from asset_index import AssetIndex
+        index = AssetIndex()
+        index.update()
+        html_files = [page for page in index.pages_with_url_containing(
+            'cdn.prod.website-files.com/667a2b77418bcfe1656798ef/66c7dd4f6865e5012249f0d5_gosim-logo-32.svg'
+        ) if page.endswith('.html')]
+    else:
+        # Find all HTML files in the current directory and subdirectories
+        html_files = glob.glob('**/*.html', recursive=True)
     
     total_replacements = 0
     files_modified = []
+    local_paths = set()
     
     print(f"Found {len(html_files)} HTML files to process...")
     
@@ -37,29 +47,31 @@ def replace_logo_urls():
             with open(file_path, 'r', encoding='utf-8') as f:
                 content = f.read()
             
-            original_content = content
-            file_replacements = 0
-            
-            # Apply each pattern replacement
-            for pattern in old_patterns:
-                matches = re.findall(pattern, content)
-                if matches:
-                    content = re.sub(pattern, new_url, content)
-                    file_replacements += len(matches)
-                    print(f"  Found {len(matches)} matches in {file_path} using pattern: {pattern}")
+            content, replacements, unresolved = resolver.localize(content, file_path, asset_ids={LOGO_ASSET_ID})
+            file_replacements = len(replacements)
+            if replacements:
+                print(f"  Found {file_replacements} matches in {file_path}")
             
             # Write back if content changed
-            if content != original_content:
+            if replacements:
                 with open(file_path, 'w', encoding='utf-8') as f:
                     f.write(content)
                 
                 files_modified.append(file_path)
                 total_replacements += file_replacements
+                local_paths.update(local_path for _, local_path in replacements)
                 print(f"✓ Modified {file_path} ({file_replacements} replacements)")
             
         except Exception as e:
             print(f"Error processing {file_path}: {e}")
     
+    if index:
+        index.update(files_modified)
+        index.close()
+    
+    # The logo the pages now load is optimized in the same run
+    optimize_localized(local_paths)
+    
     # Summary
     print(f"\n=== SUMMARY ===")
     print(f"Total files modified: {len(files_modified)}")
@@ -80,5 +92,5 @@ def replace_logo_urls():
 if __name__ == "__main__":
     print("Logo URL Replacement Script")
     print("=" * 40)
-    replace_logo_urls()
+    replace_logo_urls(use_index='--use-index' in sys.argv[1:])
     print("\nScript completed!")
@@ -6,29 +6,28 @@ This script finds all HTML files and replaces CDN URLs for social media icons
 with their corresponding local versions in the images directory.
 """
 
-import os
-import re
 import glob
-from pathlib import Path
 
-# Mapping of CDN URLs to local file names
-SOCIAL_MEDIA_MAPPINGS = {
-    # Hyperlink icon
-    r'\.\./cdn\.prod\.website-files\.com/667a2b77418bcfe1656798ef/66bf84acb0f469cc27b2fa33_Hyperlink\\-3\\-\\-Streamline\\-Ultimate\\.svg': 'images/66bf84acb0f469cc27b2fa33_Hyperlink-3--Streamline-Ultimate.svg',
-    
-    # LinkedIn icon
-    r'\.\./cdn\.prod\.website-files\.com/667a2b77418bcfe1656798ef/66bf853720980489a44c58e6_Linkedin\\-Logo\\-\\-Streamline\\-Ultimate\\.svg': 'images/66bf853720980489a44c58e6_Linkedin-Logo--Streamline-Ultimate.svg',
-    
-    # GitHub icon
-    r'\.\./cdn\.prod\.website-files\.com/667a2b77418bcfe1656798ef/66bf8563ca46328f7b53f91b_Github\\-Logo\\-1\\-\\-Streamline\\-Ultimate\\.svg': 'images/66bf8563ca46328f7b53f91b_Github-Logo-1--Streamline-Ultimate.svg',
-    
-    # X/Twitter icon
-    r'\.\./cdn\.prod\.website-files\.com/667a2b77418bcfe1656798ef/66bf857ffde6f20927495260_X\\-Logo\\-\\-Streamline\\-Ultimate\\.svg': 'images/66bf857ffde6f20927495260_X-Logo--Streamline-Ultimate.svg',
-    
-    # Mastodon icon (note: the CDN URL uses "mastadon" but local file uses "Mastodon")
-    r'\.\./cdn\.prod\.website-files\.com/667a2b77418bcfe1656798ef/66cbd1c3e2cabf9da01cb603_mastadon\\-logo\\.svg': 'images/66ad02e3059014c9b0de5e89_Mastodon-Logo-Fill--Streamline-Phosphor-Fill.svg',
+from webflow_assets import WebflowAssetResolver
+from optimize_svgs import optimize_localized
+
+# Webflow asset IDs of the social media icons, resolved to local files by ID
+SOCIAL_MEDIA_ASSET_IDS = {
+    '66bf84acb0f469cc27b2fa33': 'Hyperlink icon',
+    '66bf853720980489a44c58e6': 'LinkedIn icon',
+    '66bf8563ca46328f7b53f91b': 'GitHub icon',
+    '66bf857ffde6f20927495260': 'X/Twitter icon',
+    '66cbd1c3e2cabf9da01cb603': 'Mastodon icon',
 }
 
+# The speaker cards deliberately use the Streamline Mastodon icon rather than
+# the "mastadon" logo that the CDN URL points at
+SOCIAL_MEDIA_ALIASES = {
+    '66cbd1c3e2cabf9da01cb603': 'images/66ad02e3059014c9b0de5e89_Mastodon-Logo-Fill--Streamline-Phosphor-Fill.svg',
+}
+
+resolver = WebflowAssetResolver(aliases=SOCIAL_MEDIA_ALIASES)
+
 def replace_social_media_urls(file_path):
     """
     Replace social media SVG URLs in a single file.
@@ -37,35 +36,35 @@ def replace_social_media_urls(file_path):
         file_path (str): Path to the HTML file to process
         
     Returns:
-        tuple: (bool, int) - (whether file was modified, number of replacements made)
+        tuple: (bool, int, set) - (whether file was modified, number of replacements made,
+               local files the replacements point at)
     """
     try:
         with open(file_path, 'r', encoding='utf-8') as f:
             content = f.read()
         
-        original_content = content
-        total_replacements = 0
+        content, replacements, unresolved = resolver.localize(
+            content, file_path, asset_ids=set(SOCIAL_MEDIA_ASSET_IDS)
+        )
+        total_replacements = len(replacements)
         
-        # Apply each replacement pattern
-        for pattern, replacement in SOCIAL_MEDIA_MAPPINGS.items():
-            # Count matches before replacement
-            matches = re.findall(pattern, content)
-            if matches:
-                content = re.sub(pattern, replacement, content)
-                total_replacements += len(matches)
-                print(f"  - Replaced {len(matches)} instances of {pattern.split('/')[-1]}")
+        counts = {}
+        for external_url, local_path in replacements:
+            counts[local_path] = counts.get(local_path, 0) + 1
+        for local_path, count in counts.items():
+            print(f"  - Replaced {count} instances of {local_path.split('/')[-1]}")
         
         # Write back if content changed
-        if content != original_content:
+        if replacements:
             with open(file_path, 'w', encoding='utf-8') as f:
                 f.write(content)
-            return True, total_replacements
+            return True, total_replacements, set(counts)
         
-        return False, 0
+        return False, 0, set()
         
     except Exception as e:
         print(f"  Error processing {file_path}: {e}")
-        return False, 0
+        return False, 0, set()
 
 def main():
     """Main function to process all HTML files."""
@@ -82,20 +81,25 @@ def main():
     
     modified_files = 0
     total_replacements = 0
+    local_paths = set()
     
     # Process each file
     for file_path in sorted(html_files):
         print(f"Processing: {file_path}")
-        was_modified, replacements = replace_social_media_urls(file_path)
+        was_modified, replacements, icons = replace_social_media_urls(file_path)
         
         if was_modified:
             modified_files += 1
             total_replacements += replacements
+            local_paths.update(icons)
             print(f"  ✓ Modified with {replacements} replacements")
         else:
             print(f"  - No changes needed")
         print()
     
+    # Optimize the icons the pages now load
+    optimize_localized(local_paths)
+    
     # Summary
     print("=" * 50)
     print("SUMMARY")
@@ -106,9 +110,8 @@ def main():
     
     if modified_files > 0:
         print("\nReplacement mappings used:")
-        for pattern, replacement in SOCIAL_MEDIA_MAPPINGS.items():
-            filename = pattern.split('/')[-1].replace('\\', '')
-            print(f"  {filename} → {replacement}")
+        for asset_id, description in SOCIAL_MEDIA_ASSET_IDS.items():
+            print(f"  {description} ({asset_id}) → {resolver.resolve_id(asset_id)}")
 
 if __name__ == "__main__":
     main()
@@ -3,10 +3,22 @@
 Script to replace social media icon URLs in HTML files with local image paths.
 """
 
-import os
-import re
 import glob
-from pathlib import Path
+
+from rewrite_engine import Rule, RewriteEngine
+
+CDN_PREFIX = '../cdn.prod.website-files.com/667a2b77418bcfe1656798ef/'
+
+# Literal rules, so the engine can stream files of any size in constant memory
+SOCIAL_MEDIA_ENGINE = RewriteEngine([
+    # X (Twitter) logo replacement
+    Rule(CDN_PREFIX + '66ad02e384b9dea8d976b7cd_X-Logo-Fill--Streamline-Phosphor-Fill.svg',
+         'images/66bf857ffde6f20927495260_X-Logo--Streamline-Ultimate.svg', literal=True),
+    
+    # Mastodon logo replacement
+    Rule(CDN_PREFIX + '66ad02e3059014c9b0de5e89_Mastodon-Logo-Fill--Streamline-Phosphor-Fill.svg',
+         'images/66cbd1c3e2cabf9da01cb603_mastadon-logo.svg', literal=True),
+])
 
 def replace_urls_in_file(file_path):
     """
@@ -18,38 +30,16 @@ def replace_urls_in_file(file_path):
     Returns:
         tuple: (bool, int) - (was_modified, number_of_replacements)
     """
-    replacements = {
-        # X (Twitter) logo replacement
-        r'\.\./cdn\.prod\.website-files\.com/667a2b77418bcfe1656798ef/66ad02e384b9dea8d976b7cd_X-Logo-Fill--Streamline-Phosphor-Fill\.svg': 
-        'images/66bf857ffde6f20927495260_X-Logo--Streamline-Ultimate.svg',
-        
-        # Mastodon logo replacement
-        r'\.\./cdn\.prod\.website-files\.com/667a2b77418bcfe1656798ef/66ad02e3059014c9b0de5e89_Mastodon-Logo-Fill--Streamline-Phosphor-Fill\.svg': 
-        'images/66cbd1c3e2cabf9da01cb603_mastadon-logo.svg'
-    }
-    
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            content = f.read()
+        counts = SOCIAL_MEDIA_ENGINE.rewrite_file(file_path)
         
-        original_content = content
         total_replacements = 0
+        for name, count in counts.items():
+            if count:
+                total_replacements += count
+                print(f"  - Replaced {count} instance(s) of {name.split('/')[-1]}")
         
-        for pattern, replacement in replacements.items():
-            # Count matches before replacement
-            matches = re.findall(pattern, content)
-            if matches:
-                content = re.sub(pattern, replacement, content)
-                total_replacements += len(matches)
-                print(f"  - Replaced {len(matches)} instance(s) of {pattern.split('/')[-1]}")
-        
-        # Write back to file if changes were made
-        if content != original_content:
-            with open(file_path, 'w', encoding='utf-8') as f:
-                f.write(content)
-            return True, total_replacements
-        else:
-            return False, 0
+        return total_replacements > 0, total_replacements
             
     except Exception as e:
         print(f"  Error processing {file_path}: {e}")
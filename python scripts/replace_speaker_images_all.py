@@ -11,6 +11,8 @@ import urllib.parse
 from pathlib import Path
 import glob
 
+from webflow_assets import WebflowAssetResolver
+
 def extract_filename_from_url(url):
     """Extract the filename from a CDN URL."""
     # Remove the CDN domain and path, keep only the filename
@@ -22,27 +24,21 @@ def extract_filename_from_url(url):
         return filename
     return None
 
+_resolver = None
+
 def find_local_speaker_image(filename):
     """Find the corresponding local speaker image file."""
+    global _resolver
     speakers_dir = Path("images/speakers")
     if not speakers_dir.exists():
         print(f"Warning: {speakers_dir} directory not found")
         return None
     
-    # Look for exact match first
-    for ext in ['.jpg', '.jpeg', '.png', '.JPG', '.JPEG', '.PNG']:
-        potential_file = speakers_dir / filename
-        if potential_file.exists():
-            return str(potential_file)
+    # Index images/speakers once; lookups are by Webflow asset ID and normalized name
+    if _resolver is None:
+        _resolver = WebflowAssetResolver(asset_dirs=['images/speakers'])
     
-    # If no exact match, try to find by partial name
-    # Remove file extension and try to match
-    base_name = Path(filename).stem
-    for file_path in speakers_dir.glob("*"):
-        if base_name.lower() in file_path.stem.lower():
-            return str(file_path)
-    
-    return None
+    return _resolver.resolve_name(filename)
 
 def replace_speaker_images_in_file(html_file):
     """Replace external speaker image URLs with local paths in a single file."""
@@ -1,133 +1,79 @@
 #!/usr/bin/env python3
 """
 Script to replace external CDN image URLs with local asset paths in sponsors.html
+
+URLs are resolved by Webflow asset ID through webflow_assets.WebflowAssetResolver.
+Only the CDN references inside the page's sponsor sections (SPONSOR_SECTION_IDS:
+the partner logo wall and the become-a-sponsor block) are localized; the logo,
+favicon and social icons elsewhere on the page are left to their own replacers.
+A new sponsor logo only needs a local copy in images/.
 """
 
-import re
-import os
+from html_stream import build_tree
+from webflow_assets import WebflowAssetResolver
+from optimize_svgs import optimize_localized
+
+# ids of the <section> elements that hold the sponsor logos and sponsorship icons
+SPONSOR_SECTION_IDS = ('about', 'sponsor')
+
+def localize_sponsor_sections(content, page_path, resolver):
+    """
+    Localize the CDN references inside the sponsor sections of a page.
+
+    Returns (new_content, replacements, unresolved) like
+    WebflowAssetResolver.localize.
+    """
+    data = content.encode('utf-8')
+    sections = [
+        section for section in build_tree(data).find_all('section')
+        if section.attrs.get('id') in SPONSOR_SECTION_IDS
+    ]
+    missing = set(SPONSOR_SECTION_IDS) - {section.attrs['id'] for section in sections}
+    for section_id in sorted(missing):
+        print(f"Warning: {page_path} has no <section id=\"{section_id}\">")
+
+    pieces = []
+    replacements = []
+    unresolved = []
+    position = 0
+    for section in sections:
+        if section.start < position:
+            continue  # nested in a section already localized
+        pieces.append(data[position:section.start])
+        section_content, section_replacements, section_unresolved = resolver.localize(
+            data[section.start:section.end].decode('utf-8'), page_path
+        )
+        pieces.append(section_content.encode('utf-8'))
+        replacements.extend(section_replacements)
+        unresolved.extend(section_unresolved)
+        position = section.end
+    pieces.append(data[position:])
+    return b''.join(pieces).decode('utf-8'), replacements, unresolved
 
 def replace_image_urls():
-    # Define the mapping of external URLs to local paths
-    url_mapping = {
-        # CSDN Logo
-        '../cdn.prod.website-files.com/667a2b77418bcfe1656798ef/667c4f10c5b167f98e5d000f_64d465bcc7f9c0552d22bfe1_CSDN_Logo\.svg': 'images/667c4f10c5b167f98e5d000f_64d465bcc7f9c0552d22bfe1_CSDN_Logo.svg',
-        
-        # Futurewei
-        '../cdn.prod.website-files.com/667a2b77418bcfe1656798ef/667c4f10611c4fa11bf1752e_futurewei\.svg': 'images/667c4f10611c4fa11bf1752e_futurewei.svg',
-        
-        # Baai
-        '../cdn.prod.website-files.com/667a2b77418bcfe1656798ef/66fdb4c30a710ce82bc0223e_Baai\.png': 'images/66fdb4c30a710ce82bc0223e_Baai.png',
-        
-        # Airs
-        '../cdn.prod.website-files.com/667a2b77418bcfe1656798ef/66fdb4c3d6c2d2e8a3b7765e_airs\.png': 'images/66fdb4c3d6c2d2e8a3b7765e_airs.png',
-        
-        # Gitcode
-        '../cdn.prod.website-files.com/667a2b77418bcfe1656798ef/66fdb4c308dfce331d236e96_gitcode\.png': 'images/66fdb4c308dfce331d236e96_gitcode.png',
-        
-        # Khronos
-        '../cdn.prod.website-files.com/667a2b77418bcfe1656798ef/66fdb4c2110c0c318f4b6e4f_khronos\.png': 'images/66fdb4c2110c0c318f4b6e4f_khronos.png',
-        
-        # Non-covex
-        '../cdn.prod.website-files.com/667a2b77418bcfe1656798ef/66fdb4c2ab314ae4d3a62acc_non\-covex\.png': 'images/66fdb4c2ab314ae4d3a62acc_non-covex.png',
-        
-        # Relevant
-        '../cdn.prod.website-files.com/667a2b77418bcfe1656798ef/66fdb4c27f1631bf41acc236_relevant\.png': 'images/66fdb4c27f1631bf41acc236_relevant.png',
-        
-        # MeetKai
-        '../cdn.prod.website-files.com/667a2b77418bcfe1656798ef/66fdb4c3f6de0c8efb5133a3_MeetKai\.png': 'images/66fdb4c3f6de0c8efb5133a3_MeetKai.png',
-        
-        # Eclipse
-        '../cdn.prod.website-files.com/667a2b77418bcfe1656798ef/66fdb4c3cb0ae6961f113b12_eclipse\.png': 'images/66fdb4c3cb0ae6961f113b12_eclipse.png',
-        
-        # Rust Foundation
-        '../cdn.prod.website-files.com/667a2b77418bcfe1656798ef/66fdb4c3d65865f449e3f8b9_rustfoundation\.png': 'images/66fdb4c3d65865f449e3f8b9_rustfoundation.png',
-        
-        # Tweedegold
-        '../cdn.prod.website-files.com/667a2b77418bcfe1656798ef/66fdb4c28ce71f7045bd0451_tweedegold\.png': 'images/66fdb4c28ce71f7045bd0451_tweedegold.png',
-        
-        # Matrix
-        '../cdn.prod.website-files.com/667a2b77418bcfe1656798ef/66fdb4c2b54fd78d202a00fc_matrix\.png': 'images/66fdb4c2b54fd78d202a00fc_matrix.png',
-        
-        # Metaverse
-        '../cdn.prod.website-files.com/667a2b77418bcfe1656798ef/66fdb4c2e66529d6e47a258b_metaverse\.png': 'images/66fdb4c2e66529d6e47a258b_metaverse.png',
-        
-        # Moxin Logo
-        '../cdn.prod.website-files.com/667a2b77418bcfe1656798ef/66fdbc8df2556057c33f54e4_moxin\-logo\.svg': 'images/66fdbc8df2556057c33f54e4_moxin-logo.svg',
-        
-        # Wasmedge
-        '../cdn.prod.website-files.com/667a2b77418bcfe1656798ef/66fdb4c2cca869543d27f2f6_wasmedge\.png': 'images/66fdb4c2cca869543d27f2f6_wasmedge.png',
-        
-        # Trifecta
-        '../cdn.prod.website-files.com/667a2b77418bcfe1656798ef/66fdb4c25e27fbd31a1ae5e2_trifecta\.png': 'images/66fdb4c25e27fbd31a1ae5e2_trifecta.png',
-        
-        # Generative AI Commons
-        '../cdn.prod.website-files.com/667a2b77418bcfe1656798ef/66fdb4c3e60d3a7301acdd0b_generativeaicommons\.png': 'images/66fdb4c3e60d3a7301acdd0b_generativeaicommons.png',
-        
-        # Rust Week
-        '../cdn.prod.website-files.com/667a2b77418bcfe1656798ef/66fdb4c2260d08af5dbb2a6c_rust\-week\.png': 'images/66fdb4c2260d08af5dbb2a6c_rust-week.png',
-        
-        # Xlang
-        '../cdn.prod.website-files.com/667a2b77418bcfe1656798ef/66fdb4c2623706f37c98f5c7_Xlang\.png': 'images/66fdb4c2623706f37c98f5c7_Xlang.png',
-        
-        # Second State
-        '../cdn.prod.website-files.com/667a2b77418bcfe1656798ef/66fdb4c243cb17ec822eeaf8_second\-state\.svg': 'images/66fdb4c243cb17ec822eeaf8_second-state.svg',
-        
-        # OPU
-        '../cdn.prod.website-files.com/667a2b77418bcfe1656798ef/66fdb4c218572cc9c7a2f690_opu\.png': 'images/66fdb4c218572cc9c7a2f690_opu.png',
-        
-        # Silicon Flow
-        '../cdn.prod.website-files.com/667a2b77418bcfe1656798ef/66fdb4c243cb17ec822eeb50_silicon\-flow\.png': 'images/66fdb4c243cb17ec822eeb50_silicon-flow.png',
-        
-        # Kaiyuanshe
-        '../cdn.prod.website-files.com/667a2b77418bcfe1656798ef/66fdb4c36c6ef8c0637be898_kaiyuanshe\.png': 'images/66fdb4c36c6ef8c0637be898_kaiyuanshe.png',
-        
-        # LlamaEdge
-        '../cdn.prod.website-files.com/667a2b77418bcfe1656798ef/66fdb5eec8f0d1c66f2986af_llamaedge\-with\-black\.svg': 'images/66fdb5eec8f0d1c66f2986af_llamaedge-with-black.svg',
-        
-        # OpenBayes
-        '../cdn.prod.website-files.com/667a2b77418bcfe1656798ef/66fdb4c3f6de0c8efb5133ec_openbayes\.svg': 'images/66fdb4c3f6de0c8efb5133ec_openbayes.svg',
-        
-        # DeveloperG
-        '../cdn.prod.website-files.com/667a2b77418bcfe1656798ef/66fdb87dd94c2d1f6ea6d334_developerg\-3\.svg': 'images/66fdb87dd94c2d1f6ea6d334_developerg-3.svg',
-        
-        # Tsing
-        '../cdn.prod.website-files.com/667a2b77418bcfe1656798ef/66fdb7864a335ccb741ad517_tsing\.png': 'images/66fdb7864a335ccb741ad517_tsing.png',
-        
-        # Sponsor Image
-        '../cdn.prod.website-files.com/667a2b77418bcfe1656798ef/66c78bf07cb8d237c6ababe0_sponsor\-img\.png': 'images/66c78bf07cb8d237c6ababe0_sponsor-img.png',
-        
-        # AI New Spark Icon
-        '../cdn.prod.website-files.com/667a2b77418bcfe1656798ef/66a9a049355b9698c78c3227_Ai\-New\-Spark\-\-Streamline\-Plump\-Remix\.svg': 'images/66a9a049355b9698c78c3227_Ai-New-Spark--Streamline-Plump-Remix.svg',
-        
-        # Crown Icon
-        '../cdn.prod.website-files.com/667a2b77418bcfe1656798ef/66a9a068a74c0b0fb8290586_Crown\-\-Streamline\-Plump\-Remix\.svg': 'images/66a9a068a74c0b0fb8290586_Crown--Streamline-Plump-Remix.svg',
-    }
-    
+    resolver = WebflowAssetResolver()
+
     # Read the sponsors.html file
     with open('sponsors.html', 'r', encoding='utf-8') as file:
         content = file.read()
-    
-    # Track replacements
-    replacements_made = 0
-    
-    # Perform replacements
-    for external_url, local_path in url_mapping.items():
-        # Check if the local file exists
-        if os.path.exists(local_path):
-            # Use regex to replace the URL
-            pattern = re.escape(external_url)
-            if re.search(pattern, content):
-                content = re.sub(pattern, local_path, content)
-                replacements_made += 1
-                print(f"Replaced: {external_url} -> {local_path}")
-        else:
-            print(f"Warning: Local file not found: {local_path}")
-    
+
+    # Replace the CDN references in the sponsor sections that have a local copy (paths relative to sponsors.html)
+    content, replacements, unresolved = localize_sponsor_sections(content, 'sponsors.html', resolver)
+
+    for external_url, local_path in replacements:
+        print(f"Replaced: {external_url} -> {local_path}")
+
+    for external_url in unresolved:
+        print(f"Warning: Local file not found for: {external_url}")
+
     # Write the updated content back to the file
     with open('sponsors.html', 'w', encoding='utf-8') as file:
         file.write(content)
-    
-    print(f"\nTotal replacements made: {replacements_made}")
+
+    # Optimize the sponsor SVGs the page now loads
+    optimize_localized(local_path for _, local_path in replacements)
+
+    print(f"\nTotal replacements made: {len(replacements)}")
     print("sponsors.html has been updated successfully!")
 
 if __name__ == "__main__":
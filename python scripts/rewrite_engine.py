@@ -0,0 +1,295 @@
+#!/usr/bin/env python3
+"""
+Shared rewrite engine for the regex and literal replacers.
+
+A RewriteEngine applies an ordered list of Rules to a file, the same way the
+replacer scripts chain re.sub calls, in one of two modes:
+
+- in memory: the whole file is read and each rule is applied to the string;
+- streaming: the file is read in fixed-size windows and each rule runs as
+  its own stage over the stream, holding back an overlap as long as its
+  longest possible match so no match is ever split across a window
+  boundary. Output is identical to the in-memory mode and memory use is
+  constant however large the file is.
+
+Both modes leave line endings as they are in the file: CRLF stays CRLF, so a
+file gives the same bytes whichever mode rewrites it.
+
+Streaming needs every rule to have a bounded match length. Literal rules and
+patterns without unbounded repeats (* + {n,}) qualify; anchors, word
+boundaries and lookarounds depend on text outside the match, so patterns
+using them are only streamed when given an explicit max_length. Files whose
+rules cannot be streamed are rewritten in memory.
+
+    from rewrite_engine import Rule, RewriteEngine
+
+    engine = RewriteEngine([
+        Rule('../cdn.prod.website-files.com/667a2b77418bcfe1656798ef/logo.svg', 'images/logo.svg', literal=True),
+        Rule(r'\\\\-', '-'),
+    ])
+    counts = engine.rewrite_file('speakers.html')
+"""
+
+import os
+import re
+import sys
+import codecs
+import argparse
+
+try:
+    import re._parser as sre_parse
+except ImportError:  # Python < 3.11
+    import sre_parse
+
+CHUNK_SIZE = 1024 * 1024
+
+# Files larger than this are streamed when every rule allows it
+STREAM_THRESHOLD = 16 * 1024 * 1024
+
+# Opcodes whose outcome depends on text outside the match itself
+CONTEXT_OPCODES = {'AT', 'ASSERT', 'ASSERT_NOT', 'GROUPREF', 'GROUPREF_EXISTS'}
+
+
+def _op_name(op):
+    return getattr(op, 'name', str(op))
+
+
+def _depends_on_context(data):
+    for op, av in data:
+        name = _op_name(op)
+        if name in CONTEXT_OPCODES:
+            return True
+        if name in ('MAX_REPEAT', 'MIN_REPEAT', 'POSSESSIVE_REPEAT'):
+            if _depends_on_context(av[2]):
+                return True
+        elif name == 'SUBPATTERN':
+            if _depends_on_context(av[-1]):
+                return True
+        elif name == 'ATOMIC_GROUP':
+            if _depends_on_context(av):
+                return True
+        elif name == 'BRANCH':
+            if any(_depends_on_context(branch) for branch in av[1]):
+                return True
+    return False
+
+
+def match_bound(regex):
+    """Longest possible match of a compiled pattern, or None if unbounded or context-dependent."""
+    parsed = sre_parse.parse(regex.pattern, regex.flags)
+    if _depends_on_context(parsed.data):
+        return None
+    low, high = parsed.getwidth()
+    if low == 0 or high >= sre_parse.MAXREPEAT - 1:
+        # Empty matches would be found again at every window boundary
+        return None
+    return high
+
+
+class Rule:
+    """
+    One replacement: a regex (string or compiled) with an re.sub-style
+    replacement, or with literal=True a plain string replaced like
+    str.replace. max_length overrides the computed match bound.
+    """
+
+    def __init__(self, pattern, replacement, literal=False, flags=0, max_length=None, name=None):
+        if literal:
+            self.regex = re.compile(re.escape(pattern), flags)
+            self.replacement = lambda match, text=replacement: text
+        else:
+            self.regex = pattern if isinstance(pattern, re.Pattern) else re.compile(pattern, flags)
+            if callable(replacement):
+                self.replacement = replacement
+            else:
+                self.replacement = lambda match, template=replacement: match.expand(template)
+        self.name = name or (pattern if isinstance(pattern, str) else pattern.pattern)
+        self.max_length = max_length if max_length is not None else match_bound(self.regex)
+
+    def __repr__(self):
+        return f"Rule({self.name!r}, max_length={self.max_length})"
+
+    def apply(self, text, limit=None):
+        """
+        Replace matches that start before limit (all matches if None).
+
+        Returns (pieces, consumed, count): the rewritten pieces cover
+        text[:consumed], and the caller keeps text[consumed:] for the next
+        window.
+        """
+        pieces = []
+        position = 0
+        count = 0
+        for match in self.regex.finditer(text):
+            if limit is not None and match.start() >= limit:
+                break
+            pieces.append(text[position:match.start()])
+            pieces.append(self.replacement(match))
+            position = match.end()
+            count += 1
+        if limit is None:
+            consumed = len(text)
+        else:
+            consumed = max(position, limit)
+        pieces.append(text[position:consumed])
+        return pieces, consumed, count
+
+
+class RewriteEngine:
+    """Apply an ordered list of Rules to strings, streams or files."""
+
+    def __init__(self, rules):
+        self.rules = list(rules)
+
+    @property
+    def streamable(self):
+        """True if every rule has a bounded match length."""
+        return all(rule.max_length is not None for rule in self.rules)
+
+    def unstreamable_rules(self):
+        return [rule for rule in self.rules if rule.max_length is None]
+
+    def rewrite(self, text):
+        """Apply every rule to a whole string. Returns (new_text, {rule name: count})."""
+        counts = {}
+        for rule in self.rules:
+            pieces, _, count = rule.apply(text)
+            text = ''.join(pieces)
+            counts[rule.name] = counts.get(rule.name, 0) + count
+        return text, counts
+
+    def _stream_rule(self, rule, chunks, counts):
+        # A match starting before len(buffer) - max_length ends inside the buffer
+        overlap = rule.max_length
+        carry = ''
+        for chunk in chunks:
+            buffer = carry + chunk
+            if len(buffer) <= overlap:
+                carry = buffer
+                continue
+            pieces, consumed, count = rule.apply(buffer, len(buffer) - overlap)
+            counts[rule.name] = counts.get(rule.name, 0) + count
+            carry = buffer[consumed:]
+            yield ''.join(pieces)
+        pieces, _, count = rule.apply(carry)
+        counts[rule.name] = counts.get(rule.name, 0) + count
+        yield ''.join(pieces)
+
+    def rewrite_stream(self, source, output, chunk_size=CHUNK_SIZE, encoding='utf-8'):
+        """
+        Stream a binary file object through every rule into a binary output.
+        Returns {rule name: count}.
+        """
+        if not self.streamable:
+            names = ', '.join(rule.name for rule in self.unstreamable_rules())
+            raise ValueError(f"Rules without a bounded match length cannot be streamed: {names}")
+
+        decoder = codecs.getincrementaldecoder(encoding)()
+
+        def read_chunks():
+            while True:
+                data = source.read(chunk_size)
+                if not data:
+                    break
+                text = decoder.decode(data)
+                if text:
+                    yield text
+            tail = decoder.decode(b'', final=True)
+            if tail:
+                yield tail
+
+        counts = {}
+        chunks = read_chunks()
+        for rule in self.rules:
+            chunks = self._stream_rule(rule, chunks, counts)
+        for piece in chunks:
+            if piece:
+                output.write(piece.encode(encoding))
+        return counts
+
+    def rewrite_file(self, file_path, output_path=None, chunk_size=None, dry_run=False, encoding='utf-8'):
+        """
+        Rewrite a file in place (or into output_path). Streams when every rule
+        allows it and either chunk_size is given or the file is larger than
+        STREAM_THRESHOLD; otherwise rewrites in memory. Unchanged files are
+        not touched. Returns {rule name: count}.
+        """
+        output_path = output_path or file_path
+        stream = self.streamable and (chunk_size or os.path.getsize(file_path) > STREAM_THRESHOLD)
+
+        if not stream:
+            with open(file_path, 'r', encoding=encoding, newline='') as f:
+                content = f.read()
+            new_content, counts = self.rewrite(content)
+            if not dry_run and (new_content != content or output_path != file_path):
+                with open(output_path, 'w', encoding=encoding, newline='') as f:
+                    f.write(new_content)
+            return counts
+
+        if dry_run:
+            with open(file_path, 'rb') as source, open(os.devnull, 'wb') as sink:
+                return self.rewrite_stream(source, sink, chunk_size or CHUNK_SIZE, encoding)
+
+        temp_path = output_path + '.rewrite.tmp'
+        with open(file_path, 'rb') as source, open(temp_path, 'wb') as output:
+            counts = self.rewrite_stream(source, output, chunk_size or CHUNK_SIZE, encoding)
+        if any(counts.values()) or output_path != file_path:
+            os.replace(temp_path, output_path)
+        else:
+            os.remove(temp_path)
+        return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Apply literal and regex replacements to files, streaming large ones')
+    parser.add_argument('files', nargs='+', help='Files to rewrite')
+    parser.add_argument('--literal', nargs=2, action='append', default=[], metavar=('OLD', 'NEW'),
+                        help='Replace a literal string (repeatable)')
+    parser.add_argument('--regex', nargs=2, action='append', default=[], metavar=('PATTERN', 'REPLACEMENT'),
+                        help='Replace a regex with an re.sub template (repeatable, applied after literals)')
+    parser.add_argument('--chunk-size', type=int, help='Force streaming with windows of this many bytes')
+    parser.add_argument('--dry-run', action='store_true', help='Count replacements without writing')
+    parser.add_argument('--verify', action='store_true',
+                        help='Check that streaming and in-memory rewriting give identical output (writes nothing)')
+    args = parser.parse_args()
+
+    rules = [Rule(old, new, literal=True) for old, new in args.literal]
+    rules += [Rule(pattern, replacement) for pattern, replacement in args.regex]
+    if not rules:
+        parser.error('give at least one --literal or --regex rule')
+    engine = RewriteEngine(rules)
+
+    for rule in rules:
+        bound = (f"max match {rule.max_length}" if rule.max_length is not None
+                 else "unbounded or context-dependent (in-memory only)")
+        print(f"Rule {rule.name!r}: {bound}")
+    print("=" * 50)
+
+    if args.verify:
+        import io
+        if not engine.streamable:
+            parser.error('--verify needs every rule to be streamable')
+        mismatches = 0
+        for file_path in args.files:
+            with open(file_path, 'r', encoding='utf-8', newline='') as f:
+                expected, _ = engine.rewrite(f.read())
+            output = io.BytesIO()
+            with open(file_path, 'rb') as source:
+                engine.rewrite_stream(source, output, args.chunk_size or CHUNK_SIZE)
+            identical = output.getvalue().decode('utf-8') == expected
+            mismatches += not identical
+            print(f"  {'✓' if identical else '✗'} {file_path}")
+        sys.exit(1 if mismatches else 0)
+
+    total = 0
+    for file_path in args.files:
+        counts = engine.rewrite_file(file_path, chunk_size=args.chunk_size, dry_run=args.dry_run)
+        replaced = sum(counts.values())
+        total += replaced
+        if replaced:
+            print(f"  ✓ {file_path}: {replaced} replacements")
+    print(f"\nTotal replacements{' (dry run)' if args.dry_run else ''}: {total}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,689 @@
+#!/usr/bin/env python3
+"""
+Regenerate the speaker, session and speakers.html pages from the dataset.
+
+Works on the dataset written by speaker_dataset.py (data/site.json) and on
+one template per page kind and language in _templates/:
+
+    speaker.en.html  speaker.zh.html     speakers/<slug>.html, zh/speakers/<slug>.html
+    session.en.html  session.zh.html     schedules/<slug>.html, zh/schedules/<slug>.html
+    speakers.en.html speakers.zh.html    speakers.html, zh/speakers.html
+
+Templates use a small language that is compiled to Python once per run:
+
+    {{ speaker.name|html }}                         expression with an escaping filter
+    {% if speaker.links.github %}...{% else %}...{% endif %}
+    {% for session in sessions(speaker.sessions) %}...{% endfor %}
+    {{ relative_url(speaker.image)|attr }}          a project path as seen from the page
+    {% spell attr ["https://github.com/x", "https://github\\.com/x"] %}
+
+A record seen from a zh page reads its zh fields first (speaker.name is
+speaker.zh.name there), then the shared ones, then the English ones.
+
+`init` derives the templates from the current pages, using the same field
+bindings as the extractor: every bound span becomes an expression, and each
+conditional or repeated block is taken from the first page that shows it.
+The filter of each kind of field is the one that reproduces most pages; a
+value the pages consistently write some other way (a link the URL fixer
+scripts escaped on a few pages) gets a spell tag, which the filter uses for
+that exact value only, so the page regenerates as it is until it is edited.
+
+`build` is incremental. Rendering a page records every record it read -
+the speaker itself, each session on their session list, each speaker on a
+speakers.html tab - and the manifest keeps those dependencies with a hash
+of every record, so after editing one speaker only their own pages, the
+pages of their sessions and speakers.html are rebuilt. It also keeps a hash
+of each page as written, so a page changed or restored on disk since (a
+`git checkout` of older pages) is rendered again. `verify` fails on any
+difference, whitespace included, since build would rewrite such a page.
+
+    python3 "python scripts/speaker_dataset.py"            # pages -> data/site.json
+    python3 "python scripts/site_generator.py" init        # pages -> _templates/
+    python3 "python scripts/site_generator.py" verify      # regenerate in memory and compare
+    python3 "python scripts/site_generator.py" build       # rebuild pages whose data changed
+    python3 "python scripts/site_generator.py" build --all
+"""
+
+import os
+import re
+import sys
+import html
+import json
+import time
+import hashlib
+import argparse
+import urllib.parse
+
+from speaker_dataset import (
+    DATA_FILE, LANGUAGES, PAGE_KINDS, Value, Switch,
+    absolute_url, bind_page, decode, dropped_items, iter_pages, load_dataset, loop_gaps, page_path, relative_url,
+)
+
+TEMPLATES_DIR = '_templates'
+MANIFEST_FILE = 'manifest.json'
+
+MARKER = re.compile('\0([^\0]+)\0')
+
+
+class TemplateError(Exception):
+    pass
+
+
+def _attr(value):
+    return value.replace('&', '&amp;').replace('"', '&quot;')
+
+
+# How a field value is written back; init picks, per page kind and category,
+# the one that reproduces the most spans of the current pages
+FILTERS = {
+    'html': lambda value: html.escape(value, quote=True),
+    'text': lambda value: value.replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;'),
+    'attr': _attr,
+    'raw': lambda value: value,
+    'escaped': lambda value: re.sub(r'([.\-])', r'\\\1', value),
+    'escaped_attr': lambda value: re.sub(r'([.\-])', r'\\\1', _attr(value)),
+    'quoted': lambda value: _attr(urllib.parse.quote(value, safe="/:'()!*,;=@&$+~")),
+    # How the URL fixer scripts left some hreflang links: dashes before a dash or after a one-letter word
+    'dash_escaped': lambda value: re.sub(r'-(?=-)|(?<=-[^-])-', r'\\-', value),
+}
+
+CANDIDATE_FILTERS = {
+    'text': ['html', 'text'],
+    'attr': ['attr', 'html', 'escaped_attr'],
+    'url': ['attr', 'quoted'],
+    'link': ['attr', 'html', 'escaped_attr'],
+    'slug': ['raw', 'escaped', 'dash_escaped'],
+    'alternate': ['raw', 'escaped', 'dash_escaped'],
+}
+
+
+def _filter(name, value, spellings):
+    """Apply a filter, unless the template spells this value out."""
+    return spellings.get((name, value)) or FILTERS[name](value)
+
+
+# --- template language -----------------------------------------------------
+
+def _tags(source):
+    """
+    Yield (start, end, expression, statement) for every {{ ... }} and
+    {% ... %} tag, left to right. The closing found for one opening is
+    reused by the openings before it, so the scan stays linear.
+    """
+    closings = {}
+    position = 0
+    while True:
+        start = source.find('{', position)
+        if start < 0:
+            return
+        opener = source[start + 1:start + 2]
+        if opener not in ('{', '%'):
+            position = start + 1
+            continue
+        closing = '}}' if opener == '{' else '%}'
+        end = closings.get(closing)
+        if end is None or -1 < end < start + 2:
+            end = closings[closing] = source.find(closing, start + 2)
+        if end < 0:
+            position = start + 1
+            continue
+        inner = source[start + 2:end]
+        yield (start, end + 2, inner, None) if opener == '{' else (start, end + 2, None, inner)
+        position = end + 2
+
+
+def compile_template(source, name='<template>'):
+    """Compile template source to a code object that appends to _out."""
+    lines = ['_w = _out.append', '_spellings = {}']
+    stack = []
+    position = 0
+
+    def emit(line):
+        lines.append('    ' * len(stack) + line)
+
+    for start, end, tag_expression, tag_statement in _tags(source):
+        if start > position:
+            emit(f"_w({source[position:start]!r})")
+        position = end
+        if tag_expression is not None:
+            expression, *filters = [part.strip() for part in tag_expression.split('|')]
+            code = f"_str({expression})"
+            for filter_name in filters:
+                if filter_name not in FILTERS:
+                    raise TemplateError(f"{name}: unknown filter {filter_name!r}")
+                code = f"_filter({filter_name!r}, {code}, _spellings)"
+            emit(f"_w({code})")
+            continue
+
+        statement = tag_statement.strip()
+        keyword = statement.split(None, 1)[0] if statement else ''
+        if keyword in ('if', 'for'):
+            emit(statement + ':')
+            stack.append(keyword)
+        elif keyword == 'else':
+            if not stack or stack[-1] != 'if':
+                raise TemplateError(f"{name}: {{% else %}} outside {{% if %}}")
+            emit('pass')
+            stack.pop()
+            emit('else:')
+            stack.append('else')
+        elif keyword == 'spell':
+            # {% spell filter ["value", "as written"] %}
+            try:
+                filter_name, spelling = statement.split(None, 2)[1:]
+                value, written = json.loads(spelling)
+            except ValueError:
+                raise TemplateError(f"{name}: malformed {{% {statement} %}}") from None
+            emit(f"_spellings[({filter_name!r}, {value!r})] = {written!r}")
+        elif keyword in ('endif', 'endfor'):
+            opened = stack[-1] if stack else None
+            if opened is None or (keyword == 'endif') != (opened in ('if', 'else')):
+                raise TemplateError(f"{name}: unexpected {{% {keyword} %}}")
+            emit('pass')
+            stack.pop()
+        else:
+            raise TemplateError(f"{name}: unknown tag {{% {statement} %}}")
+    if position < len(source):
+        emit(f"_w({source[position:]!r})")
+    if stack:
+        raise TemplateError(f"{name}: unclosed {{% {stack[-1]} %}}")
+    try:
+        return compile('\n'.join(lines), name, 'exec')
+    except SyntaxError as e:
+        raise TemplateError(f"{name}: {e.msg} in {e.text!r}") from None
+
+
+def _str(value):
+    if value is None or isinstance(value, RecordView):
+        return ''
+    return str(value)
+
+
+class RecordView:
+    """
+    Attribute access to a record as seen from one language: the language's
+    own fields first, then shared fields, then the first language's.
+    """
+
+    __slots__ = ('_record', '_lang', '_path')
+
+    def __init__(self, record, lang, path=()):
+        self._record = record
+        self._lang = lang
+        self._path = path
+
+    def _resolve(self, path):
+        for base in (self._record.get(self._lang), self._record, self._record.get(LANGUAGES[0])):
+            value = base
+            for part in path:
+                if not isinstance(value, dict) or part not in value:
+                    value = None
+                    break
+                value = value[part]
+            if value is not None:
+                return value
+        return None
+
+    def __getattr__(self, name):
+        value = self._resolve(self._path + (name,))
+        if isinstance(value, dict):
+            return RecordView(self._record, self._lang, self._path + (name,))
+        return '' if value is None else value
+
+    def __bool__(self):
+        return bool(self._resolve(self._path))
+
+
+class RenderContext:
+    """Template helpers for one page; records every record the page reads."""
+
+    def __init__(self, dataset, lang):
+        self.dataset = dataset
+        self.lang = lang
+        self.deps = set()
+
+    def record(self, kind, record_id):
+        self.deps.add(f"{kind}/{record_id}")
+        record = self.dataset.get(kind, {}).get(record_id)
+        return None if record is None else RecordView(record, self.lang)
+
+    def records(self, kind, ids):
+        """Views of the records; a null id (an item the page left out) stays in its place as None."""
+        views = []
+        for record_id in ids or []:
+            view = None if record_id is None else self.record(kind, record_id)
+            if view is not None or record_id is None:
+                views.append(view)
+        return views
+
+    def tab(self, name):
+        """Speaker slugs on a speakers.html tab in the page's language."""
+        self.deps.add(f"speaker_index/{self.lang}")
+        return self.dataset.get('speaker_index', {}).get(self.lang, {}).get(name, [])
+
+    def namespace(self, kind, slug):
+        page = {'slug': slug, 'lang': self.lang}
+        path = page_path(kind, self.lang, slug)
+        namespace = {
+            '_str': _str,
+            '_filter': _filter,
+            'page': RecordView(page, self.lang),
+            'relative_url': lambda value: relative_url(value, path),
+            'absolute_url': lambda value: absolute_url(value, path),
+            'speakers': lambda ids: self.records('speakers', ids),
+            'sessions': lambda ids: self.records('sessions', ids),
+            'tab': self.tab,
+            'us_date': us_date,
+        }
+        if kind.var in ('speaker', 'session'):
+            namespace[kind.var] = self.record(kind.record_kind, slug)
+        return namespace
+
+
+def us_date(value):
+    """'2024-10-17' -> '10.17.2024', as speaker pages show session dates."""
+    year, month, day = (value.split('-') + ['', '', ''])[:3]
+    return f"{month}.{day}.{year}" if day else value
+
+
+# --- deriving templates from pages -----------------------------------------
+
+class Derivation:
+    """Collects the template of one page kind and language from its pages."""
+
+    def __init__(self, kind, lang, dataset):
+        self.kind = kind
+        self.lang = lang
+        self.dataset = dataset
+        self.page = None
+        self.top = None
+        self.slots = {}        # (name, part) -> template text with markers
+        self.dropping = set()  # loops some page leaves items out of
+        self.blocks = {}       # name -> ('if', cond) or ('for', var, expr)
+        self.samples = {}      # category -> [(written, value the filter is given)]
+        self.slug_pattern = None
+        self.slug_votes = {}   # occurrence of the page slug -> {filter: pages it matches}
+
+    def add_page(self, data, bindings, slug):
+        self.page = page_path(self.kind, self.lang, slug)
+        if self.kind.var in ('speaker', 'session'):
+            # The page's own slug in links and attributes, in any of its escaped forms
+            self.slug_forms = {}
+            for name in CANDIDATE_FILTERS['slug']:
+                self.slug_forms.setdefault(FILTERS[name](slug), []).append(name)
+            forms = sorted(map(re.escape, self.slug_forms), key=len, reverse=True)
+            self.slug_pattern = re.compile(r'(?<=[/"])(' + '|'.join(forms) + r')(?=\\?\.html|")')
+            self.slug_count = 0
+        text = self.region(data, bindings, 0, len(data))
+        if self.top is None:
+            self.top = text
+
+    def literal(self, text):
+        text = text.replace('{{', "{{ '{{' }}").replace('{%', "{{ '{%' }}")
+        if self.slug_pattern is None:
+            return text
+
+        def replace(match):
+            # Each occurrence keeps the escaping most pages use at that position
+            votes = self.slug_votes.setdefault(self.slug_count, {})
+            for name in self.slug_forms[match.group(1)]:
+                votes[name] = votes.get(name, 0) + 1
+            self.slug_count += 1
+            return f"\0slug:{self.slug_count - 1}\0"
+        return self.slug_pattern.sub(replace, text)
+
+    def region(self, data, bindings, start, end):
+        parts = []
+        position = start
+        for binding in sorted(bindings, key=lambda binding: binding.start):
+            parts.append(self.literal(data[position:binding.start].decode('utf-8')))
+            parts.append(self.binding(data, binding))
+            position = binding.end
+        parts.append(self.literal(data[position:end].decode('utf-8')))
+        return ''.join(parts)
+
+    def binding(self, data, binding):
+        if isinstance(binding, Value):
+            written = data[binding.start:binding.end].decode('utf-8')
+            self.samples.setdefault(binding.category, []).append((written, self.filter_input(data, binding)))
+            if binding.code:
+                return binding.code
+            return f"{{{{ {binding.expression}|@{binding.category} }}}}"
+
+        if isinstance(binding, Switch):
+            self.blocks[binding.name] = ('if', binding.cond)
+            self.slots.setdefault((binding.name, binding.on),
+                                  self.region(data, binding.children, binding.start, binding.end))
+            return f"\0{binding.name}\0"
+
+        self.blocks[binding.name] = ('for', binding.var, binding.expr)
+        # Without the blank lines of left-out items, the whitespace is the same before every item
+        gaps = []
+        for gap in loop_gaps(data, binding):
+            dropped = dropped_items(gap)
+            if dropped:
+                self.dropping.add(binding.name)
+            gaps.append(gap[dropped:].decode('utf-8'))
+        if binding.items:
+            first = binding.items[0]
+            self.slots.setdefault((binding.name, 'sep'), self.literal(gaps[0]))
+            self.slots.setdefault((binding.name, 'body'), self.region(data, first.children, first.start, first.end))
+            self.slots.setdefault((binding.name, 'trail'), self.literal(gaps[-1]))
+            for item in binding.items[1:]:
+                self.region(data, item.children, item.start, item.end)
+        return f"\0{binding.name}\0"
+
+    def filter_input(self, data, binding):
+        """The value the template will hand the span's filter on this page."""
+        value = decode(binding.category, data[binding.start:binding.end])
+        if binding.category in ('url', 'link') and binding.record:
+            # Paths and links are stored once and written relative to each page
+            record_kind, record_id = binding.record
+            record = self.dataset.get(record_kind, {}).get(record_id)
+            stored = RecordView(record, self.lang)._resolve(binding.key) if record else None
+            if isinstance(stored, str):
+                value = (relative_url if binding.category == 'url' else absolute_url)(stored, self.page)
+        return value
+
+    def choose_filters(self):
+        """Per category, the filter that reproduces the most spans."""
+        chosen = {}
+        for category, candidates in CANDIDATE_FILTERS.items():
+            samples = self.samples.get(category, [])
+            chosen[category] = max(candidates, key=lambda name: (
+                sum(FILTERS[name](value) == written for written, value in samples), -candidates.index(name)))
+        return chosen
+
+    def slot(self, name, part):
+        if (name, part) in self.slots:
+            return self.slots[(name, part)]
+        # Cards in every tab share their markup apart from Webflow ids
+        suffix = name.split('.', 1)[-1]
+        for (other, other_part), text in self.slots.items():
+            if other_part == part and other.split('.', 1)[-1] == suffix:
+                return text
+        return None
+
+    def expand(self, text, single):
+        def replace(match):
+            name = match.group(1)
+            if name.startswith('slug:'):
+                votes = self.slug_votes[int(name[5:])]
+                best = max(CANDIDATE_FILTERS['slug'], key=lambda candidate: votes.get(candidate, 0))
+                return '{{ page.slug }}' if best == 'raw' else f"{{{{ page.slug|{best} }}}}"
+            block = self.blocks[name]
+            if block[0] == 'if':
+                on, off = self.slot(name, True), self.slot(name, False)
+                if on is None or off is None:
+                    # Every page shows the same form, so there is nothing to switch on
+                    single.append(f"{name} ({'off' if on is None else 'on'})")
+                    return self.expand(on if off is None else off, single)
+                return (f"{{% if {block[1]} %}}" + self.expand(on, single) +
+                        "{% else %}" + self.expand(off, single) + "{% endif %}")
+            body = self.slot(name, 'sep') + self.slot(name, 'body')
+            if name in self.dropping:
+                # An item the page left out is only its blank line
+                body = f"{{% if {block[1]} is None %}}\n{{% else %}}" + body + "{% endif %}"
+            return (f"{{% for {block[1]} in {block[2]} %}}" + self.expand(body, single) +
+                    "{% endfor %}" + self.expand(self.slot(name, 'trail'), single))
+        return MARKER.sub(replace, text)
+
+    def spellings(self, filters):
+        """
+        {(filter, value): written} for the values the pages write some other
+        way than the chosen filter would, more often than not.
+        """
+        forms = {}
+        for category, samples in self.samples.items():
+            name = filters[category]
+            for written, value in samples:
+                forms.setdefault((name, value), {}).setdefault(written, 0)
+                forms[(name, value)][written] += 1
+        spellings = {}
+        for (name, value), counts in sorted(forms.items()):
+            written = max(counts, key=counts.get)
+            if written != FILTERS[name](value) and counts[written] > counts.get(FILTERS[name](value), 0):
+                spellings[(name, value)] = written
+        return spellings
+
+    def template(self):
+        """(template source, filters, [conditional blocks every page shows in one form])"""
+        single = []
+        filters = self.choose_filters()
+        source = self.expand(self.top, single)
+        source = re.sub(r'\|@(\w+) \}\}', lambda match: f"|{filters[match.group(1)]} }}}}", source)
+        # '%' is escaped so no spelling can end its tag early
+        spells = ''.join(
+            '{% spell ' + name + ' ' + json.dumps([value, written], ensure_ascii=False).replace('%', '\\u0025') + ' %}'
+            for (name, value), written in self.spellings(filters).items())
+        return spells + source, filters, single
+
+
+def template_name(kind, lang):
+    return f"{kind.name}.{lang}.html"
+
+
+def derive_templates(project_root='.', data_file=DATA_FILE):
+    """Return {template name: (source, filters, missing)} derived from the current pages."""
+    dataset = load_dataset(os.path.join(project_root, data_file))
+    derivations = {}
+    for kind, lang, slug, path in iter_pages(project_root):
+        with open(path, 'rb') as f:
+            data = f.read()
+        _, bindings = bind_page(kind, lang, slug, data)
+        derivation = derivations.setdefault(template_name(kind, lang), Derivation(kind, lang, dataset))
+        derivation.add_page(data, bindings, slug)
+    return {name: derivation.template() for name, derivation in derivations.items()}
+
+
+# --- building --------------------------------------------------------------
+
+def _hash(value):
+    return hashlib.sha256(json.dumps(value, sort_keys=True, ensure_ascii=False).encode('utf-8')).hexdigest()
+
+
+class SiteGenerator:
+    """Render pages from a dataset and templates, tracking what each page read."""
+
+    def __init__(self, project_root='.', data_file=DATA_FILE, templates_dir=TEMPLATES_DIR):
+        self.project_root = project_root
+        self.dataset = load_dataset(os.path.join(project_root, data_file))
+        self.templates_dir = os.path.join(project_root, templates_dir)
+        self.manifest_path = os.path.join(self.templates_dir, MANIFEST_FILE)
+        self.compiled = {}
+        self.template_hashes = {}
+        self.compile_seconds = 0.0
+
+    def template(self, name):
+        if name not in self.compiled:
+            path = os.path.join(self.templates_dir, name)
+            with open(path, 'r', encoding='utf-8') as f:
+                source = f.read()
+            start = time.perf_counter()
+            self.compiled[name] = compile_template(source, path)
+            self.compile_seconds += time.perf_counter() - start
+            self.template_hashes[name] = hashlib.sha256(source.encode('utf-8')).hexdigest()
+        return self.compiled[name]
+
+    def pages(self):
+        """Yield (kind, lang, slug, path) for every page the dataset describes."""
+        for kind in PAGE_KINDS:
+            for lang in LANGUAGES:
+                if not os.path.exists(os.path.join(self.templates_dir, template_name(kind, lang))):
+                    continue
+                if kind.record_kind == 'speaker_index':
+                    if lang in self.dataset.get('speaker_index', {}):
+                        yield kind, lang, lang, page_path(kind, lang, lang)
+                    continue
+                for slug, record in self.dataset.get(kind.record_kind, {}).items():
+                    if lang in record.get('pages', []):
+                        yield kind, lang, slug, page_path(kind, lang, slug)
+
+    def render(self, kind, lang, slug):
+        """Return (page text, sorted record ids the page read)."""
+        context = RenderContext(self.dataset, lang)
+        namespace = context.namespace(kind, slug)
+        namespace['_out'] = out = []
+        exec(self.template(template_name(kind, lang)), namespace)
+        return ''.join(out), sorted(context.deps)
+
+    def record_hashes(self):
+        hashes = {}
+        for kind in ('speakers', 'sessions', 'speaker_index'):
+            for record_id, record in self.dataset.get(kind, {}).items():
+                hashes[f"{kind}/{record_id}"] = _hash(record)
+        return hashes
+
+    def load_manifest(self):
+        try:
+            with open(self.manifest_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {'templates': {}, 'records': {}, 'pages': {}}
+
+    def build(self, rebuild_all=False, dry_run=False):
+        """Render the pages whose template or records changed. Returns (written, unchanged, skipped)."""
+        manifest = self.load_manifest()
+        records = self.record_hashes()
+        changed_records = {record_id for record_id, digest in records.items()
+                           if manifest['records'].get(record_id) != digest}
+        changed_records |= set(manifest['records']) - set(records)
+
+        written, unchanged, skipped = [], [], []
+        pages = {}
+        for kind, lang, slug, path in self.pages():
+            name = template_name(kind, lang)
+            self.template(name)
+            previous = manifest['pages'].get(path)
+            output = os.path.join(self.project_root, path)
+            try:
+                with open(output, 'r', encoding='utf-8') as f:
+                    current = f.read()
+            except OSError:
+                current = None
+            # The page on disk has to be the one the last build left, not just its inputs unchanged
+            stale = (rebuild_all or previous is None or current is None
+                     or previous.get('output') != _hash(current)
+                     or manifest['templates'].get(name) != self.template_hashes[name]
+                     or changed_records & set(previous['deps']))
+            if not stale:
+                pages[path] = previous
+                skipped.append(path)
+                continue
+
+            text, deps = self.render(kind, lang, slug)
+            pages[path] = {'template': name, 'deps': deps, 'output': _hash(text)}
+            if current == text:
+                unchanged.append(path)
+                continue
+            written.append(path)
+            if not dry_run:
+                os.makedirs(os.path.dirname(output) or '.', exist_ok=True)
+                with open(output, 'w', encoding='utf-8') as f:
+                    f.write(text)
+
+        if not dry_run:
+            manifest = {'templates': dict(self.template_hashes), 'records': records, 'pages': pages}
+            os.makedirs(self.templates_dir, exist_ok=True)
+            with open(self.manifest_path, 'w', encoding='utf-8') as f:
+                json.dump(manifest, f, indent=1, sort_keys=True)
+        return written, unchanged, skipped
+
+    def verify(self):
+        """Render every page in memory. Returns {'exact'|'whitespace'|'different'|'missing': [paths]}."""
+        results = {'exact': [], 'whitespace': [], 'different': [], 'missing': []}
+        for kind, lang, slug, path in self.pages():
+            text, _ = self.render(kind, lang, slug)
+            try:
+                with open(os.path.join(self.project_root, path), 'r', encoding='utf-8') as f:
+                    current = f.read()
+            except OSError:
+                results['missing'].append(path)
+                continue
+            if text == current:
+                results['exact'].append(path)
+            elif text.split() == current.split():
+                results['whitespace'].append(path)
+            else:
+                results['different'].append(path)
+        return results
+
+
+def first_difference(expected, actual, context=60):
+    """A short description of where two texts start to differ."""
+    index = next((i for i, (a, b) in enumerate(zip(expected, actual)) if a != b), min(len(expected), len(actual)))
+    line = expected.count('\n', 0, index) + 1
+    return (f"line {line}: page {expected[max(0, index - 20):index + context]!r}\n"
+            f"        generated {actual[max(0, index - 20):index + context]!r}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Generate speaker and session pages from the dataset')
+    parser.add_argument('--root', default='.', help='Project root (default: current directory)')
+    parser.add_argument('--data', default=DATA_FILE, help=f'Dataset file (default: {DATA_FILE})')
+    parser.add_argument('--templates', default=TEMPLATES_DIR, help=f'Templates directory (default: {TEMPLATES_DIR})')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    init_parser = subparsers.add_parser('init', help='Derive the templates from the current pages')
+    init_parser.add_argument('--force', action='store_true', help='Overwrite existing templates')
+
+    build_parser = subparsers.add_parser('build', help='Rebuild pages whose template or data changed')
+    build_parser.add_argument('--all', action='store_true', help='Rebuild every page')
+    build_parser.add_argument('--dry-run', action='store_true', help='Report without writing')
+
+    verify_parser = subparsers.add_parser('verify', help='Regenerate every page in memory and compare')
+    verify_parser.add_argument('-v', '--verbose', action='store_true', help='Show where each differing page differs')
+    args = parser.parse_args()
+
+    templates_dir = os.path.join(args.root, args.templates)
+
+    if args.command == 'init':
+        print("🔍 Deriving templates from the current pages...")
+        templates = derive_templates(args.root, args.data)
+        os.makedirs(templates_dir, exist_ok=True)
+        for name, (source, filters, single) in sorted(templates.items()):
+            path = os.path.join(templates_dir, name)
+            if os.path.exists(path) and not args.force:
+                print(f"  ⏭️  {path} exists (use --force to overwrite)")
+                continue
+            compile_template(source, path)
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(source)
+            print(f"  ✓ {path} ({len(source) / 1024:.0f} KB, "
+                  f"filters: {', '.join(f'{category}={name}' for category, name in filters.items())})")
+            if single:
+                print(f"    ℹ️  {len(single)} blocks always look the same and are not conditional: "
+                      f"{', '.join(single[:4])}{' ...' if len(single) > 4 else ''}")
+        return
+
+    generator = SiteGenerator(args.root, args.data, args.templates)
+
+    if args.command == 'verify':
+        start = time.perf_counter()
+        results = generator.verify()
+        elapsed = time.perf_counter() - start
+        total = sum(len(paths) for paths in results.values())
+        print(f"Rendered {total} pages in {elapsed:.2f}s (templates compiled in {generator.compile_seconds * 1000:.0f}ms)")
+        print(f"  ✅ identical:         {len(results['exact'])}")
+        print(f"  ≈  whitespace only:   {len(results['whitespace'])}")
+        print(f"  ❌ different:         {len(results['different'])}")
+        print(f"  ❓ missing on disk:   {len(results['missing'])}")
+        # A whitespace difference is still a page build would rewrite
+        for path in results['whitespace'] + results['different']:
+            print(f"     - {path}")
+            if args.verbose:
+                kind, lang, slug = next((k, l, s) for k, l, s, p in generator.pages() if p == path)
+                with open(os.path.join(args.root, path), 'r', encoding='utf-8') as f:
+                    current = f.read()
+                print(f"       {first_difference(current, generator.render(kind, lang, slug)[0])}")
+        sys.exit(1 if results['whitespace'] or results['different'] else 0)
+
+    written, unchanged, skipped = generator.build(rebuild_all=args.all, dry_run=args.dry_run)
+    for path in written:
+        print(f"  ✓ {path}")
+    print(f"\n{'Would write' if args.dry_run else 'Wrote'} {len(written)} pages "
+          f"({len(unchanged)} rendered unchanged, {len(skipped)} up to date)")
+
+
+if __name__ == "__main__":
+    main()
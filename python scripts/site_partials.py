@@ -0,0 +1,471 @@
+#!/usr/bin/env python3
+"""
+Shared head, nav, footer and script partials for every page of the site.
+
+Every page carries its own copy of the nav, the footer, the favicon/webclip
+and stylesheet links and the script tags, so one change to them has meant a
+regex pass over ~560 files. This tool:
+
+1. extract - finds blocks (runs of <head> children, <body> children such as
+   the nav, <footer> elements, trailing <script> runs) that are identical
+   across pages once their relative paths are written against the site
+   root, stores each as a partial under _partials/ with {{root}} in place
+   of the per-depth ../ prefix (and {{self}}/{{en}}/{{zh}} for the language
+   switcher), and wraps every occurrence in its page with
+   <!-- partial:NAME --> ... <!-- /partial:NAME --> markers. Blocks that are
+   only near-identical (whitespace, attribute order) are reported, and with
+   --unify replaced by the common variant.
+2. build   - re-renders the marked regions from the partials. The manifest
+   records which pages use which partial and the partial's hash, so after
+   editing _partials/nav.html only the pages that include the nav are
+   rewritten.
+3. check   - verifies that every marked region matches its partial (exit 1 if
+   not), e.g. after a tree-wide script has edited the pages directly.
+
+Edit the partial, not the marked regions: build overwrites them.
+
+Usage:
+    python3 "python scripts/site_partials.py" extract --dry-run
+    python3 "python scripts/site_partials.py" extract
+    python3 "python scripts/site_partials.py" build
+    python3 "python scripts/site_partials.py" check
+"""
+
+import io
+import os
+import re
+import sys
+import json
+import hashlib
+import argparse
+from pathlib import Path
+
+from html_stream import iter_tokens, parse_attrs, VOID_ELEMENTS
+
+PARTIALS_DIR = '_partials'
+MANIFEST_NAME = 'manifest.json'
+ROOT_PLACEHOLDER = b'{{root}}'
+PLACEHOLDER = re.compile(rb'\{\{(root|self|en|zh)\}\}')
+
+SKIP_DIRS = {'.git', 'python scripts', '__pycache__', PARTIALS_DIR}
+
+# A block must appear on at least this many pages to become a partial
+DEFAULT_MIN_PAGES = 20
+
+MARKED_REGION = re.compile(rb'<!-- partial:([\w-]+) -->(.*?)<!-- /partial:\1 -->', re.DOTALL)
+
+# URL-bearing attribute values and CSS url() references inside a block
+URL_ATTRIBUTE = re.compile(rb'(\s(?:href|src|srcset|poster|action)\s*=\s*)("|\')(.*?)\2', re.IGNORECASE | re.DOTALL)
+CSS_URL = re.compile(rb'(url\(\s*)(["\']?)([^"\')]*)\2(\s*\))')
+
+NON_LOCAL_PREFIXES = (b'http:', b'https:', b'//', b'#', b'mailto:', b'tel:', b'data:', b'javascript:', b'/', b'{{')
+
+
+def page_depth(page):
+    """Number of directories between the site root and a project-relative page."""
+    return page.count('/')
+
+
+def page_variables(page):
+    """
+    Per-page values a partial can refer to: {{root}} (the ../ prefix back to
+    the site root), {{self}} (the page's own file name) and {{en}}/{{zh}}
+    (the root-relative paths of the page in each language, used by the
+    language switcher and hreflang links).
+    """
+    if page == 'zh.html':
+        en, zh = 'index.html', 'zh.html'
+    elif page.startswith('zh/'):
+        en, zh = page[3:], page
+    else:
+        en, zh = page, ('zh.html' if page == 'index.html' else 'zh/' + page)
+    return {
+        b'root': b'../' * page_depth(page),
+        b'self': os.path.basename(page).encode('utf-8'),
+        b'en': en.encode('utf-8'),
+        b'zh': zh.encode('utf-8'),
+    }
+
+
+def is_site_page(name):
+    return name.endswith('.html') and not any(skip in name for skip in ['backup', 'temp', '.bak', 'before_dedup'])
+
+
+def find_pages(project_root='.'):
+    """Every HTML page in the project, as sorted project-relative POSIX paths."""
+    pages = []
+    for root, dirs, files in os.walk(project_root):
+        dirs[:] = [d for d in dirs if d not in SKIP_DIRS and not d.startswith('.')]
+        for name in files:
+            if is_site_page(name):
+                pages.append(Path(root, name).relative_to(project_root).as_posix())
+    return sorted(pages)
+
+
+def _to_template_url(url, variables):
+    if not url or url.startswith(NON_LOCAL_PREFIXES):
+        return url
+    prefix = variables[b'root']
+    if prefix and not url.startswith(prefix):
+        if url == variables[b'self']:
+            return b'{{self}}'
+        # Other page-relative links (e.g. a sibling speaker page) cannot be shared
+        return url
+    rest = url[len(prefix):]
+    if rest.startswith(b'../') or rest.startswith(b'..\\'):
+        return url
+    for name in (b'en', b'zh'):
+        if rest == variables[name]:
+            return ROOT_PLACEHOLDER + b'{{' + name + b'}}'
+    return ROOT_PLACEHOLDER + rest
+
+
+def to_template(block, page):
+    """Rewrite the URLs of a block in terms of the page variables, so it is page-independent."""
+    variables = page_variables(page)
+
+    def attribute(match):
+        name, quote, value = match.groups()
+        if name.strip().lower().startswith(b'srcset'):
+            candidates = []
+            for candidate in value.split(b','):
+                leading = candidate[:len(candidate) - len(candidate.lstrip())]
+                parts = candidate.strip().split(None, 1)
+                if parts:
+                    parts[0] = _to_template_url(parts[0], variables)
+                candidates.append(leading + b' '.join(parts))
+            value = b','.join(candidates)
+        else:
+            value = _to_template_url(value, variables)
+        return name + quote + value + quote
+
+    def css_url(match):
+        opener, quote, value, closer = match.groups()
+        return opener + quote + _to_template_url(value, variables) + quote + closer
+
+    return CSS_URL.sub(css_url, URL_ATTRIBUTE.sub(attribute, block))
+
+
+def render(template, page):
+    """Render a partial for a page."""
+    variables = page_variables(page)
+    return PLACEHOLDER.sub(lambda match: variables[match.group(1)], template)
+
+
+def near_key(template):
+    """Key that ignores whitespace and attribute order, for grouping near-identical blocks."""
+    parts = []
+    for token in iter_tokens(io.BytesIO(template)):
+        if token.kind == 'start':
+            attrs = sorted(parse_attrs(token.attrs).items())
+            parts.append(f"<{token.name} {attrs}>")
+        elif token.kind == 'end':
+            parts.append(f"</{token.name}>")
+        elif token.kind == 'text':
+            text = ' '.join(token.raw.decode('utf-8', errors='replace').split())
+            if text:
+                parts.append(text)
+        else:
+            parts.append(' '.join(token.raw.decode('utf-8', errors='replace').split()))
+    return hashlib.sha256('\n'.join(parts).encode('utf-8')).hexdigest()
+
+
+def find_blocks(data):
+    """
+    Return candidate blocks as (kind, start, end, tag name): each child
+    element or comment of <head> and <body>, and every <footer> element
+    wherever it is nested.
+    """
+    blocks = []
+    stack = []
+    open_blocks = []  # (kind, start, stack depth at which the block closes)
+    for token in iter_tokens(io.BytesIO(data)):
+        end = token.offset + len(token.raw)
+        depth = len(stack)
+        if token.kind == 'start':
+            kind = None
+            if token.name == 'footer':
+                kind = 'footer'
+            elif depth == 2 and stack[0] == 'html' and stack[1] in ('head', 'body'):
+                kind = stack[1]
+            if token.name in VOID_ELEMENTS or token.self_closing:
+                if kind:
+                    blocks.append((kind, token.offset, end, token.name))
+                continue
+            stack.append(token.name)
+            if kind:
+                open_blocks.append((kind, token.offset, depth, token.name))
+        elif token.kind == 'end':
+            if token.name not in stack:
+                continue
+            while stack and stack.pop() != token.name:
+                pass
+            while open_blocks and open_blocks[-1][2] >= len(stack):
+                kind, start, _, name = open_blocks.pop()
+                blocks.append((kind, start, end, name))
+        elif token.kind == 'comment' and depth == 2 and stack[0] == 'html' and stack[1] in ('head', 'body'):
+            blocks.append((stack[1], token.offset, end, '!--'))
+    blocks.sort(key=lambda block: block[1])
+    return blocks
+
+
+def group_runs(data, blocks, shared):
+    """
+    Merge blocks into partial candidates: consecutive shared <head> children
+    form one run, consecutive <script> children of <body> another; every
+    other shared block stands alone.
+    """
+    runs = []
+    current = None
+    for kind, start, end, name in blocks:
+        if (start, end) not in shared:
+            current = None
+            continue
+        mergeable = kind == 'head' or (kind == 'body' and name == 'script')
+        if (current and mergeable and current['kind'] == kind and current['mergeable']
+                and not data[current['end']:start].strip()):
+            current['end'] = end
+            continue
+        current = {'kind': kind, 'start': start, 'end': end, 'name': name, 'mergeable': mergeable}
+        runs.append(current)
+    return runs
+
+
+def partial_name(run, template):
+    if run['kind'] == 'head':
+        return 'head'
+    if run['name'] == 'footer':
+        return 'footer'
+    if run['name'] == 'script':
+        return 'scripts'
+    if b'w-nav' in template[:600] or run['name'] == 'nav':
+        return 'nav'
+    return run['name'] if run['name'] != '!--' else 'comment'
+
+
+class PartialSet:
+    """The _partials/ directory: partial templates plus the page manifest."""
+
+    def __init__(self, project_root='.'):
+        self.project_root = Path(project_root)
+        self.directory = self.project_root / PARTIALS_DIR
+        self.manifest_path = self.directory / MANIFEST_NAME
+        self.manifest = {'partials': {}, 'pages': {}}
+        if self.manifest_path.exists():
+            with open(self.manifest_path, 'r', encoding='utf-8') as f:
+                self.manifest = json.load(f)
+
+    def partial_path(self, name):
+        return self.directory / f"{name}.html"
+
+    def load(self, name):
+        with open(self.partial_path(name), 'rb') as f:
+            return f.read()
+
+    @staticmethod
+    def digest(template):
+        return hashlib.sha256(template).hexdigest()
+
+    def save_manifest(self):
+        self.directory.mkdir(exist_ok=True)
+        with open(self.manifest_path, 'w', encoding='utf-8') as f:
+            json.dump(self.manifest, f, indent=2, sort_keys=True)
+            f.write('\n')
+
+    def pages_using(self, names):
+        names = set(names)
+        return sorted(page for page, used in self.manifest['pages'].items() if names & set(used))
+
+    def render_page(self, page, data, templates):
+        """Re-render every marked region of a page. Returns (new_data, partial names used)."""
+        used = []
+
+        def region(match):
+            name = match.group(1).decode('ascii')
+            if name not in templates:
+                templates[name] = self.load(name)
+            used.append(name)
+            marker = match.group(1)
+            return (b'<!-- partial:' + marker + b' -->' + render(templates[name], page)
+                    + b'<!-- /partial:' + marker + b' -->')
+
+        return MARKED_REGION.sub(region, data), used
+
+
+def extract(project_root, min_pages, unify, dry_run):
+    pages = find_pages(project_root)
+    print(f"Scanning {len(pages)} pages for shared blocks...")
+
+    page_data = {}
+    page_blocks = {}
+    element_pages = {}
+    for page in pages:
+        with open(os.path.join(project_root, page), 'rb') as f:
+            data = f.read()
+        if MARKED_REGION.search(data):
+            print(f"  - {page} already has partial markers; run build instead")
+            continue
+        blocks = find_blocks(data)
+        page_data[page] = data
+        page_blocks[page] = blocks
+        for kind, start, end, name in blocks:
+            key = (kind, to_template(data[start:end], page))
+            element_pages.setdefault(key, set()).add(page)
+
+    # Runs of shared elements, grouped by exact template and by near-identity
+    by_template = {}
+    for page, blocks in page_blocks.items():
+        data = page_data[page]
+        shared = {
+            (start, end) for kind, start, end, name in blocks
+            if len(element_pages[(kind, to_template(data[start:end], page))]) >= min_pages
+        }
+        for run in group_runs(data, blocks, shared):
+            template = to_template(data[run['start']:run['end']], page)
+            entry = by_template.setdefault(template, {'run': run, 'pages': []})
+            entry['pages'].append((page, run['start'], run['end']))
+
+    clusters = {}
+    for template, entry in by_template.items():
+        clusters.setdefault(near_key(template), []).append(template)
+
+    partials = {}    # name -> template
+    wraps = {}       # page -> [(start, end, name)]
+    name_counts = {}
+    near_identical = []
+    for variants in sorted(clusters.values(), key=lambda v: -sum(len(by_template[t]['pages']) for t in v)):
+        variants.sort(key=lambda template: -len(by_template[template]['pages']))
+        canonical = variants[0]
+        total = sum(len(by_template[template]['pages']) for template in variants)
+        if len(by_template[canonical]['pages']) < min_pages and not (unify and total >= min_pages):
+            continue
+        base = partial_name(by_template[canonical]['run'], canonical)
+        name_counts[base] = name_counts.get(base, 0) + 1
+        name = base if name_counts[base] == 1 else f"{base}-{name_counts[base]}"
+        partials[name] = canonical
+        for template in variants:
+            occurrences = by_template[template]['pages']
+            if template is not canonical:
+                near_identical.append((name, len(occurrences), [page for page, _, _ in occurrences[:3]]))
+                if not unify:
+                    continue
+            for page, start, end in occurrences:
+                wraps.setdefault(page, []).append((start, end, name))
+
+    for name, template in partials.items():
+        count = sum(1 for page_wraps in wraps.values() if any(wrap[2] == name for wrap in page_wraps))
+        print(f"  ✓ {name}: {len(template)} bytes, used by {count} pages")
+    if near_identical:
+        print(f"\nNear-identical variants ({'unified' if unify else 'left inline; use --unify to replace them'}):")
+        for name, count, examples in near_identical:
+            print(f"  ~ {name}: {count} pages, e.g. {', '.join(examples)}")
+
+    saved = sum(
+        (len(partials[name]) for page_wraps in wraps.values() for _, _, name in page_wraps)
+    ) - sum(len(template) for template in partials.values())
+    print(f"\nPages with partials: {len(wraps)}")
+    print(f"Duplicated markup now kept once: {saved / 1024:.0f} KB")
+
+    if dry_run:
+        print("\nDry run: nothing written")
+        return
+
+    partial_set = PartialSet(project_root)
+    partial_set.directory.mkdir(exist_ok=True)
+    for name, template in partials.items():
+        with open(partial_set.partial_path(name), 'wb') as f:
+            f.write(template)
+        partial_set.manifest['partials'][name] = PartialSet.digest(template)
+
+    for page, page_wraps in wraps.items():
+        data = page_data[page]
+        # Wrap from the end so earlier offsets stay valid
+        for start, end, name in sorted(page_wraps, reverse=True):
+            marker = name.encode('ascii')
+            data = (data[:start] + b'<!-- partial:' + marker + b' -->' + render(partials[name], page)
+                    + b'<!-- /partial:' + marker + b' -->' + data[end:])
+        with open(os.path.join(project_root, page), 'wb') as f:
+            f.write(data)
+        partial_set.manifest['pages'][page] = sorted({name for _, _, name in page_wraps})
+    partial_set.save_manifest()
+    print(f"\nPartials written to {partial_set.directory}/")
+
+
+def build(project_root, rebuild_all, check_only):
+    partial_set = PartialSet(project_root)
+    if not partial_set.manifest['partials']:
+        print(f"No partials found; run extract first")
+        sys.exit(1)
+
+    current = {}
+    for name in partial_set.manifest['partials']:
+        current[name] = PartialSet.digest(partial_set.load(name))
+    changed = [name for name, digest in current.items() if partial_set.manifest['partials'][name] != digest]
+
+    if rebuild_all or check_only:
+        pages = find_pages(project_root)
+    else:
+        pages = partial_set.pages_using(changed)
+        if not changed:
+            print("All partials up to date; nothing to rebuild")
+            return
+        print(f"Changed partials: {', '.join(changed)}")
+
+    templates = {}
+    rewritten = []
+    for page in pages:
+        path = os.path.join(project_root, page)
+        with open(path, 'rb') as f:
+            data = f.read()
+        new_data, used = partial_set.render_page(page, data, templates)
+        if used:
+            partial_set.manifest['pages'][page] = sorted(set(used))
+        else:
+            partial_set.manifest['pages'].pop(page, None)
+        if new_data != data:
+            rewritten.append(page)
+            if not check_only:
+                with open(path, 'wb') as f:
+                    f.write(new_data)
+
+    if check_only:
+        for page in rewritten:
+            print(f"  ✗ {page}: marked regions differ from their partials")
+        print(f"\nChecked {len(pages)} pages: {len(rewritten)} out of date")
+        sys.exit(1 if rewritten else 0)
+
+    partial_set.manifest['partials'].update(current)
+    partial_set.save_manifest()
+    for page in rewritten:
+        print(f"  ✓ {page}")
+    print(f"\nRendered {len(pages)} pages, rewrote {len(rewritten)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Extract shared page blocks into partials and rebuild pages from them')
+    parser.add_argument('--project-root', default='.', help='Project root directory')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    extract_parser = subparsers.add_parser('extract', help='Find shared blocks, write partials and mark the pages')
+    extract_parser.add_argument('--min-pages', type=int, default=DEFAULT_MIN_PAGES,
+                                help=f'Pages a block must appear on to become a partial (default: {DEFAULT_MIN_PAGES})')
+    extract_parser.add_argument('--unify', action='store_true',
+                                help='Replace near-identical variants with the most common one')
+    extract_parser.add_argument('--dry-run', action='store_true', help='Report without writing anything')
+
+    build_parser = subparsers.add_parser('build', help='Re-render pages that use changed partials')
+    build_parser.add_argument('--all', action='store_true', help='Re-render every page, not just affected ones')
+
+    subparsers.add_parser('check', help='Verify every marked region matches its partial')
+
+    args = parser.parse_args()
+    if args.command == 'extract':
+        extract(args.project_root, args.min_pages, args.unify, args.dry_run)
+    elif args.command == 'build':
+        build(args.project_root, args.all, check_only=False)
+    else:
+        build(args.project_root, True, check_only=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,703 @@
+#!/usr/bin/env python3
+"""
+Extract the speaker and session data model from the generated pages.
+
+Every speaker page (speakers/*.html, zh/speakers/*.html), session page
+(schedules/*.html, zh/schedules/*.html) and the two speaker listings
+(speakers.html, zh/speakers.html) is the same Webflow collection template
+filled in with one record's fields. This module knows where each field sits
+in those templates: a binder per page kind walks the page's element tree
+(html_stream.build_tree) and returns Bindings - byte spans of the page tied
+to a field of a record:
+
+- Value: a span holding one field (a name, a bio, an href, an image file);
+- Switch: a span rendered one of two ways depending on a field, e.g. a social
+  link that is hidden with w-condition-invisible when the speaker has none;
+- Loop: a span repeating one item per entry of a list, e.g. the sessions on
+  a speaker page or the cards in a speakers.html tab.
+
+Reading the bound spans of every page gives the dataset:
+
+    speakers       slug -> image, links, sessions, and per language name,
+                   title, organization and bio
+    sessions       slug -> speakers, date, time, slides, video, and per
+                   language title, description and tracks
+    speaker_index  language -> speakers.html tab -> speaker slugs
+    tracks         the track names seen on session pages, per language
+    languages      the page languages
+
+Fields that are not translated (image, links, sessions, date...) are stored
+once; where a zh page shows a different value, because Webflow localized
+it, that value is kept in the record's zh section. A field shown on several
+pages (a speaker's name appears on their own page, on their card and on each
+of their session pages) is taken from the page that owns it, unless it is
+an image only another page has a local copy of; disagreeing copies are
+reported. site_generator.py uses the same bindings to turn the pages back
+into templates and regenerate them from the dataset.
+
+Values that depend on where a page is are stored independently of it:
+image paths relative to the project root (the pages write them relative to
+themselves), and social links as Webflow had them before publishing
+resolved them against the page URL. A page whose counterpart in the other
+language has a different slug (speakers/rui-zhao.html and
+zh/speakers/zhao-rui.html) stores it under slugs.<language>. The cards on
+speakers.html list the sessions Webflow linked to the card when it was
+exported, which are not always the speaker's own list, so they are kept
+apart as listed_sessions.
+
+Webflow leaves a blank line in a zh collection list for each item it had
+no zh version of. Those items are kept as null entries of the list, so a
+tab or a session list keeps its exact whitespace when it is regenerated.
+
+    python3 "python scripts/speaker_dataset.py"                 # writes data/site.json
+    python3 "python scripts/speaker_dataset.py" -o data/site.yaml   # needs PyYAML
+    python3 "python scripts/speaker_dataset.py" --conflicts
+"""
+
+import os
+import re
+import sys
+import glob
+import html
+import json
+import argparse
+import posixpath
+import urllib.parse
+from collections import namedtuple
+
+from html_stream import build_tree, text_span, attr_span
+
+DATA_FILE = os.path.join('data', 'site.json')
+
+LANGUAGES = ['en', 'zh']
+
+# Where the pages are published; Webflow resolved relative CMS links against it
+SITE_URL = 'https://china2024.gosim.org/'
+
+# Icons identify the social link slots; their order differs between templates
+SOCIAL_ICONS = [
+    ('Hyperlink', 'website'),
+    ('Github', 'github'),
+    ('X-Logo', 'x'),
+    ('astodon', 'mastodon'),
+    ('astadon', 'mastodon'),
+    ('Linkedin', 'linkedin'),
+]
+
+HIDDEN_CLASS = 'w-condition-invisible'
+
+# Lower wins when pages disagree about a field: (page kind, record kind) -> priority
+PRIORITY = {
+    ('speaker', 'speakers'): 0,
+    ('speakers', 'speakers'): 1,
+    ('session', 'speakers'): 3,
+    ('session', 'sessions'): 0,
+    ('speaker', 'sessions'): 3,
+    ('speakers', 'sessions'): 4,
+    ('speakers', 'speaker_index'): 0,
+}
+
+BACKSLASH_ESCAPE = re.compile(r'\\([.\-])')
+BACKGROUND_URL = re.compile(rb'url\(([^()]+)\)')
+EXTERNAL_URL = re.compile(r'^(?:[a-z][a-z0-9+.-]*:|/)', re.IGNORECASE)
+US_DATETIME = re.compile(r'(\d{2})\.(\d{2})\.(\d{4})\s+(\S+)')
+
+
+class Value:
+    """
+    A span holding one field of a record. category says how the span is
+    encoded ('text', 'attr', 'url', 'link', 'slug' or 'alternate'); code
+    overrides the template expression for derived spans, and parse turns
+    such a span back into {key: value} facts.
+    """
+
+    __slots__ = ('start', 'end', 'record', 'key', 'var', 'category', 'code', 'parse')
+
+    def __init__(self, span, record, key, var, category='text', code=None, parse=None):
+        self.start, self.end = span
+        self.record = record
+        self.key = key
+        self.var = var
+        self.category = category
+        self.code = code
+        self.parse = parse
+
+    @property
+    def expression(self):
+        return expression(self.var, self.key)
+
+
+class Switch:
+    """
+    A span rendered as its 'on' or 'off' form depending on cond. When off,
+    the record's key (if any) is known to hold default.
+    """
+
+    __slots__ = ('start', 'end', 'name', 'cond', 'on', 'children', 'record', 'key', 'default')
+
+    def __init__(self, span, name, cond, on, children=(), record=None, key=None, default=''):
+        self.start, self.end = span
+        self.name = name
+        self.cond = cond
+        self.on = on
+        self.children = list(children)
+        self.record = record
+        self.key = key
+        self.default = default
+
+
+Item = namedtuple('Item', ['start', 'end', 'id', 'children'])
+
+
+class Loop:
+    """
+    A span holding one Item per entry of a list: `for var in expr`. The
+    item ids are the list stored at record's key, with None for each item
+    the page left out (see dropped_items).
+    """
+
+    __slots__ = ('start', 'end', 'name', 'var', 'expr', 'items', 'record', 'key')
+
+    def __init__(self, span, name, var, expr, items, record=None, key=None):
+        self.start, self.end = span
+        self.name = name
+        self.var = var
+        self.expr = expr
+        self.items = items
+        self.record = record
+        self.key = key
+
+
+def dropped_items(gap):
+    """
+    How many items Webflow left out of a list at the whitespace before an
+    item (or before the end of the list): each left a blank line.
+    """
+    return len(gap) - 1 if len(gap) > 1 and not gap.strip(b'\n') else 0
+
+
+def loop_gaps(data, loop):
+    """The whitespace before each item of the loop, then before its end."""
+    gaps = []
+    position = loop.start
+    for item in loop.items:
+        gaps.append(data[position:item.start])
+        position = item.end
+    gaps.append(data[position:loop.end])
+    return gaps
+
+
+PageKind = namedtuple('PageKind', ['name', 'record_kind', 'var', 'patterns', 'binder'])
+
+
+def expression(var, key):
+    """Template expression for a record field; templates read fields in the page's language."""
+    if key and key[0] in LANGUAGES:
+        key = key[1:]
+    return '.'.join((var,) + tuple(key))
+
+
+def decode(category, raw):
+    """The field value behind a span's bytes."""
+    value = html.unescape(raw.decode('utf-8'))
+    if category in ('attr', 'slug', 'url', 'link', 'alternate'):
+        # Exported zh pages escape dots and dashes in URLs
+        value = BACKSLASH_ESCAPE.sub(r'\1', value)
+    if category == 'url':
+        # Speaker pages percent-encode image file names, speakers.html doesn't
+        value = urllib.parse.unquote(value)
+    return value
+
+
+def _page_dir(page):
+    return posixpath.dirname(page.replace(os.sep, '/'))
+
+
+def resolve(category, value, page):
+    """
+    The stored form of a decoded value written on page: image paths
+    relative to the project root, links relative to the page as before
+    Webflow resolved them. Other values are stored as they are.
+    """
+    if category == 'url' and not EXTERNAL_URL.match(value):
+        return posixpath.normpath(posixpath.join(_page_dir(page), value))
+    if category == 'link':
+        base = urllib.parse.urljoin(SITE_URL, _page_dir(page) + '/')
+        if value.startswith(base) and len(value) > len(base):
+            return value[len(base):]
+    return value
+
+
+def relative_url(path, page):
+    """Inverse of resolve('url', ...): a project path as written on page."""
+    if not path or EXTERNAL_URL.match(path):
+        return path
+    return posixpath.relpath(path, _page_dir(page) or '.')
+
+
+def absolute_url(href, page):
+    """Inverse of resolve('link', ...): a link as published on page."""
+    if not href or EXTERNAL_URL.match(href) or href.startswith('#'):
+        return href
+    return urllib.parse.urljoin(urllib.parse.urljoin(SITE_URL, page.replace(os.sep, '/')), href)
+
+
+def us_datetime(value):
+    """'10.17.2024 10:30' -> {'date': '2024-10-17', 'time': '10:30'}"""
+    match = US_DATETIME.match(value)
+    if not match:
+        return {}
+    month, day, year, time = match.groups()
+    return {('date',): f"{year}-{month}-{day}", ('time',): time}
+
+
+# --- binders ---------------------------------------------------------------
+
+def _text(data, element, record, key, var, name):
+    """
+    A text field. Webflow marks elements bound to an empty field with
+    w-dyn-bind-empty and leaves them without content, so the element is a
+    Switch between its filled and empty forms.
+    """
+    on = 'w-dyn-bind-empty' not in element.classes
+    children = [Value(text_span(data, element), record, key, var, 'text')] if on else []
+    return Switch((element.start, element.end), name, expression(var, key), on, children, record, key)
+
+
+def _image(data, element, record, var):
+    """The image URL inside a background-image style, ../ prefix included."""
+    start, end = attr_span(data, element, 'style')
+    match = BACKGROUND_URL.search(data, start, end)
+    return Value(match.span(1), record, ('image',), var, 'url', code=f"{{{{ relative_url({var}.image)|@url }}}}")
+
+
+def _slug_span(data, link):
+    """
+    (start, end) of the slug in the link's href: the path segment before
+    .html (or the zh pages' escaped \\.html), or None if there is none.
+    """
+    start, end = attr_span(data, link, 'href')
+    suffix = data.find(b'.html', start, end)
+    if suffix < 0:
+        return None
+    if data[suffix - 1:suffix] == b'\\':
+        suffix -= 1
+    slug_start = max(start, data.rfind(b'/', start, suffix) + 1)
+    return (slug_start, suffix) if slug_start < suffix else None
+
+
+def _linked_slug(data, link, record, var):
+    """The slug inside an href like ../schedules/<slug>.html, and its decoded value."""
+    span = _slug_span(data, link)
+    return Value(span, record, ('slug',), var, 'slug'), decode('slug', data[span[0]:span[1]])
+
+
+def _alternates(data, root, record, var, slug, lang):
+    """
+    The slug in each link to the page in another language: the
+    <link rel="alternate"> tags and the language switcher. Its value is a
+    fact only when it is not the page's own slug.
+    """
+    values = []
+    for link in root.find_all('link') + root.find_all('a'):
+        target = link.attrs.get('hreflang', '').split('-')[0].lower()
+        target = LANGUAGES[0] if target == 'x' else target
+        if target not in LANGUAGES or target == lang or 'href' not in link.attrs:
+            continue
+        span = _slug_span(data, link)
+        if span is None:
+            continue
+        value = decode('alternate', data[span[0]:span[1]])
+        values.append(Value(span, record if value != slug else None, ('slugs', target), var, 'alternate',
+                            code=f"{{{{ ({var}.slugs and {var}.slugs.{target}) or page.slug|@alternate }}}}"))
+    return values
+
+
+def _social_switches(data, container, record, var, prefix):
+    """One Switch per social link slot: the link's start tag, shown or hidden."""
+    switches = []
+    for link in container.find_all('a'):
+        # An <img>, or a <use> of the sprite build_icon_sprite.py writes
+        icon = link.find('img') or link.find('use')
+        source = icon.attrs.get('src', icon.attrs.get('href', '')) if icon else ''
+        service = next((name for marker, name in SOCIAL_ICONS if marker in source), None)
+        if service is None:
+            continue
+        on = HIDDEN_CLASS not in link.classes
+        children = []
+        if on:
+            children.append(Value(attr_span(data, link, 'href'), record, ('links', service), var, 'link',
+                                  code=f"{{{{ absolute_url({var}.links.{service})|@link }}}}"))
+        switches.append(Switch((link.start, link.inner_start), f"{prefix}.{service}", f"{var}.links.{service}",
+                               on, children, record, ('links', service)))
+    return switches
+
+
+def _dyn_list(data, wrapper, name, cond, record, key, bind_item):
+    """
+    A Webflow collection list: a Switch between the w-dyn-items list and the
+    w-dyn-empty placeholder, holding a Loop over the items.
+    """
+    items = wrapper.find('div', 'w-dyn-items')
+    if items is None:
+        return Switch((wrapper.inner_start, wrapper.inner_end), name, cond, False, (), record, key, [])
+    loop_items = [bind_item(item) for item in items.children if 'w-dyn-item' in item.classes]
+    var, expr = bind_item.var, bind_item.expr
+    loop = Loop((items.inner_start, items.inner_end), name + '.item', var, expr, loop_items, record, key)
+    return Switch((wrapper.inner_start, wrapper.inner_end), name, cond, True, [loop], record, key, [])
+
+
+def _session_item(data, lang, prefix, title_classes='', time_class=None):
+    """Binder for one session link in a speaker's session list."""
+
+    def bind_item(item):
+        link = item.find('a')
+        slug_value, slug = _linked_slug(data, link, ('sessions', None), 'session')
+        record = ('sessions', slug)
+        slug_value.record = record
+        children = [slug_value, _text(data, link.find('div', title_classes), record, (lang, 'title'), 'session',
+                                      prefix + '.title')]
+        if time_class:
+            children.append(Value(text_span(data, link.find('div', time_class)), record, None, 'session',
+                                  code='{{ us_date(session.date) }} {{ session.time }}', parse=us_datetime))
+        return Item(item.start, item.end, slug, children)
+
+    bind_item.var = 'session'
+    bind_item.expr = None
+    return bind_item
+
+
+def bind_speaker_page(data, root, slug, lang):
+    """Bindings of a speakers/<slug>.html page."""
+    record = ('speakers', slug)
+    organization = root.find('div', 'time-bl').find('div', '_w-inline-block')
+    bindings = [
+        _image(data, root.find('div', 'div-block-66'), record, 'speaker'),
+        _text(data, root.find('h1', 'heading-style-h1'), record, (lang, 'name'), 'speaker', 'name'),
+        _text(data, organization, record, (lang, 'organization'), 'speaker', 'organization'),
+        _text(data, root.find('div', 'jlk34'), record, (lang, 'bio'), 'speaker', 'bio'),
+    ]
+    bindings += _social_switches(data, root.find('div', 'socials'), record, 'speaker', 'links')
+    bindings += _alternates(data, root, record, 'speaker', slug, lang)
+
+    bind_item = _session_item(data, lang, 'sessions', title_classes='klle23', time_class='kk54')
+    bind_item.expr = 'sessions(speaker.sessions)'
+    bindings.append(_dyn_list(data, root.find('div', 'collection-list-wrapper'), 'sessions',
+                              'speaker.sessions', record, ('sessions',), bind_item))
+    return bindings
+
+
+def bind_session_page(data, root, slug, lang):
+    """Bindings of a schedules/<slug>.html page."""
+    record = ('sessions', slug)
+    speakers_block, datetime_block, slides_block, video_block = root.find_all('div', 'time-bl')[:4]
+
+    def bind_track(item):
+        label = item.find('div', 'text-weight-semibold')
+        span = text_span(data, label)
+        value = Value(span, None, (), 'track', 'text', code='{{ track|@text }}')
+        return Item(item.start, item.end, decode('text', data[span[0]:span[1]]), [value])
+
+    bind_track.var = 'track'
+    bind_track.expr = 'session.tracks'
+    bindings = [
+        _dyn_list(data, root.find('div', 'jkjkh').find('div', 'w-dyn-list'), 'tracks',
+                  'session.tracks', record, (lang, 'tracks'), bind_track),
+        _text(data, root.find('h1', 'heading-style-h1'), record, (lang, 'title'), 'session', 'title'),
+    ]
+
+    first, second = speakers_block.find_all('a', 'link-block-3')[:2]
+    bindings.append(_speaker_slot(data, first, 0, lang, 'speaker0', record))
+    bindings.append(_speaker_slot(data, second, 1, lang, 'speaker1', record))
+
+    date, time = datetime_block.find('div', 'div-block-70').find_all('div', '_w-inline-block')[:2]
+    bindings += [_text(data, date, record, ('date',), 'session', 'date'),
+                 _text(data, time, record, ('time',), 'session', 'time')]
+    # The Date / Time block repeats the second speaker; it is not a field of its own
+    repeat = datetime_block.find('a', 'link-block-3')
+    bindings.append(_speaker_slot(data, repeat, 1, lang, 'speaker1.repeat', None))
+
+    for block, key in ((slides_block, 'slides'), (video_block, 'video')):
+        on = HIDDEN_CLASS not in block.classes
+        children = [Value(attr_span(data, block.find('a'), 'href'), record, (key,), 'session', 'attr')] if on else []
+        bindings.append(Switch((block.start, block.end), key, f'session.{key}', on, children, record, (key,)))
+
+    bindings.append(_text(data, root.find('p', 'jlk34'), record, (lang, 'description'), 'session', 'description'))
+    bindings += _alternates(data, root, record, 'session', slug, lang)
+    return bindings
+
+
+def _speaker_slot(data, link, index, lang, name, record):
+    """
+    A session page's link to its index-th speaker, or the empty link when
+    there is none. With record None the slot only repeats data stored elsewhere.
+    """
+    key = ('speakers',) if record else None
+    selection = f'session.speakers[{index}:{index + 1}]'
+    label = link.find('div', '_w-inline-block')
+    if 'w-dyn-bind-empty' in label.classes:
+        return Switch((link.start, link.end), name, selection, False, (), record, key, [])
+    slug_value, speaker = _linked_slug(data, link, None, 'speaker')
+    slug_value.record = ('speakers', speaker)
+    item = Item(link.start, link.end, speaker,
+                [slug_value, _text(data, label, ('speakers', speaker), (lang, 'name'), 'speaker', name + '.name')])
+    loop = Loop((link.start, link.end), name + '.item', 'speaker', f'speakers({selection})', [item], record, key)
+    return Switch((link.start, link.end), name, selection, True, [loop], record, key, [])
+
+
+def bind_speaker_index(data, root, slug, lang):
+    """Bindings of speakers.html: one Loop of speaker cards per tab."""
+    index = ('speaker_index', lang)
+    bindings = []
+    for pane in root.find_all('div', 'w-tab-pane'):
+        tab = pane.attrs['data-w-tab']
+        prefix = tab.lower().replace(' ', '')
+
+        def bind_card(card, prefix=prefix):
+            slug = card.find('div', 'div-block-49').attrs['id']
+            record = ('speakers', slug)
+            anchor = card.find('div', 'div-block-49')
+            children = [
+                _image(data, card.find('div', 'image-15'), record, 'speaker'),
+                Value(attr_span(data, anchor, 'id'), record, ('slug',), 'speaker', 'slug'),
+            ]
+            summary = card.find('div', 'div-block-9')
+            children += [
+                _text(data, summary.find('h3', 'heading'), record, (lang, 'name'), 'speaker', prefix + '.summary.name'),
+                _text(data, summary.find('div', 'text-block-2'), record, (lang, 'title'), 'speaker',
+                      prefix + '.summary.title'),
+            ]
+            children += _social_switches(data, summary.find('div', 'socials2'), record, 'speaker', prefix + '.socials2')
+
+            details = card.find('div', 'div-block-27')
+            organization, bio = details.find_all('div', 'text-size-medium')[:2]
+            children += [
+                _text(data, organization, record, (lang, 'organization'), 'speaker', prefix + '.details.organization'),
+                _text(data, bio, record, (lang, 'bio'), 'speaker', prefix + '.details.bio'),
+            ]
+            children += _social_switches(data, details.find('div', 'socials'), record, 'speaker', prefix + '.socials')
+
+            overlay = card.find('div', 'div-block-15')
+            children += [
+                _image(data, overlay.find('div', 'div-block-17'), record, 'speaker'),
+                _text(data, overlay.find('h3', 'heading'), record, (lang, 'name'), 'speaker', prefix + '.overlay.name'),
+                _text(data, overlay.find('div', 'text-block-2'), record, (lang, 'title'), 'speaker',
+                      prefix + '.overlay.title'),
+            ]
+            sections = overlay.find_all('div', 'div-block-21')
+            children += [
+                _text(data, sections[0].find('div', 'text-size-medium'), record, (lang, 'organization'), 'speaker',
+                      prefix + '.overlay.organization'),
+                _text(data, sections[1].find('div', 'text-size-medium'), record, (lang, 'bio'), 'speaker',
+                      prefix + '.overlay.bio'),
+            ]
+            if len(sections) > 2:
+                # Only the "All" tab's cards list sessions, and not always the speaker's own
+                bind_item = _session_item(data, lang, prefix + '.sessions', title_classes='text-size-medium')
+                bind_item.expr = 'sessions(speaker.listed_sessions)'
+                children.append(_dyn_list(data, sections[2].find('div', 'w-dyn-list'), prefix + '.sessions',
+                                          'speaker.listed_sessions', record, ('listed_sessions',), bind_item))
+            children.sort(key=lambda binding: binding.start)
+            return Item(card.start, card.end, slug, children)
+
+        items = pane.find('div', 'w-dyn-items')
+        cards = [bind_card(card) for card in items.children if 'collection-item' in card.classes]
+        bindings.append(Loop((items.inner_start, items.inner_end), prefix + '.cards', 'speaker',
+                             f"speakers(tab({tab!r}))", cards, index, (tab,)))
+    return bindings
+
+
+PAGE_KINDS = [
+    PageKind('speaker', 'speakers', 'speaker',
+             {'en': 'speakers/*.html', 'zh': 'zh/speakers/*.html'}, bind_speaker_page),
+    PageKind('session', 'sessions', 'session',
+             {'en': 'schedules/*.html', 'zh': 'zh/schedules/*.html'}, bind_session_page),
+    PageKind('speakers', 'speaker_index', 'index',
+             {'en': 'speakers.html', 'zh': 'zh/speakers.html'}, bind_speaker_index),
+]
+
+
+def page_path(kind, lang, slug):
+    """Where the page for a record lives, relative to the project root."""
+    pattern = kind.patterns[lang]
+    return pattern.replace('*', slug) if '*' in pattern else pattern
+
+
+def iter_pages(project_root='.'):
+    """Yield (kind, lang, slug, path) for every page of every kind, en first."""
+    for kind in PAGE_KINDS:
+        for lang in LANGUAGES:
+            pattern = kind.patterns[lang]
+            for path in sorted(glob.glob(os.path.join(project_root, pattern))):
+                slug = os.path.splitext(os.path.basename(path))[0] if '*' in pattern else lang
+                yield kind, lang, slug, path
+
+
+def bind_page(kind, lang, slug, data):
+    """Parse a page and return (tree, bindings)."""
+    root = build_tree(data)
+    return root, kind.binder(data, root, slug, lang)
+
+
+# --- extraction ------------------------------------------------------------
+
+def iter_facts(data, bindings, page):
+    """Yield (record, key, value, category) for every field the page at path page shows."""
+    lists = {}
+    for fact in _walk_facts(data, bindings, page, lists):
+        yield fact
+    for (record, key), ids in lists.items():
+        yield record, key, ids, 'list'
+
+
+def _walk_facts(data, bindings, page, lists):
+    for binding in bindings:
+        if isinstance(binding, Value):
+            if binding.record is None:
+                continue
+            value = decode(binding.category, data[binding.start:binding.end])
+            if binding.parse:
+                for key, parsed in binding.parse(value).items():
+                    yield binding.record, key, parsed, binding.category
+            elif binding.key != ('slug',):
+                yield binding.record, binding.key, resolve(binding.category, value, page), binding.category
+        elif isinstance(binding, Switch):
+            if binding.on:
+                yield from _walk_facts(data, binding.children, page, lists)
+            elif binding.key is not None:
+                if isinstance(binding.default, list):
+                    # An empty list is still a list the page shows
+                    lists.setdefault((binding.record, binding.key), [])
+                else:
+                    yield binding.record, binding.key, binding.default, None
+        elif isinstance(binding, Loop):
+            ids = lists.setdefault((binding.record, binding.key), []) if binding.key is not None else []
+            gaps = loop_gaps(data, binding)
+            for item, gap in zip(binding.items, gaps):
+                ids.extend([None] * dropped_items(gap))
+                ids.append(item.id)
+                yield from _walk_facts(data, item.children, page, lists)
+            ids.extend([None] * dropped_items(gaps[-1]))
+
+
+def _set(record, key, value):
+    for part in key[:-1]:
+        record = record.setdefault(part, {})
+    record[key[-1]] = value
+
+
+def extract(project_root='.', verbose=False):
+    """
+    Read every page and return (dataset, conflicts). conflicts lists fields
+    that pages of the same language disagree about. An image that has a
+    local copy wins over one that has not, whichever page shows it.
+    """
+    dataset = {'languages': list(LANGUAGES), 'tracks': [], 'speakers': {}, 'sessions': {}, 'speaker_index': {}}
+    chosen = {}      # (record, key, page language) -> (priority, value, source)
+    conflicts = []
+
+    for kind, lang, slug, path in iter_pages(project_root):
+        with open(path, 'rb') as f:
+            data = f.read()
+        _, bindings = bind_page(kind, lang, slug, data)
+        source = os.path.relpath(path, project_root)
+        if verbose:
+            print(f"  📄 {source}")
+        if kind.record_kind != 'speaker_index':
+            pages = dataset[kind.record_kind].setdefault(slug, {'slug': slug}).setdefault('pages', [])
+            pages.append(lang)
+
+        for record, key, value, category in iter_facts(data, bindings, source):
+            missing = category == 'url' and not os.path.isfile(os.path.join(project_root, value))
+            priority = (missing, PRIORITY.get((kind.name, record[0]), 5))
+            current = chosen.get((record, key, lang))
+            if current is None or priority < current[0]:
+                if current is not None and current[1] != value:
+                    conflicts.append((record, key, value, source, current[1], current[2]))
+                chosen[(record, key, lang)] = (priority, value, source)
+            elif current[1] != value:
+                conflicts.append((record, key, current[1], current[2], value, source))
+
+    for ((record_kind, record_id), key, lang), (priority, value, _) in chosen.items():
+        record = dataset[record_kind].setdefault(record_id, {} if record_kind == 'speaker_index' else {'slug': record_id})
+        if key[0] in LANGUAGES:
+            _set(record, key, value)
+            continue
+        # Shared fields come from the first language; other languages keep
+        # their own value only where Webflow localized it, and an image path
+        # with no local copy behind it is not a localization
+        first = next(chosen[(record_kind, record_id), key, other] for other in LANGUAGES
+                     if ((record_kind, record_id), key, other) in chosen)
+        if lang == LANGUAGES[0] or first is chosen[(record_kind, record_id), key, lang]:
+            _set(record, key, value)
+        elif value != first[1] and not (priority[0] and not first[0][0]):
+            _set(record, (lang,) + key, value)
+
+    tracks = []
+    for session in dataset['sessions'].values():
+        en, zh = session.get('en', {}).get('tracks', []), session.get('zh', {}).get('tracks', [])
+        for index, name in enumerate(en):
+            track = {'en': name, 'zh': zh[index] if index < len(zh) else ''}
+            if track not in tracks:
+                tracks.append(track)
+    dataset['tracks'] = tracks
+    for name in ('speakers', 'sessions'):
+        dataset[name] = dict(sorted(dataset[name].items()))
+    return dataset, conflicts
+
+
+def load_dataset(path=DATA_FILE):
+    """Read a dataset written by save_dataset (JSON, or YAML when PyYAML is installed)."""
+    with open(path, 'r', encoding='utf-8') as f:
+        if path.endswith(('.yaml', '.yml')):
+            import yaml
+            return yaml.safe_load(f)
+        return json.load(f)
+
+
+def save_dataset(dataset, path=DATA_FILE):
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        if path.endswith(('.yaml', '.yml')):
+            import yaml
+            yaml.safe_dump(dataset, f, allow_unicode=True, sort_keys=False, width=1000)
+        else:
+            json.dump(dataset, f, ensure_ascii=False, indent=2)
+            f.write('\n')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Extract the speaker and session dataset from the site pages')
+    parser.add_argument('--root', default='.', help='Project root (default: current directory)')
+    parser.add_argument('-o', '--output', default=DATA_FILE,
+                        help=f'Dataset file, .json or .yaml (default: {DATA_FILE})')
+    parser.add_argument('--conflicts', action='store_true', help='List every field whose copies disagree')
+    parser.add_argument('-v', '--verbose', action='store_true', help='List pages as they are read')
+    args = parser.parse_args()
+
+    if args.output.endswith(('.yaml', '.yml')):
+        try:
+            import yaml  # noqa: F401
+        except ImportError:
+            print("❌ PyYAML is not installed; use a .json output or pip install pyyaml")
+            sys.exit(1)
+
+    print("🔍 Extracting speakers and sessions...")
+    dataset, conflicts = extract(args.root, args.verbose)
+    save_dataset(dataset, args.output)
+
+    print(f"✅ Wrote {args.output}")
+    print(f"   Speakers: {len(dataset['speakers'])}")
+    print(f"   Sessions: {len(dataset['sessions'])}")
+    print(f"   Tracks:   {len(dataset['tracks'])}")
+    print(f"   Tabs:     {', '.join(f'{lang} {len(tabs)}' for lang, tabs in dataset['speaker_index'].items())}")
+    if conflicts:
+        print(f"⚠️  {len(conflicts)} fields differ between pages (kept the owning page's value, or the one with a local copy)")
+        for record, key, kept, kept_source, other, other_source in (conflicts if args.conflicts else conflicts[:5]):
+            print(f"   {record[0]}/{record[1]} {'.'.join(key)}: {kept_source} {kept[:40]!r} vs {other_source} {other[:40]!r}")
+        if not args.conflicts and len(conflicts) > 5:
+            print("   ... (--conflicts lists them all)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,267 @@
+#!/usr/bin/env python3
+"""
+Load the speakers.html tab panels on demand.
+
+speakers.html ships all seven data-w-tab panels - some 2,500 lazy images
+and 500 background-image cards - in one document although a visitor only
+sees one tab at a time. This build step keeps the active tab inline and
+moves every other panel out of the page:
+
+- speakers.html keeps the Tab 1 panel; each other panel is left as an
+  empty stub carrying data-tab-src and a link to where its cards live;
+- speakers-tab-N.html is written next to it for every other tab: the same
+  page with tab N active and inline. It is a complete page, so it is both
+  what the loader fetches and the no-JS fallback - the tab links get an
+  href to it, and without JavaScript a tab click simply opens that page;
+- a small inline loader fetches a stub's page when its tab is activated
+  (or hovered/focused, so the fetch usually finishes before the click
+  does), moves the panel's cards into the stub and re-binds the Webflow
+  interactions for the new cards (through wfRuntime.init() on pages
+  built with webflow_runtime.py).
+
+The variant pages sit in the same directory as the page they come from, so
+every relative URL in the panels stays valid, and carry a canonical link
+back to it. Running the script again on a page that is already split puts
+the panels back from the variant pages first, so it can be re-run after
+editing them; run it after the steps that work on all the tabs at once
+(dedup_speakers_stream.py, fix_speaker_duplicates_v2.py, site_generator.py).
+
+Usage:
+    python3 "python scripts/split_speaker_tabs.py" --dry-run
+    python3 "python scripts/split_speaker_tabs.py" speakers.html zh/speakers.html
+"""
+
+import os
+import re
+import sys
+import time
+import html
+import argparse
+
+from html_stream import build_tree, apply_edits, set_attr_edit, remove_attr_edit
+
+DEFAULT_PAGES = ['speakers.html', 'zh/speakers.html']
+
+LOADER_ID = 'tab-fragments'
+LOADER = re.compile(rb'\s*<script id="' + LOADER_ID.encode() + rb'">.*?</script>', re.DOTALL)
+
+LOADER_SCRIPT = b'''<script id="tab-fragments">
+(function () {
+  function paneFor(link) {
+    var tabs = link.closest('.w-tabs');
+    var name = link.getAttribute('data-w-tab');
+    return tabs && tabs.querySelector('.w-tab-pane[data-w-tab="' + name + '"][data-tab-src]');
+  }
+  function load(pane) {
+    if (!pane || pane.hasAttribute('data-tab-state')) return;
+    pane.setAttribute('data-tab-state', 'loading');
+    fetch(pane.getAttribute('data-tab-src')).then(function (response) {
+      if (!response.ok) throw new Error(response.status);
+      return response.text();
+    }).then(function (text) {
+      var page = new DOMParser().parseFromString(text, 'text/html');
+      var source = page.querySelector('.w-tab-pane[data-w-tab="' + pane.getAttribute('data-w-tab') + '"]');
+      if (!source) throw new Error('panel not found');
+      pane.innerHTML = source.innerHTML;
+      pane.setAttribute('data-tab-state', 'loaded');
+      if (window.wfRuntime) return wfRuntime.init(pane);
+      var ix2 = window.Webflow && Webflow.require && Webflow.require('ix2');
+      if (ix2 && ix2.init) ix2.init();
+    }).catch(function () {
+      // Leave the fallback link in place and try again on the next activation
+      pane.removeAttribute('data-tab-state');
+    });
+  }
+  document.querySelectorAll('.w-tab-link[data-w-tab]').forEach(function (link) {
+    link.addEventListener('click', function (e) { e.preventDefault(); load(paneFor(link)); });
+    ['mouseenter', 'focus', 'touchstart'].forEach(function (type) {
+      link.addEventListener(type, function () { load(paneFor(link)); }, { passive: true });
+    });
+  });
+})();
+</script>'''
+
+
+def variant_name(page, tab):
+    """File name of the page variant with the given tab inline, e.g. speakers-tab-2.html."""
+    stem, ext = os.path.splitext(os.path.basename(page))
+    return f"{stem}-tab-{tab.split()[-1]}{ext}"
+
+
+def tab_widgets(tree):
+    """(tabs element, [tab links], [tab panes]) for every Webflow tabs widget on the page."""
+    widgets = []
+    for tabs in tree.find_all('div', 'w-tabs'):
+        links = [link for link in tabs.find_all(classes='w-tab-link') if 'data-w-tab' in link.attrs]
+        panes = [pane for pane in tabs.find_all('div', 'w-tab-pane') if 'data-w-tab' in pane.attrs]
+        if panes:
+            widgets.append((tabs, links, panes))
+    return widgets
+
+
+def _set_class(data, element, name, present):
+    classes = element.attrs.get('class', '').split()
+    if (name in classes) == present:
+        return None
+    classes = classes + [name] if present else [c for c in classes if c != name]
+    return set_attr_edit(data, element, 'class', ' '.join(classes))
+
+
+def restore_panels(data, directory):
+    """
+    Put back the panels of an already split page from its variant pages.
+    Returns (data, number of panels restored).
+    """
+    tree = build_tree(data)
+    edits = []
+    for _, _, panes in tab_widgets(tree):
+        for pane in panes:
+            src = pane.attrs.get('data-tab-src')
+            if not src:
+                continue
+            with open(os.path.join(directory, src), 'rb') as f:
+                variant = f.read()
+            source = next((other for _, _, others in tab_widgets(build_tree(variant)) for other in others
+                           if other.attrs['data-w-tab'] == pane.attrs['data-w-tab']
+                           and 'data-tab-src' not in other.attrs), None)
+            if source is None:
+                raise ValueError(f"{src} has no inline panel for {pane.attrs['data-w-tab']}")
+            edits.append(remove_attr_edit(data, pane, 'data-tab-src'))
+            edits.append((pane.inner_start, pane.inner_end, variant[source.inner_start:source.inner_end]))
+    return apply_edits(data, edits), len(edits) // 2
+
+
+def render_variant(data, page, active, labels, canonical=None):
+    """
+    The page with only the active tab's panel inline. Every other panel
+    becomes a stub that points at its variant page (the page itself for the
+    default tab).
+    """
+    tree = build_tree(data)
+
+    def source(tab):
+        return os.path.basename(page) if tab == labels['default'] else variant_name(page, tab)
+
+    edits = []
+    for tabs, links, panes in tab_widgets(tree):
+        edits.append(set_attr_edit(data, tabs, 'data-current', active))
+        for link in links:
+            tab = link.attrs['data-w-tab']
+            edits.append(_set_class(data, link, 'w--current', tab == active))
+            edits.append(set_attr_edit(data, link, 'href', source(tab)))
+        for pane in panes:
+            tab = pane.attrs['data-w-tab']
+            edits.append(_set_class(data, pane, 'w--tab-active', tab == active))
+            if tab == active:
+                continue
+            src = source(tab)
+            label = html.escape(labels.get(tab, tab)).encode('utf-8')
+            edits.append(set_attr_edit(data, pane, 'data-tab-src', src))
+            edits.append((pane.inner_start, pane.inner_end,
+                          b'\n<div class="tab-fragment-fallback"><a href="' + src.encode('utf-8') + b'">'
+                          + label + b'</a></div>\n'))
+
+    body_end = data.rfind(b'</body>')
+    if body_end != -1:
+        edits.append((body_end, body_end, LOADER_SCRIPT + b'\n'))
+    if canonical:
+        head_end = data.find(b'</head>')
+        if head_end != -1 and b'rel="canonical"' not in data[:head_end]:
+            edits.append((head_end, head_end, b'<link rel="canonical" href="' + canonical.encode('utf-8') + b'"/>\n'))
+    return apply_edits(data, edits)
+
+
+def tab_labels(data, tree):
+    """{tab name: visible tab link text}, plus 'default': the tab that is active as shipped."""
+    labels = {}
+    for tabs, links, panes in tab_widgets(tree):
+        labels.setdefault('default', tabs.attrs.get('data-current') or panes[0].attrs['data-w-tab'])
+        for link in links:
+            text = re.sub(rb'<[^>]*>', b' ', data[link.inner_start:link.inner_end])
+            labels[link.attrs['data-w-tab']] = ' '.join(html.unescape(text.decode('utf-8')).split())
+    return labels
+
+
+def parse_seconds(data, repeat=3):
+    """Best-of-n time to tokenize and build a tree of the document, a rough proxy for parse cost."""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        build_tree(data)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def split_page(page, dry_run=False):
+    """Split one page. Returns {output path: bytes written} or None if the page has no tabs."""
+    with open(page, 'rb') as f:
+        original = f.read()
+    directory = os.path.dirname(page)
+
+    data, restored = restore_panels(original, directory)
+    data = LOADER.sub(b'', data)
+    tree = build_tree(data)
+    if not tab_widgets(tree):
+        return None
+    if restored:
+        print(f"  ↺ restored {restored} panels from the existing variant pages")
+
+    labels = tab_labels(data, tree)
+    default = labels['default']
+    tabs = [pane.attrs['data-w-tab'] for _, _, panes in tab_widgets(tree) for pane in panes]
+
+    outputs = {page: render_variant(data, page, default, labels)}
+    variant_tabs = {}
+    for tab in tabs:
+        if tab != default:
+            path = os.path.join(directory, variant_name(page, tab))
+            variant_tabs[path] = tab
+            outputs[path] = render_variant(data, page, tab, labels, canonical=os.path.basename(page))
+
+    initial = outputs[page]
+    print(f"  {page}: {len(data) / 1024:.0f} KB -> {len(initial) / 1024:.0f} KB initial HTML "
+          f"({len(data) / max(len(initial), 1):.1f}x smaller)")
+    print(f"    images in the initial document: {data.count(b'<img')} -> {initial.count(b'<img')}, "
+          f"background-image cards: {data.count(b'background-image')} -> {initial.count(b'background-image')}")
+    print(f"    tree build: {parse_seconds(data) * 1000:.0f} ms -> {parse_seconds(initial) * 1000:.0f} ms")
+    for path, tab in variant_tabs.items():
+        print(f"    + {os.path.basename(path)} ({len(outputs[path]) / 1024:.0f} KB, {labels.get(tab, tab)})")
+
+    if not dry_run:
+        for path, content in outputs.items():
+            if path == page and content == original:
+                continue
+            with open(path, 'wb') as f:
+                f.write(content)
+    return {path: len(content) for path, content in outputs.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Split the speakers page tab panels into pages loaded on demand')
+    parser.add_argument('pages', nargs='*', default=DEFAULT_PAGES, help='Pages with Webflow tabs to split')
+    parser.add_argument('--dry-run', action='store_true', help='Report sizes without writing anything')
+    args = parser.parse_args()
+
+    print("🔍 Splitting tab panels" + (" (dry run)" if args.dry_run else ""))
+    print("=" * 50)
+    failed = False
+    for page in args.pages:
+        if not os.path.exists(page):
+            print(f"  ⚠️  {page} not found")
+            continue
+        try:
+            result = split_page(page, args.dry_run)
+        except (OSError, ValueError) as e:
+            print(f"  ❌ {page}: {e}")
+            failed = True
+            continue
+        if result is None:
+            print(f"  - {page}: no tabs, skipped")
+    if not args.dry_run and not failed:
+        print("\n✅ Done. Check the pages in a browser: other tabs load when clicked, and open as pages without JavaScript.")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
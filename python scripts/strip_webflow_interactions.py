@@ -0,0 +1,688 @@
+#!/usr/bin/env python3
+"""
+Strip Webflow interaction (IX2) bloat from the pages.
+
+Every page carries data-w-id hooks for IX2 - one on each nav button, several
+on each of the 500 speaker cards - and Webflow exports initial states as
+inline style="opacity:0;transform:..." on animated elements. Many of the
+hooks no longer belong to any interaction, and the simple animations do not
+need JavaScript at all. This pass reads the interaction data from the
+require("ix2").init({...}) call in js/china2024.js and:
+
+1. inventories the events: which page and element each one is bound to,
+   which action list it runs and whether it can ever fire. Events bound to
+   a page id no page of the site has, or running an empty action list, are
+   dead and dropped from the script along with action lists nothing runs
+   any more;
+2. replaces the animations CSS can express with CSS: MOUSE_OVER/MOUSE_OUT
+   pairs that move, rotate, scale, fade or recolour the element or its
+   descendants become :hover rules with transitions, and looping
+   scroll-into-view/page-load moves (the logo marquee) become @keyframes.
+   Those events are dropped from the script too;
+3. removes every data-w-id that no remaining event, action or CSS rule
+   refers to, and moves inline initial states (opacity/transform) of the
+   elements that keep their hook into one CSS rule per hook, so copies of a
+   card share a rule instead of repeating the style.
+
+The generated rules go into a <style id="ix2-css"> block in each page's
+<head>, holding only the rules for elements on that page. Running the pass
+again keeps the rules already there, so it is safe to re-run after a
+re-export or on new pages. Interactions CSS cannot express (clicks,
+navbar/dropdown states, display toggles, scroll progress) stay in IX2.
+
+Usage:
+    python3 "python scripts/strip_webflow_interactions.py" --dry-run
+    python3 "python scripts/strip_webflow_interactions.py" --report ix2_strip_report.md
+    python3 "python scripts/strip_webflow_interactions.py" --keep-js   # only strip dead hooks
+"""
+
+import os
+import re
+import sys
+import json
+import argparse
+from collections import Counter, defaultdict
+
+from html_stream import build_tree, apply_edits
+from site_partials import find_pages
+
+IX2_SCRIPT = 'js/china2024.js'
+IX2_INIT = 'require("ix2").init('
+
+STYLE_ID = 'ix2-css'
+STYLE_BLOCK = re.compile(rb'<style id="' + STYLE_ID.encode() + rb'">(.*?)</style>\n?', re.DOTALL)
+WID_REFERENCE = re.compile(r'\[data-w-id="([^"]+)"\]')
+WID_ATTRIBUTE = re.compile(rb'\sdata-w-id\s*=\s*"[^"]*"', re.IGNORECASE)
+WID_VALUE = re.compile(rb'\sdata-w-id="([^"]*)"')
+STYLE_ATTRIBUTE = re.compile(rb'\sstyle\s*=\s*"([^"]*)"', re.IGNORECASE)
+PAGE_ID = re.compile(rb'<html[^>]*\sdata-wf-page="([^"]*)"')
+
+# Inline declarations Webflow writes for IX2 initial states
+INITIAL_STATE_PROPERTIES = {'opacity', 'transform', '-webkit-transform', '-moz-transform', '-ms-transform',
+                            'transform-style'}
+
+# IX2 easing names; an empty name is linear. Back/elastic/bounce have no cubic-bezier equivalent.
+EASINGS = {
+    '': 'linear', 'ease': 'ease', 'easeIn': 'ease-in', 'easeOut': 'ease-out', 'easeInOut': 'ease-in-out',
+    'inQuad': 'cubic-bezier(0.55, 0.085, 0.68, 0.53)', 'outQuad': 'cubic-bezier(0.25, 0.46, 0.45, 0.94)',
+    'inOutQuad': 'cubic-bezier(0.455, 0.03, 0.515, 0.955)',
+    'inCubic': 'cubic-bezier(0.55, 0.055, 0.675, 0.19)', 'outCubic': 'cubic-bezier(0.215, 0.61, 0.355, 1)',
+    'inOutCubic': 'cubic-bezier(0.645, 0.045, 0.355, 1)',
+    'inQuart': 'cubic-bezier(0.895, 0.03, 0.685, 0.22)', 'outQuart': 'cubic-bezier(0.165, 0.84, 0.44, 1)',
+    'inOutQuart': 'cubic-bezier(0.77, 0, 0.175, 1)',
+    'inQuint': 'cubic-bezier(0.755, 0.05, 0.855, 0.06)', 'outQuint': 'cubic-bezier(0.23, 1, 0.32, 1)',
+    'inOutQuint': 'cubic-bezier(0.86, 0, 0.07, 1)',
+    'inSine': 'cubic-bezier(0.47, 0, 0.745, 0.715)', 'outSine': 'cubic-bezier(0.39, 0.575, 0.565, 1)',
+    'inOutSine': 'cubic-bezier(0.445, 0.05, 0.55, 0.95)',
+    'inExpo': 'cubic-bezier(0.95, 0.05, 0.795, 0.035)', 'outExpo': 'cubic-bezier(0.19, 1, 0.22, 1)',
+    'inOutExpo': 'cubic-bezier(1, 0, 0, 1)',
+    'inCirc': 'cubic-bezier(0.6, 0.04, 0.98, 0.335)', 'outCirc': 'cubic-bezier(0.075, 0.82, 0.165, 1)',
+    'inOutCirc': 'cubic-bezier(0.785, 0.135, 0.15, 0.86)',
+}
+
+# action type -> (transform function, default value, default unit)
+TRANSFORM_ACTIONS = {
+    'TRANSFORM_MOVE': ('translate', 0, 'px'),
+    'TRANSFORM_SCALE': ('scale', 1, ''),
+    'TRANSFORM_ROTATE': ('rotate', 0, 'deg'),
+}
+TRANSFORM_ORDER = ['translate', 'scale', 'rotate']
+LOOP_EVENTS = {'SCROLL_INTO_VIEW', 'PAGE_START', 'PAGE_FINISH'}
+
+JS_TOKEN = re.compile(r'''\s*(?:
+    (?P<punct>[{}\[\]:,])
+  | (?P<string>"(?:[^"\\]|\\.)*"|'(?:[^'\\]|\\.)*')
+  | (?P<bool>!0|!1)
+  | (?P<number>-?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?)
+  | (?P<name>[A-Za-z_$][\w$]*)
+)''', re.VERBOSE | re.DOTALL)
+
+
+class NotConvertible(Exception):
+    """An interaction that CSS cannot reproduce; the message says why."""
+
+
+def parse_js_literal(text, position=0):
+    """
+    Parse the JavaScript object literal starting at text[position], as
+    minifiers write it (unquoted keys, !0/!1 booleans, 1e4 numbers).
+    Returns (value, end position).
+    """
+    def token(at):
+        match = JS_TOKEN.match(text, at)
+        if match is None:
+            raise ValueError(f"unexpected {text[at:at + 30]!r} at offset {at}")
+        return match.lastgroup, match.group(match.lastgroup), match.end()
+
+    def string(raw):
+        if raw[0] == '"':
+            return json.loads(raw)
+        return json.loads('"' + raw[1:-1].replace('\\\'', '\'').replace('"', '\\"') + '"')
+
+    def value(at):
+        kind, raw, at = token(at)
+        if kind == 'string':
+            return string(raw), at
+        if kind == 'bool':
+            return raw == '!0', at
+        if kind == 'number':
+            return (float(raw) if any(c in raw for c in '.eE') else int(raw)), at
+        if kind == 'name':
+            constants = {'null': None, 'true': True, 'false': False}
+            if raw not in constants:
+                raise ValueError(f"unsupported name {raw!r} at offset {at}")
+            return constants[raw], at
+        if raw == '{':
+            result = {}
+            kind, raw, after = token(at)
+            if raw == '}':
+                return result, after
+            while True:
+                kind, raw, at = token(at)
+                key = string(raw) if kind == 'string' else raw
+                if token(at)[1] != ':':
+                    raise ValueError(f"expected ':' at offset {at}")
+                result[key], at = value(token(at)[2])
+                kind, raw, at = token(at)
+                if raw == '}':
+                    return result, at
+        if raw == '[':
+            result = []
+            kind, raw, after = token(at)
+            if raw == ']':
+                return result, after
+            while True:
+                item, at = value(at)
+                result.append(item)
+                kind, raw, at = token(at)
+                if raw == ']':
+                    return result, at
+        raise ValueError(f"unexpected {raw!r} at offset {at}")
+
+    return value(position)
+
+
+def load_interactions(path):
+    """(script text, interaction data, start, end) of the object passed to require("ix2").init()."""
+    with open(path, 'r', encoding='utf-8') as f:
+        text = f.read()
+    call = text.find(IX2_INIT)
+    if call == -1:
+        raise ValueError(f"no {IX2_INIT} call in {path}")
+    start = call + len(IX2_INIT)
+    data, end = parse_js_literal(text, start)
+    return text, data, start, end
+
+
+def split_target(target_id):
+    """'pageId|elementId' -> (pageId, elementId); ids bound to no page (symbols) give (None, elementId)."""
+    page, _, wid = target_id.rpartition('|')
+    return page or None, wid
+
+
+def _number(value):
+    return str(int(value)) if float(value).is_integer() else f"{value:g}"
+
+
+def _unit(unit, default):
+    return (unit or default).lower() if unit != '%' else '%'
+
+
+class Interactions:
+    """The events and action lists of the IX2 data."""
+
+    def __init__(self, data):
+        self.data = data
+        self.events = data.get('events', {})
+        self.action_lists = data.get('actionLists', {})
+        self.breakpoints = {query['key']: (query['min'], query['max'])
+                            for query in data.get('site', {}).get('mediaQueries', [])}
+
+    def action_list(self, event):
+        return self.action_lists.get(event['action']['config'].get('actionListId'))
+
+    @staticmethod
+    def items(action_list):
+        for group in action_list.get('actionItemGroups', []):
+            yield from group.get('actionItems', [])
+        for parameters in action_list.get('continuousParameterGroups', []):
+            for group in parameters.get('continuousActionGroups', []):
+                yield from group.get('actionItems', [])
+
+    def targets(self, event):
+        """(page, element id) of everything the event is bound to."""
+        for target in event.get('targets') or [event.get('target', {})]:
+            if target.get('id'):
+                yield split_target(target['id'])
+
+    def dead_reason(self, event, site):
+        """
+        Why an event can never do anything on this site, or None. site maps
+        each page id to the data-w-ids on the pages that have it.
+        """
+        action_list = self.action_list(event)
+        if action_list is None or not any(True for _ in self.items(action_list)):
+            return 'empty action list'
+        targets = list(self.targets(event))
+        if not targets:
+            return None
+        if all(page is not None and page not in site for page, _ in targets):
+            return 'page not on the site'
+        if not any(wid in wids for page, wid in targets for page_id, wids in site.items()
+                   if page is None or page == page_id):
+            return 'element not on its page'
+        return None
+
+    def used_wids(self, page_id):
+        """Element ids the remaining events and actions refer to on a page."""
+        used = set()
+        for event in self.events.values():
+            for page, wid in self.targets(event):
+                if page is None or page == page_id:
+                    used.add(wid)
+        for action_list in self.action_lists.values():
+            for item in self.items(action_list):
+                target = item.get('config', {}).get('target', {})
+                if target.get('id'):
+                    used.add(split_target(target['id'])[1])
+        return used
+
+    def media_query(self, keys):
+        """CSS media condition for a list of IX2 breakpoint keys, '' for all of them."""
+        if set(keys) >= set(self.breakpoints):
+            return ''
+        ranges = sorted(self.breakpoints[key] for key in keys)
+        for (_, high), (low, _) in zip(ranges, ranges[1:]):
+            if low > high + 1:
+                raise NotConvertible('breakpoints are not contiguous')
+        low, high = ranges[0][0], ranges[-1][1]
+        conditions = []
+        if low > 0:
+            conditions.append(f"(min-width: {low}px)")
+        if high < 10000:
+            conditions.append(f"(max-width: {high}px)")
+        return ' and '.join(conditions)
+
+
+class Conversion:
+    """
+    An interaction rewritten as CSS, bound to one trigger element.
+
+    targets maps a target key - ('self',), ('id', wid) or ('class', name) -
+    to its rule bodies; css() emits the rules for the targets present on a
+    page.
+    """
+
+    def __init__(self, kind, name, events, trigger, media):
+        self.kind = kind
+        self.name = name
+        self.events = events
+        self.trigger = trigger
+        self.media = media
+        self.rules = []        # (target key, pseudo-class, declarations)
+        self.keyframes = []    # css text of @keyframes blocks
+
+    @staticmethod
+    def selector(key):
+        if key[0] == 'self':
+            return ''
+        if key[0] == 'id':
+            return f' [data-w-id="{key[1]}"]'
+        return f' .{key[1]}'
+
+    def css(self, present):
+        """CSS lines for the targets in present, or None if none of them are on the page."""
+        trigger = f'[data-w-id="{self.trigger[1]}"]'
+        rules = [f"{trigger}{pseudo}{self.selector(key)} {{{declarations}}}"
+                 for key, pseudo, declarations in self.rules if key in present]
+        if not rules:
+            return None
+        css = ' '.join(rules)
+        if self.media:
+            css = f"@media {self.media} {{{css}}}"
+        return self.keyframes + [css]
+
+
+def _target_key(item):
+    target = item['config'].get('target', {})
+    selector = target.get('selector')
+    if target.get('useEventTarget') is True and not selector:
+        return ('self',)
+    if target.get('id') and not target.get('useEventTarget'):
+        return ('id', split_target(target['id'])[1])
+    if target.get('useEventTarget') == 'CHILDREN' and selector and re.fullmatch(r'\.[\w-]+', selector):
+        return ('class', selector[1:])
+    raise NotConvertible(f"target {json.dumps(target, sort_keys=True)} is not a descendant of the trigger")
+
+
+def _state(items):
+    """
+    {target key: {css property: value}} and {target key: {css property:
+    (duration, delay, easing)}} for one action item group.
+    """
+    transforms = defaultdict(dict)
+    values = defaultdict(dict)
+    timings = defaultdict(dict)
+    for item in items:
+        action, config = item['actionTypeId'], item['config']
+        key = _target_key(item)
+        if config.get('easing', '') not in EASINGS:
+            raise NotConvertible(f"easing {config['easing']!r}")
+        timing = (config.get('duration', 0), config.get('delay', 0), EASINGS[config.get('easing', '')])
+        if action in TRANSFORM_ACTIONS:
+            function, default, unit = TRANSFORM_ACTIONS[action]
+            transforms[key][function] = tuple(
+                (config.get(axis + 'Value', default), _unit(config.get(axis + 'Unit'), unit)) for axis in 'xyz')
+            prop = 'transform'
+        elif action == 'STYLE_OPACITY':
+            values[key]['opacity'] = _number(config['value'])
+            prop = 'opacity'
+        elif action == 'STYLE_BACKGROUND_COLOR':
+            values[key]['background-color'] = (
+                f"rgba({config['rValue']}, {config['gValue']}, {config['bValue']}, {_number(config['aValue'])})")
+            prop = 'background-color'
+        else:
+            raise NotConvertible(action)
+        if timings[key].setdefault(prop, timing) != timing:
+            raise NotConvertible(f"{prop} parts animate with different timings")
+    return transforms, values, timings
+
+
+def _transform(functions, used):
+    parts = []
+    for function in TRANSFORM_ORDER:
+        if function not in used:
+            continue
+        _, default, unit = next(spec for spec in TRANSFORM_ACTIONS.values() if spec[0] == function)
+        axes = functions.get(function, tuple((default, unit) for _ in 'xyz'))
+        if function == 'translate':
+            parts.append('translate3d(' + ', '.join(_number(v) + u for v, u in axes) + ')')
+        elif function == 'scale':
+            parts.append('scale3d(' + ', '.join(_number(v) for v, _ in axes) + ')')
+        else:
+            parts.append(' '.join(f"rotate{axis.upper()}({_number(v)}{u})" for axis, (v, u) in zip('xyz', axes)))
+    return ' '.join(parts)
+
+
+def _declarations(transforms, values, used_functions):
+    declarations = dict(values)
+    if transforms or used_functions:
+        declarations['transform'] = _transform(transforms, used_functions)
+    return declarations
+
+
+def _transition(timings):
+    return ', '.join(f"{prop} {_number(duration)}ms {easing}" + (f" {_number(delay)}ms" if delay else '')
+                     for prop, (duration, delay, easing) in sorted(timings.items()))
+
+
+def _body(declarations, extra=''):
+    body = '; '.join(f"{prop}: {value}" for prop, value in sorted(declarations.items()))
+    return body + (f"; {extra}" if extra else '')
+
+
+def convert_hover(interactions, over, out):
+    """A MOUSE_OVER/MOUSE_OUT event pair as :hover rules with transitions."""
+    over_list, out_list = interactions.action_list(over), interactions.action_list(out)
+    over_groups = over_list.get('actionItemGroups', [])
+    out_groups = out_list.get('actionItemGroups', [])
+    if not over_list.get('useFirstGroupAsInitialState') or len(over_groups) != 2 or len(out_groups) != 1:
+        raise NotConvertible('hover is not a plain initial state -> hover state -> back')
+    initial = _state(over_groups[0]['actionItems'])
+    hover = _state(over_groups[1]['actionItems'])
+    rest = _state(out_groups[0]['actionItems'])
+    if initial[:2] != rest[:2]:
+        raise NotConvertible('mouse-out does not return to the initial state')
+    if set(hover[2]) != set(rest[2]) or any(set(hover[2][key]) != set(rest[2][key]) for key in hover[2]):
+        raise NotConvertible('hover and mouse-out animate different properties')
+
+    trigger = next(interactions.targets(over))
+    conversion = Conversion('hover', over_list.get('title', ''), [over['id'], out['id']], trigger,
+                            interactions.media_query(over['mediaQueries']))
+    for key in rest[2]:
+        used = set(rest[0].get(key, {})) | set(hover[0].get(key, {}))
+        conversion.rules.append((key, '', _body(_declarations(rest[0].get(key, {}), rest[1].get(key, {}), used),
+                                                'transition: ' + _transition(rest[2][key]))))
+        conversion.rules.append((key, ':hover', _body(_declarations(hover[0].get(key, {}), hover[1].get(key, {}), used),
+                                                      'transition: ' + _transition(hover[2][key]))))
+    return conversion
+
+
+def convert_loop(interactions, event):
+    """A looping animation that plays to the end and jumps back, as @keyframes."""
+    action_list = interactions.action_list(event)
+    groups = action_list.get('actionItemGroups', [])
+    if action_list.get('useFirstGroupAsInitialState') or len(groups) != 2:
+        raise NotConvertible('loop is not a single animation followed by a reset')
+    forward = _state(groups[0]['actionItems'])
+    reset = _state(groups[1]['actionItems'])
+    if any(duration or delay for timings in reset[2].values() for duration, delay, _ in timings.values()):
+        raise NotConvertible('loop reset is animated')
+    if set(forward[2]) != set(reset[2]):
+        raise NotConvertible('loop reset touches other elements')
+
+    trigger = next(interactions.targets(event))
+    conversion = Conversion('loop', action_list.get('title', ''), [event['id']], trigger,
+                            interactions.media_query(event['mediaQueries']))
+    for number, key in enumerate(sorted(forward[2]), 1):
+        timings = set(forward[2][key].values())
+        if len(timings) != 1:
+            raise NotConvertible('loop properties animate with different timings')
+        duration, delay, easing = timings.pop()
+        used = set(forward[0].get(key, {})) | set(reset[0].get(key, {}))
+        name = f"ix2-{action_list['id']}-{number}"
+        start = _body(_declarations(reset[0].get(key, {}), reset[1].get(key, {}), used))
+        end = _body(_declarations(forward[0].get(key, {}), forward[1].get(key, {}), used))
+        conversion.keyframes.append(f"@keyframes {name} {{from {{{start}}} to {{{end}}}}}")
+        conversion.rules.append((key, '', f"animation: {name} {_number(duration)}ms {easing}"
+                                          + (f" {_number(delay)}ms" if delay else '') + ' infinite'))
+    return conversion
+
+
+def plan(interactions, site):
+    """
+    Decide what happens to every event. Returns (conversions, dead, kept):
+    dead maps event id -> reason, kept maps event id -> why it stays in IX2.
+    """
+    dead = {}
+    live = []
+    for event_id, event in interactions.events.items():
+        reason = interactions.dead_reason(event, site)
+        if reason:
+            dead[event_id] = reason
+        else:
+            live.append(event)
+
+    conversions = []
+    kept = {}
+    by_trigger = defaultdict(dict)
+    for event in live:
+        if event['eventTypeId'] in ('MOUSE_OVER', 'MOUSE_OUT'):
+            targets = list(interactions.targets(event))
+            if len(targets) == 1:
+                by_trigger[(targets[0], tuple(event['mediaQueries']))][event['eventTypeId']] = event
+                continue
+        if event['eventTypeId'] in LOOP_EVENTS and event.get('config', {}).get('loop'):
+            try:
+                conversions.append(convert_loop(interactions, event))
+            except NotConvertible as e:
+                kept[event['id']] = str(e)
+            continue
+        kept[event['id']] = event['eventTypeId'].lower().replace('_', ' ')
+
+    for pair in by_trigger.values():
+        if len(pair) != 2:
+            for event in pair.values():
+                kept[event['id']] = 'hover without a matching mouse-out'
+            continue
+        try:
+            conversions.append(convert_hover(interactions, pair['MOUSE_OVER'], pair['MOUSE_OUT']))
+        except NotConvertible as e:
+            for event in pair.values():
+                kept[event['id']] = str(e)
+    return conversions, dead, kept
+
+
+def prune(data, removed_events):
+    """The IX2 data without the given events and the action lists nothing runs any more."""
+    events = {event_id: event for event_id, event in data['events'].items() if event_id not in removed_events}
+    running = {event['action']['config'].get('actionListId') for event in events.values()}
+    action_lists = {list_id: action_list for list_id, action_list in data['actionLists'].items()
+                    if list_id in running}
+    return dict(data, events=events, actionLists=action_lists)
+
+
+def _split_style(value):
+    declarations = []
+    for declaration in value.split(';'):
+        prop, _, prop_value = declaration.partition(':')
+        if prop.strip():
+            declarations.append((prop.strip().lower(), prop_value.strip()))
+    return declarations
+
+
+def present_targets(element):
+    """Target keys a conversion can use below one trigger element."""
+    present = {('self',)}
+    for descendant in element.iter():
+        if descendant is element:
+            continue
+        if 'data-w-id' in descendant.attrs:
+            present.add(('id', descendant.attrs['data-w-id']))
+        for name in descendant.classes:
+            present.add(('class', name))
+    return present
+
+
+def strip_page(data, interactions, conversions):
+    """
+    Strip one page. Returns (new bytes, stats) where stats counts the removed
+    hooks, the moved initial states and the CSS rules in the page.
+    """
+    old_lines = []
+    old_block = STYLE_BLOCK.search(data)
+    if old_block:
+        old_lines = [line.strip() for line in old_block.group(1).decode('utf-8').splitlines() if line.strip()]
+        data = data[:old_block.start()] + data[old_block.end():]
+
+    tree = build_tree(data)
+    html_element = tree.find('html')
+    page_id = html_element.attrs.get('data-wf-page') if html_element else None
+    hooked = defaultdict(list)
+    for element in tree.iter():
+        if 'data-w-id' in element.attrs:
+            hooked[element.attrs['data-w-id']].append(element)
+
+    lines = list(old_lines)
+    for conversion in conversions:
+        page, wid = conversion.trigger
+        if page not in (None, page_id) or wid not in hooked:
+            continue
+        present = set()
+        for trigger in hooked[wid]:
+            present |= present_targets(trigger)
+        for line in conversion.css(present) or []:
+            if line not in lines:
+                lines.append(line)
+
+    used = interactions.used_wids(page_id)
+    for line in lines:
+        used.update(WID_REFERENCE.findall(line))
+
+    edits = []
+    stats = Counter()
+    for wid, elements in hooked.items():
+        if wid not in used:
+            for element in elements:
+                match = WID_ATTRIBUTE.search(data, element.start, element.inner_start)
+                edits.append((match.start(), match.end(), b''))
+                stats['hooks removed'] += 1
+            continue
+        styles = []
+        for element in elements:
+            match = STYLE_ATTRIBUTE.search(data, element.start, element.inner_start)
+            styles.append((match, _split_style(match.group(1).decode('utf-8')) if match else []))
+        states = {tuple(d for d in declarations if d[0] in INITIAL_STATE_PROPERTIES) for _, declarations in styles}
+        if len(states) != 1 or not next(iter(states)):
+            continue
+        state = dict(next(iter(states)))
+        if 'transform' not in state:
+            for prefixed in ('-webkit-transform', '-moz-transform', '-ms-transform'):
+                if prefixed in state:
+                    state['transform'] = state[prefixed]
+        state = {prop: value for prop, value in state.items() if not prop.startswith('-')}
+        line = f'[data-w-id="{wid}"] {{{_body(state)}}}'
+        if line not in lines:
+            lines.append(line)
+        for match, declarations in styles:
+            remaining = ';'.join(f"{prop}:{value}" for prop, value in declarations
+                                 if prop not in INITIAL_STATE_PROPERTIES)
+            replacement = f' style="{remaining}"'.encode('utf-8') if remaining else b''
+            edits.append((match.start(), match.end(), replacement))
+            stats['initial states moved'] += 1
+
+    if lines:
+        head_end = data.find(b'</head>')
+        if head_end != -1:
+            block = f'<style id="{STYLE_ID}">\n' + '\n'.join(lines) + '\n</style>\n'
+            edits.append((head_end, head_end, block.encode('utf-8')))
+        stats['css rules'] = len(lines)
+    return apply_edits(data, edits), stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Strip unused Webflow interaction hooks and replace simple animations with CSS')
+    parser.add_argument('--project-root', default='.', help='Project root directory')
+    parser.add_argument('--script', default=IX2_SCRIPT, help='Script holding the require("ix2").init() data')
+    parser.add_argument('--keep-js', action='store_true',
+                        help='Leave the script alone: only strip hooks no interaction uses, convert nothing')
+    parser.add_argument('--dry-run', action='store_true', help='Report without writing anything')
+    parser.add_argument('--report', help='Also write the per-page report to this Markdown file')
+    args = parser.parse_args()
+
+    script_path = os.path.join(args.project_root, args.script)
+    try:
+        script, data, start, end = load_interactions(script_path)
+    except (OSError, ValueError) as e:
+        print(f"❌ Could not read the interaction data: {e}")
+        sys.exit(1)
+
+    pages = find_pages(args.project_root)
+    site = defaultdict(set)
+    for page in pages:
+        with open(os.path.join(args.project_root, page), 'rb') as f:
+            content = f.read()
+        match = PAGE_ID.search(content)
+        site[match.group(1).decode('ascii') if match else None].update(
+            wid.decode('utf-8') for wid in WID_VALUE.findall(content))
+
+    interactions = Interactions(data)
+    conversions, dead, kept = plan(interactions, site)
+    if args.keep_js:
+        conversions, dead = [], {}
+    removed = set(dead) | {event_id for conversion in conversions for event_id in conversion.events}
+    pruned = prune(data, removed)
+
+    print(f"🔍 Interactions in {args.script}: {len(interactions.events)} events, "
+          f"{len(interactions.action_lists)} action lists")
+    print("=" * 50)
+    for reason, count in Counter(dead.values()).most_common():
+        print(f"  🗑  {count:3d} dead events ({reason})")
+    for conversion in conversions:
+        print(f"  🎨 {', '.join(conversion.events)}: {conversion.kind} '{conversion.name}' -> CSS"
+              + (f" @media {conversion.media}" if conversion.media else ''))
+    for reason, count in Counter(kept.values()).most_common():
+        print(f"  ⏸  {count:3d} events stay in IX2 ({reason})")
+
+    remaining = Interactions(pruned)
+    rows = []
+    totals = Counter()
+    for page in pages:
+        path = os.path.join(args.project_root, page)
+        with open(path, 'rb') as f:
+            original = f.read()
+        content, stats = strip_page(original, remaining, conversions)
+        saved = len(original) - len(content)
+        totals.update(stats)
+        totals['bytes'] += saved
+        if content != original:
+            rows.append((page, len(original), len(content), stats))
+            if not args.dry_run:
+                with open(path, 'wb') as f:
+                    f.write(content)
+
+    new_script = script
+    if removed:
+        new_script = script[:start] + json.dumps(pruned, separators=(',', ':'), ensure_ascii=False) + script[end:]
+        if not args.dry_run:
+            with open(script_path, 'w', encoding='utf-8') as f:
+                f.write(new_script)
+
+    print(f"\n📄 Pages changed: {len(rows)} of {len(pages)}")
+    for page, before, after, stats in sorted(rows, key=lambda row: row[2] - row[1])[:15]:
+        print(f"  {page}: {before - after:,d} bytes saved ({stats['hooks removed']} hooks, "
+              f"{stats['initial states moved']} initial states)")
+    if len(rows) > 15:
+        print(f"  ... and {len(rows) - 15} more")
+    script_saved = len(script.encode('utf-8')) - len(new_script.encode('utf-8'))
+    print(f"\n📊 Hooks removed: {totals['hooks removed']:,}, initial states moved: {totals['initial states moved']:,}")
+    print(f"   HTML bytes saved: {totals['bytes']:,}, script bytes saved: {script_saved:,}"
+          + (" (dry run)" if args.dry_run else ''))
+
+    if args.report:
+        with open(args.report, 'w', encoding='utf-8') as f:
+            f.write("# Webflow Interaction Strip Report\n\n")
+            f.write(f"- Events removed from `{args.script}`: {len(removed)} "
+                    f"({len(dead)} dead, {len(removed) - len(dead)} replaced by CSS), "
+                    f"{script_saved:,} bytes saved\n")
+            f.write(f"- Pages changed: {len(rows)} of {len(pages)}, {totals['bytes']:,} bytes saved\n\n")
+            f.write("| Page | Before | After | Saved | Hooks removed | Initial states moved |\n")
+            f.write("|------|-------:|------:|------:|--------------:|---------------------:|\n")
+            for page, before, after, stats in rows:
+                f.write(f"| {page} | {before:,} | {after:,} | {before - after:,} | "
+                        f"{stats['hooks removed']} | {stats['initial states moved']} |\n")
+        print(f"📋 Report written to {args.report}")
+
+
+if __name__ == "__main__":
+    main()
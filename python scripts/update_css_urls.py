@@ -1,169 +1,346 @@
 #!/usr/bin/env python3
 """
-Script to update all URLs in CSS file to point to local project assets.
-This script will:
-1. Find all external URLs in the CSS file
-2. Check if corresponding assets exist in the images directory
-3. Replace external URLs with local relative paths
-4. Keep track of assets that couldn't be updated
+Point every url() and @import in the site's CSS at the local project assets.
+
+The CSS is read by a tokenizer (the subset of CSS Syntax Level 3 that
+decides where a URL is: comments, strings, escapes, identifiers, url()
+and bad-url tokens), so each url() and @import is visited exactly once,
+whether it sits in an @font-face src list, a background declaration or
+an @import rule, and nothing inside a comment or a string is taken for
+one. For every URL:
+
+- a local path to an existing file (asset_index.resolve_asset) is left
+  alone, which makes re-running a no-op;
+- a CDN URL (absolute, or one of the ../cdn.prod.website-files.com
+  mirror paths) or a local path to a missing file is resolved to a local
+  copy by the Webflow asset resolver and replaced with the path relative
+  to the file it is written in;
+- data: URIs, fragments and anything else are skipped, and URLs with no
+  local copy are reported.
+
+Only the URL itself is replaced, inside whatever quotes it already had,
+and all of a file's edits are applied in one pass, so nothing is matched
+twice and no quoting needs repairing afterwards. Besides the stylesheets,
+the <style> blocks and style attributes of the HTML pages the asset index
+lists with url() or @import references are rewritten the same way.
+
+Usage:
+    python3 "python scripts/update_css_urls.py" --dry-run
+    python3 "python scripts/update_css_urls.py"
+    python3 "python scripts/update_css_urls.py" css/china2024.css speakers.html
 """
 
 import os
 import re
-import urllib.parse
-from pathlib import Path
-
-def extract_filename_from_url(url):
-    """Extract filename from URL, handling URL encoding."""
-    # Remove query parameters and fragments
-    url = url.split('?')[0].split('#')[0]
-    
-    # Get the filename from the URL
-    filename = os.path.basename(url)
-    
-    # URL decode the filename
-    try:
-        filename = urllib.parse.unquote(filename)
-    except:
-        pass
-    
-    return filename
-
-def find_asset_in_images(filename, images_dir):
-    """Find an asset in the images directory, trying different variations."""
-    # Direct match
-    if os.path.exists(os.path.join(images_dir, filename)):
-        return filename
-    
-    # Try without URL encoding
-    decoded_filename = urllib.parse.unquote(filename)
-    if os.path.exists(os.path.join(images_dir, decoded_filename)):
-        return decoded_filename
-    
-    # Try common variations
-    variations = [
-        filename,
-        decoded_filename,
-        filename.replace('%20', ' '),
-        filename.replace('%2C', ','),
-        filename.replace('%2F', '/'),
-        filename.replace('%3A', ':'),
-        filename.replace('%40', '@'),
-    ]
-    
-    for variation in variations:
-        if os.path.exists(os.path.join(images_dir, variation)):
-            return variation
-    
-    return None
-
-def update_css_urls(css_file_path, images_dir):
-    """Update URLs in CSS file to point to local assets."""
-    
-    # Read the CSS file
-    with open(css_file_path, 'r', encoding='utf-8') as f:
-        css_content = f.read()
-    
-    # Patterns to match different types of URLs
-    url_patterns = [
-        # background-image: url("https://...")
-        r'background-image:\s*url\(["\']?(https://[^"\']+)["\']?\)',
-        # src: url('https://...')
-        r'src:\s*url\(["\']?(https://[^"\']+)["\']?\)',
-        # Any other url("https://...")
-        r'url\(["\']?(https://[^"\']+)["\']?\)',
-    ]
-    
-    updated_count = 0
-    failed_assets = []
-    
-    # Process each pattern
-    for pattern in url_patterns:
-        matches = re.finditer(pattern, css_content, re.IGNORECASE)
-        
-        for match in matches:
-            original_url = match.group(1)
-            filename = extract_filename_from_url(original_url)
-            
-            # Skip data URLs
-            if filename.startswith('data:'):
+import sys
+import html
+import argparse
+from collections import Counter, namedtuple
+
+from asset_index import AssetIndex, normalize_target, is_local_reference, resolve_asset
+from html_stream import build_tree, attr_span, set_attr_edit, apply_edits
+from webflow_assets import WebflowAssetResolver
+
+CssUrl = namedtuple('CssUrl', 'kind url start end quote context')
+
+WHITESPACE = ' \t\n\r\f'
+HEX_ESCAPE = re.compile(r'\\([0-9a-fA-F]{1,6})[ \t\n\r\f]?|\\(.)', re.DOTALL)
+EXTERNAL = re.compile(r'^(?:https?:)?//', re.IGNORECASE)
+REPORT_FILE = 'failed_assets_report.txt'
+
+
+def unescape(raw):
+    """The value of CSS text with its backslash escapes (\\- and \\2d alike) resolved."""
+    def replace(match):
+        if match.group(1):
+            code = int(match.group(1), 16)
+            return chr(code) if 0 < code <= 0x10FFFF else '�'
+        # An escaped newline inside a string is a line continuation
+        return '' if match.group(2) == '\n' else match.group(2)
+    return HEX_ESCAPE.sub(replace, raw)
+
+
+def _is_name_char(char):
+    return char.isalnum() or char in '-_' or ord(char) > 0x7F
+
+
+def _ident(text, position):
+    """(end, raw name) of the identifier starting at position, escapes included."""
+    start = position
+    length = len(text)
+    while position < length:
+        if text[position] == '\\' and position + 1 < length and text[position + 1] != '\n':
+            match = HEX_ESCAPE.match(text, position)
+            position = match.end()
+        elif _is_name_char(text[position]):
+            position += 1
+        else:
+            break
+    return position, text[start:position]
+
+
+def _string(text, position):
+    """(content start, content end, position after the string) for the string opened at position."""
+    quote = text[position]
+    start = position = position + 1
+    length = len(text)
+    while position < length:
+        char = text[position]
+        if char == quote:
+            return start, position, position + 1
+        if char == '\\':
+            position += 2
+        elif char == '\n':
+            # Bad string: it ends at the newline
+            return start, position, position
+        else:
+            position += 1
+    return start, length, length
+
+
+def _url(text, position):
+    """
+    (content start, content end, quote, position after the token) for the
+    url( whose contents start at position, or (None, ..., position after)
+    for a bad url.
+    """
+    length = len(text)
+    while position < length and text[position] in WHITESPACE:
+        position += 1
+    if position < length and text[position] in '"\'':
+        start, end, position = _string(text, position)
+        quote = text[start - 1]
+        while position < length and text[position] in WHITESPACE:
+            position += 1
+        if position < length and text[position] == ')':
+            return start, end, quote, position + 1
+        # url("a" b) is a function with other arguments, not a URL we can rewrite
+        return None, None, None, text.find(')', position) + 1 or length
+    start = position
+    while position < length:
+        char = text[position]
+        if char == ')':
+            return start, position, '', position + 1
+        if char in WHITESPACE:
+            end = position
+            while position < length and text[position] in WHITESPACE:
+                position += 1
+            if position < length and text[position] == ')':
+                return start, end, '', position + 1
+            break
+        if char in '"\'(':
+            break
+        position += 2 if char == '\\' else 1
+    # Bad url: skip to the closing parenthesis
+    while position < length and text[position] != ')':
+        position += 2 if text[position] == '\\' else 1
+    return None, None, None, min(position + 1, length)
+
+
+def css_urls(text):
+    """
+    Every url() and @import URL in a stylesheet, as CssUrl(kind, url,
+    start, end, quote, context): kind is 'url' or 'import', url the
+    unescaped value, text[start:end] the raw value inside its quotes (if
+    any), and context the innermost at-rule block ('font-face', 'media')
+    or '' for a plain rule.
+    """
+    found = []
+    blocks = []
+    at_rule = None
+    position = 0
+    length = len(text)
+    while position < length:
+        char = text[position]
+        if text.startswith('/*', position):
+            end = text.find('*/', position + 2)
+            position = length if end < 0 else end + 2
+        elif char in '"\'':
+            start, end, position = _string(text, position)
+            if at_rule == 'import':
+                found.append(CssUrl('import', unescape(text[start:end]), start, end, char, 'import'))
+                at_rule = ''
+        elif char == '@':
+            position, name = _ident(text, position + 1)
+            at_rule = unescape(name).lower()
+        elif char == '{':
+            blocks.append(at_rule or '')
+            at_rule = None
+            position += 1
+        elif char == '}':
+            if blocks:
+                blocks.pop()
+            at_rule = None
+            position += 1
+        elif char == ';':
+            at_rule = None
+            position += 1
+        elif _is_name_char(char) or char == '\\' or char == '#':
+            end, name = _ident(text, position + (char == '#'))
+            if end == position:
+                position += 1
                 continue
-            
-            # Find the asset in images directory
-            found_asset = find_asset_in_images(filename, images_dir)
-            
-            if found_asset:
-                # Create relative path from CSS file to images directory
-                css_dir = os.path.dirname(css_file_path)
-                relative_path = os.path.relpath(os.path.join(images_dir, found_asset), css_dir)
-                
-                # Replace the URL
-                new_url = f'url("../{found_asset}")'
-                css_content = css_content.replace(match.group(0), new_url)
-                updated_count += 1
-                print(f"Updated: {original_url} -> {new_url}")
-            else:
-                failed_assets.append({
-                    'url': original_url,
-                    'filename': filename,
-                    'context': match.group(0)
-                })
-                print(f"Failed to find asset: {filename}")
-    
-    # Write the updated CSS content
-    with open(css_file_path, 'w', encoding='utf-8') as f:
-        f.write(css_content)
-    
-    return updated_count, failed_assets
+            position = end
+            if char != '#' and unescape(name).lower() == 'url' and text[position:position + 1] == '(':
+                start, end, quote, position = _url(text, position + 1)
+                if start is not None:
+                    kind = 'import' if at_rule == 'import' else 'url'
+                    context = 'import' if kind == 'import' else next((b for b in reversed(blocks) if b), '')
+                    found.append(CssUrl(kind, unescape(text[start:end]), start, end, quote, context))
+                if at_rule == 'import':
+                    at_rule = ''
+        else:
+            position += 1
+    return found
+
+
+class CssUrlRewriter:
+    """Resolves the URLs of a stylesheet to local assets and rewrites them in one pass."""
+
+    def __init__(self, resolver=None):
+        self.resolver = resolver or WebflowAssetResolver()
+
+    def locate(self, url, path):
+        """Project path the URL should point at instead, '' if it is fine as it is, or None if unresolved."""
+        target = normalize_target(url)
+        if not target or url.startswith('#'):
+            return ''
+        if is_local_reference(target):
+            asset = resolve_asset(path, target)
+            if asset and os.path.isfile(asset):
+                return ''
+        elif not EXTERNAL.match(target):
+            # data:, about: and other schemes
+            return ''
+        return self.resolver.resolve_url(target)
+
+    def rewrite(self, text, path):
+        """(new text, [(old url, local path, context)], [(unresolved url, context)]) for CSS written in path."""
+        edits = []
+        rewritten = []
+        unresolved = []
+        for reference in css_urls(text):
+            local = self.locate(reference.url, path)
+            if local is None:
+                unresolved.append((reference.url, reference.context))
+                continue
+            if not local:
+                continue
+            fragment = reference.url.partition('#')[2]
+            edits.append((reference.start, reference.end,
+                          self.resolver.relative_to(local, path) + ('#' + fragment if fragment else '')))
+            rewritten.append((reference.url, local, reference.context))
+        pieces = []
+        position = 0
+        for start, end, replacement in edits:
+            pieces.append(text[position:start])
+            pieces.append(replacement)
+            position = end
+        pieces.append(text[position:])
+        return ''.join(pieces), rewritten, unresolved
+
+    def rewrite_html(self, data, page):
+        """(new bytes, rewritten, unresolved) for the <style> blocks and style attributes of a page."""
+        edits = []
+        rewritten = []
+        unresolved = []
+        for element in build_tree(data).iter():
+            if element.name == 'style':
+                css = data[element.inner_start:element.inner_end].decode('utf-8')
+                new_css, done, missing = self.rewrite(css, page)
+                if done:
+                    edits.append((element.inner_start, element.inner_end, new_css.encode('utf-8')))
+                rewritten += done
+                unresolved += missing
+            span = attr_span(data, element, 'style') if 'style' in element.attrs else None
+            if span:
+                raw = data[span[0]:span[1]].decode('utf-8')
+                new_css, done, missing = self.rewrite(html.unescape(raw), page)
+                if done:
+                    # set_attr_edit escapes the whole value, so only use it when the value had entities to begin with
+                    if '&' in raw or '&' in new_css:
+                        edits.append(set_attr_edit(data, element, 'style', new_css))
+                    else:
+                        edits.append((span[0], span[1], new_css.encode('utf-8')))
+                rewritten += done
+                unresolved += missing
+        return apply_edits(data, edits), rewritten, unresolved
+
+
+def find_files(index):
+    """The stylesheets, and the pages the asset index lists with url() or @import references."""
+    index.update()
+    stylesheets = [path for path in index.find_pages() if path.endswith('.css')]
+    pages = sorted({page for page, _, _, _ in index.references_matching('%', kinds=['url', 'import'])
+                    if page.endswith('.html')})
+    return stylesheets + pages
+
+
+def write_report(path, failed):
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write("Assets that could not be updated:\n")
+        f.write("=" * 50 + "\n")
+        for file_path, url, context in failed:
+            f.write(f"URL: {url}\n")
+            f.write(f"File: {file_path}\n")
+            f.write(f"Context: {context or 'declaration'}\n")
+            f.write("-" * 30 + "\n")
+
 
 def main():
-    # File paths
-    css_file = "css/china2024.css"
-    images_dir = "images"
-    
-    # Check if files exist
-    if not os.path.exists(css_file):
-        print(f"Error: CSS file '{css_file}' not found")
-        return
-    
-    if not os.path.exists(images_dir):
-        print(f"Error: Images directory '{images_dir}' not found")
-        return
-    
-    print(f"Updating URLs in {css_file}...")
-    print(f"Looking for assets in {images_dir}...")
-    print("-" * 50)
-    
-    # Update the URLs
-    updated_count, failed_assets = update_css_urls(css_file, images_dir)
-    
-    # Print summary
-    print("-" * 50)
-    print(f"Update complete!")
-    print(f"Successfully updated: {updated_count} URLs")
-    print(f"Failed to update: {len(failed_assets)} URLs")
-    
-    # Print failed assets
-    if failed_assets:
-        print("\nAssets that could not be updated:")
-        print("=" * 50)
-        for asset in failed_assets:
-            print(f"URL: {asset['url']}")
-            print(f"Filename: {asset['filename']}")
-            print(f"Context: {asset['context']}")
-            print("-" * 30)
-    
-    # Save failed assets to a file
-    if failed_assets:
-        with open("failed_assets_report.txt", "w", encoding="utf-8") as f:
-            f.write("Assets that could not be updated:\n")
-            f.write("=" * 50 + "\n")
-            for asset in failed_assets:
-                f.write(f"URL: {asset['url']}\n")
-                f.write(f"Filename: {asset['filename']}\n")
-                f.write(f"Context: {asset['context']}\n")
-                f.write("-" * 30 + "\n")
-        print(f"\nFailed assets report saved to: failed_assets_report.txt")
+    parser = argparse.ArgumentParser(description='Point url() and @import references in CSS at local assets')
+    parser.add_argument('files', nargs='*',
+                        help='CSS or HTML files (default: every stylesheet and every page with CSS URLs)')
+    parser.add_argument('--project-root', default='.', help='Site root (default: current directory)')
+    parser.add_argument('--report', default=REPORT_FILE,
+                        help=f'Where to list the URLs with no local copy (default: {REPORT_FILE})')
+    parser.add_argument('--dry-run', action='store_true', help='Report without writing anything')
+    args = parser.parse_args()
+
+    os.chdir(args.project_root)
+    print("🎨 Updating CSS URLs" + (" (dry run)" if args.dry_run else ""))
+    print("=" * 50)
+
+    rewriter = CssUrlRewriter()
+    with AssetIndex() as index:
+        files = [os.path.normpath(path).replace(os.sep, '/') for path in args.files] or find_files(index)
+        contexts = Counter()
+        failed = []
+        modified = []
+        for path in files:
+            with open(path, 'rb') as f:
+                data = f.read()
+            if path.endswith('.css'):
+                text, rewritten, unresolved = rewriter.rewrite(data.decode('utf-8'), path)
+                updated = text.encode('utf-8')
+            else:
+                updated, rewritten, unresolved = rewriter.rewrite_html(data, path)
+            for url, local, context in rewritten:
+                contexts[context or 'declaration'] += 1
+                print(f"  {path}: {url} -> {local}")
+            failed += [(path, url, context) for url, context in unresolved]
+            if updated != data:
+                modified.append(path)
+                if not args.dry_run:
+                    with open(path, 'wb') as f:
+                        f.write(updated)
+        if modified and not args.dry_run:
+            index.update(modified)
+
+    print(f"  Files {'to update' if args.dry_run else 'updated'}: {len(modified)} of {len(files)}, "
+          f"URLs: {sum(contexts.values())}"
+          + (f" ({', '.join(f'{name} {count}' for name, count in contexts.most_common())})" if contexts else ""))
+    if failed:
+        print(f"  ⚠️  {len(failed)} URLs have no local copy:")
+        for path, url, context in failed[:20]:
+            print(f"    {path}: {url}")
+        if not args.dry_run:
+            write_report(args.report, failed)
+            print(f"  Report saved to {args.report}")
+    if not args.dry_run:
+        print("\n✅ Done.")
+    sys.exit(0)
+
 
 if __name__ == "__main__":
     main()
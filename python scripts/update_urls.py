@@ -15,13 +15,26 @@ import glob
 from pathlib import Path
 from urllib.parse import urlparse, unquote
 import html
-from bs4 import BeautifulSoup
+from html_parsers import make_soup, available_parsers
 import argparse
 
+# Attribute values, matched on raw bytes for the memory-mapped report mode
+ATTRIBUTE_BYTES = re.compile(rb'\s([\w:.-]+)\s*=\s*(?:"([^"]*)"|\'([^\']*)\')')
+# A start tag, with quoted attribute values allowed to contain >
+START_TAG_BYTES = re.compile(rb'<([a-zA-Z][\w:-]*)((?:[^>"\']|"[^"]*"|\'[^\']*\')*)>')
+# Tags whose href/src/srcset extract_urls_from_html collects
+URL_TAGS = {b'a', b'img', b'link', b'script'}
+ABSOLUTE_URL_BYTES = re.compile(rb'https?://[^\s"\'<>]+')
+RELATIVE_URL_BYTES = re.compile(rb'\.\./[^\s"\'<>]+')
+
 class URLUpdater:
-    def __init__(self, project_root="."):
+    def __init__(self, project_root=".", parser=None, documents=None):
         self.project_root = Path(project_root).resolve()
+        self.parser = parser
+        # Optional dom_cache.DocumentCache shared with other tree-based stages
+        self.documents = documents
         self.local_files = set()
+        self.files_by_name = None
         self.updated_files = []
         self.missing_files = set()
         self.external_urls = set()
@@ -99,12 +112,13 @@ class URLUpdater:
                     html_files.append(Path(root) / file)
         return html_files
     
-    def extract_urls_from_html(self, html_content):
-        """Extract all URLs from HTML content."""
+    def extract_urls_from_html(self, html_content, soup=None):
+        """Extract all URLs from HTML content (or from an already parsed tree)."""
         urls = set()
         
-        # Parse HTML with BeautifulSoup
-        soup = BeautifulSoup(html_content, 'html.parser')
+        # Parse HTML with BeautifulSoup (fastest installed backend unless one was chosen)
+        if soup is None:
+            soup = make_soup(html_content, self.parser)
         
         # Find URLs in various attributes
         for tag in soup.find_all(['a', 'img', 'link', 'script']):
@@ -141,6 +155,58 @@ class URLUpdater:
         
         return urls
     
+    def extract_urls_from_file(self, file_path):
+        """
+        Extract the URLs of a file, through the shared document cache when
+        there is one so the page is parsed at most once per run (and not at
+        all when its result is cached on disk).
+        """
+        if self.documents is not None:
+            return self.documents.result(file_path, 'update_urls.extract',
+                                         lambda soup: self.extract_urls_from_html(None, soup=soup))
+        with open(file_path, 'r', encoding='utf-8', errors='replace') as f:
+            return self.extract_urls_from_html(f.read())
+    
+    def extract_urls_mmap(self, file_path):
+        """
+        Extract the same URLs as extract_urls_from_html, but from a read-only
+        memory map of the file: patterns run on the raw bytes and only the
+        matched URLs are decoded. href, src and srcset count on <a>, <img>,
+        <link> and <script> only; URLs inside any attribute count everywhere.
+        """
+        from mmap_scan import mapped
+        
+        urls = set()
+        with mapped(file_path) as data:
+            for tag in START_TAG_BYTES.finditer(data):
+                url_tag = tag.group(1).lower() in URL_TAGS
+                for match in ATTRIBUTE_BYTES.finditer(tag.group(2)):
+                    name = match.group(1).lower()
+                    value = match.group(2) if match.group(2) is not None else match.group(3)
+                    if url_tag and name in (b'href', b'src') and value:
+                        urls.add(value)
+                    elif url_tag and name == b'srcset':
+                        for item in value.split(b','):
+                            item = item.strip()
+                            if item:
+                                urls.add(item.split()[0])
+                    urls.update(ABSOLUTE_URL_BYTES.findall(value))
+                    urls.update(RELATIVE_URL_BYTES.findall(value))
+        return {html.unescape(url.decode('utf-8', errors='replace')) for url in urls}
+    
+    def report_html_file(self, file_path, use_mmap=False):
+        """Record external and missing URLs for a file without rewriting it."""
+        if use_mmap:
+            urls = self.extract_urls_mmap(file_path)
+        else:
+            urls = self.extract_urls_from_file(file_path)
+        
+        for url in urls:
+            if self.is_external_url(url):
+                self.external_urls.add(url)
+                if not self.find_local_file_for_url(url):
+                    self.missing_files.add(url)
+    
     def is_external_url(self, url):
         """Check if a URL is external (not a local file)."""
         if not url:
@@ -176,26 +242,29 @@ class URLUpdater:
         if not filename:
             return None
         
+        # Index local files by name once instead of scanning them per URL
+        if self.files_by_name is None:
+            self.files_by_name = {}
+            for local_file in self.local_files:
+                self.files_by_name.setdefault(Path(local_file).name, local_file)
+        
         # Look for exact filename match
-        for local_file in self.local_files:
-            if Path(local_file).name == filename:
-                return local_file
+        if filename in self.files_by_name:
+            return self.files_by_name[filename]
         
         # Try with URL decoding
-        decoded_filename = unquote(filename)
-        for local_file in self.local_files:
-            if Path(local_file).name == decoded_filename:
-                return local_file
-        
-        return None
+        return self.files_by_name.get(unquote(filename))
     
     def update_html_file(self, file_path):
         """Update URLs in a single HTML file."""
         print(f"Processing: {file_path}")
         
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
+            if self.documents is not None:
+                content = self.documents.text(file_path)
+            else:
+                with open(file_path, 'r', encoding='utf-8') as f:
+                    content = f.read()
         except UnicodeDecodeError:
             try:
                 with open(file_path, 'r', encoding='latin-1') as f:
@@ -203,9 +272,15 @@ class URLUpdater:
             except Exception as e:
                 print(f"Error reading {file_path}: {e}")
                 return
+        except Exception as e:
+            print(f"Error reading {file_path}: {e}")
+            return
         
         original_content = content
-        urls = self.extract_urls_from_html(content)
+        if self.documents is not None:
+            urls = self.extract_urls_from_file(file_path)
+        else:
+            urls = self.extract_urls_from_html(content)
         
         # Track changes
         changes_made = False
@@ -243,6 +318,9 @@ class URLUpdater:
             try:
                 with open(file_path, 'w', encoding='utf-8') as f:
                     f.write(content)
+                if self.documents is not None:
+                    # Rewritten as text, so any cached tree or result is stale
+                    self.documents.invalidate(file_path)
                 self.updated_files.append(str(file_path))
                 print(f"  Updated file: {file_path}")
             except Exception as e:
@@ -252,7 +330,7 @@ class URLUpdater:
         self.missing_files.update(file_missing_urls)
         self.external_urls.update(file_external_urls)
     
-    def process_all_files(self):
+    def process_all_files(self, report_only=False, use_mmap=False):
         """Process all HTML files in the project."""
         print("Processing HTML files...")
         
@@ -260,7 +338,10 @@ class URLUpdater:
         print(f"Found {len(html_files)} HTML files")
         
         for file_path in html_files:
-            self.update_html_file(file_path)
+            if report_only or use_mmap:
+                self.report_html_file(file_path, use_mmap=use_mmap)
+            else:
+                self.update_html_file(file_path)
     
     def generate_report(self):
         """Generate a report of the changes made."""
@@ -303,22 +384,37 @@ def main():
     parser = argparse.ArgumentParser(description='Update URLs in HTML files to point to local files')
     parser.add_argument('--project-root', default='.', help='Project root directory')
     parser.add_argument('--test-file', help='Test on a single file first')
+    parser.add_argument('--report-only', action='store_true',
+                        help='Only report external and missing URLs; do not rewrite any file')
+    parser.add_argument('--mmap', action='store_true',
+                        help='Report-only scan over read-only memory maps with bytes patterns (implies --report-only)')
+    parser.add_argument('--parser', choices=available_parsers(),
+                        help='BeautifulSoup backend (default: fastest installed, or $HTML_PARSER)')
+    parser.add_argument('--cache-dir',
+                        help='Cache extracted URLs on disk by page content hash (e.g. .dom_cache)')
     
     args = parser.parse_args()
     
-    updater = URLUpdater(args.project_root)
+    documents = None
+    if args.cache_dir:
+        from dom_cache import DocumentCache
+        documents = DocumentCache(parser=args.parser, cache_dir=args.cache_dir)
+    updater = URLUpdater(args.project_root, parser=args.parser, documents=documents)
     
     if args.test_file:
         print(f"Testing on single file: {args.test_file}")
         updater.scan_local_files()
         updater.build_url_mapping()
-        updater.update_html_file(Path(args.test_file))
+        if args.report_only or args.mmap:
+            updater.report_html_file(Path(args.test_file), use_mmap=args.mmap)
+        else:
+            updater.update_html_file(Path(args.test_file))
         updater.generate_report()
     else:
         print("Processing all HTML files...")
         updater.scan_local_files()
         updater.build_url_mapping()
-        updater.process_all_files()
+        updater.process_all_files(report_only=args.report_only, use_mmap=args.mmap)
         updater.generate_report()
 
 if __name__ == "__main__":
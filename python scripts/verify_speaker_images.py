@@ -6,6 +6,7 @@ This script scans HTML files to ensure no external CDN URLs remain for speaker i
 
 import re
 import glob
+import argparse
 from pathlib import Path
 
 def check_html_file(html_file):
@@ -28,26 +29,77 @@ def check_html_file(html_file):
         print(f"✅ {html_file}: No external URLs found")
         return True
 
+# Same pattern as bytes, for the memory-mapped scan mode
+EXTERNAL_SPEAKER_IMAGE_BYTES = re.compile(rb'background-image:url\(\.\./cdn\.prod\.website-files\.com/[^)]+\)')
+
+def check_html_file_mmap(html_file):
+    """Check a single HTML file by scanning its read-only memory map (no decoding)."""
+    from mmap_scan import iter_matches
+
+    matches = [matched.decode('utf-8', errors='replace')
+               for offset, matched in iter_matches(html_file, EXTERNAL_SPEAKER_IMAGE_BYTES)]
+    
+    if matches:
+        print(f"❌ {html_file}: {len(matches)} external URLs found")
+        for match in matches:
+            print(f"    - {match}")
+        return False
+    else:
+        print(f"✅ {html_file}: No external URLs found")
+        return True
+
+def check_with_index():
+    """Answer the same question from the asset reference index instead of scanning every file."""
+    from asset_index import AssetIndex
+
+    with AssetIndex() as index:
+        index.update()
+        rows = index.references_matching('../cdn.prod.website-files.com/%', kinds=['url'])
+    
+    matches_by_file = {}
+    for page, kind, raw_url, offset in rows:
+        if page.endswith('.html'):
+            matches_by_file.setdefault(page, []).append(f"url({raw_url}) at byte {offset}")
+    
+    for html_file, matches in sorted(matches_by_file.items()):
+        print(f"❌ {html_file}: {len(matches)} external URLs found")
+        for match in matches:
+            print(f"    - {match}")
+    
+    return sorted(matches_by_file)
+
 def main():
     """Main function to verify speaker image replacements."""
+    parser = argparse.ArgumentParser(description='Verify that no external CDN speaker image URLs remain')
+    parser.add_argument('--use-index', action='store_true',
+                        help='Query the asset reference index (asset_index.py) instead of scanning every file')
+    parser.add_argument('--mmap', action='store_true',
+                        help='Scan read-only memory maps with a bytes pattern instead of decoding each file')
+    args = parser.parse_args()
+    
     print("🔍 Verifying speaker image replacements...")
     print("Checking for any remaining external CDN URLs...")
     
-    # Find all HTML files
-    html_files = []
-    for html_file in glob.glob("**/*.html", recursive=True):
-        if not any(skip in html_file for skip in ['backup', 'temp', '.bak']):
-            html_files.append(html_file)
-    
-    print(f"\nFound {len(html_files)} HTML files to check")
-    
-    all_clean = True
-    files_with_issues = []
-    
-    for html_file in html_files:
-        if not check_html_file(html_file):
-            all_clean = False
-            files_with_issues.append(html_file)
+    if args.use_index:
+        files_with_issues = check_with_index()
+        all_clean = not files_with_issues
+    else:
+        # Find all HTML files
+        html_files = []
+        for html_file in glob.glob("**/*.html", recursive=True):
+            if not any(skip in html_file for skip in ['backup', 'temp', '.bak']):
+                html_files.append(html_file)
+        
+        print(f"\nFound {len(html_files)} HTML files to check")
+        
+        all_clean = True
+        files_with_issues = []
+        check = check_html_file_mmap if args.mmap else check_html_file
+        
+        for html_file in html_files:
+            if not check(html_file):
+                all_clean = False
+                files_with_issues.append(html_file)
     
     print(f"\n{'='*50}")
     print(f"📊 VERIFICATION SUMMARY")
@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+"""
+Webflow asset-ID keyed resolver shared by the image, logo, social and sponsor replacers.
+
+Webflow names every uploaded asset <24-hex-id>_<name>, both on the CDN
+(cdn.prod.website-files.com/<site-id>/<id>_<name>) and in our local copies
+under images/ and fonts/. This module indexes the local assets once, by
+asset ID and by normalized file name, so a CDN URL - including the escaped
+\\- / \\. variants in the Webflow export - resolves to a local path with a
+couple of dictionary lookups instead of a hand-kept table or a directory glob.
+
+Run directly, it localizes every CDN reference in the tree in a single pass:
+
+    python3 "python scripts/webflow_assets.py"            # rewrite all HTML and CSS files
+    python3 "python scripts/webflow_assets.py" --dry-run  # only report what would change
+
+The SVGs the pages are pointed at are optimized in the same run
+(optimize_svgs.optimize_localized).
+"""
+
+import os
+import re
+import sys
+import argparse
+from pathlib import Path
+from urllib.parse import unquote
+
+# Directories searched for local copies of CDN assets, in order of preference
+ASSET_DIRS = ['images', 'images/speakers', 'fonts', 'css', 'js']
+
+ASSET_ID_PATTERN = re.compile(r'^([0-9a-f]{24})_(.+)$')
+
+# Responsive variants Webflow generates next to the original: name-p-500.png
+RESPONSIVE_SUFFIX = re.compile(r'-p-\d+(?=\.[^.]+$)')
+
+# Webflow exports escape some characters in URLs, e.g. gosim\-logo\-32\.svg
+ESCAPE_PATTERN = re.compile(r'\\(.)')
+
+# Start of a CDN reference, with the character that opened it
+CDN_URL_START = re.compile(
+    r'(["\'(;=,\s])((?:(?:\\?\.){2}/)*(?:https?:)?(?://)?cdn\.prod\.website-files\.com/[0-9a-f]{24}/)'
+)
+
+# How far a CDN URL extends depends on what opened it
+CDN_URL_TAIL = {
+    '"': re.compile(r'[^"\s<>]*'),
+    "'": re.compile(r"[^'\s<>]*"),
+    '(': re.compile(r'[^)\s"<>]*'),
+    ';': re.compile(r'[^&)\s"\'<>]*'),
+}
+CDN_URL_TAIL_DEFAULT = re.compile(r'[^"\'\s)<>]*')
+
+SKIP_DIRS = {'.git', 'python scripts', '__pycache__', '_partials', '_templates'}
+
+# Characters that would end an unquoted url() or a srcset candidate early
+URL_UNSAFE = str.maketrans({' ': '%20', '"': '%22', "'": '%27', '(': '%28', ')': '%29'})
+
+
+def normalize_name(name):
+    """Normalize a file name for fuzzy matching: case, separators and encoding."""
+    name = unquote(ESCAPE_PATTERN.sub(r'\1', name)).lower()
+    return re.sub(r'[\s_\-%+]+', '-', name)
+
+
+def url_filename(url):
+    """Return the decoded file name a (possibly escaped) URL points at."""
+    url = ESCAPE_PATTERN.sub(r'\1', url)
+    url = url.split('#')[0].split('?')[0]
+    return unquote(url.rstrip('/').split('/')[-1])
+
+
+class WebflowAssetResolver:
+    """
+    Constant-time lookup from Webflow CDN URLs (or file names) to local assets.
+
+    Lookups try, in order: an explicit alias for the asset ID, the exact
+    file name, the asset ID plus normalized name (which tolerates case and
+    separator differences), and finally the asset ID alone when only one
+    local file carries it.
+    """
+
+    def __init__(self, project_root='.', asset_dirs=None, aliases=None):
+        self.project_root = Path(project_root)
+        self.by_filename = {}
+        self.by_id_and_name = {}
+        self.by_id = {}
+        self.by_name = {}
+        self.aliases = dict(aliases or {})
+        self._index(asset_dirs or ASSET_DIRS)
+
+    def _index(self, asset_dirs):
+        for directory in asset_dirs:
+            path = self.project_root / directory
+            if not path.is_dir():
+                continue
+            for entry in os.scandir(path):
+                if not entry.is_file():
+                    continue
+                local_path = f"{directory}/{entry.name}"
+                self.by_filename.setdefault(entry.name, local_path)
+                self.by_name.setdefault(normalize_name(entry.name), []).append(local_path)
+                match = ASSET_ID_PATTERN.match(entry.name)
+                if match:
+                    asset_id, name = match.groups()
+                    self.by_id_and_name.setdefault((asset_id, normalize_name(name)), local_path)
+                    # Prefer the original over its -p-NNN responsive variants
+                    if not RESPONSIVE_SUFFIX.search(entry.name):
+                        self.by_id.setdefault(asset_id, []).append(local_path)
+
+    def __len__(self):
+        return len(self.by_filename)
+
+    def resolve_name(self, filename):
+        """Resolve a decoded file name to a project-relative local path, or None."""
+        filename = ESCAPE_PATTERN.sub(r'\1', filename)
+        match = ASSET_ID_PATTERN.match(filename)
+        if match and match.group(1) in self.aliases:
+            return self.aliases[match.group(1)]
+        if filename in self.by_filename:
+            return self.by_filename[filename]
+        if match:
+            asset_id, name = match.groups()
+            local_path = self.by_id_and_name.get((asset_id, normalize_name(name)))
+            if local_path:
+                return local_path
+            if not RESPONSIVE_SUFFIX.search(filename):
+                candidates = self.by_id.get(asset_id, [])
+                if len(candidates) == 1:
+                    return candidates[0]
+        candidates = self.by_name.get(normalize_name(filename), [])
+        if len(candidates) == 1:
+            return candidates[0]
+        return None
+
+    def resolve_id(self, asset_id):
+        """Resolve a bare Webflow asset ID to its (non-responsive) local file, or None."""
+        if asset_id in self.aliases:
+            return self.aliases[asset_id]
+        candidates = self.by_id.get(asset_id, [])
+        return candidates[0] if len(candidates) == 1 else None
+
+    def resolve_url(self, url):
+        """Resolve a CDN URL (escaped or not) to a project-relative local path, or None."""
+        return self.resolve_name(url_filename(url))
+
+    def relative_to(self, local_path, page_path):
+        """Path to local_path as written in page_path (both project-relative)."""
+        page_dir = os.path.dirname(str(page_path))
+        relative_path = os.path.relpath(local_path, page_dir or '.').replace(os.sep, '/')
+        return relative_path.translate(URL_UNSAFE)
+
+    def localize(self, content, page_path, asset_ids=None):
+        """
+        Replace every CDN reference in content with the relative local path.
+
+        asset_ids limits the rewrite to those Webflow asset IDs. Returns
+        (new_content, replacements, unresolved) where replacements is a list
+        of (cdn_url, local_path) and unresolved a list of CDN URLs with no
+        local copy.
+        """
+        pieces = []
+        replacements = []
+        unresolved = []
+        position = 0
+        for match in CDN_URL_START.finditer(content):
+            start = match.start(2)
+            if start < position:
+                continue
+            tail = CDN_URL_TAIL.get(match.group(1), CDN_URL_TAIL_DEFAULT)
+            end = tail.match(content, match.end(2)).end()
+            url = content[start:end]
+            filename = url_filename(url)
+            asset = ASSET_ID_PATTERN.match(filename)
+            if asset_ids is not None and (not asset or asset.group(1) not in asset_ids):
+                continue
+            local_path = self.resolve_name(filename)
+            if not local_path:
+                unresolved.append(url)
+                continue
+            pieces.append(content[position:start])
+            pieces.append(self.relative_to(local_path, page_path))
+            replacements.append((url, local_path))
+            position = end
+        pieces.append(content[position:])
+        return ''.join(pieces), replacements, unresolved
+
+
+def localize_file(file_path, resolver, asset_ids=None, dry_run=False, project_root='.'):
+    """Localize the CDN references in one file. Returns (replacements, unresolved)."""
+    with open(file_path, 'r', encoding='utf-8') as f:
+        content = f.read()
+    page_path = os.path.relpath(file_path, project_root)
+    new_content, replacements, unresolved = resolver.localize(content, page_path, asset_ids)
+    if replacements and not dry_run:
+        with open(file_path, 'w', encoding='utf-8') as f:
+            f.write(new_content)
+    return replacements, unresolved
+
+
+def find_site_files(project_root='.'):
+    """Find every HTML and CSS file in the project."""
+    site_files = []
+    for root, dirs, files in os.walk(project_root):
+        dirs[:] = [d for d in dirs if d not in SKIP_DIRS and not d.startswith('.')]
+        for name in files:
+            if name.endswith(('.html', '.css')) and not any(skip in name for skip in ['backup', 'temp', '.bak']):
+                site_files.append(os.path.join(root, name))
+    return sorted(site_files)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Localize every Webflow CDN asset reference in one pass')
+    parser.add_argument('--project-root', default='.', help='Project root directory')
+    parser.add_argument('--dry-run', action='store_true', help='Report replacements without writing files')
+    parser.add_argument('files', nargs='*', help='Files to process (default: every HTML and CSS file)')
+    args = parser.parse_args()
+
+    resolver = WebflowAssetResolver(args.project_root)
+    print(f"Indexed {len(resolver)} local assets")
+
+    site_files = args.files or find_site_files(args.project_root)
+    print(f"Found {len(site_files)} files to process")
+    print("=" * 50)
+
+    files_modified = 0
+    total_replacements = 0
+    all_unresolved = {}
+    local_paths = set()
+    for file_path in site_files:
+        try:
+            replacements, unresolved = localize_file(file_path, resolver, dry_run=args.dry_run,
+                                                     project_root=args.project_root)
+        except Exception as e:
+            print(f"  ✗ Error processing {file_path}: {e}")
+            continue
+        if replacements:
+            files_modified += 1
+            total_replacements += len(replacements)
+            local_paths.update(local_path for _, local_path in replacements)
+            print(f"  ✓ {file_path}: {len(replacements)} replacements")
+        for url in unresolved:
+            all_unresolved.setdefault(url, []).append(file_path)
+
+    if local_paths:
+        # Imported here: optimize_svgs imports this module for ASSET_DIRS
+        from optimize_svgs import optimize_localized
+        # The local paths and the optimizer's cache are relative to the site root
+        os.chdir(args.project_root)
+        optimize_localized(local_paths, dry_run=args.dry_run)
+
+    print("=" * 50)
+    print(f"Files {'that would be ' if args.dry_run else ''}modified: {files_modified}")
+    print(f"Total replacements: {total_replacements}")
+    if all_unresolved:
+        print(f"\nCDN URLs with no local copy: {len(all_unresolved)}")
+        for url, files in sorted(all_unresolved.items()):
+            print(f"  - {url} ({len(files)} files)")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,868 @@
+#!/usr/bin/env python3
+"""
+Replace the jQuery + Webflow bundle with a small per-page vanilla runtime.
+
+Every page loads js/jquery-3.5.1.min.js (89 KB) and the 297 KB
+js/china2024.js Webflow runtime, both render-blocking, to drive a handful
+of components. This build mode looks at what each page actually uses and
+ships only that:
+
+- the Webflow components on the page are detected from its markup: the
+  navbar (w-nav), dropdowns (w-dropdown), tabs (w-tabs), and the IX2
+  interactions bound to elements of the page (read from the
+  require("ix2").init({...}) data in js/china2024.js, see
+  strip_webflow_interactions.py);
+- one vanilla-JS module per combination of components is written to
+  js/webflow-lite/ (nav-dropdown.js, nav-dropdown-tabs-ix.js, ...). The
+  interaction data a page needs goes inline next to it as a small JSON
+  script, so the module itself is shared by every page using it;
+- the two bundle script tags are replaced with the module, the same way
+  update_html_files.py rewrites them, with paths made relative to the page.
+  A page that uses none of the components ships no script at all.
+
+Pages the runtime cannot cover keep the bundle untouched and are listed in
+the report: pages whose own scripts use jQuery or the Webflow API, pages
+with sliders, forms or lightboxes with items, and pages bound to
+interactions or actions the runtime does not implement.
+
+The runtime covers: navbar open/close (overlay, button state, closing on
+link and outside clicks), dropdown toggling (click or data-hover, outside
+click and Escape close), tabs (click and arrow keys, no fade), and the IX2
+subset the site uses - click/second click, hover, scroll into/out of view,
+page start/finish, navbar/dropdown open/close and scroll progress triggers
+running move/scale/rotate, opacity, size (including auto height),
+background colour and display actions on the trigger, its children,
+parents, siblings or any selector, with breakpoints and initial states.
+window.wfRuntime.init(element) binds content inserted later (the speakers
+tab loader calls it).
+
+A marker comment records what was replaced - the components and the
+original tags byte for byte, whitespace included - so running the script
+again rebuilds from the original tags and --restore puts the page back
+exactly as it was.
+
+Usage:
+    python3 "python scripts/webflow_runtime.py" --dry-run
+    python3 "python scripts/webflow_runtime.py"
+    python3 "python scripts/webflow_runtime.py" index.html zh/index.html
+    python3 "python scripts/webflow_runtime.py" --restore
+"""
+
+import os
+import re
+import sys
+import json
+import argparse
+from collections import Counter
+from urllib.parse import quote, unquote_to_bytes
+
+from html_stream import build_tree, apply_edits
+from site_partials import find_pages
+from update_html_files import get_relative_path
+from strip_webflow_interactions import (IX2_SCRIPT, EASINGS, PAGE_ID, Interactions, load_interactions,
+                                        split_target)
+
+JQUERY_SCRIPT = 'js/jquery-3.5.1.min.js'
+RUNTIME_DIR = 'js/webflow-lite'
+
+BUNDLE_TAG = re.compile(rb'[ \t]*<script[^>]*\ssrc="[^"]*(?:jquery-3\.5\.1\.min|china2024)\.js"[^>]*></script>\n?')
+MARKER = re.compile(rb'([ \t]*)<!-- webflow-lite: ([^>|]*?)(?: \| ([^>]*?))? -->\n?'
+                    rb'(?:[ \t]*<script type="application/json" id="wf-ix">.*?</script>\n?)?'
+                    rb'(?:[ \t]*<script [^>]*data-wf-lite[^>]*></script>\n?)?', re.DOTALL)
+# Characters of the original tags kept readable in the marker; '>' is always escaped so it cannot end the comment
+MARKER_SAFE = ' <"/=.:;,?&'
+JS_COMMENT = re.compile(r'/\*.*?\*/|(?<![:\'"\\])//[^\n]*', re.DOTALL)
+BUNDLE_API = re.compile(r'(?<![\w$.])(?:\$\s*[(.]|jQuery\b|Webflow\b)')
+
+# Scripts that are part of the build rather than page code
+OWN_SCRIPTS = {'tab-fragments', 'wf-ix'}
+
+# Webflow components that need the full bundle: class -> description
+UNSUPPORTED_CLASSES = {
+    'w-slider': 'slider',
+    'w-form': 'form',
+    'w-background-video': 'background video',
+    'w-commerce-commercecartwrapper': 'ecommerce cart',
+}
+
+COMPONENT_CLASSES = {'nav': 'w-nav', 'dropdown': 'w-dropdown', 'tabs': 'w-tabs'}
+COMPONENT_ORDER = ['nav', 'dropdown', 'tabs', 'ix']
+
+SUPPORTED_EVENTS = {
+    'MOUSE_CLICK', 'MOUSE_SECOND_CLICK', 'MOUSE_OVER', 'MOUSE_OUT', 'SCROLL_INTO_VIEW', 'SCROLL_OUT_OF_VIEW',
+    'SCROLLING_IN_VIEW', 'PAGE_START', 'PAGE_FINISH', 'NAVBAR_OPEN', 'NAVBAR_CLOSE', 'DROPDOWN_OPEN',
+    'DROPDOWN_CLOSE',
+}
+TRANSFORMS = {'TRANSFORM_MOVE': ('translate', 'px'), 'TRANSFORM_SCALE': ('scale', ''),
+              'TRANSFORM_ROTATE': ('rotate', 'deg')}
+TARGET_SCOPES = {'CHILDREN': 'children', 'PARENTS': 'parents', 'SIBLINGS': 'siblings'}
+
+CORE_JS = '''/* Webflow lite runtime (%(names)s) - generated by webflow_runtime.py, do not edit */
+(function () {
+  'use strict';
+  var components = [];
+  function each(root, selector, fn) {
+    if (root.matches && root.matches(selector)) fn(root);
+    Array.prototype.forEach.call(root.querySelectorAll(selector), fn);
+  }
+  function emit(el, type) {
+    el.dispatchEvent(new CustomEvent('wf:' + type, { bubbles: true }));
+  }
+%(components)s
+  window.wfRuntime = {
+    init: function (root) {
+      root = root || document;
+      components.forEach(function (init) { init(root); });
+    }
+  };
+  if (document.readyState === 'loading') {
+    document.addEventListener('DOMContentLoaded', function () { window.wfRuntime.init(document); });
+  } else {
+    window.wfRuntime.init(document);
+  }
+})();
+'''
+
+COMPONENT_JS = {}
+
+COMPONENT_JS['nav'] = '''
+  components.push(function (root) {
+    each(root, '.w-nav', function (nav) {
+      var button = nav.querySelector('.w-nav-button'), menu = nav.querySelector('.w-nav-menu');
+      if (nav.wfNav || !button || !menu) return;
+      var overlay = document.createElement('div'), placeholder = document.createComment('w-nav-menu');
+      var state = nav.wfNav = { open: false };
+      overlay.className = 'w-nav-overlay';
+      overlay.setAttribute('data-wf-ignore', '');
+      nav.appendChild(overlay);
+      button.setAttribute('role', 'button');
+      button.setAttribute('aria-expanded', 'false');
+      if (!button.hasAttribute('aria-label')) button.setAttribute('aria-label', 'menu');
+      if (!button.hasAttribute('tabindex')) button.tabIndex = 0;
+      function mark(selector, name, open) {
+        each(menu, selector, function (el) { el.classList.toggle(name, open); });
+      }
+      function setOpen(open) {
+        if (open === state.open) return;
+        state.open = open;
+        button.classList.toggle('w--open', open);
+        button.setAttribute('aria-expanded', String(open));
+        mark('.w-nav-link', 'w--nav-link-open', open);
+        mark('.w-dropdown', 'w--nav-dropdown-open', open);
+        mark('.w-dropdown-toggle', 'w--nav-dropdown-toggle-open', open);
+        mark('.w-dropdown-list', 'w--nav-dropdown-list-open', open);
+        if (open) {
+          menu.parentNode.insertBefore(placeholder, menu);
+          overlay.appendChild(menu);
+          menu.setAttribute('data-nav-menu-open', '');
+          overlay.style.display = 'block';
+        } else {
+          menu.removeAttribute('data-nav-menu-open');
+          placeholder.parentNode.replaceChild(menu, placeholder);
+          overlay.style.display = '';
+        }
+        emit(nav, open ? 'navbar-open' : 'navbar-close');
+      }
+      button.addEventListener('click', function (e) { e.preventDefault(); setOpen(!state.open); });
+      button.addEventListener('keydown', function (e) {
+        if (e.key === 'Enter' || e.key === ' ') { e.preventDefault(); setOpen(!state.open); }
+      });
+      menu.addEventListener('click', function (e) {
+        var link = e.target.closest('a[href]');
+        if (link && !link.closest('.w-dropdown-toggle')) setOpen(false);
+      });
+      document.addEventListener('click', function (e) {
+        if (state.open && !nav.contains(e.target)) setOpen(false);
+      });
+      document.addEventListener('keydown', function (e) {
+        if (state.open && e.key === 'Escape') { setOpen(false); button.focus(); }
+      });
+      window.addEventListener('resize', function () {
+        if (state.open && getComputedStyle(button).display === 'none') setOpen(false);
+      });
+    });
+  });
+'''
+
+COMPONENT_JS['dropdown'] = '''
+  var openDropdowns = [];
+  components.push(function (root) {
+    each(root, '.w-dropdown', function (dropdown) {
+      var toggle = dropdown.querySelector('.w-dropdown-toggle'), list = dropdown.querySelector('.w-dropdown-list');
+      if (dropdown.wfDropdown || !toggle || !list) return;
+      var delay = parseFloat(dropdown.getAttribute('data-delay')) || 0, timer;
+      var state = dropdown.wfDropdown = { open: false, setOpen: setOpen };
+      toggle.setAttribute('aria-haspopup', 'menu');
+      toggle.setAttribute('aria-expanded', 'false');
+      if (!toggle.hasAttribute('tabindex')) toggle.tabIndex = 0;
+      function setOpen(open) {
+        clearTimeout(timer);
+        if (open === state.open) return;
+        state.open = open;
+        dropdown.style.zIndex = open ? '901' : '';
+        toggle.classList.toggle('w--open', open);
+        list.classList.toggle('w--open', open);
+        toggle.setAttribute('aria-expanded', String(open));
+        if (open) {
+          openDropdowns.slice().forEach(function (other) {
+            if (!other.contains(dropdown)) other.wfDropdown.setOpen(false);
+          });
+          openDropdowns.push(dropdown);
+        } else {
+          openDropdowns.splice(openDropdowns.indexOf(dropdown), 1);
+        }
+        emit(dropdown, open ? 'dropdown-open' : 'dropdown-close');
+      }
+      toggle.addEventListener('click', function (e) { e.preventDefault(); setOpen(!state.open); });
+      toggle.addEventListener('keydown', function (e) {
+        if (e.key === 'Enter' || e.key === ' ') { e.preventDefault(); setOpen(!state.open); }
+      });
+      dropdown.addEventListener('keydown', function (e) {
+        if (state.open && e.key === 'Escape') { setOpen(false); toggle.focus(); }
+      });
+      if (dropdown.getAttribute('data-hover') === 'true') {
+        dropdown.addEventListener('mouseenter', function () { setOpen(true); });
+        dropdown.addEventListener('mouseleave', function () {
+          timer = setTimeout(function () { setOpen(false); }, delay);
+        });
+      }
+    });
+  });
+  document.addEventListener('click', function (e) {
+    openDropdowns.slice().forEach(function (dropdown) {
+      if (!dropdown.contains(e.target)) dropdown.wfDropdown.setOpen(false);
+    });
+  });
+'''
+
+COMPONENT_JS['tabs'] = '''
+  components.push(function (root) {
+    each(root, '.w-tabs', function (tabs) {
+      if (tabs.wfTabs) return;
+      tabs.wfTabs = true;
+      function own(selector) {
+        return Array.prototype.filter.call(tabs.querySelectorAll(selector), function (el) {
+          return el.closest('.w-tabs') === tabs;
+        });
+      }
+      function select(name, focus) {
+        tabs.setAttribute('data-current', name);
+        own('.w-tab-link').forEach(function (link) {
+          var active = link.getAttribute('data-w-tab') === name;
+          link.classList.toggle('w--current', active);
+          link.setAttribute('aria-selected', String(active));
+          link.tabIndex = active ? 0 : -1;
+          if (active && focus) link.focus();
+        });
+        own('.w-tab-pane').forEach(function (pane) {
+          pane.classList.toggle('w--tab-active', pane.getAttribute('data-w-tab') === name);
+        });
+      }
+      own('.w-tab-menu').forEach(function (menu) { menu.setAttribute('role', 'tablist'); });
+      own('.w-tab-link').forEach(function (link) { link.setAttribute('role', 'tab'); });
+      own('.w-tab-pane').forEach(function (pane) { pane.setAttribute('role', 'tabpanel'); });
+      var current = own('.w-tab-link.w--current')[0] || own('.w-tab-link')[0];
+      if (current) select(tabs.getAttribute('data-current') || current.getAttribute('data-w-tab'));
+      tabs.addEventListener('click', function (e) {
+        var link = e.target.closest('.w-tab-link');
+        if (!link || link.closest('.w-tabs') !== tabs) return;
+        e.preventDefault();
+        select(link.getAttribute('data-w-tab'));
+      });
+      tabs.addEventListener('keydown', function (e) {
+        var link = e.target.closest('.w-tab-link');
+        if (!link || link.closest('.w-tabs') !== tabs) return;
+        var links = own('.w-tab-link'), index = links.indexOf(link);
+        var next = { ArrowRight: index + 1, ArrowDown: index + 1, ArrowLeft: index - 1, ArrowUp: index - 1,
+                     Home: 0, End: links.length - 1 }[e.key];
+        if (next === undefined) return;
+        e.preventDefault();
+        select(links[(next + links.length) % links.length].getAttribute('data-w-tab'), true);
+      });
+    });
+  });
+'''
+
+COMPONENT_JS['ix'] = '''
+  var ix = null, loaded = false;
+  var families = { MOUSE_CLICK: 'click', MOUSE_SECOND_CLICK: 'click', MOUSE_OVER: 'hover', MOUSE_OUT: 'hover',
+                   SCROLL_INTO_VIEW: 'view', SCROLL_OUT_OF_VIEW: 'view', NAVBAR_OPEN: 'nav', NAVBAR_CLOSE: 'nav',
+                   DROPDOWN_OPEN: 'dropdown', DROPDOWN_CLOSE: 'dropdown' };
+  var signals = { 'wf:navbar-open': 'NAVBAR_OPEN', 'wf:navbar-close': 'NAVBAR_CLOSE',
+                  'wf:dropdown-open': 'DROPDOWN_OPEN', 'wf:dropdown-close': 'DROPDOWN_CLOSE' };
+  function breakpoint() {
+    var width = window.innerWidth;
+    for (var i = 0; i < ix.mq.length; i++) {
+      if (width >= ix.mq[i][1] && width <= ix.mq[i][2]) return ix.mq[i][0];
+    }
+  }
+  function active(event) {
+    return !event.media || event.media.indexOf(breakpoint()) !== -1;
+  }
+  function length(value) {
+    return value[0] + value[1];
+  }
+  function css(prop, value) {
+    if (prop === 'backgroundColor') {
+      return 'rgba(' + value.slice(0, 3).map(Math.round).join(', ') + ', ' + value[3] + ')';
+    }
+    if (prop === 'width' || prop === 'height') return value === 'auto' ? 'auto' : length(value);
+    return String(value);
+  }
+  function transform(el, values) {
+    var state = el.wfTransform || (el.wfTransform = {
+      translate: [[0, 'px'], [0, 'px'], [0, 'px']], scale: [1, 1, 1], rotate: [[0, 'deg'], [0, 'deg'], [0, 'deg']]
+    });
+    ['translate', 'scale', 'rotate'].forEach(function (name) {
+      (values[name] || []).forEach(function (value, axis) { if (value !== null) state[name][axis] = value; });
+    });
+    return 'translate3d(' + state.translate.map(length).join(', ') + ') scale3d(' + state.scale.join(', ') +
+      ') rotateX(' + length(state.rotate[0]) + ') rotateY(' + length(state.rotate[1]) +
+      ') rotateZ(' + length(state.rotate[2]) + ')';
+  }
+  function targets(target, trigger) {
+    if (target.scope === 'self') return [trigger];
+    var context = target.scope === 'boundary' ? trigger.closest('.w-dyn-item') || document : document;
+    var found = Array.prototype.slice.call(context.querySelectorAll(target.sel));
+    if (target.scope === 'children') return found.filter(function (el) { return el !== trigger && trigger.contains(el); });
+    if (target.scope === 'parents') return found.filter(function (el) { return el !== trigger && el.contains(trigger); });
+    if (target.scope === 'siblings') {
+      return found.filter(function (el) { return el !== trigger && el.parentNode === trigger.parentNode; });
+    }
+    return found;
+  }
+  function render(el, values, timing) {
+    var transitions = el.wfTransitions || (el.wfTransitions = {});
+    var styles = {};
+    if (values.translate || values.scale || values.rotate) styles.transform = transform(el, values);
+    ['opacity', 'backgroundColor', 'width', 'height'].forEach(function (prop) {
+      if (values[prop] !== undefined) styles[prop] = css(prop, values[prop]);
+    });
+    Object.keys(styles).forEach(function (prop) {
+      var name = prop.replace(/[A-Z]/g, function (c) { return '-' + c.toLowerCase(); });
+      if (timing && (prop === 'width' || prop === 'height')) {
+        // Transitions cannot run to or from auto: pin the current size, then animate to the measured one
+        var from = getComputedStyle(el)[prop];
+        if (styles[prop] === 'auto') {
+          el.style[prop] = 'auto';
+          var to = getComputedStyle(el)[prop];
+          setTimeout(function () { if (el.style[prop] === to) el.style[prop] = 'auto'; }, timing.end);
+          styles[prop] = to;
+        }
+        el.style.transition = 'none';
+        el.style[prop] = from;
+        void el.offsetWidth;
+      }
+      if (timing) transitions[name] = name + ' ' + timing.css; else delete transitions[name];
+    });
+    el.style.transition = Object.keys(transitions).map(function (name) { return transitions[name]; }).join(', ');
+    Object.keys(styles).forEach(function (prop) { el.style[prop] = styles[prop]; });
+  }
+  function apply(item, trigger, instant) {
+    var timing = instant || !item.duration ? null : {
+      css: item.duration + 'ms ' + item.easing + ' ' + (item.delay || 0) + 'ms', end: item.duration + (item.delay || 0)
+    };
+    targets(item.target, trigger).forEach(function (el) {
+      if (item.values.display === undefined) return render(el, item.values, timing);
+      if (instant || !item.delay) el.style.display = item.values.display;
+      else setTimeout(function () { el.style.display = item.values.display; }, item.delay);
+    });
+  }
+  function play(event, trigger) {
+    var list = ix.lists[event.list], groups = list.groups || [];
+    var runs = trigger.wfRuns || (trigger.wfRuns = {});
+    var family = families[event.type] || event.type, run = {};
+    if (event.loop && runs[family] && runs[family].loop === event.list) return;
+    runs[family] = run;
+    run.loop = event.loop && event.list;
+    (function next(index) {
+      if (runs[family] !== run) return;
+      if (index >= groups.length) {
+        if (event.loop && groups.length) next(0);
+        return;
+      }
+      void document.body.offsetWidth;
+      var longest = 0;
+      groups[index].forEach(function (item) {
+        apply(item, trigger);
+        longest = Math.max(longest, (item.delay || 0) + (item.duration || 0));
+      });
+      setTimeout(function () { next(index + 1); }, longest);
+    })(list.initial ? 1 : 0);
+  }
+  function hits(el, types, stop) {
+    var found = [];
+    for (; el && el.nodeType === 1 && el !== stop; el = el.parentNode) {
+      ix.events.forEach(function (event) {
+        if (types.indexOf(event.type) !== -1 && el.matches(event.trigger)) found.push({ el: el, event: event });
+      });
+    }
+    return found;
+  }
+  function fire(found) {
+    found.forEach(function (hit) { if (active(hit.event)) play(hit.event, hit.el); });
+  }
+  function scrub(trigger, event) {
+    var rect = trigger.getBoundingClientRect(), height = window.innerHeight;
+    var progress = Math.min(1, Math.max(0, (height - rect.top) / (height + rect.height))) * 100;
+    (ix.lists[event.list].tracks || []).forEach(function (track) {
+      var frames = track.frames, i = 0;
+      while (i < frames.length - 1 && frames[i + 1][0] <= progress) i++;
+      var a = frames[i], b = frames[Math.min(i + 1, frames.length - 1)];
+      var f = progress <= a[0] || b[0] === a[0] ? 0 : Math.min(1, (progress - a[0]) / (b[0] - a[0]));
+      var values = {};
+      values[track.prop] = mix(a[1], b[1], f);
+      targets(track.target, trigger).forEach(function (el) { render(el, values, null); });
+    });
+  }
+  function mix(a, b, f) {
+    if (typeof a === 'number' && typeof b === 'number') return a + (b - a) * f;
+    if (Array.isArray(a) && Array.isArray(b)) return a.map(function (value, i) { return mix(value, b[i], f); });
+    return f < 1 ? a : b;
+  }
+  function bind() {
+    document.addEventListener('click', function (e) {
+      var byElement = new Map();
+      hits(e.target, ['MOUSE_CLICK', 'MOUSE_SECOND_CLICK']).forEach(function (hit) {
+        if (!byElement.has(hit.el)) byElement.set(hit.el, []);
+        byElement.get(hit.el).push(hit.event);
+      });
+      byElement.forEach(function (events, el) {
+        var clicks = el.wfClicks = (el.wfClicks || 0) + 1;
+        var second = events.some(function (event) { return event.type === 'MOUSE_SECOND_CLICK'; });
+        var type = second && clicks % 2 === 0 ? 'MOUSE_SECOND_CLICK' : 'MOUSE_CLICK';
+        fire(events.filter(function (event) { return event.type === type; }).map(function (event) {
+          return { el: el, event: event };
+        }));
+      });
+    });
+    ['mouseover', 'mouseout'].forEach(function (name) {
+      document.addEventListener(name, function (e) {
+        fire(hits(e.target, [name === 'mouseover' ? 'MOUSE_OVER' : 'MOUSE_OUT']).filter(function (hit) {
+          return !e.relatedTarget || !hit.el.contains(e.relatedTarget);
+        }));
+      });
+    });
+    Object.keys(signals).forEach(function (name) {
+      document.addEventListener(name, function (e) { fire(hits(e.target, [signals[name]], e.target.parentNode)); });
+    });
+    var scrolling = ix.events.filter(function (event) { return event.type === 'SCROLLING_IN_VIEW'; });
+    if (scrolling.length) {
+      var pending = false;
+      var update = function () {
+        pending = false;
+        scrolling.forEach(function (event) {
+          if (!active(event)) return;
+          Array.prototype.forEach.call(document.querySelectorAll(event.trigger), function (el) { scrub(el, event); });
+        });
+      };
+      var schedule = function () { if (!pending) { pending = true; requestAnimationFrame(update); } };
+      window.addEventListener('scroll', schedule, { passive: true });
+      window.addEventListener('resize', schedule);
+      schedule();
+    }
+    window.addEventListener('load', function () {
+      loaded = true;
+      ix.events.forEach(function (event) {
+        if (event.type === 'PAGE_FINISH' && active(event)) {
+          each(document, event.trigger, function (trigger) { play(event, trigger); });
+        }
+      });
+    });
+  }
+  var observer = null;
+  function observe(el) {
+    if (!observer) {
+      observer = new IntersectionObserver(function (entries) {
+        entries.forEach(function (entry) {
+          var el = entry.target, seen = el.wfSeen;
+          el.wfSeen = entry.isIntersecting;
+          if (entry.isIntersecting) fire(hits(el, ['SCROLL_INTO_VIEW'], el.parentNode));
+          else if (seen) fire(hits(el, ['SCROLL_OUT_OF_VIEW'], el.parentNode));
+        });
+      });
+    }
+    observer.observe(el);
+  }
+  components.push(function (root) {
+    if (!ix) {
+      var data = document.getElementById('wf-ix');
+      if (!data) return;
+      ix = JSON.parse(data.textContent);
+      bind();
+    }
+    var initialized = root.wfInitial || (root.wfInitial = {});
+    ix.events.forEach(function (event) {
+      var list = ix.lists[event.list];
+      if (!active(event)) return;
+      each(root, event.trigger, function (trigger) {
+        if (list.initial && list.groups.length) {
+          list.groups[0].forEach(function (item) {
+            // Selector targets are the same elements for every trigger: set them once
+            if (item.target.scope === 'document') {
+              if (initialized[item.id]) return;
+              initialized[item.id] = true;
+            }
+            apply(item, trigger, true);
+          });
+        }
+        if (event.type === 'SCROLL_INTO_VIEW' || event.type === 'SCROLL_OUT_OF_VIEW') observe(trigger);
+        if (event.type === 'PAGE_START' && root === document) play(event, trigger);
+        if (event.type === 'PAGE_FINISH' && loaded && root === document) play(event, trigger);
+      });
+    });
+  });
+'''
+
+
+class Unsupported(Exception):
+    """Something on a page the lite runtime does not implement; the message says what."""
+
+
+def strip_js_comments(source):
+    return JS_COMMENT.sub('', source)
+
+
+def bundle_api_use(data, tree):
+    """Inline scripts of the page that call jQuery or the Webflow API, as short excerpts."""
+    uses = []
+    for script in tree.find_all('script'):
+        attrs = script.attrs
+        if 'src' in attrs or attrs.get('id') in OWN_SCRIPTS or 'json' in attrs.get('type', ''):
+            continue
+        code = strip_js_comments(data[script.inner_start:script.inner_end].decode('utf-8', errors='replace'))
+        match = BUNDLE_API.search(code)
+        if match:
+            uses.append(' '.join(code[match.start():match.start() + 40].split()))
+    return uses
+
+
+def lightbox_items(data, tree):
+    """Number of lightboxes that have media to show; Webflow exports empty ones that do nothing."""
+    count = 0
+    for lightbox in tree.find_all(classes='w-lightbox'):
+        for script in lightbox.find_all('script', 'w-json'):
+            try:
+                config = json.loads(data[script.inner_start:script.inner_end])
+            except ValueError:
+                count += 1
+                continue
+            if config.get('items'):
+                count += 1
+    return count
+
+
+def id_selector(wid):
+    return f'[data-w-id="{wid}"], [data-w-id^="{wid}_instance"]'
+
+
+def compile_target(target):
+    """The runtime form of an action item target, or None when it selects nothing."""
+    use_event_target = target.get('useEventTarget')
+    if use_event_target is True:
+        return {'scope': 'self'}
+    if target.get('id'):
+        selector = id_selector(split_target(target['id'])[1])
+    elif target.get('selector'):
+        selector = target['selector']
+    else:
+        # IX2 resolves an empty target to no elements (Webflow's preset nav/dropdown animations)
+        return None
+    if use_event_target:
+        if use_event_target not in TARGET_SCOPES:
+            raise Unsupported(f"{use_event_target} target")
+        return {'sel': selector, 'scope': TARGET_SCOPES[use_event_target]}
+    return {'sel': selector, 'scope': 'boundary' if target.get('boundaryMode') else 'document'}
+
+
+def compile_values(item):
+    """{property: value} an action item sets, in the shapes the runtime's css()/transform() take."""
+    kind, config = item['actionTypeId'], item['config']
+    if kind in TRANSFORMS:
+        name, unit = TRANSFORMS[kind]
+        axes = []
+        for axis in 'xyz':
+            value = config.get(f'{axis}Value')
+            if value is None:
+                axes.append(None)
+            elif name == 'scale':
+                axes.append(value)
+            else:
+                axis_unit = config.get(f'{axis}Unit') or unit
+                axes.append([value, '%' if axis_unit == '%' else axis_unit.lower()])
+        return {name: axes}
+    if kind == 'STYLE_OPACITY':
+        return {'opacity': config.get('value', 1)}
+    if kind == 'STYLE_SIZE':
+        values = {}
+        for dimension in ('width', 'height'):
+            unit = config.get(f'{dimension}Unit') or 'px'
+            if config.get(f'{dimension}Value') is not None:
+                values[dimension] = [config[f'{dimension}Value'], '%' if unit == '%' else unit.lower()]
+            elif unit.upper() == 'AUTO':
+                values[dimension] = 'auto'
+        return values
+    if kind == 'STYLE_BACKGROUND_COLOR':
+        return {'backgroundColor': [config.get('rValue', 0), config.get('gValue', 0), config.get('bValue', 0),
+                                    config.get('aValue', 1)]}
+    if kind == 'GENERAL_DISPLAY':
+        return {'display': config.get('value', '')}
+    raise Unsupported(f"{kind} action")
+
+
+def compile_item(item):
+    """The runtime form of an action item, or None for items that select nothing."""
+    config = item['config']
+    target = compile_target(config.get('target') or {})
+    if target is None:
+        return None
+    compiled = {'id': item['id'], 'target': target, 'values': compile_values(item)}
+    if config.get('duration'):
+        compiled['duration'] = config['duration']
+        compiled['easing'] = EASINGS.get(config.get('easing') or '', 'ease')
+    if config.get('delay'):
+        compiled['delay'] = config['delay']
+    return compiled
+
+
+def compile_list(action_list):
+    """
+    The runtime form of an action list: sequential groups (the first one
+    being the initial state when useFirstGroupAsInitialState is set) and,
+    for scroll progress lists, one keyframe track per target and property.
+    Returns None when no item of the list selects anything.
+    """
+    compiled = {}
+    groups = [[item for item in map(compile_item, group.get('actionItems', [])) if item]
+              for group in action_list.get('actionItemGroups', [])]
+    if any(groups):
+        compiled['groups'] = groups
+        if action_list.get('useFirstGroupAsInitialState'):
+            compiled['initial'] = True
+    tracks = {}
+    for parameters in action_list.get('continuousParameterGroups', []):
+        if parameters.get('type') != 'SCROLL_PROGRESS':
+            raise Unsupported(f"{parameters.get('type')} continuous interaction")
+        for group in parameters.get('continuousActionGroups', []):
+            for item in map(compile_item, group.get('actionItems', [])):
+                if item is None:
+                    continue
+                for prop, value in item['values'].items():
+                    key = (json.dumps(item['target'], sort_keys=True), prop)
+                    track = tracks.setdefault(key, {'target': item['target'], 'prop': prop, 'frames': []})
+                    track['frames'].append([group.get('keyframe', 0), value])
+    if tracks:
+        compiled['tracks'] = [dict(track, frames=sorted(track['frames'], key=lambda frame: frame[0]))
+                              for track in tracks.values()]
+    return compiled or None
+
+
+def page_interactions(interactions, page_id, wids, classes):
+    """
+    The interaction data the runtime needs for one page - {'mq', 'events',
+    'lists'} - or None when no interaction applies to it. Raises Unsupported
+    for interactions the runtime cannot play.
+    """
+    events, lists = [], {}
+    all_breakpoints = set(interactions.breakpoints)
+    for event in interactions.events.values():
+        triggers = []
+        for target in event.get('targets') or [event.get('target', {})]:
+            if target.get('appliesTo') == 'CLASS' and target.get('selector'):
+                if set(target['selector'].lstrip('.').split('.')) <= classes:
+                    triggers.append(target['selector'])
+            elif target.get('appliesTo') == 'PAGE':
+                if target.get('id') == page_id:
+                    triggers.append('html')
+            elif target.get('id'):
+                page, wid = split_target(target['id'])
+                if (page is None or page == page_id) and wid in wids:
+                    triggers.append(id_selector(wid))
+        if not triggers:
+            continue
+        list_id = event['action']['config'].get('actionListId')
+        action_list = interactions.action_lists.get(list_id)
+        if action_list is None:
+            continue
+        if event['eventTypeId'] not in SUPPORTED_EVENTS:
+            raise Unsupported(f"{event['eventTypeId']} interaction ({event['id']})")
+        if list_id not in lists:
+            lists[list_id] = compile_list(action_list)
+        if lists[list_id] is None:
+            continue
+        compiled = {'type': event['eventTypeId'], 'trigger': ', '.join(triggers), 'list': list_id}
+        media = event.get('mediaQueries') or []
+        if media and set(media) != all_breakpoints:
+            compiled['media'] = media
+        config = event.get('config')
+        if isinstance(config, dict) and config.get('loop'):
+            compiled['loop'] = True
+        events.append(compiled)
+    if not events:
+        return None
+    used = {event['list'] for event in events}
+    return {
+        'mq': [[key, low, int(high)] for key, (low, high) in interactions.breakpoints.items()],
+        'events': events,
+        'lists': {list_id: compiled for list_id, compiled in lists.items() if list_id in used},
+    }
+
+
+def analyse(data, interactions):
+    """
+    (components, interaction data, reasons) for a page. components is the
+    ordered list of runtime components it needs; reasons lists why the page
+    has to keep the full bundle (empty when the lite runtime covers it).
+    """
+    tree = build_tree(data)
+    classes, wids = set(), set()
+    for element in tree.iter():
+        classes.update(element.classes)
+        if 'data-w-id' in element.attrs:
+            wids.add(element.attrs['data-w-id'])
+
+    reasons = [f"{description} ({name})" for name, description in UNSUPPORTED_CLASSES.items() if name in classes]
+    if 'w-lightbox' in classes and lightbox_items(data, tree):
+        reasons.append('lightbox with items')
+    reasons += [f"page script uses the bundle: {use}" for use in bundle_api_use(data, tree)]
+
+    components = [name for name, class_name in COMPONENT_CLASSES.items() if class_name in classes]
+    ix_data = None
+    if interactions is not None:
+        match = PAGE_ID.search(data)
+        try:
+            ix_data = page_interactions(interactions, match.group(1).decode() if match else None, wids, classes)
+        except Unsupported as e:
+            reasons.append(str(e))
+    if ix_data:
+        components.append('ix')
+    return [name for name in COMPONENT_ORDER if name in components], ix_data, reasons
+
+
+def runtime_source(components):
+    return CORE_JS % {
+        'names': ', '.join(components),
+        'components': ''.join(COMPONENT_JS[name] for name in components),
+    }
+
+
+def runtime_path(components):
+    return f"{RUNTIME_DIR}/{'-'.join(components)}.js"
+
+
+def original_tags(page, indent):
+    return b''.join(
+        indent + f'<script src="{get_relative_path(page, script)}" type="text/javascript"></script>\n'.encode()
+        for script in (JQUERY_SCRIPT, IX2_SCRIPT))
+
+
+def restore_bundle(page, data):
+    """Put the original bundle tags back in place of a lite runtime block. Returns (data, restored)."""
+    def original(match):
+        if match.group(3) is not None:
+            return unquote_to_bytes(match.group(3))
+        # Markers written before the tags were recorded: rebuild them
+        return original_tags(page, match.group(1))
+    restored, count = MARKER.subn(original, data)
+    return restored, count > 0
+
+
+def rewrite_page(page, data, components, ix_data):
+    """Replace the bundle tags with the runtime for the given components, or with nothing."""
+    tags = list(BUNDLE_TAG.finditer(data))
+    indent = re.match(rb'[ \t]*', tags[0].group(0)).group(0)
+    # The tags are next to each other on every page; when they are, the whole run
+    # (whitespace between them included) is replaced and recorded, so restoring is exact
+    adjacent = not data[tags[0].end():tags[-1].start()].strip(b' \t\n')
+    if adjacent:
+        original = data[tags[0].start():tags[-1].end()]
+    else:
+        # Other markup in between stays where it is; restore puts the tags back together at the first one
+        original = b''.join(tag.group(0) for tag in tags)
+    block = (indent + b'<!-- webflow-lite: ' + (' '.join(components) or 'none').encode()
+             + b' | ' + quote(original, safe=MARKER_SAFE).encode() + b' -->\n')
+    if ix_data:
+        payload = json.dumps(ix_data, separators=(',', ':'), ensure_ascii=False).replace('</', '<\\/')
+        block += indent + b'<script type="application/json" id="wf-ix">' + payload.encode('utf-8') + b'</script>\n'
+    if components:
+        src = get_relative_path(page, runtime_path(components))
+        block += indent + f'<script src="{src}" type="text/javascript" data-wf-lite></script>\n'.encode()
+    if adjacent:
+        return data[:tags[0].start()] + block + data[tags[-1].end():]
+    edits = [(tag.start(), tag.end(), b'') for tag in tags[1:]]
+    edits.append((tags[0].start(), tags[0].end(), block))
+    return apply_edits(data, edits)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Replace the jQuery/Webflow bundle with a per-page vanilla runtime')
+    parser.add_argument('pages', nargs='*', help='Pages to process (default: every page of the site)')
+    parser.add_argument('--project-root', default='.', help='Site root (default: current directory)')
+    parser.add_argument('--restore', action='store_true', help='Put the original bundle script tags back')
+    parser.add_argument('--dry-run', action='store_true', help='Report what would change without writing')
+    args = parser.parse_args()
+
+    os.chdir(args.project_root)
+    pages = args.pages or find_pages('.')
+    print(("🔁 Restoring the Webflow bundle" if args.restore else "🧩 Building the Webflow lite runtime")
+          + (" (dry run)" if args.dry_run else ""))
+    print("=" * 50)
+
+    interactions = None
+    if not args.restore:
+        try:
+            interactions = Interactions(load_interactions(IX2_SCRIPT)[1])
+        except (OSError, ValueError) as e:
+            print(f"  ⚠️  no interaction data ({e}); pages with data-w-id hooks keep the bundle")
+
+    bundle_bytes = sum(os.path.getsize(path) for path in (JQUERY_SCRIPT, IX2_SCRIPT) if os.path.exists(path))
+    combinations = Counter()
+    fallbacks = {}
+    changed = 0
+    for page in pages:
+        page = os.path.normpath(page)
+        with open(page, 'rb') as f:
+            original = f.read()
+        data, _ = restore_bundle(page, original)
+        if not args.restore and BUNDLE_TAG.search(data):
+            components, ix_data, reasons = analyse(data, interactions)
+            if interactions is None and b'data-w-id' in data:
+                reasons.append('no interaction data')
+            if reasons:
+                fallbacks[page] = reasons
+            else:
+                combinations[tuple(components)] += 1
+                data = rewrite_page(page, data, components, ix_data)
+        if data != original:
+            changed += 1
+            if not args.dry_run:
+                with open(page, 'wb') as f:
+                    f.write(data)
+
+    if not args.restore:
+        for components in combinations:
+            if not components:
+                continue
+            path = runtime_path(components)
+            source = runtime_source(components).encode('utf-8')
+            print(f"  📦 {path}: {len(source) / 1024:.1f} KB, {combinations[components]} pages")
+            if not args.dry_run:
+                os.makedirs(RUNTIME_DIR, exist_ok=True)
+                with open(path, 'wb') as f:
+                    f.write(source)
+        if combinations.get(()):
+            print(f"  ✂️  {combinations[()]} pages use no Webflow component and ship no script")
+        covered = sum(combinations.values())
+        print(f"\n  {covered} pages moved off the {bundle_bytes / 1024:.0f} KB jQuery + Webflow bundle")
+        if fallbacks:
+            print(f"  ⚠️  {len(fallbacks)} pages keep the bundle:")
+            for page, reasons in sorted(fallbacks.items()):
+                print(f"    - {page}: {'; '.join(reasons)}")
+    print(f"\n{'Would update' if args.dry_run else 'Updated'} {changed} pages")
+    if not args.dry_run and changed:
+        print("✅ Done. Check the navbar, dropdowns, tabs and interactions in a browser at each breakpoint.")
+    sys.exit(0)
+
+
+if __name__ == "__main__":
+    main()